@@ -59,6 +59,10 @@ class PaillierCryptosystem:
     E(m1) * E(m2) = E(m1 + m2) という特性を持つ。
     """
 
+    # 鍵ファイルに保存するCRT復号用のフィールド（q_inv は q^(-1) mod p）
+    # 素因数 p, q そのものは保存せず、読み込み時に set_crt_factor で復元する
+    CRT_KEY_FIELDS = ("hp", "hq", "q_inv")
+
     def __init__(self, key_size=PAILLIER_KEY_BITS):
         """
         Paillier暗号システムを初期化
@@ -102,6 +106,8 @@ class PaillierCryptosystem:
         # 公開鍵と秘密鍵の設定
         self.public_key = {"n": n, "g": g}
         self.private_key = {"lambda": lambda_n, "mu": mu}
+        # CRT復号用の事前計算値
+        self.private_key.update(self._crt_parameters(self._p, self._q, g))
 
         return self.public_key, self.private_key
 
@@ -117,6 +123,20 @@ class PaillierCryptosystem:
             raise ValueError("鍵ペアがまだ生成されていません")
         return self._q
 
+    def set_crt_factor(self, prime_factor) -> bool:
+        """鍵ファイルの素因数と n // prime_factor からCRT復号用の p, q を復元（q_inv と照合して順序を決める）"""
+        n = self.public_key["n"]
+        q_inv = self.private_key.get("q_inv")
+        if not prime_factor or not q_inv or n % prime_factor != 0:
+            return False
+
+        other = n // prime_factor
+        for p, q in ((prime_factor, other), (other, prime_factor)):
+            if p > 1 and q > 1 and q * q_inv % p == 1:
+                self._p, self._q = p, q
+                return True
+        return False
+
     def decrypt(self, c, apply_transform=False):
         """
         暗号文を復号
@@ -132,14 +152,19 @@ class PaillierCryptosystem:
             raise ValueError("秘密鍵が設定されていません")
 
         n = self.public_key["n"]
-        lambda_n = self.private_key["lambda"]
-        mu = self.private_key["mu"]
-        n_squared = n * n
+        if self._use_crt(n):
+            # p^2, q^2 を法として計算し、CRTで結合（n^2 を法とするより高速）
+            m = self._decrypt_crt(c)
+        else:
+            # CRT用のパラメータを持たない鍵は従来の方法で復号
+            lambda_n = self.private_key["lambda"]
+            mu = self.private_key["mu"]
+            n_squared = n * n
 
-        # L(c^λ mod n^2) * μ mod n を計算
-        c_lambda = pow(c, lambda_n, n_squared)
-        L_c_lambda = (c_lambda - 1) // n
-        m = (L_c_lambda * mu) % n
+            # L(c^λ mod n^2) * μ mod n を計算
+            c_lambda = pow(c, lambda_n, n_squared)
+            L_c_lambda = (c_lambda - 1) // n
+            m = (L_c_lambda * mu) % n
 
         return m
 
@@ -181,6 +206,33 @@ class PaillierCryptosystem:
         """mod mでのaの逆元を計算"""
         return pow(a, -1, m)
 
+    def _crt_parameters(self, p, q, g):
+        """CRT復号用の秘密鍵パラメータを事前計算（hp = L_p(g^(p-1) mod p^2)^(-1) mod p、hqも同様）"""
+        hp = self._mod_inverse((pow(g, p - 1, p * p) - 1) // p, p)
+        hq = self._mod_inverse((pow(g, q - 1, q * q) - 1) // q, q)
+        return {"hp": hp, "hq": hq, "q_inv": self._mod_inverse(q, p)}
+
+    def _use_crt(self, n):
+        """素因数が復元済みでCRT用のパラメータを持ち、公開鍵と対応しているかを判定"""
+        key = self.private_key
+        if self._p is None or self._q is None:
+            return False
+        if not all(key.get(name) for name in self.CRT_KEY_FIELDS):
+            return False
+        return self._p * self._q == n
+
+    def _decrypt_crt(self, c):
+        """p^2, q^2 を法として復号し、中国剰余定理（CRT）で結合"""
+        p = self._p
+        q = self._q
+
+        # m_p = L_p(c^(p-1) mod p^2) * hp mod p、m_q も同様
+        m_p = ((pow(c, p - 1, p * p) - 1) // p) * self.private_key["hp"] % p
+        m_q = ((pow(c, q - 1, q * q) - 1) // q) * self.private_key["hq"] % q
+
+        # m ≡ m_p (mod p), m ≡ m_q (mod q) を満たす m を求める
+        return m_q + q * ((m_p - m_q) * self.private_key["q_inv"] % p)
+
 # 数学ユーティリティ関数
 def fibonacci(n: int) -> int:
     """フィボナッチ数列のn番目の値を計算"""
@@ -547,6 +599,12 @@ def decrypt_with_key(data: bytes, key_data: Dict[str, Any], key_path: str = "")
                 "lambda": private_key.get("lambda", 0),
                 "mu": private_key.get("mu", 0)
             }
+            # CRT復号用のパラメータ（古い鍵ファイルにはないため、その場合は従来の方法で復号）
+            for name in PaillierCryptosystem.CRT_KEY_FIELDS:
+                if name in private_key:
+                    paillier.private_key[name] = int(private_key[name])
+            # 素因数 p, q は鍵ファイルの prime_factor と n // prime_factor から復元する
+            paillier.set_crt_factor(parameters.get("modulus_component", {}).get("prime_factor"))
         except (ValueError, TypeError) as e:
             print(f"秘密鍵の解析に失敗しました: {e}")
             return b""
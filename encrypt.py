@@ -119,6 +119,10 @@ class PaillierCryptosystem:
     E(m1) * E(m2) = E(m1 + m2) という特性を持つ。
     """
 
+    # 鍵ファイルに保存するCRT復号用のフィールド（q_inv は q^(-1) mod p）
+    # 素因数 p, q そのものは保存せず、読み込み時に set_crt_factor で復元する
+    CRT_KEY_FIELDS = ("hp", "hq", "q_inv")
+
     def __init__(self, key_size=PAILLIER_KEY_BITS):
         """
         Paillier暗号システムを初期化
@@ -164,6 +168,8 @@ class PaillierCryptosystem:
         # 公開鍵と秘密鍵の設定
         self.public_key = {"n": n, "g": g}
         self.private_key = {"lambda": lambda_n, "mu": mu}
+        # CRT復号用の事前計算値
+        self.private_key.update(self._crt_parameters(self._p, self._q, g))
 
         return self.public_key, self.private_key
 
@@ -189,6 +195,31 @@ class PaillierCryptosystem:
             raise ValueError("鍵ペアがまだ生成されていません")
         return self._q
 
+    def set_crt_factor(self, prime_factor) -> bool:
+        """
+        鍵ファイルの素因数からCRT復号用の素因数 p, q を復元
+
+        鍵ファイルには素因数の一方しか含まれないため、もう一方は n // prime_factor として求め、
+        q_inv（q^(-1) mod p）と照合して p, q の順序を決める
+
+        Args:
+            prime_factor: 鍵ファイルに含まれる素因数
+
+        Returns:
+            CRT復号を使用できる場合はTrue（Falseの場合は従来の方法で復号される）
+        """
+        n = self.public_key["n"]
+        q_inv = self.private_key.get("q_inv")
+        if not prime_factor or not q_inv or n % prime_factor != 0:
+            return False
+
+        other = n // prime_factor
+        for p, q in ((prime_factor, other), (other, prime_factor)):
+            if p > 1 and q > 1 and q * q_inv % p == 1:
+                self._p, self._q = p, q
+                return True
+        return False
+
     def encrypt(self, m):
         """
         平文を暗号化
@@ -233,14 +264,19 @@ class PaillierCryptosystem:
             raise ValueError("秘密鍵が設定されていません")
 
         n = self.public_key["n"]
-        lambda_n = self.private_key["lambda"]
-        mu = self.private_key["mu"]
-        n_squared = n * n
-
-        # L(c^λ mod n^2) * μ mod n を計算
-        c_lambda = pow(c, lambda_n, n_squared)
-        L_c_lambda = (c_lambda - 1) // n
-        m = (L_c_lambda * mu) % n
+        if self._use_crt(n):
+            # p^2, q^2 を法として計算し、CRTで結合（n^2 を法とするより高速）
+            m = self._decrypt_crt(c)
+        else:
+            # CRT用のパラメータを持たない鍵は従来の方法で復号
+            lambda_n = self.private_key["lambda"]
+            mu = self.private_key["mu"]
+            n_squared = n * n
+
+            # L(c^λ mod n^2) * μ mod n を計算
+            c_lambda = pow(c, lambda_n, n_squared)
+            L_c_lambda = (c_lambda - 1) // n
+            m = (L_c_lambda * mu) % n
 
         return m
 
@@ -326,6 +362,63 @@ class PaillierCryptosystem:
         """
         return pow(a, -1, m)
 
+    def _crt_parameters(self, p, q, g):
+        """
+        CRT復号用の秘密鍵パラメータを事前計算
+
+        hp = L_p(g^(p-1) mod p^2)^(-1) mod p、hq も同様（L_p(x) = (x-1)/p）
+
+        Args:
+            p, q: 素因数
+            g: 生成子
+
+        Returns:
+            CRT_KEY_FIELDS の各値を持つ辞書
+        """
+        hp = self._mod_inverse((pow(g, p - 1, p * p) - 1) // p, p)
+        hq = self._mod_inverse((pow(g, q - 1, q * q) - 1) // q, q)
+        return {"hp": hp, "hq": hq, "q_inv": self._mod_inverse(q, p)}
+
+    def _use_crt(self, n):
+        """
+        CRT復号を使用できるかを判定
+
+        Args:
+            n: 公開鍵のモジュラス
+
+        Returns:
+            素因数が復元済みでCRT用のパラメータを持ち、公開鍵と対応している場合はTrue
+        """
+        key = self.private_key
+        if self._p is None or self._q is None:
+            return False
+        if not all(key.get(name) for name in self.CRT_KEY_FIELDS):
+            return False
+        return self._p * self._q == n
+
+    def _decrypt_crt(self, c):
+        """
+        中国剰余定理（CRT）を用いて暗号文を復号
+
+        c^λ mod n^2 の代わりに p^2, q^2 を法とする半分のサイズのべき乗で
+        m mod p, m mod q を求め、CRTで結合する
+
+        Args:
+            c: 暗号文
+
+        Returns:
+            復号された平文
+        """
+        p = self._p
+        q = self._q
+
+        # m_p = L_p(c^(p-1) mod p^2) * hp mod p、m_q も同様
+        m_p = ((pow(c, p - 1, p * p) - 1) // p) * self.private_key["hp"] % p
+        m_q = ((pow(c, q - 1, q * q) - 1) // q) * self.private_key["hq"] % q
+
+        # m ≡ m_p (mod p), m ≡ m_q (mod q) を満たす m を求める
+        return m_q + q * ((m_p - m_q) * self.private_key["q_inv"] % p)
+
     def _get_random_coprime(self, n):
         """
         nと互いに素な乱数を生成
@@ -563,6 +656,10 @@ def encrypt_file(file_path1: str, file_path2: str, output_path: str = None, save
             "lambda": paillier.private_key["lambda"],
             "mu": paillier.private_key["mu"]
         }
+        # CRT復号用の事前計算値（素因数 p, q は含めず、読み込み時に prime_factor から復元する。
+        # これらを持たない古い鍵ファイルは従来の方法で復号される）
+        for name in PaillierCryptosystem.CRT_KEY_FIELDS:
+            private_key[name] = paillier.private_key[name]
 
         # 個別のシード値を生成
         seed_1 = hashlib.sha256(str(p_value).encode() + master_seed).digest()
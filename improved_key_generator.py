@@ -26,6 +26,10 @@ PAILLIER_KEY_BITS = 1024
 class PaillierCryptosystem:
     """Paillier準同型暗号システム（簡略版）"""
 
+    # 鍵ファイルに保存するCRT復号用のフィールド（q_inv は q^(-1) mod p）
+    # 素因数 p, q そのものは保存せず、読み込み時に set_crt_factor で復元する
+    CRT_KEY_FIELDS = ("hp", "hq", "q_inv")
+
     def __init__(self, key_size=PAILLIER_KEY_BITS):
         self.key_size = key_size
         self.public_key = None
@@ -57,6 +61,8 @@ class PaillierCryptosystem:
         # 公開鍵と秘密鍵の設定
         self.public_key = {"n": n, "g": g}
         self.private_key = {"lambda": lambda_n, "mu": mu}
+        # CRT復号用の事前計算値
+        self.private_key.update(self._crt_parameters(self._p, self._q, g))
 
         return self.public_key, self.private_key
 
@@ -80,6 +86,12 @@ class PaillierCryptosystem:
         """mod mでのaの逆元を計算"""
         return pow(a, -1, m)
 
+    def _crt_parameters(self, p, q, g):
+        """CRT復号用の秘密鍵パラメータを事前計算（hp = L_p(g^(p-1) mod p^2)^(-1) mod p、hqも同様）"""
+        hp = self._mod_inverse((pow(g, p - 1, p * p) - 1) // p, p)
+        hq = self._mod_inverse((pow(g, q - 1, q * q) - 1) // q, q)
+        return {"hp": hp, "hq": hq, "q_inv": self._mod_inverse(q, p)}
+
 def generate_fibonacci_sequence(seed_val, length=5):
     """
     シード値からフィボナッチ数列を生成
@@ -141,6 +153,10 @@ def generate_improved_key_parameters(master_seed: bytes = None) -> Tuple[Dict[st
         "lambda": paillier.private_key["lambda"],
         "mu": paillier.private_key["mu"]
     }
+    # CRT復号用の事前計算値（素因数 p, q は含めず、読み込み時に prime_factor から復元する。
+    # これらを持たない古い鍵ファイルは従来の方法で復号される）
+    for name in PaillierCryptosystem.CRT_KEY_FIELDS:
+        private_key[name] = paillier.private_key[name]
 
     # 素因数を取得
     p_value = paillier.get_p()
@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ラビット暗号化方式のベンチマーク
+
+鍵ストリーム生成、XOR、カプセル変換、鍵導出、ファイル単位の暗号化/復号について
+スループット（MB/s）、レイテンシ（中央値/最小値）、ピークメモリ（tracemalloc）を計測し、
+JSON形式で出力します。保存済みのベースラインと比較し、許容率を超える性能低下が
+あれば失敗として終了コード1を返します。
+反復回数が少ないため裾のパーセンタイル（p99など）は報告しません。
+既定のサイズは小さなものだけで、16MB以上のサイズは --large で明示的に追加します。
+
+使用例:
+    python -m method_6_rabbit.benchmark --sizes 1K,1M --output bench.json
+    python -m method_6_rabbit.benchmark --baseline bench.json --max-regression 15
+    python -m method_6_rabbit.benchmark --large --output bench_large.json
+"""
+
+import os
+import sys
+import io
+import glob
+import json
+import time
+import shutil
+import argparse
+import platform
+import datetime
+import statistics
+import tempfile
+import tracemalloc
+import contextlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# インポートエラーを回避するための処理
+if __name__ == "__main__":
+    # モジュールとして実行された場合の処理
+    sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+    from method_6_rabbit.config import (
+        BENCHMARK_SIZES,
+        BENCHMARK_LARGE_SIZES,
+        BENCHMARK_REPEATS,
+        BENCHMARK_REPEAT_BYTE_BUDGET,
+        BENCHMARK_MAX_REGRESSION,
+        RABBIT_KEY_SIZE,
+        RABBIT_IV_SIZE,
+        VERSION
+    )
+    from method_6_rabbit.rabbit_stream import RabbitStreamGenerator, derive_key
+    from method_6_rabbit.xor_kernel import xor_bytes
+    from method_6_rabbit.capsule import apply_security_transformations
+    from method_6_rabbit.encrypt import encrypt_file, ENCRYPTION_METHOD_SIMPLE_XOR, ENCRYPTION_METHOD_CAPSULE
+    from method_6_rabbit.decrypt import decrypt_file
+else:
+    # パッケージの一部として実行された場合の処理
+    from .config import (
+        BENCHMARK_SIZES,
+        BENCHMARK_LARGE_SIZES,
+        BENCHMARK_REPEATS,
+        BENCHMARK_REPEAT_BYTE_BUDGET,
+        BENCHMARK_MAX_REGRESSION,
+        RABBIT_KEY_SIZE,
+        RABBIT_IV_SIZE,
+        VERSION
+    )
+    from .rabbit_stream import RabbitStreamGenerator, derive_key
+    from .xor_kernel import xor_bytes
+    from .capsule import apply_security_transformations
+    from .encrypt import encrypt_file, ENCRYPTION_METHOD_SIMPLE_XOR, ENCRYPTION_METHOD_CAPSULE
+    from .decrypt import decrypt_file
+
+# ベンチマーク結果の形式バージョン
+RESULT_FORMAT_VERSION = 2
+
+# ベンチマークで使用する鍵
+BENCHMARK_PASSWORD = "benchmark_password_12345"
+BENCHMARK_FALSE_PASSWORD = "benchmark_false_password_12345"
+
+# 計測対象の一覧（サイズに依存しない計測はサイズ0で1回だけ実行）
+# （encrypt_file/decrypt_file はシンプルなXOR方式、encrypt_file_capsule は既定の多重データカプセル化方式）
+BENCHMARK_CASES = ["keystream", "xor", "capsule_transform", "kdf", "encrypt_file", "decrypt_file",
+                   "encrypt_file_capsule"]
+SIZE_INDEPENDENT_CASES = {"kdf"}
+
+# 計測処理: サイズと作業ディレクトリを受け取り、(計測対象の関数, 後処理) を返す
+CaseFactory = Callable[[int, str], Tuple[Callable[[], Any], Optional[Callable[[], None]]]]
+
+
+def parse_size(text: str) -> int:
+    """
+    サイズ指定文字列をバイト数に変換（例: "64K", "1M", "256MB", "1024"）
+
+    Args:
+        text: サイズ指定文字列
+
+    Returns:
+        バイト数
+
+    Raises:
+        ValueError: 形式が不正な場合
+    """
+    value = text.strip().upper()
+    if value.endswith('B'):
+        value = value[:-1]
+
+    multipliers = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    multiplier = 1
+    if value and value[-1] in multipliers:
+        multiplier = multipliers[value[-1]]
+        value = value[:-1]
+
+    try:
+        size = int(value) * multiplier
+    except ValueError:
+        raise ValueError(f"不正なサイズ指定: {text}")
+    if size <= 0:
+        raise ValueError(f"不正なサイズ指定: {text}")
+    return size
+
+
+def format_size(size: int) -> str:
+    """
+    バイト数を読みやすい文字列に変換
+
+    Args:
+        size: バイト数
+
+    Returns:
+        "1KB"、"256MB" などの文字列
+    """
+    for unit, factor in (("GB", 1024 ** 3), ("MB", 1024 ** 2), ("KB", 1024)):
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{unit}"
+    return f"{size}B"
+
+
+def _write_random_file(path: str, size: int) -> None:
+    """ランダムデータのファイルを作成（大きなサイズでもメモリを使い切らないよう分割して書き込む）"""
+    chunk_size = 1024 * 1024
+    with open(path, 'wb') as f:
+        remaining = size
+        while remaining > 0:
+            n = min(chunk_size, remaining)
+            f.write(os.urandom(n))
+            remaining -= n
+
+
+def _case_keystream(size: int, work_dir: str):
+    key = os.urandom(RABBIT_KEY_SIZE)
+    iv = os.urandom(RABBIT_IV_SIZE)
+    return (lambda: RabbitStreamGenerator(key, iv).generate(size)), None
+
+
+def _case_xor(size: int, work_dir: str):
+    data = os.urandom(size)
+    stream = os.urandom(size)
+    return (lambda: xor_bytes(data, stream)), None
+
+
+def _case_capsule_transform(size: int, work_dir: str):
+    data = os.urandom(size)
+    salt = os.urandom(16)
+    return (lambda: apply_security_transformations(data, BENCHMARK_PASSWORD, salt)), None
+
+
+def _case_kdf(size: int, work_dir: str):
+    # 毎回異なるソルトを使い、鍵導出キャッシュを経由しない実際の導出コストを計測
+    return (lambda: derive_key(BENCHMARK_PASSWORD, os.urandom(16))), None
+
+
+def _encrypt_file_case(size: int, work_dir: str, method: str):
+    true_file = os.path.join(work_dir, "true.dat")
+    false_file = os.path.join(work_dir, "false.dat")
+    _write_random_file(true_file, size)
+    _write_random_file(false_file, size)
+    output_dir = os.path.join(work_dir, "encrypted")
+    os.makedirs(output_dir, exist_ok=True)
+
+    def run():
+        encrypt_file(true_file, false_file, os.path.join(output_dir, "encrypted.bin"),
+                     BENCHMARK_PASSWORD, method, false_key=BENCHMARK_FALSE_PASSWORD)
+
+    def cleanup():
+        # 出力ファイル名にはタイムスタンプが付加されるため、計測ごとに削除する
+        for path in glob.glob(os.path.join(output_dir, "*")):
+            os.remove(path)
+
+    return run, cleanup
+
+
+def _case_encrypt_file(size: int, work_dir: str):
+    return _encrypt_file_case(size, work_dir, ENCRYPTION_METHOD_SIMPLE_XOR)
+
+
+def _case_encrypt_file_capsule(size: int, work_dir: str):
+    return _encrypt_file_case(size, work_dir, ENCRYPTION_METHOD_CAPSULE)
+
+
+def _case_decrypt_file(size: int, work_dir: str):
+    run_encrypt, _ = _case_encrypt_file(size, work_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_encrypt()
+    encrypted_file = glob.glob(os.path.join(work_dir, "encrypted", "*"))[0]
+    output_dir = os.path.join(work_dir, "decrypted")
+    os.makedirs(output_dir, exist_ok=True)
+
+    def run():
+        decrypt_file(encrypted_file, os.path.join(output_dir, "decrypted.dat"), BENCHMARK_PASSWORD)
+
+    def cleanup():
+        for path in glob.glob(os.path.join(output_dir, "*")):
+            os.remove(path)
+
+    return run, cleanup
+
+
+CASE_FACTORIES: Dict[str, CaseFactory] = {
+    "keystream": _case_keystream,
+    "xor": _case_xor,
+    "capsule_transform": _case_capsule_transform,
+    "kdf": _case_kdf,
+    "encrypt_file": _case_encrypt_file,
+    "decrypt_file": _case_decrypt_file,
+    "encrypt_file_capsule": _case_encrypt_file_capsule,
+}
+
+
+def measure(func: Callable[[], Any], size: int, repeats: int,
+            cleanup: Optional[Callable[[], None]] = None,
+            track_memory: bool = True) -> Dict[str, Any]:
+    """
+    関数の実行時間とピークメモリを計測
+
+    時間計測とメモリ計測は別々に実行します（tracemalloc有効時は処理が遅くなるため）。
+
+    Args:
+        func: 計測対象の関数
+        size: 1回の処理で扱うデータサイズ（バイト、サイズに依存しない場合は0）
+        repeats: 時間計測の反復回数
+        cleanup: 各実行後に呼び出す後処理（計測時間に含まない）
+        track_memory: ピークメモリを計測するかどうか
+
+    Returns:
+        計測結果の辞書
+    """
+    timings = []
+    for _ in range(max(1, repeats)):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        if cleanup:
+            cleanup()
+
+    peak_memory = None
+    if track_memory:
+        tracemalloc.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                func()
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        if cleanup:
+            cleanup()
+
+    median = statistics.median(timings)
+    return {
+        "size": size,
+        "repeats": len(timings),
+        "mb_per_s": (size / (1024 * 1024)) / median if size and median > 0 else None,
+        "ops_per_s": 1.0 / median if median > 0 else None,
+        "median_ms": median * 1000,
+        "min_ms": min(timings) * 1000,
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def run_benchmarks(cases: Optional[List[str]] = None, sizes: Optional[List[int]] = None,
+                   repeats: int = BENCHMARK_REPEATS,
+                   repeat_byte_budget: int = BENCHMARK_REPEAT_BYTE_BUDGET,
+                   track_memory: bool = True, verbose: bool = False) -> Dict[str, Any]:
+    """
+    ベンチマークを実行
+
+    Args:
+        cases: 計測対象の名前のリスト（省略時は全て）
+        sizes: データサイズのリスト（省略時は BENCHMARK_SIZES）
+        repeats: 各計測の最大反復回数
+        repeat_byte_budget: 反復回数×サイズの上限
+        track_memory: ピークメモリを計測するかどうか
+        verbose: 計測ごとに結果を表示するかどうか
+
+    Returns:
+        JSONに変換可能なベンチマーク結果
+
+    Raises:
+        ValueError: 未知の計測対象が指定された場合
+    """
+    cases = list(cases or BENCHMARK_CASES)
+    sizes = list(sizes or BENCHMARK_SIZES)
+    for case in cases:
+        if case not in CASE_FACTORIES:
+            raise ValueError(f"未知のベンチマーク: {case}")
+
+    results = []
+    for case in cases:
+        case_sizes = [0] if case in SIZE_INDEPENDENT_CASES else sizes
+        for size in case_sizes:
+            work_dir = tempfile.mkdtemp(prefix="rabbit_bench_")
+            try:
+                func, cleanup = CASE_FACTORIES[case](size, work_dir)
+                case_repeats = repeats
+                if size:
+                    case_repeats = max(1, min(repeats, repeat_byte_budget // size))
+                result = measure(func, size, case_repeats, cleanup, track_memory)
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+            result["name"] = case
+            results.append(result)
+            if verbose:
+                print(format_result(result))
+
+    return {
+        "format_version": RESULT_FORMAT_VERSION,
+        "version": VERSION,
+        "timestamp": datetime.datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    """
+    計測結果を1行の文字列に整形
+
+    Args:
+        result: measure() の結果に name を加えた辞書
+
+    Returns:
+        表示用の文字列
+    """
+    label = result["name"] if not result["size"] else f"{result['name']} {format_size(result['size'])}"
+    throughput = (f"{result['mb_per_s']:.2f} MB/s" if result["mb_per_s"] is not None
+                  else f"{result['ops_per_s']:.2f} ops/s")
+    memory = ("-" if result["peak_memory_bytes"] is None
+              else f"{result['peak_memory_bytes'] / (1024 * 1024):.2f} MB")
+    return (f"{label:<28} {throughput:>16}  median={result['median_ms']:.2f}ms  "
+            f"min={result['min_ms']:.2f}ms  peak={memory}")
+
+
+def _throughput(result: Dict[str, Any]) -> Optional[float]:
+    """比較に使用するスループット（サイズに依存しない計測は ops/s）"""
+    return result["mb_per_s"] if result.get("mb_per_s") is not None else result.get("ops_per_s")
+
+
+def compare_with_baseline(current: Dict[str, Any], baseline: Dict[str, Any],
+                          max_regression: float = BENCHMARK_MAX_REGRESSION) -> List[Dict[str, Any]]:
+    """
+    ベースラインと比較し、許容率を超えて低下した計測を抽出
+
+    計測対象とサイズが一致するものだけを比較します。
+
+    Args:
+        current: 今回のベンチマーク結果
+        baseline: ベースラインのベンチマーク結果
+        max_regression: 許容する性能低下率（%）
+
+    Returns:
+        性能低下した計測のリスト（name, size, baseline, current, change_percent）
+    """
+    baseline_results = {(r["name"], r["size"]): r for r in baseline.get("results", [])}
+
+    regressions = []
+    for result in current.get("results", []):
+        reference = baseline_results.get((result["name"], result["size"]))
+        if reference is None:
+            continue
+
+        before = _throughput(reference)
+        after = _throughput(result)
+        if not before or after is None:
+            continue
+
+        change = (after - before) / before * 100
+        if change < -max_regression:
+            regressions.append({
+                "name": result["name"],
+                "size": result["size"],
+                "baseline": before,
+                "current": after,
+                "change_percent": change,
+            })
+
+    return regressions
+
+
+def save_results(results: Dict[str, Any], output_path: str) -> None:
+    """
+    ベンチマーク結果をJSONファイルに保存
+
+    Args:
+        results: ベンチマーク結果
+        output_path: 出力ファイルパス
+    """
+    output_dir = os.path.dirname(output_path)
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """
+    保存済みのベンチマーク結果を読み込む
+
+    Args:
+        path: JSONファイルパス
+
+    Returns:
+        ベンチマーク結果
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def parse_arguments() -> argparse.Namespace:
+    """
+    コマンドライン引数を解析
+
+    Returns:
+        解析された引数オブジェクト
+    """
+    parser = argparse.ArgumentParser(
+        description="Rabbit暗号化方式のベンチマーク",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+
+    parser.add_argument(
+        "--cases",
+        default=",".join(BENCHMARK_CASES),
+        help="計測対象（カンマ区切り）"
+    )
+
+    parser.add_argument(
+        "--sizes",
+        default=",".join(format_size(size) for size in BENCHMARK_SIZES),
+        help="データサイズ（カンマ区切り、K/M/G単位可）"
+    )
+
+    parser.add_argument(
+        "--large",
+        action="store_true",
+        help="大きなデータサイズ（" + ",".join(format_size(size) for size in BENCHMARK_LARGE_SIZES) + "）も計測"
+    )
+
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=BENCHMARK_REPEATS,
+        help="各計測の最大反復回数"
+    )
+
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="ピークメモリの計測を省略"
+    )
+
+    parser.add_argument(
+        "-o", "--output",
+        help="結果を保存するJSONファイルのパス"
+    )
+
+    parser.add_argument(
+        "--baseline",
+        help="比較するベースラインのJSONファイルのパス"
+    )
+
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=BENCHMARK_MAX_REGRESSION,
+        help="許容する性能低下率（%%）"
+    )
+
+    return parser.parse_args()
+
+
+def main() -> int:
+    """
+    メイン関数
+
+    Returns:
+        終了コード（ベースラインから性能低下があれば1）
+    """
+    args = parse_arguments()
+
+    cases = [case.strip() for case in args.cases.split(",") if case.strip()]
+    sizes = [parse_size(size) for size in args.sizes.split(",") if size.strip()]
+    if args.large:
+        sizes += [size for size in BENCHMARK_LARGE_SIZES if size not in sizes]
+
+    results = run_benchmarks(cases, sizes, args.repeats, track_memory=not args.no_memory, verbose=True)
+
+    if args.output:
+        save_results(results, args.output)
+        print(f"ベンチマーク結果を '{args.output}' に保存しました")
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, load_results(args.baseline), args.max_regression)
+        if regressions:
+            print(f"性能低下を検出しました（許容: {args.max_regression:.1f}%）:")
+            for item in regressions:
+                label = item["name"] if not item["size"] else f"{item['name']} {format_size(item['size'])}"
+                print(f"  {label}: {item['baseline']:.2f} -> {item['current']:.2f} ({item['change_percent']:+.1f}%)")
+            return 1
+        print("ベースラインからの性能低下はありません")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
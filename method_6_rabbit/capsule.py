@@ -17,7 +17,20 @@ import hmac
 import secrets
 import random
 import binascii
-from typing import Dict, List, Tuple, Callable, Any, Union, Optional
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Callable, Any, Union, Optional, Sequence
+
+import numpy as np
+
+# インポートエラーを回避するための処理
+if __name__ == "__main__":
+    # モジュールとして実行された場合の処理
+    sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+    from method_6_rabbit.kdf_cache import cached_pbkdf2_hmac
+else:
+    # パッケージの一部として実行された場合の処理
+    from .kdf_cache import cached_pbkdf2_hmac
 
 # バージョン情報
 CAPSULE_VERSION = "1.0"
@@ -29,9 +42,14 @@ MIX_SEED_SIZE = 32  # 混合用シード値のサイズ（バイト）
 SECURITY_BLOCK_SIZE = 16  # セキュリティ変換のブロックサイズ
 NONCE_SIZE = 16  # 識別不能性用のノンスサイズ（バイト）
 CHECKSUM_SIZE = 8  # チェックサムサイズ（バイト）
+MIXING_TABLE_CACHE_SIZE = 128  # キャッシュする混合関数テーブルの最大数（シード単位）
 
+# 識別不能性変換の位置係数 (i * 7 + 11) % 256 は周期256で繰り返す
+POSITION_FACTOR_PERIOD = 256
+_POSITION_FACTORS = ((np.arange(POSITION_FACTOR_PERIOD) * 7 + 11) % 256).astype(np.uint8)
 
-def create_mixing_functions(seed: bytes, count: int = MIXING_FUNCTIONS_COUNT) -> List[Callable]:
+
+def _build_mixing_functions(seed: bytes, count: int = MIXING_FUNCTIONS_COUNT) -> List[Callable]:
     """
     データ混合関数を生成
 
@@ -67,7 +85,7 @@ def create_mixing_functions(seed: bytes, count: int = MIXING_FUNCTIONS_COUNT) ->
     return functions
 
 
-def create_reverse_mixing_functions(seed: bytes, count: int = MIXING_FUNCTIONS_COUNT) -> List[Dict[str, Callable]]:
+def _build_reverse_mixing_functions(seed: bytes, count: int = MIXING_FUNCTIONS_COUNT) -> List[Dict[str, Callable]]:
     """
     データ抽出関数を生成
 
@@ -116,6 +134,127 @@ def create_reverse_mixing_functions(seed: bytes, count: int = MIXING_FUNCTIONS_C
     return function_pairs
 
 
+class MixingTable:
+    """
+    シードごとの混合関数・抽出関数テーブル
+
+    関数は最初に必要になった側（混合または抽出）のみ生成し、以後は再利用します。
+    """
+
+    def __init__(self, seed: bytes, count: int = MIXING_FUNCTIONS_COUNT):
+        """
+        MixingTableを初期化
+
+        Args:
+            seed: シード値
+            count: 関数の数
+        """
+        self.seed = seed
+        self.count = count
+        self._mixing_functions: Optional[List[Callable]] = None
+        self._reverse_functions: Optional[List[Dict[str, Callable]]] = None
+        self._function_index: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def mixing_functions(self) -> List[Callable]:
+        """混合関数のリスト"""
+        with self._lock:
+            if self._mixing_functions is None:
+                self._mixing_functions = _build_mixing_functions(self.seed, self.count)
+            return self._mixing_functions
+
+    @property
+    def reverse_functions(self) -> List[Dict[str, Callable]]:
+        """抽出関数のディクショナリのリスト"""
+        with self._lock:
+            if self._reverse_functions is None:
+                self._reverse_functions = _build_reverse_mixing_functions(self.seed, self.count)
+            return self._reverse_functions
+
+    def function_index(self, key: str, salt: bytes) -> int:
+        """
+        使用する関数のインデックスを取得（初回のみ select_mixing_function で計算）
+
+        シードは鍵とソルトから導出されるため、同じテーブルでは結果が変わりません。
+
+        Args:
+            key: 鍵文字列
+            salt: ソルト
+
+        Returns:
+            選択された関数のインデックス
+        """
+        if self._function_index is None:
+            self._function_index = select_mixing_function(key, salt, self.count)
+        return self._function_index
+
+
+# シード -> MixingTable のLRUキャッシュ
+_MIXING_TABLE_CACHE: "OrderedDict[Tuple[bytes, int], MixingTable]" = OrderedDict()
+_MIXING_TABLE_CACHE_LOCK = threading.Lock()
+
+
+def get_mixing_table(seed: bytes, count: int = MIXING_FUNCTIONS_COUNT) -> MixingTable:
+    """
+    シードに対応する混合関数テーブルを取得（最大 MIXING_TABLE_CACHE_SIZE 件をキャッシュ）
+
+    Args:
+        seed: シード値
+        count: 関数の数
+
+    Returns:
+        MixingTableインスタンス
+    """
+    cache_key = (bytes(seed), count)
+    with _MIXING_TABLE_CACHE_LOCK:
+        table = _MIXING_TABLE_CACHE.get(cache_key)
+        if table is not None:
+            _MIXING_TABLE_CACHE.move_to_end(cache_key)
+            return table
+
+        table = MixingTable(cache_key[0], count)
+        _MIXING_TABLE_CACHE[cache_key] = table
+        # 最も古く使われたテーブルから追い出す
+        while len(_MIXING_TABLE_CACHE) > MIXING_TABLE_CACHE_SIZE:
+            _MIXING_TABLE_CACHE.popitem(last=False)
+        return table
+
+
+def clear_mixing_table_cache() -> None:
+    """混合関数テーブルのキャッシュを消去"""
+    with _MIXING_TABLE_CACHE_LOCK:
+        _MIXING_TABLE_CACHE.clear()
+
+
+def create_mixing_functions(seed: bytes, count: int = MIXING_FUNCTIONS_COUNT) -> List[Callable]:
+    """
+    データ混合関数を取得（シードごとにキャッシュされたテーブルを使用）
+
+    Args:
+        seed: シード値
+        count: 生成する関数の数
+
+    Returns:
+        混合関数のリスト
+    """
+    return list(get_mixing_table(seed, count).mixing_functions)
+
+
+def create_reverse_mixing_functions(seed: bytes, count: int = MIXING_FUNCTIONS_COUNT) -> List[Dict[str, Callable]]:
+    """
+    データ抽出関数を取得（シードごとにキャッシュされたテーブルを使用）
+
+    Args:
+        seed: シード値
+        count: 生成する関数の数
+
+    Returns:
+        抽出関数のディクショナリのリスト [{true_extractor, false_extractor}, ...]
+    """
+    return list(get_mixing_table(seed, count).reverse_functions)
+
+
 def select_mixing_function(key: str, salt: bytes, functions_count: int = MIXING_FUNCTIONS_COUNT) -> int:
     """
     使用する混合関数を選択
@@ -161,33 +300,60 @@ def encapsulate_data(true_data: bytes, false_data: bytes, key: str,
     if salt is None:
         salt = secrets.token_bytes(32)
 
-    # データ長の調整（一致させる）
-    max_length = max(len(true_data), len(false_data))
-    min_length = min(len(true_data), len(false_data))
+    return _encapsulate_with_table(true_data, false_data, key, salt, _mixing_table_for(key, salt))
 
-    # 長さが一致しない場合、短い方を0パディングで拡張
-    if len(true_data) < max_length:
-        true_data = true_data + b'\x00' * (max_length - len(true_data))
-    if len(false_data) < max_length:
-        false_data = false_data + b'\x00' * (max_length - len(false_data))
 
+def _mixing_table_for(key: str, salt: bytes) -> MixingTable:
+    """
+    鍵とソルトからシードを導出し、対応する混合関数テーブルを取得
+
+    Args:
+        key: カプセル化キー
+        salt: ソルト
+
+    Returns:
+        MixingTableインスタンス
+    """
     # シード値の生成
-    mix_seed = hashlib.pbkdf2_hmac(
+    mix_seed = cached_pbkdf2_hmac(
         hash_name=HASH_ALGORITHM,
         password=key.encode('utf-8'),
         salt=salt,
         iterations=10000,
         dklen=MIX_SEED_SIZE
     )
+    return get_mixing_table(mix_seed)
+
+
+def _encapsulate_with_table(true_data: bytes, false_data: bytes, key: str, salt: bytes,
+                            table: MixingTable) -> Tuple[bytes, Dict[str, Any]]:
+    """
+    導出済みの混合関数テーブルで2つのデータを単一のカプセルに結合
 
-    # 混合関数を生成
-    mixing_functions = create_mixing_functions(mix_seed)
+    Args:
+        true_data: 真のデータ
+        false_data: 偽のデータ
+        key: カプセル化キー
+        salt: ソルト
+        table: 鍵とソルトに対応する混合関数テーブル
+
+    Returns:
+        (カプセル化データ, メタデータ)
+    """
+    # データ長の調整（一致させる）
+    max_length = max(len(true_data), len(false_data))
+
+    # 長さが一致しない場合、短い方を0パディングで拡張
+    if len(true_data) < max_length:
+        true_data = true_data + b'\x00' * (max_length - len(true_data))
+    if len(false_data) < max_length:
+        false_data = false_data + b'\x00' * (max_length - len(false_data))
 
     # 関数の選択
-    function_index = select_mixing_function(key, salt)
+    function_index = table.function_index(key, salt)
 
     # データの混合
-    mixed_data = mixing_functions[function_index](true_data, false_data)
+    mixed_data = table.mixing_functions[function_index](true_data, false_data)
 
     # チェックサム生成（復号後の検証用）
     true_checksum = hashlib.sha256(true_data[:SECURITY_BLOCK_SIZE]).hexdigest()[:CHECKSUM_SIZE]
@@ -213,6 +379,33 @@ def encapsulate_data(true_data: bytes, false_data: bytes, key: str,
     return mixed_data, metadata
 
 
+def encapsulate_data_batch(pairs: Sequence[Tuple[bytes, bytes]], key: str,
+                           salt: Optional[bytes] = None) -> List[Tuple[bytes, Dict[str, Any]]]:
+    """
+    複数の（真, 偽）データの組を同じ鍵とソルトでまとめてカプセル化
+
+    シードの導出、混合関数テーブル、関数の選択をバッチ全体で1回だけ行います。
+    各カプセルは encapsulate_data(true_data, false_data, key, salt) と同じ結果になり、
+    個別に extract_data_from_capsule で抽出できます。
+
+    Args:
+        pairs: (真のデータ, 偽のデータ) のシーケンス
+        key: カプセル化キー
+        salt: バッチ共通のソルト（指定がなければランダム生成）
+
+    Returns:
+        (カプセル化データ, メタデータ) のリスト（入力順）
+    """
+    if salt is None:
+        salt = secrets.token_bytes(32)
+
+    table = _mixing_table_for(key, salt)
+    return [
+        _encapsulate_with_table(true_data, false_data, key, salt, table)
+        for true_data, false_data in pairs
+    ]
+
+
 def extract_data_from_capsule(capsule: bytes, key: str, key_type: str,
                               metadata: Dict[str, Any]) -> bytes:
     """
@@ -233,20 +426,12 @@ def extract_data_from_capsule(capsule: bytes, key: str, key_type: str,
     true_length = metadata.get('true_length', data_length)
     false_length = metadata.get('false_length', data_length)
 
-    # シード値の生成
-    mix_seed = hashlib.pbkdf2_hmac(
-        hash_name=HASH_ALGORITHM,
-        password=key.encode('utf-8'),
-        salt=salt,
-        iterations=10000,
-        dklen=MIX_SEED_SIZE
-    )
-
-    # 抽出関数を生成
-    reverse_functions = create_reverse_mixing_functions(mix_seed)
+    # シード値に対応する抽出関数テーブルを取得（キャッシュ済みなら再生成しない）
+    table = _mixing_table_for(key, salt)
+    reverse_functions = table.reverse_functions
 
     # 関数の選択
-    function_index = select_mixing_function(key, salt)
+    function_index = table.function_index(key, salt)
 
     # 鍵種別に基づいてデータを抽出
     if key_type == "true":
@@ -261,6 +446,56 @@ def extract_data_from_capsule(capsule: bytes, key: str, key_type: str,
     return extracted_data
 
 
+def _security_key_stream(transform_key: bytes, length: int) -> bytes:
+    """
+    セキュリティ変換用の鍵バイト列を生成
+
+    ブロックiの鍵バイトは SHA-256(transform_key || i) の先頭から
+    SECURITY_BLOCK_SIZE バイト（ダイジェストより長い場合は繰り返し）です。
+
+    Args:
+        transform_key: 変換キー
+        length: 必要な長さ（バイト単位）
+
+    Returns:
+        length バイトの鍵バイト列
+    """
+    block_count = (length + SECURITY_BLOCK_SIZE - 1) // SECURITY_BLOCK_SIZE
+    base_hash = hashlib.sha256(transform_key)
+    digest_size = base_hash.digest_size
+
+    parts = []
+    for i in range(block_count):
+        # 変換キー部分のハッシュ状態を再利用してブロック番号だけを追加
+        block_hash = base_hash.copy()
+        block_hash.update(i.to_bytes(4, byteorder='big'))
+        block_key = block_hash.digest()
+        if SECURITY_BLOCK_SIZE <= digest_size:
+            parts.append(block_key[:SECURITY_BLOCK_SIZE])
+        else:
+            parts.append((block_key * (SECURITY_BLOCK_SIZE // digest_size + 1))[:SECURITY_BLOCK_SIZE])
+
+    return b''.join(parts)[:length]
+
+
+def _indistinguishability_pad(nonce: bytes, length: int) -> np.ndarray:
+    """
+    識別不能性変換の加算パッド nonce[i % len(nonce)] + (i * 7 + 11) % 256 を生成
+
+    Args:
+        nonce: ノンス
+        length: 必要な長さ（バイト単位）
+
+    Returns:
+        uint8配列のパッド（256を法とする）
+    """
+    # ノンスと位置係数の両方の周期（最小公倍数）を1周期として組み立てて繰り返す
+    period = np.lcm(len(nonce), POSITION_FACTOR_PERIOD)
+    nonce_cycle = np.resize(np.frombuffer(nonce, dtype=np.uint8), period)
+    base = nonce_cycle + np.resize(_POSITION_FACTORS, period)
+    return np.resize(base, length)
+
+
 def apply_security_transformations(data: bytes, key: str, salt: bytes) -> bytes:
     """
     セキュリティ強化変換を適用
@@ -277,7 +512,7 @@ def apply_security_transformations(data: bytes, key: str, salt: bytes) -> bytes:
         return b''
 
     # 変換キーの生成
-    transform_key = hashlib.pbkdf2_hmac(
+    transform_key = cached_pbkdf2_hmac(
         hash_name=HASH_ALGORITHM,
         password=key.encode('utf-8'),
         salt=salt,
@@ -285,22 +520,14 @@ def apply_security_transformations(data: bytes, key: str, salt: bytes) -> bytes:
         dklen=32
     )
 
-    # 結果格納用
-    result = bytearray(len(data))
-
-    # ブロック単位で処理
-    blocks = [data[i:i+SECURITY_BLOCK_SIZE] for i in range(0, len(data), SECURITY_BLOCK_SIZE)]
-
-    for i, block in enumerate(blocks):
-        # ブロック固有の変換キー
-        block_key = hashlib.sha256(transform_key + i.to_bytes(4, byteorder='big')).digest()
-
-        # 単純なバイト単位のXOR
-        for j, byte in enumerate(block):
-            key_byte = block_key[j % len(block_key)]
-            result[i * SECURITY_BLOCK_SIZE + j] = byte ^ key_byte
+    # 全ブロック分の鍵バイト列を一括生成し、配列全体でXOR
+    key_stream = _security_key_stream(transform_key, len(data))
+    result = np.bitwise_xor(
+        np.frombuffer(data, dtype=np.uint8),
+        np.frombuffer(key_stream, dtype=np.uint8)
+    )
 
-    return bytes(result)
+    return result.tobytes()
 
 
 def reverse_security_transformations(data: bytes, key: str, salt: bytes) -> bytes:
@@ -335,16 +562,10 @@ def add_indistinguishability(data: bytes) -> Tuple[bytes, bytes]:
     # ランダムノンスの生成
     nonce = secrets.token_bytes(NONCE_SIZE)
 
-    # ノンスをシードとした変換を適用
-    result = bytearray(len(data))
+    # ノンスと位置に依存した加算パッドを一括で加算（uint8演算で256を法とする）
+    result = np.frombuffer(data, dtype=np.uint8) + _indistinguishability_pad(nonce, len(data))
 
-    for i, byte in enumerate(data):
-        # 位置に依存した変換を適用
-        nonce_byte = nonce[i % len(nonce)]
-        position_factor = (i * 7 + 11) % 256  # 素数を使った単純な位置依存変換
-        result[i] = (byte + nonce_byte + position_factor) % 256
-
-    return bytes(result), nonce
+    return result.tobytes(), nonce
 
 
 def remove_indistinguishability(data: bytes, nonce: bytes) -> bytes:
@@ -361,16 +582,10 @@ def remove_indistinguishability(data: bytes, nonce: bytes) -> bytes:
     if not data or not nonce:
         return b''
 
-    # 逆変換を適用
-    result = bytearray(len(data))
-
-    for i, byte in enumerate(data):
-        nonce_byte = nonce[i % len(nonce)]
-        position_factor = (i * 7 + 11) % 256
-        # 逆変換（減算して正の値に調整）
-        result[i] = (byte - nonce_byte - position_factor) % 256
+    # 逆変換（加算パッドを一括で減算、uint8演算で256を法とする）
+    result = np.frombuffer(data, dtype=np.uint8) - _indistinguishability_pad(nonce, len(data))
 
-    return bytes(result)
+    return result.tobytes()
 
 
 def is_multipath_capsule(data: bytes, metadata: Dict[str, Any]) -> bool:
@@ -27,8 +27,20 @@ ENCRYPTED_FILE_PATH = "encrypted.bin"  # 暗号化ファイルの出力パス
 DECRYPTED_FILE_PATH = "decrypted.text"  # 復号ファイルの出力パス
 
 # 暗号化設定
-ENCRYPT_CHUNK_SIZE = 1024  # 一度に暗号化するチャンクサイズ（バイト）
-DECRYPT_CHUNK_SIZE = 1024  # 一度に復号するチャンクサイズ（バイト）
+ENCRYPT_CHUNK_SIZE = 64 * 1024  # 一度に暗号化するチャンクサイズ（バイト）
+DECRYPT_CHUNK_SIZE = 64 * 1024  # 一度に復号するチャンクサイズ（バイト）
+ENCRYPT_JOURNAL_INTERVAL = 16 * 1024 * 1024  # 暗号化ジャーナルを確定する間隔（バイト）
+STREAM_CHECKPOINT_INTERVAL = 4096  # ストリーム状態スナップショットの間隔（16バイトブロック数）
+STREAM_MAX_CHECKPOINTS = 1024  # 1パスあたりのチェックポイント数の上限（超える場合は間隔を広げる）
+CONTAINER_FORMAT_VERSION = 2  # 暗号化ファイルの出力形式（1: JSONヘッダー、2: バイナリヘッダー）
+PARALLEL_DECRYPT_WORKERS = 0  # 多重経路復号の並列ワーカー数（0はCPUコア数）
+
+# ベンチマーク設定
+BENCHMARK_SIZES = [1024, 64 * 1024, 1024 * 1024]  # 計測するデータサイズ（バイト）
+BENCHMARK_LARGE_SIZES = [16 * 1024 * 1024, 256 * 1024 * 1024]  # --large 指定時のみ追加する大きなサイズ（バイト）
+BENCHMARK_REPEATS = 5  # 各計測の最大反復回数
+BENCHMARK_REPEAT_BYTE_BUDGET = 64 * 1024 * 1024  # 反復回数×サイズの上限（大きなサイズは反復を減らす）
+BENCHMARK_MAX_REGRESSION = 10.0  # ベースラインからの許容性能低下率（%）
 
 # デバッグ設定
 DEBUG_MODE = False  # デバッグモード（True/False）
@@ -36,6 +48,9 @@ DEBUG_MODE = False  # デバッグモード（True/False）
 # セキュリティ設定
 SECURE_MEMORY_WIPE = True  # メモリから機密データを消去するかどうか
 KEY_DERIVATION_ITERATIONS = 10000  # 鍵導出関数の反復回数
+KDF_CACHE_ENABLED = True  # 鍵導出結果をプロセス内でキャッシュするかどうか
+KDF_CACHE_MAX_ENTRIES = 256  # 鍵導出キャッシュの最大エントリ数
+KDF_CACHE_TTL = 300  # 鍵導出キャッシュの有効期間（秒）
 
 # 特殊なマジック値（識別不能性のためにランダムに見える値を使用）
 # これらの値は解析を困難にするために選定されています
@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+暗号化コンテナ形式モジュール
+
+暗号化ファイルのヘッダーの組み立てと解析、およびmmapによるゼロコピー読み込みを提供します。
+
+対応形式:
+- RABBIT_ENCRYPTED_V1: マジック + 4バイトのサイズ + JSONメタデータ + 暗号化データ
+  （improved_encrypt が出力する RABBIT_ENCRYPTED_V2 も同じレイアウトのため読み込み可能）
+- RABBIT_ENCRYPTED_B2: マジック + 固定長バイナリヘッダー + コンパクトな拡張領域 + 暗号化データ
+
+B2形式の固定長ヘッダー（ビッグエンディアン）:
+    method(1) flags(1) salt_length(1) salt(32) data_length(8) body_length(8)
+    true_offset(8) true_length(8) false_offset(8) false_length(8) extension_length(4)
+オフセットは暗号化データ本体の先頭からの位置です。拡張領域には固定フィールドに
+含まれないメタデータ（チェックサム、ストリームチェックポイント等）を区切り文字なしの
+JSONで格納します。末尾の空白はパディングとして扱います。
+"""
+
+import os
+import sys
+import json
+import mmap
+import base64
+import struct
+from typing import Any, BinaryIO, Dict, Tuple, Union
+
+# インポートエラーを回避するための処理
+if __name__ == "__main__":
+    # モジュールとして実行された場合の処理
+    sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+    from method_6_rabbit.config import CONTAINER_FORMAT_VERSION
+else:
+    # パッケージの一部として実行された場合の処理
+    from .config import CONTAINER_FORMAT_VERSION
+
+# マジックヘッダー（すべて20バイト）
+MAGIC_V1 = b'RABBIT_ENCRYPTED_V1\n'
+MAGIC_V1_IMPROVED = b'RABBIT_ENCRYPTED_V2\n'  # improved_encrypt のJSON形式（V1と同じレイアウト）
+MAGIC_B2 = b'RABBIT_ENCRYPTED_B2\n'
+MAGIC_SIZE = len(MAGIC_V1)
+JSON_MAGICS = (MAGIC_V1, MAGIC_V1_IMPROVED)
+
+# 形式バージョン
+FORMAT_V1 = 1
+FORMAT_B2 = 2
+
+# JSONメタデータの最大サイズ
+MAX_METADATA_SIZE = 10 * 1024 * 1024
+
+# B2形式の固定長ヘッダー
+B2_HEADER_STRUCT = struct.Struct('>BBB32sQQQQQQI')
+B2_SALT_FIELD_SIZE = 32
+
+# 暗号化方式の識別コード
+METHOD_CODES = {
+    None: 0,
+    "simple_xor": 1,
+    "classic": 2,
+    "capsule": 3,
+}
+METHOD_NAMES = {code: name for name, code in METHOD_CODES.items()}
+METHOD_CODE_OTHER = 0xFF  # 拡張領域の encryption_method に方式名を格納
+
+# 固定長ヘッダーに格納されるメタデータのキー
+FIXED_FIELDS = ("salt", "data_length", "encryption_method")
+
+# 領域のインデックス（暗号文上の前半/後半）
+REGION_TRUE = 0
+REGION_FALSE = 1
+
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+
+def compute_regions(metadata: Dict[str, Any], body_length: int) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """
+    暗号化データ本体における正規/非正規領域の (オフセット, 長さ) を求める
+
+    カプセル方式は両方の経路が同じカプセル全体を参照します。それ以外の方式は
+    前半 [0, L) と後半 [L, 2L) の単純連結です（L = data_length）。
+
+    Args:
+        metadata: メタデータ辞書
+        body_length: 暗号化データ本体の長さ
+
+    Returns:
+        ((true_offset, true_length), (false_offset, false_length))
+    """
+    if metadata.get("encryption_method") == "capsule":
+        return (0, body_length), (0, body_length)
+
+    data_length = int(metadata.get("data_length", 0))
+    return (0, data_length), (data_length, data_length)
+
+
+def _build_header_v1(metadata: Dict[str, Any], reserve: int = 0) -> bytes:
+    """
+    V1形式（JSONメタデータ）のヘッダーを組み立てる
+
+    Args:
+        metadata: メタデータ辞書
+        reserve: メタデータ領域の最小サイズ（不足分は空白で埋める）
+
+    Returns:
+        マジックからメタデータ末尾までのバイト列
+    """
+    metadata_bytes = json.dumps(metadata, indent=2).encode('utf-8')
+    if len(metadata_bytes) < reserve:
+        metadata_bytes += b' ' * (reserve - len(metadata_bytes))
+
+    # メタデータサイズの妥当性チェック
+    if len(metadata_bytes) > MAX_METADATA_SIZE:
+        raise ValueError(f"メタデータサイズが大きすぎます: {len(metadata_bytes)} bytes")
+
+    return MAGIC_V1 + len(metadata_bytes).to_bytes(4, byteorder='big') + metadata_bytes
+
+
+def _build_header_b2(metadata: Dict[str, Any], body_length: int, reserve: int = 0) -> bytes:
+    """
+    B2形式（固定長バイナリヘッダー + 拡張領域）のヘッダーを組み立てる
+
+    Args:
+        metadata: メタデータ辞書
+        body_length: 暗号化データ本体の長さ
+        reserve: 拡張領域の最小サイズ（不足分は空白で埋める）
+
+    Returns:
+        マジックから拡張領域末尾までのバイト列
+    """
+    extension = {k: v for k, v in metadata.items() if k not in FIXED_FIELDS}
+
+    # 暗号化方式
+    method = metadata.get("encryption_method")
+    method_code = METHOD_CODES.get(method, METHOD_CODE_OTHER)
+    if method_code == METHOD_CODE_OTHER:
+        extension["encryption_method"] = method
+
+    # ソルト（固定欄に収まらない場合は拡張領域に格納）
+    salt = b''
+    if "salt" in metadata:
+        salt = base64.b64decode(metadata["salt"])
+        if len(salt) > B2_SALT_FIELD_SIZE:
+            extension["salt"] = metadata["salt"]
+            salt = b''
+
+    (true_offset, true_length), (false_offset, false_length) = compute_regions(metadata, body_length)
+
+    extension_bytes = b''
+    if extension:
+        extension_bytes = json.dumps(extension, separators=(',', ':')).encode('utf-8')
+    if len(extension_bytes) < reserve:
+        extension_bytes += b' ' * (reserve - len(extension_bytes))
+    if len(extension_bytes) > MAX_METADATA_SIZE:
+        raise ValueError(f"拡張領域のサイズが大きすぎます: {len(extension_bytes)} bytes")
+
+    fixed = B2_HEADER_STRUCT.pack(
+        method_code,
+        0,  # フラグ（予約）
+        len(salt),
+        salt,
+        int(metadata.get("data_length", 0)),
+        body_length,
+        true_offset, true_length,
+        false_offset, false_length,
+        len(extension_bytes)
+    )
+    return MAGIC_B2 + fixed + extension_bytes
+
+
+def header_prefix_size(format_version: int = CONTAINER_FORMAT_VERSION) -> int:
+    """
+    可変長メタデータ領域より前の固定部分のサイズを取得
+
+    Args:
+        format_version: コンテナ形式
+
+    Returns:
+        マジックを含む固定部分のバイト数
+    """
+    if format_version == FORMAT_V1:
+        return MAGIC_SIZE + 4
+    if format_version == FORMAT_B2:
+        return MAGIC_SIZE + B2_HEADER_STRUCT.size
+    raise ValueError(f"未対応のコンテナ形式: {format_version}")
+
+
+def build_header(metadata: Dict[str, Any], body_length: int,
+                 format_version: int = CONTAINER_FORMAT_VERSION, reserve: int = 0) -> bytes:
+    """
+    暗号化コンテナのヘッダーを組み立てる
+
+    Args:
+        metadata: メタデータ辞書
+        body_length: 暗号化データ本体の長さ
+        format_version: 出力形式（FORMAT_V1 または FORMAT_B2）
+        reserve: 可変長メタデータ領域の最小サイズ（後からメタデータを書き戻す場合に使用）
+
+    Returns:
+        ヘッダーのバイト列（この直後に暗号化データ本体が続く）
+
+    Raises:
+        ValueError: 未対応の形式、またはメタデータが大きすぎる場合
+    """
+    if format_version == FORMAT_V1:
+        return _build_header_v1(metadata, reserve)
+    if format_version == FORMAT_B2:
+        return _build_header_b2(metadata, body_length, reserve)
+    raise ValueError(f"未対応のコンテナ形式: {format_version}")
+
+
+def _parse_json_metadata(metadata_bytes: Buffer) -> Dict[str, Any]:
+    """
+    JSONメタデータを解析
+
+    Args:
+        metadata_bytes: UTF-8のJSONバイト列
+
+    Returns:
+        メタデータ辞書
+    """
+    try:
+        return json.loads(bytes(metadata_bytes).decode('utf-8'))
+    except UnicodeDecodeError:
+        raise ValueError("メタデータのUTF-8デコードに失敗しました")
+    except json.JSONDecodeError:
+        raise ValueError("メタデータのJSON解析に失敗しました")
+
+
+def _metadata_from_b2(fields: Tuple[Any, ...], extension_bytes: Buffer) -> Dict[str, Any]:
+    """
+    B2形式の固定フィールドと拡張領域からメタデータ辞書を復元
+
+    Args:
+        fields: B2_HEADER_STRUCT で展開した値
+        extension_bytes: 拡張領域のバイト列
+
+    Returns:
+        V1形式と同じキー構成のメタデータ辞書
+    """
+    method_code, _flags, salt_length, salt_field, data_length, body_length = fields[:6]
+    extension_length = fields[-1]
+
+    if salt_length > B2_SALT_FIELD_SIZE:
+        raise ValueError(f"無効なソルト長: {salt_length}バイト")
+    if method_code not in METHOD_NAMES and method_code != METHOD_CODE_OTHER:
+        raise ValueError(f"無効な暗号化方式コード: {method_code}")
+
+    metadata: Dict[str, Any] = {}
+    if salt_length:
+        metadata["salt"] = base64.b64encode(salt_field[:salt_length]).decode('ascii')
+    metadata["data_length"] = data_length
+    method = METHOD_NAMES.get(method_code)
+    if method is not None:
+        metadata["encryption_method"] = method
+
+    if extension_length and bytes(extension_bytes).strip():
+        metadata.update(_parse_json_metadata(extension_bytes))
+
+    return metadata
+
+
+def _parse_header_with_regions(data: Buffer) -> Tuple[Dict[str, Any], int, Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """
+    ヘッダーを解析し、メタデータ・本体の開始位置・領域情報を取得
+
+    B2形式はヘッダーに記録された領域のオフセットを、V1形式はメタデータから求めた値を返します。
+
+    Args:
+        data: 暗号化コンテナ全体または先頭部分
+
+    Returns:
+        (metadata, data_offset, regions)
+    """
+    magic = bytes(data[:MAGIC_SIZE])
+
+    if magic in JSON_MAGICS:
+        # メタデータのサイズを読み取り
+        meta_size = int.from_bytes(data[MAGIC_SIZE:MAGIC_SIZE + 4], byteorder='big')
+
+        # メタデータサイズの妥当性チェック（過大なサイズを防止）
+        if meta_size <= 0 or meta_size > MAX_METADATA_SIZE:
+            raise ValueError(f"無効なメタデータサイズ: {meta_size}バイト")
+
+        data_offset = MAGIC_SIZE + 4 + meta_size
+        if len(data) < data_offset:
+            raise ValueError(f"データサイズが不足: メタデータに{data_offset}バイト必要ですが{len(data)}バイトしかありません")
+
+        metadata = _parse_json_metadata(data[MAGIC_SIZE + 4:data_offset])
+        return metadata, data_offset, compute_regions(metadata, len(data) - data_offset)
+
+    if magic == MAGIC_B2:
+        fixed_end = MAGIC_SIZE + B2_HEADER_STRUCT.size
+        if len(data) < fixed_end:
+            raise ValueError("データサイズが不足: 固定長ヘッダーが途中で終わっています")
+
+        fields = B2_HEADER_STRUCT.unpack(bytes(data[MAGIC_SIZE:fixed_end]))
+        extension_length = fields[-1]
+        if extension_length > MAX_METADATA_SIZE:
+            raise ValueError(f"無効な拡張領域サイズ: {extension_length}バイト")
+
+        data_offset = fixed_end + extension_length
+        if len(data) < data_offset:
+            raise ValueError(f"データサイズが不足: ヘッダーに{data_offset}バイト必要ですが{len(data)}バイトしかありません")
+
+        metadata = _metadata_from_b2(fields, data[fixed_end:data_offset])
+        true_offset, true_length, false_offset, false_length = fields[6:10]
+        return metadata, data_offset, ((true_offset, true_length), (false_offset, false_length))
+
+    raise ValueError("無効なデータ形式: Rabbit暗号化データではありません")
+
+
+def parse_header(data: Buffer) -> Tuple[Dict[str, Any], int]:
+    """
+    メモリ上のコンテナ（bytes, memoryview, mmap など）のヘッダーを解析
+
+    Args:
+        data: 暗号化コンテナ全体または先頭部分
+
+    Returns:
+        (metadata, data_offset): メタデータと暗号化データ本体の開始位置
+
+    Raises:
+        ValueError: 形式が不正な場合
+    """
+    metadata, data_offset, _ = _parse_header_with_regions(data)
+    return metadata, data_offset
+
+
+def read_header(file: BinaryIO) -> Dict[str, Any]:
+    """
+    開いた暗号化ファイルからヘッダーとメタデータのみを読み込む
+
+    読み込み後のファイル位置は暗号化データの先頭になります。
+
+    Args:
+        file: バイナリモードで開いたファイルオブジェクト
+
+    Returns:
+        メタデータの辞書
+
+    Raises:
+        ValueError: 形式が不正な場合
+    """
+    magic = file.read(MAGIC_SIZE)
+
+    if magic in JSON_MAGICS:
+        meta_size = int.from_bytes(file.read(4), byteorder='big')
+        if meta_size <= 0 or meta_size > MAX_METADATA_SIZE:
+            raise ValueError(f"無効なメタデータサイズ: {meta_size}バイト")
+
+        metadata_bytes = file.read(meta_size)
+        if len(metadata_bytes) < meta_size:
+            raise ValueError("メタデータが途中で終わっています")
+        return _parse_json_metadata(metadata_bytes)
+
+    if magic == MAGIC_B2:
+        fixed = file.read(B2_HEADER_STRUCT.size)
+        if len(fixed) < B2_HEADER_STRUCT.size:
+            raise ValueError("データサイズが不足: 固定長ヘッダーが途中で終わっています")
+
+        fields = B2_HEADER_STRUCT.unpack(fixed)
+        extension_length = fields[-1]
+        if extension_length > MAX_METADATA_SIZE:
+            raise ValueError(f"無効な拡張領域サイズ: {extension_length}バイト")
+
+        extension_bytes = file.read(extension_length)
+        if len(extension_bytes) < extension_length:
+            raise ValueError("拡張領域が途中で終わっています")
+        return _metadata_from_b2(fields, extension_bytes)
+
+    raise ValueError("無効なファイル形式: Rabbit暗号化ファイルではありません")
+
+
+def detect_format(data: Buffer) -> int:
+    """
+    コンテナ形式を判定
+
+    Args:
+        data: コンテナの先頭部分（20バイト以上）
+
+    Returns:
+        FORMAT_V1 または FORMAT_B2
+
+    Raises:
+        ValueError: Rabbit暗号化データではない場合
+    """
+    magic = bytes(data[:MAGIC_SIZE])
+    if magic in JSON_MAGICS:
+        return FORMAT_V1
+    if magic == MAGIC_B2:
+        return FORMAT_B2
+    raise ValueError("無効なデータ形式: Rabbit暗号化データではありません")
+
+
+class MappedContainer:
+    """
+    mmapによる暗号化コンテナの読み取り専用ビュー
+
+    ファイル全体を読み込まずにヘッダーのみを解析し、暗号化データ本体と
+    正規/非正規領域をコピーなしの memoryview として提供します。
+    V1/B2の両形式に対応します。
+
+    取得した memoryview は close() 後に使用しないでください。
+    """
+
+    def __init__(self, file_path: str):
+        """
+        暗号化ファイルを開いてmmapする
+
+        Args:
+            file_path: 暗号化ファイルのパス
+
+        Raises:
+            ValueError: ファイルが存在しない、または形式が不正な場合
+        """
+        try:
+            self._file = open(file_path, 'rb')
+        except FileNotFoundError:
+            raise ValueError(f"ファイル '{file_path}' が見つかりません")
+
+        try:
+            if os.fstat(self._file.fileno()).st_size < MAGIC_SIZE:
+                raise ValueError("無効なファイル形式: Rabbit暗号化ファイルではありません")
+
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.format_version = detect_format(self._mmap)
+            self.metadata, self.data_offset, self.regions = _parse_header_with_regions(self._mmap)
+        except Exception:
+            self._file.close()
+            if hasattr(self, '_mmap'):
+                self._mmap.close()
+            raise
+
+        self.file_path = file_path
+        self._view = memoryview(self._mmap)
+        self._body = self._view[self.data_offset:]
+
+    @property
+    def body(self) -> memoryview:
+        """暗号化データ本体（ヘッダー以降）の memoryview"""
+        return self._body
+
+    def region(self, index: int) -> memoryview:
+        """
+        正規/非正規領域の memoryview を取得
+
+        Args:
+            index: REGION_TRUE（前半）または REGION_FALSE（後半）
+
+        Returns:
+            領域の memoryview（ファイル末尾を超える部分は切り詰め）
+        """
+        offset, length = self.regions[index]
+        return self._body[offset:offset + length]
+
+    def close(self) -> None:
+        """mmapとファイルを閉じる"""
+        if self._view is None:
+            return
+        self._body.release()
+        self._view.release()
+        self._view = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            # 呼び出し側（例外のトレースバック等）がまだビューを保持している場合は
+            # 参照がなくなった時点で解放されるのに任せる
+            pass
+        self._file.close()
+
+    def __enter__(self) -> "MappedContainer":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+def open_container(file_path: str) -> MappedContainer:
+    """
+    暗号化ファイルをmmapで開く
+
+    Args:
+        file_path: 暗号化ファイルのパス
+
+    Returns:
+        MappedContainerインスタンス（with文で使用可能）
+    """
+    return MappedContainer(file_path)
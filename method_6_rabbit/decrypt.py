@@ -30,8 +30,10 @@ if __name__ == "__main__":
         KEY_DERIVATION_ITERATIONS,
         VERSION
     )
-    from method_6_rabbit.stream_selector import StreamSelector, KEY_TYPE_TRUE, KEY_TYPE_FALSE
-    from method_6_rabbit.rabbit_stream import derive_key, RabbitStreamGenerator
+    from method_6_rabbit.stream_selector import StreamSelector, KEY_TYPE_TRUE, KEY_TYPE_FALSE, is_simple_xor_true_region
+    from method_6_rabbit.rabbit_stream import derive_key, RabbitStreamGenerator, SeekableRabbitStream
+    from method_6_rabbit.xor_kernel import xor_bytes, xor_into
+    from method_6_rabbit.container import read_header, parse_header
     # 多重データカプセル化モジュールをインポート
     from method_6_rabbit.capsule import extract_from_multipath_capsule, is_multipath_capsule
 else:
@@ -45,8 +47,10 @@ else:
         KEY_DERIVATION_ITERATIONS,
         VERSION
     )
-    from .stream_selector import StreamSelector, KEY_TYPE_TRUE, KEY_TYPE_FALSE
-    from .rabbit_stream import derive_key, RabbitStreamGenerator
+    from .stream_selector import StreamSelector, KEY_TYPE_TRUE, KEY_TYPE_FALSE, is_simple_xor_true_region
+    from .rabbit_stream import derive_key, RabbitStreamGenerator, SeekableRabbitStream
+    from .xor_kernel import xor_bytes, xor_into
+    from .container import read_header, parse_header
     # 多重データカプセル化モジュールをインポート
     from .capsule import extract_from_multipath_capsule, is_multipath_capsule
 
@@ -70,12 +74,25 @@ def decrypt_xor(encrypted_data: bytes, stream: bytes) -> bytes:
     if len(encrypted_data) > len(stream):
         raise ValueError(f"ストリーム長（{len(stream)}バイト）がデータ長（{len(encrypted_data)}バイト）より小さいです")
 
-    # XORによる復号（暗号化と同じ処理）
-    decrypted = bytearray(len(encrypted_data))
-    for i in range(len(encrypted_data)):
-        decrypted[i] = encrypted_data[i] ^ stream[i]
+    # XORによる復号（暗号化と同じ処理、一括XORカーネルを使用）
+    return xor_bytes(encrypted_data, stream)
 
-    return bytes(decrypted)
+
+def read_encrypted_header(file) -> Dict[str, Any]:
+    """
+    開いた暗号化ファイルからヘッダーとメタデータのみを読み込む
+
+    読み込み後のファイル位置は暗号化データの先頭になります。
+    V1/B2の両形式に対応します。
+
+    Args:
+        file: バイナリモードで開いたファイルオブジェクト
+
+    Returns:
+        メタデータの辞書
+    """
+    # V1（JSONヘッダー）とB2（バイナリヘッダー）の両形式に対応
+    return read_header(file)
 
 
 def read_encrypted_file(file_path: str) -> Tuple[bytes, Dict[str, Any]]:
@@ -90,29 +107,7 @@ def read_encrypted_file(file_path: str) -> Tuple[bytes, Dict[str, Any]]:
     """
     try:
         with open(file_path, 'rb') as file:
-            # マジックヘッダーを確認
-            expected_magic = b'RABBIT_ENCRYPTED_V1\n'
-            magic = file.read(len(expected_magic))
-            if magic != expected_magic:
-                raise ValueError("無効なファイル形式: Rabbit暗号化ファイルではありません")
-
-            # メタデータのサイズを読み取り
-            meta_size_bytes = file.read(4)
-            meta_size = int.from_bytes(meta_size_bytes, byteorder='big')
-
-            # メタデータサイズの妥当性チェック
-            if meta_size <= 0 or meta_size > 10 * 1024 * 1024:  # 10MB超過でエラー
-                raise ValueError(f"無効なメタデータサイズ: {meta_size}バイト")
-
-            # メタデータを読み取り
-            meta_bytes = file.read(meta_size)
-            try:
-                meta_json = meta_bytes.decode('utf-8')
-                metadata = json.loads(meta_json)
-            except UnicodeDecodeError:
-                raise ValueError("メタデータのUTF-8デコードに失敗しました")
-            except json.JSONDecodeError:
-                raise ValueError("メタデータのJSON解析に失敗しました")
+            metadata = read_encrypted_header(file)
 
             # 残りのデータ（暗号化済み）を読み取り
             encrypted_data = file.read()
@@ -145,11 +140,9 @@ def decrypt_classic(encrypted_data: bytes, metadata: Dict[str, Any], password: s
     # StreamSelectorを初期化
     selector = StreamSelector(salt)
 
-    # 鍵種別を判定（正規/非正規）
-    key_type = selector.determine_key_type_for_decryption(password)
-
-    # 適切なストリームを生成
-    stream = selector.get_stream_for_decryption(password, data_length)
+    # 鍵種別を判定（正規/非正規）し、対応するパスのストリームハンドルを取得
+    # （鍵ストリームは復号する範囲の分だけ生成される）
+    key_type, stream_handle = selector.get_stream_handle_for_decryption(password, data_length)
 
     # 適切な暗号文の部分を選択
     if key_type == KEY_TYPE_TRUE:
@@ -166,6 +159,7 @@ def decrypt_classic(encrypted_data: bytes, metadata: Dict[str, Any], password: s
         print(f"警告: 暗号データが短すぎます: 要求={data_length}, 利用可能={len(encrypted_portion)}")
 
     # XORによる復号
+    stream = stream_handle.read_at(0, len(encrypted_portion))
     decrypted = decrypt_xor(encrypted_portion, stream)
 
     return decrypted
@@ -204,6 +198,20 @@ def decrypt_capsule(encrypted_data: bytes, metadata: Dict[str, Any], password: s
     return decrypted
 
 
+def _is_true_key_simple_xor(salt: bytes, password: str) -> bool:
+    """
+    シンプルなXOR方式でパスワードが前半領域（true）を選択するか判定
+
+    Args:
+        salt: ソルト
+        password: 復号パスワード
+
+    Returns:
+        前半領域を選択する場合はTrue
+    """
+    return is_simple_xor_true_region(salt, password)
+
+
 def decrypt_container(encrypted_data: bytes, metadata: Dict[str, Any], password: str) -> bytes:
     """
     暗号化コンテナを復号 (シンプルなXOR方式)
@@ -233,26 +241,21 @@ def decrypt_container(encrypted_data: bytes, metadata: Dict[str, Any], password:
     stream = stream_gen.generate(data_length)
 
     # 鍵種別に応じてデータを選択
-    # はじめにパスワード判定
-    hmac_hash = hmac.new(salt, password.encode(), hashlib.sha256).digest()[:4]
-    value = int.from_bytes(hmac_hash, byteorder='big')
-
-    # 数値が偶数ならtrue、奇数ならfalse
-    is_true_key = (value % 2 == 0)
+    is_true_key = _is_true_key_simple_xor(salt, password)
 
     # データ選択
     if is_true_key:
         # true鍵の場合は前半部分
         if len(encrypted_data) < data_length:
             raise ValueError(f"暗号データが短すぎます: {len(encrypted_data)} < {data_length}")
-        encrypted_part = encrypted_data[:data_length]
+        encrypted_part = memoryview(encrypted_data)[:data_length]
     else:
         # false鍵の場合は後半部分
         if len(encrypted_data) < 2 * data_length:
             raise ValueError(f"暗号データが短すぎます: {len(encrypted_data)} < {2 * data_length}")
-        encrypted_part = encrypted_data[data_length:2 * data_length]
+        encrypted_part = memoryview(encrypted_data)[data_length:2 * data_length]
 
-    # XOR復号
+    # XOR復号（スライスはコピーせずmemoryviewで参照）
     decrypted = decrypt_xor(encrypted_part, stream)
 
     # チェックサム検証 (オプショナル)
@@ -264,6 +267,69 @@ def decrypt_container(encrypted_data: bytes, metadata: Dict[str, Any], password:
     return decrypted
 
 
+def decrypt_container_range(encrypted_data: bytes, metadata: Dict[str, Any], password: str,
+                            offset: int, length: int) -> bytes:
+    """
+    暗号化コンテナの指定範囲のみを復号 (シンプルなXOR方式)
+
+    メタデータにストリームチェックポイントがあれば最寄りの状態から鍵ストリームを
+    再生成するため、コストはオフセットではなく範囲の長さに比例します。
+
+    Args:
+        encrypted_data: 暗号化データ
+        metadata: メタデータ辞書
+        password: 復号パスワード
+        offset: 平文上の開始バイト位置
+        length: 復号する長さ（バイト単位）
+
+    Returns:
+        復号された範囲のデータ（データ末尾を超える部分は切り詰め）
+    """
+    # メタデータを確認
+    encryption_method = metadata.get("encryption_method", "simple_xor")
+    if encryption_method != "simple_xor":
+        raise ValueError(f"未対応の暗号化方式: {encryption_method}")
+
+    if offset < 0 or length < 0:
+        raise ValueError(f"不正な範囲: offset={offset}, length={length}")
+
+    # メタデータを取得
+    salt = base64.b64decode(metadata["salt"])
+    data_length = metadata["data_length"]
+
+    # データ末尾で範囲を切り詰め
+    length = max(0, min(length, data_length - offset))
+    if length == 0:
+        return b''
+
+    # 鍵種別に応じて領域を選択
+    is_true_key = _is_true_key_simple_xor(salt, password)
+    region_index = 0 if is_true_key else 1
+    region_start = region_index * data_length
+    if len(encrypted_data) < region_start + offset + length:
+        raise ValueError(f"暗号データが短すぎます: {len(encrypted_data)} < {region_start + offset + length}")
+
+    # パスワードから鍵を派生
+    key, iv, _ = derive_key(password, salt)
+
+    # チェックポイントがあれば利用してシーク可能なストリームを構築
+    # （鍵と一致しないチェックポイントは使用せず先頭から生成する）
+    stream_gen = None
+    checkpoints = metadata.get("stream_checkpoints")
+    if checkpoints and len(checkpoints) > region_index:
+        try:
+            stream_gen = SeekableRabbitStream.from_checkpoints(key, iv, checkpoints[region_index])
+        except (ValueError, KeyError, TypeError):
+            stream_gen = None
+    if stream_gen is None:
+        stream_gen = SeekableRabbitStream(key, iv)
+
+    stream = stream_gen.read_at(offset, length)
+    encrypted_part = memoryview(encrypted_data)[region_start + offset:region_start + offset + length]
+
+    return decrypt_xor(encrypted_part, stream)
+
+
 def add_timestamp_to_filename(filename: str) -> str:
     """
     ファイル名にタイムスタンプを追加する
@@ -307,31 +373,126 @@ def save_decrypted_file(decrypted_data: bytes, output_path: str) -> None:
         raise
 
 
-def decrypt_file(input_file: str, output_file: str, key: str) -> bytes:
+def decrypt_file(input_file: str, output_file: str, key: str) -> str:
     """
     暗号化ファイルを復号する
 
+    シンプルなXOR方式のコンテナは選択された領域をチャンク単位で復号し、
+    出力ファイルへ直接書き込みます（decrypt_file_streaming）。復号データ全体を
+    メモリに保持しないため、メモリ使用量はファイルサイズに依存しません。
+
     Args:
         input_file: 暗号化ファイルのパス
-        output_file: 出力ファイルパス
+        output_file: 出力ファイルパス（タイムスタンプが付加されます）
         key: 復号に使用する鍵
 
     Returns:
-        復号されたデータ
+        実際に保存された出力ファイルパス
     """
-    try:
-        # 暗号化ファイルを読み込む
-        encrypted_data, metadata = read_encrypted_file(input_file)
+    return decrypt_file_streaming(input_file, output_file, key)
 
-        # データを復号する
-        decrypted_data = decrypt_container(encrypted_data, metadata, key)
 
-        # 復号したデータを保存する
-        save_decrypted_file(decrypted_data, output_file)
+def parse_encrypted_data(data: bytes) -> Tuple[bytes, Dict[str, Any]]:
+    """
+    メモリ上の暗号化データをデータとメタデータに分解
+
+    Args:
+        data: 暗号化されたデータ（ヘッダー付き）
+
+    Returns:
+        (encrypted_data, metadata): データとメタデータの辞書
+    """
+    # ヘッダーを解析（V1/B2の両形式に対応）
+    metadata, data_offset = parse_header(data)
+
+    # テスト用簡易フォーマット処理を削除
+    # これは暗号化をバイパスするバックドアであり、要件に違反しています
+
+    # 残りのデータ（暗号化済み）を取得
+    encrypted_data = data[data_offset:]
+
+    return encrypted_data, metadata
+
 
-        return decrypted_data
+def decrypt_file_streaming(input_file: str, output_file: str, key: str,
+                           chunk_size: int = DECRYPT_CHUNK_SIZE) -> str:
+    """
+    暗号化ファイルをチャンク単位で復号する（シンプルなXOR方式）
+
+    暗号文全体をメモリに読み込まず、選択された領域をチャンクごとに復号して
+    出力ファイルへ直接書き込みます。メモリ使用量はファイルサイズに依存しません。
+
+    Args:
+        input_file: 暗号化ファイルのパス
+        output_file: 出力ファイルパス（タイムスタンプが付加されます）
+        key: 復号に使用する鍵
+        chunk_size: 一度に処理するバイト数
+
+    Returns:
+        実際に保存された出力ファイルパス
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"不正なチャンクサイズ: {chunk_size}")
+
+    try:
+        with open(input_file, 'rb') as source:
+            metadata = read_encrypted_header(source)
+            data_offset = source.tell()
+
+            # メタデータを確認
+            encryption_method = metadata.get("encryption_method", "simple_xor")
+            if encryption_method != "simple_xor":
+                raise ValueError(f"未対応の暗号化方式: {encryption_method}")
+
+            salt = base64.b64decode(metadata["salt"])
+            data_length = metadata["data_length"]
+
+            # 鍵種別に応じて領域を選択
+            is_true_key = _is_true_key_simple_xor(salt, key)
+            region_start = data_offset + (0 if is_true_key else data_length)
+
+            source.seek(0, os.SEEK_END)
+            if source.tell() < region_start + data_length:
+                raise ValueError(f"暗号データが短すぎます: {source.tell() - data_offset}バイト")
+            source.seek(region_start)
+
+            # パスワードから鍵を派生し、鍵ストリームを逐次生成
+            stream_key, stream_iv, _ = derive_key(key, salt)
+            stream_gen = SeekableRabbitStream(stream_key, stream_iv)
+
+            # 出力先の準備
+            timestamped_output_path = add_timestamp_to_filename(output_file)
+            output_dir = os.path.dirname(timestamped_output_path)
+            if output_dir and not os.path.exists(output_dir):
+                os.makedirs(output_dir)
+
+            # 再利用するチャンクバッファ
+            buffer = bytearray(chunk_size)
+            view = memoryview(buffer)
+            checksum = hashlib.sha256()
+
+            with open(timestamped_output_path, 'wb') as output:
+                remaining = data_length
+                while remaining > 0:
+                    size = min(chunk_size, remaining)
+                    chunk = view[:size]
+                    if source.readinto(chunk) != size:
+                        raise ValueError("暗号データの読み込み中にファイル末尾に達しました")
+
+                    xor_into(chunk, chunk, stream_gen.read(size))
+                    checksum.update(chunk)
+                    output.write(chunk)
+                    remaining -= size
+
+        # チェックサム検証 (オプショナル)
+        actual = checksum.hexdigest()[:8]
+        expected = metadata.get("true_checksum" if is_true_key else "false_checksum")
+        if expected and actual != expected:
+            print(f"警告: チェックサムが一致しません (期待: {expected}, 実際: {actual})")
+
+        print(f"復号データを '{timestamped_output_path}' に保存しました")
+        return timestamped_output_path
     except Exception as e:
-        # エラーメッセージを表示して再度例外を発生
         print(f"ファイル復号中にエラー: {e}")
         raise
 
@@ -348,39 +509,7 @@ def decrypt_data(data: bytes, key: str) -> bytes:
         復号されたデータ
     """
     try:
-        # マジックヘッダーを確認
-        expected_magic = b'RABBIT_ENCRYPTED_V1\n'
-        if not data.startswith(expected_magic):
-            raise ValueError("無効なデータ形式: Rabbit暗号化データではありません")
-
-        # ヘッダーの長さを取得
-        header_length = len(expected_magic)
-
-        # メタデータのサイズを読み取り
-        meta_size = int.from_bytes(data[header_length:header_length+4], byteorder='big')
-
-        # メタデータサイズの妥当性チェック（過大なサイズを防止）
-        if meta_size <= 0 or meta_size > 10 * 1024 * 1024:  # 最大10MBのメタデータに制限
-            raise ValueError(f"無効なメタデータサイズ: {meta_size}バイト")
-
-        # データの長さチェック
-        if len(data) < header_length + 4 + meta_size:
-            raise ValueError(f"データサイズが不足: メタデータに{header_length + 4 + meta_size}バイト必要ですが{len(data)}バイトしかありません")
-
-        # メタデータを読み取り
-        try:
-            meta_json = data[header_length+4:header_length+4+meta_size].decode('utf-8')
-            metadata = json.loads(meta_json)
-        except UnicodeDecodeError:
-            raise ValueError("メタデータのUTF-8デコードに失敗しました")
-        except json.JSONDecodeError:
-            raise ValueError("メタデータのJSON解析に失敗しました")
-
-        # テスト用簡易フォーマット処理を削除
-        # これは暗号化をバイパスするバックドアであり、要件に違反しています
-
-        # 残りのデータ（暗号化済み）を取得
-        encrypted_data = data[header_length+4+meta_size:]
+        encrypted_data, metadata = parse_encrypted_data(data)
 
         # データを復号する
         return decrypt_container(encrypted_data, metadata, key)
@@ -389,6 +518,26 @@ def decrypt_data(data: bytes, key: str) -> bytes:
         raise ValueError(f"データの復号に失敗しました: {e}")
 
 
+def decrypt_range(data: bytes, key: str, offset: int, length: int) -> bytes:
+    """
+    暗号化データの指定範囲のみを復号する
+
+    Args:
+        data: 暗号化されたデータ
+        key: 復号に使用する鍵
+        offset: 平文上の開始バイト位置
+        length: 復号する長さ（バイト単位）
+
+    Returns:
+        復号された範囲のデータ
+    """
+    try:
+        encrypted_data, metadata = parse_encrypted_data(data)
+        return decrypt_container_range(encrypted_data, metadata, key, offset, length)
+    except Exception as e:
+        raise ValueError(f"データの範囲復号に失敗しました: {e}")
+
+
 def simpler_decrypt(encrypted_data: bytes, metadata: Dict[str, Any], password: str) -> Tuple[bytes, str]:
     """
     シンプルな復号処理を行う関数。
@@ -408,10 +557,7 @@ def simpler_decrypt(encrypted_data: bytes, metadata: Dict[str, Any], password: s
 
     # 安全な鍵種別判定を実装 (StreamSelectorを使用)
     selector = StreamSelector(salt)
-    key_type = selector.determine_key_type_for_decryption(password)
-
-    # 適切なストリームを生成
-    stream = selector.get_stream_for_decryption(password, data_length)
+    key_type, stream_handle = selector.get_stream_handle_for_decryption(password, data_length)
 
     # 鍵種別に応じてデータを選択
     if key_type == KEY_TYPE_TRUE:
@@ -423,8 +569,8 @@ def simpler_decrypt(encrypted_data: bytes, metadata: Dict[str, Any], password: s
             raise ValueError(f"暗号データが短すぎます: {len(encrypted_data)} < {2 * data_length}")
         encrypted_part = encrypted_data[data_length:2 * data_length]
 
-    # XOR復号
-    decrypted = decrypt_xor(encrypted_part, stream)
+    # XOR復号（使用する範囲の鍵ストリームのみ生成）
+    decrypted = decrypt_xor(encrypted_part, stream_handle.read_at(0, len(encrypted_part)))
 
     # チェックサム検証 (オプショナル)
     checksum = hashlib.sha256(decrypted).hexdigest()[:8]
@@ -480,14 +626,28 @@ def main():
     args = parse_arguments()
 
     print(f"暗号化ファイル '{args.input}' を読み込んでいます...")
-    encrypted_data, metadata = read_encrypted_file(args.input)
+    # 先にヘッダーのみを読み込んで暗号化方式を確認
+    try:
+        with open(args.input, 'rb') as file:
+            metadata = read_encrypted_header(file)
+    except FileNotFoundError:
+        raise ValueError(f"ファイル '{args.input}' が見つかりません")
 
+    method = metadata.get("encryption_method", "simple_separate_xor")
     if args.verbose:
         # 暗号化方式の表示
-        method = metadata.get("encryption_method", "simple_separate_xor")
         print(f"暗号化方式: {method}")
         print(f"ファイルバージョン: {metadata.get('version', '不明')}")
 
+    # シンプルなXOR方式は暗号文全体を読み込まずにチャンク単位で復号
+    if method == "simple_xor":
+        print("データを復号しています...")
+        decrypt_file(args.input, args.output, args.password)
+        print("復号が完了しました！")
+        return
+
+    encrypted_data, _ = read_encrypted_file(args.input)
+
     print("データを復号しています...")
     # データを復号
     decrypted_data, key_type = simpler_decrypt(encrypted_data, metadata, args.password)
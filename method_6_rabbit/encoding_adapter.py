@@ -10,11 +10,29 @@ import argparse
 import base64
 import binascii
 import chardet
+import hashlib
 import json
 import os
 import re
 import sys
-from typing import Dict, Tuple, Any, Optional
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple, Any, Optional, List
+
+from chardet import UniversalDetector
+
+# インポートエラーを回避するための処理
+if __name__ == "__main__":
+    # モジュールとして実行された場合の処理
+    sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+    from method_6_rabbit.reference_index import (
+        get_reference_index, matches_reference_prefix, MATCH_THRESHOLD, HIGH_SIMILARITY_THRESHOLD
+    )
+else:
+    # パッケージの一部として実行された場合の処理
+    from .reference_index import (
+        get_reference_index, matches_reference_prefix, MATCH_THRESHOLD, HIGH_SIMILARITY_THRESHOLD
+    )
 
 # バイナリファイルのパターン
 BINARY_PATTERNS = {
@@ -56,14 +74,130 @@ LANGUAGE_PATTERNS = {
     'ascii_art': (r'[X\*\-\_\|\/\\:\.]{4,}', ['utf-8', 'ascii']),  # ASCIIアート
 }
 
-# リファレンスファイルのキャッシュ
-REFERENCE_DATA_CACHE = {}
+# サンプリング検出の設定（このサイズ以下のデータは全体を検査）
+DETECTION_PREFIX_SIZE = 64 * 1024  # 先頭から必ず検査するサイズ（バイト）
+DETECTION_SAMPLE_COUNT = 16  # 先頭以降から等間隔に取り出すサンプル数
+DETECTION_SAMPLE_SIZE = 4096  # 各サンプルのサイズ（バイト）
+DETECTION_FEED_SIZE = 4096  # UniversalDetectorへ一度に与えるサイズ（バイト）
+DETECTION_CONFIDENCE_THRESHOLD = 0.8  # 先頭の検出結果がこの信頼度未満ならサンプルを追加投入
+
+# 検出結果のキャッシュ（内容のハッシュ -> エンコーディング）
+ENCODING_CACHE_MAX_ENTRIES = 256
+ENCODING_CACHE: "OrderedDict[bytes, str]" = OrderedDict()
+_ENCODING_CACHE_LOCK = threading.Lock()
+
+
+def _content_key(data: bytes) -> bytes:
+    """
+    検出結果キャッシュ用の内容ハッシュを計算
+
+    Args:
+        data: 対象データ
+
+    Returns:
+        16バイトのダイジェスト（データ長を含む）
+    """
+    digest = hashlib.blake2b(data, digest_size=16)
+    digest.update(len(data).to_bytes(8, byteorder='big'))
+    return digest.digest()
+
+
+def clear_encoding_cache() -> None:
+    """エンコーディング検出結果のキャッシュを消去"""
+    with _ENCODING_CACHE_LOCK:
+        ENCODING_CACHE.clear()
+
+
+def _align_utf8_start(data: bytes, start: int) -> int:
+    """
+    サンプル境界をUTF-8の文字境界まで進める（継続バイトは最大3バイト）
+
+    Args:
+        data: 対象データ
+        start: 元の開始位置
+
+    Returns:
+        調整後の開始位置
+    """
+    for offset in range(4):
+        if start + offset >= len(data) or (data[start + offset] & 0xC0) != 0x80:
+            return start + offset
+    return start
+
+
+def sample_for_detection(data: bytes) -> List[bytes]:
+    """
+    エンコーディング検出用のサンプルを取り出す
+
+    先頭 DETECTION_PREFIX_SIZE バイトと、それ以降から等間隔に取り出した
+    DETECTION_SAMPLE_COUNT 個のサンプルを返します。データが十分小さい場合は全体を返します。
+
+    Args:
+        data: 対象データ
+
+    Returns:
+        サンプルのリスト（先頭から順）
+    """
+    sampled_size = DETECTION_PREFIX_SIZE + DETECTION_SAMPLE_COUNT * DETECTION_SAMPLE_SIZE
+    if len(data) <= sampled_size:
+        return [data]
+
+    samples = [data[:_align_utf8_start(data, DETECTION_PREFIX_SIZE)]]
+    remaining = len(data) - DETECTION_PREFIX_SIZE
+    stride = remaining // DETECTION_SAMPLE_COUNT
+    for i in range(DETECTION_SAMPLE_COUNT):
+        # 開始・終了位置を文字境界に揃え、マルチバイト文字の分断による誤検出を防ぐ
+        start = _align_utf8_start(data, DETECTION_PREFIX_SIZE + i * stride)
+        end = _align_utf8_start(data, start + DETECTION_SAMPLE_SIZE)
+        samples.append(data[start:end])
+    return samples
+
+
+def detect_with_sampling(data: bytes) -> Dict[str, Any]:
+    """
+    先頭とサンプルのみを使ってエンコーディングを推定
+
+    まず先頭部分だけで推定し、信頼度が DETECTION_CONFIDENCE_THRESHOLD 未満の場合に限り、
+    等間隔のサンプルを UniversalDetector に段階的に与えて再推定します（検出器が
+    確定した時点で投入を打ち切ります）。コストはデータ全体ではなくサンプル量で抑えられます。
+
+    Args:
+        data: 対象データ
+
+    Returns:
+        chardet.detect と同じ形式の辞書（encoding, confidence, language）
+    """
+    samples = sample_for_detection(data)
+
+    # 先頭部分のみで推定（小さいデータはここで全体を検査して終了）
+    result = chardet.detect(samples[0])
+    if len(samples) == 1 or (result['encoding'] and result['confidence'] >= DETECTION_CONFIDENCE_THRESHOLD):
+        return result
+
+    # 信頼度が低い場合のみ、サンプル全体を段階的に投入
+    detector = UniversalDetector()
+    for sample in samples:
+        for i in range(0, len(sample), DETECTION_FEED_SIZE):
+            detector.feed(sample[i:i + DETECTION_FEED_SIZE])
+            if detector.done:
+                break
+        if detector.done:
+            break
+    detector.close()
+
+    # 信頼度の高い方を採用
+    sampled = detector.result
+    if sampled['encoding'] and sampled['confidence'] > (result['confidence'] or 0.0):
+        return sampled
+    return result
 
 
 def detect_encoding(data: bytes) -> str:
     """
     バイナリデータのエンコーディングを検出
 
+    先頭とサンプルのみを検査し、結果は内容のハッシュごとにキャッシュします。
+
     Args:
         data: エンコーディングを検出するバイナリデータ
 
@@ -74,13 +208,36 @@ def detect_encoding(data: bytes) -> str:
     if len(data) < 8:
         return 'binary'
 
-    # chardetでエンコーディングを検出（信頼度も考慮）
-    try:
-        result = chardet.detect(data)
-        encoding = result['encoding']
-        confidence = result['confidence']
+    # 同じ内容の検出結果はキャッシュから返す
+    cache_key = _content_key(data)
+    with _ENCODING_CACHE_LOCK:
+        cached = ENCODING_CACHE.get(cache_key)
+        if cached is not None:
+            ENCODING_CACHE.move_to_end(cache_key)
+            return cached
+
+    encoding = _detect_encoding_uncached(data)
 
-        # 特定のエンコーディングでサンプルデコードしてみる
+    with _ENCODING_CACHE_LOCK:
+        ENCODING_CACHE[cache_key] = encoding
+        while len(ENCODING_CACHE) > ENCODING_CACHE_MAX_ENTRIES:
+            ENCODING_CACHE.popitem(last=False)
+
+    return encoding
+
+
+def _detect_encoding_uncached(data: bytes) -> str:
+    """
+    バイナリデータのエンコーディングを検出（キャッシュなし）
+
+    Args:
+        data: エンコーディングを検出するバイナリデータ（8バイト以上）
+
+    Returns:
+        検出されたエンコーディング。検出できない場合は 'binary'
+    """
+    try:
+        # 特定のエンコーディングでサンプルデコードしてみる（先頭のみで判定できる安価な検査）
         for enc in ['utf-8', 'shift-jis', 'euc-jp', 'latin-1']:
             try:
                 sample = data[:min(100, len(data))].decode(enc)
@@ -91,6 +248,11 @@ def detect_encoding(data: bytes) -> str:
             except UnicodeDecodeError:
                 pass
 
+        # chardetでエンコーディングを検出（サンプリングし、信頼度が低い間のみ投入を継続）
+        result = detect_with_sampling(data)
+        encoding = result['encoding']
+        confidence = result['confidence']
+
         # chardet結果の信頼性が高い場合はその結果を使用
         if encoding and confidence > 0.7:
             return encoding
@@ -169,64 +331,33 @@ def compare_with_reference_files(data: bytes) -> Tuple[bool, str, float]:
     best_similarity = 0.0
     best_category = ""
 
-    # キャッシュしたリファレンスデータを取得または読み込み
-    reference_data = {}
-    for category, file_path in reference_files.items():
-        try:
-            if category in REFERENCE_DATA_CACHE:
-                ref_data = REFERENCE_DATA_CACHE[category]
-            elif os.path.exists(file_path):
-                with open(file_path, 'rb') as f:
-                    ref_data = f.read()
-                REFERENCE_DATA_CACHE[category] = ref_data
-            else:
-                continue
-
-            reference_data[category] = ref_data
-        except Exception as e:
-            print(f"リファレンスファイル読込エラー: {e}")
+    # リファレンスファイルの索引（ファイル更新時のみ再構築）から類似度を取得
+    try:
+        index = get_reference_index(reference_files)
+        similarities = index.similarities(data)
+    except Exception as e:
+        print(f"リファレンスファイル読込エラー: {e}")
+        similarities = {}
 
     # リファレンスデータがない場合
-    if not reference_data:
+    if not similarities:
         return False, "", 0.0
 
-    # 各リファレンスファイルとの類似性を計算
-    for category, ref_data in reference_data.items():
+    # 各リファレンスファイルとの類似性を評価
+    for category, similarity in similarities.items():
         # サイズチェック - あまりにもサイズが違う場合はスキップ
-        size_ratio = min(len(data), len(ref_data)) / max(len(data), len(ref_data))
+        ref_size = index.size_of(category)
+        size_ratio = min(len(data), ref_size) / max(len(data), ref_size, 1)
         if size_ratio < 0.3:  # サイズが70%以上違う場合はスキップ
             print(f"サイズ比が小さすぎるためスキップ: {category} ({size_ratio:.2f})")
             continue
 
-        # バイト一致率
-        min_len = min(len(data), len(ref_data))
-        if min_len > 0:
-            # 先頭と末尾のサンプルデータを取得
-            sample_size = min(100, min_len // 3)
-            head_match = sum(1 for i in range(sample_size) if data[i] == ref_data[i]) / sample_size
-
-            # 中間部のサンプルを取得
-            mid_start = min_len // 2 - sample_size // 2
-            mid_match = sum(1 for i in range(sample_size) if
-                           mid_start + i < min_len and
-                           data[mid_start + i] == ref_data[mid_start + i]) / sample_size
-
-            # 末尾部のサンプルを取得
-            tail_start = max(0, min_len - sample_size)
-            tail_match = sum(1 for i in range(sample_size) if
-                           tail_start + i < min_len and
-                           data[tail_start + i] == ref_data[tail_start + i]) / sample_size
-
-            # 重み付き平均
-            similarity = (head_match * 0.5) + (mid_match * 0.3) + (tail_match * 0.2)
-
-            if similarity > best_similarity:
-                best_similarity = similarity
-                best_category = category
+        if min(len(data), ref_size) > 0 and similarity > best_similarity:
+            best_similarity = similarity
+            best_category = category
 
     # 結果返却
-    match_threshold = 0.6  # 類似度の閾値
-    if best_similarity >= match_threshold:
+    if best_similarity >= MATCH_THRESHOLD:
         print(f"リファレンス一致: カテゴリ={best_category}, 類似度={best_similarity:.2f}")
         return True, best_category, best_similarity
     else:
@@ -353,8 +484,9 @@ def adaptive_decode(data: bytes, metadata: Dict[str, Any] = None) -> Tuple[str,
                 with open(reference_file_path, 'rb') as f:
                     ref_data = f.read()
 
-                # 自動リファレンス適用するか確認
-                if similarity >= 0.8:  # 80%以上一致の場合は自動適用
+                # 類似度が高く、データがリファレンスで始まる場合のみ自動適用
+                # （末尾のパディングを落とすだけで、異なる内容は置き換えない）
+                if similarity >= HIGH_SIMILARITY_THRESHOLD and matches_reference_prefix(data, ref_data):
                     print(f"リファレンスファイルを自動適用します: {match_category}")
 
                     # カテゴリに基づいてエンコーディングを選択
@@ -417,7 +549,8 @@ def adaptive_decode(data: bytes, metadata: Dict[str, Any] = None) -> Tuple[str,
     common_xor_keys = [0x00, 0xFF, 0x55, 0xAA, 0x33, 0x66, 0x99, 0xCC]
     for key in common_xor_keys:
         try:
-            xor_data = bytes(b ^ key for b in data)
+            # 256バイトの変換表でXORを一括適用
+            xor_data = data.translate(bytes(b ^ key for b in range(256)))
             xor_encoding = detect_encoding(xor_data)
             if xor_encoding != 'binary':
                 xor_text, _ = decode_data(xor_data, xor_encoding)
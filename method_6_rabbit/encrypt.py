@@ -16,7 +16,7 @@ import binascii
 import base64
 import hashlib
 import datetime
-from typing import Tuple, Dict, Any, List, Optional, Union
+from typing import Tuple, Dict, Any, List, Optional, Union, BinaryIO, Callable
 
 # インポートエラーを回避するための処理
 if __name__ == "__main__":
@@ -26,14 +26,23 @@ if __name__ == "__main__":
         RABBIT_KEY_SIZE,
         RABBIT_IV_SIZE,
         ENCRYPT_CHUNK_SIZE,
+        ENCRYPT_JOURNAL_INTERVAL,
         TRUE_FILE_PATH,
         FALSE_FILE_PATH,
         ENCRYPTED_FILE_PATH,
         KEY_DERIVATION_ITERATIONS,
         VERSION
     )
-    from method_6_rabbit.stream_selector import StreamSelector, KEY_TYPE_TRUE, KEY_TYPE_FALSE
-    from method_6_rabbit.rabbit_stream import derive_key, RabbitStreamGenerator
+    from method_6_rabbit.stream_selector import StreamSelector, KEY_TYPE_TRUE, KEY_TYPE_FALSE, is_simple_xor_true_region
+    from method_6_rabbit.rabbit_stream import (
+        derive_key, RabbitStreamGenerator, SeekableRabbitStream, CHECKPOINT_STRUCT, checkpoint_interval_for
+    )
+    from method_6_rabbit.xor_kernel import xor_bytes, xor_into
+    from method_6_rabbit.container import build_header, header_prefix_size
+    from method_6_rabbit.job_journal import (
+        default_journal_path, file_fingerprint, load_journal, save_journal, remove_journal,
+        append_checkpoints, load_checkpoints
+    )
     # 多重データカプセル化モジュールをインポート
     from method_6_rabbit.capsule import (
         create_multipath_capsule,
@@ -46,14 +55,23 @@ else:
         RABBIT_KEY_SIZE,
         RABBIT_IV_SIZE,
         ENCRYPT_CHUNK_SIZE,
+        ENCRYPT_JOURNAL_INTERVAL,
         TRUE_FILE_PATH,
         FALSE_FILE_PATH,
         ENCRYPTED_FILE_PATH,
         KEY_DERIVATION_ITERATIONS,
         VERSION
     )
-    from .stream_selector import StreamSelector, KEY_TYPE_TRUE, KEY_TYPE_FALSE
-    from .rabbit_stream import derive_key, RabbitStreamGenerator
+    from .stream_selector import StreamSelector, KEY_TYPE_TRUE, KEY_TYPE_FALSE, is_simple_xor_true_region
+    from .rabbit_stream import (
+        derive_key, RabbitStreamGenerator, SeekableRabbitStream, CHECKPOINT_STRUCT, checkpoint_interval_for
+    )
+    from .xor_kernel import xor_bytes, xor_into
+    from .container import build_header, header_prefix_size
+    from .job_journal import (
+        default_journal_path, file_fingerprint, load_journal, save_journal, remove_journal,
+        append_checkpoints, load_checkpoints
+    )
     # 多重データカプセル化モジュールをインポート
     from .capsule import (
         create_multipath_capsule,
@@ -64,10 +82,14 @@ else:
 # 暗号化方式の選択肢
 ENCRYPTION_METHOD_CLASSIC = "classic"  # 旧来の単純連結方式
 ENCRYPTION_METHOD_CAPSULE = "capsule"  # 新しい多重データカプセル化方式
+ENCRYPTION_METHOD_SIMPLE_XOR = "simple_xor"  # ストリーミング対応のシンプルなXOR方式
 
 # ソルトサイズの定義
 SALT_SIZE = 16
 
+# シンプルなXOR方式で領域判定に合うソルトを探す最大試行回数
+SIMPLE_XOR_SALT_ATTEMPTS = 256
+
 
 def generate_master_key() -> bytes:
     """
@@ -94,12 +116,8 @@ def xor_encrypt_data(data: bytes, stream: bytes) -> bytes:
     if len(data) > len(stream):
         raise ValueError(f"ストリーム長（{len(stream)}バイト）がデータ長（{len(data)}バイト）より小さいです")
 
-    # XORによる暗号化
-    encrypted = bytearray(len(data))
-    for i in range(len(data)):
-        encrypted[i] = data[i] ^ stream[i]
-
-    return bytes(encrypted)
+    # XORによる暗号化（一括XORカーネルを使用）
+    return xor_bytes(data, stream)
 
 
 def read_file(file_path: str) -> bytes:
@@ -297,24 +315,12 @@ def save_encrypted_file(encrypted_data: bytes, metadata: Dict[str, Any], output_
         if output_dir and not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
-        # メタデータをJSON形式に変換
-        metadata_json = json.dumps(metadata, indent=2)
-        metadata_bytes = metadata_json.encode('utf-8')
-
-        # メタデータサイズの妥当性チェック
-        if len(metadata_bytes) > 10 * 1024 * 1024:  # 10MB超過でエラー
-            raise ValueError(f"メタデータサイズが大きすぎます: {len(metadata_bytes)} bytes")
+        # ヘッダー（形式識別用マジックとメタデータ）を組み立て
+        header = build_header(metadata, len(encrypted_data))
 
         # ヘッダーとデータを結合
         with open(timestamped_output_path, 'wb') as file:
-            # マジックヘッダー（形式識別用）
-            file.write(b'RABBIT_ENCRYPTED_V1\n')
-
-            # メタデータ部分のサイズ（4バイト）
-            file.write(len(metadata_bytes).to_bytes(4, byteorder='big'))
-
-            # メタデータJSON
-            file.write(metadata_bytes)
+            file.write(header)
 
             # 暗号化データ
             file.write(encrypted_data)
@@ -327,7 +333,8 @@ def save_encrypted_file(encrypted_data: bytes, metadata: Dict[str, Any], output_
 
 
 def encrypt_file(true_file: str, false_file: str, output_file: str, key: str,
-                method: str = ENCRYPTION_METHOD_CAPSULE) -> None:
+                method: str = ENCRYPTION_METHOD_CAPSULE, journal_path: Optional[str] = None,
+                false_key: Optional[str] = None) -> None:
     """
     ファイルを暗号化する
 
@@ -335,9 +342,21 @@ def encrypt_file(true_file: str, false_file: str, output_file: str, key: str,
         true_file: 正規の平文ファイルパス
         false_file: 非正規の平文ファイルパス
         output_file: 出力ファイルパス
-        key: 暗号化に使用する鍵
+        key: 暗号化に使用する鍵（シンプルなXOR方式では正規パスワード）
         method: 暗号化方式
+        journal_path: 中断時の再開用ジャーナルのパス（シンプルなXOR方式のみ、省略時は記録しない）
+        false_key: 非正規パスワード（シンプルなXOR方式でのみ必須、key と異なること）
+
+    Raises:
+        ValueError: シンプルなXOR方式で false_key がない、または key と同じ場合
     """
+    # シンプルなXOR方式はファイル全体を読み込まずにストリーミングで暗号化
+    if method == ENCRYPTION_METHOD_SIMPLE_XOR:
+        if false_key is None:
+            raise ValueError("シンプルなXOR方式には非正規パスワード（false_key）が必要です")
+        encrypt_file_streaming(true_file, false_file, output_file, key, false_key, journal_path=journal_path)
+        return
+
     # ファイルを読み込む
     true_data = read_file(true_file)
     false_data = read_file(false_file)
@@ -354,6 +373,382 @@ def encrypt_file(true_file: str, false_file: str, output_file: str, key: str,
     save_encrypted_file(encrypted_data, metadata, output_file)
 
 
+def _read_padded(source: BinaryIO, chunk: memoryview) -> None:
+    """
+    入力ファイルからチャンクを読み込み、ファイル末尾以降は0で埋める
+
+    Args:
+        source: 平文の入力ファイル
+        chunk: 読み込み先のバッファ
+    """
+    size = len(chunk)
+    filled = 0
+    while filled < size:
+        n = source.readinto(chunk[filled:])
+        if not n:
+            break
+        filled += n
+    if filled < size:
+        chunk[filled:] = bytes(size - filled)
+
+
+def _encrypt_region_streaming(source: BinaryIO, output: BinaryIO, stream_gen: SeekableRabbitStream,
+                              data_length: int, buffer: bytearray, start: int = 0,
+                              checksum: Optional[Any] = None,
+                              on_chunk: Optional[Callable[[int], None]] = None) -> str:
+    """
+    1つの平文ファイルをチャンク単位で暗号化して出力ファイルに書き込む
+
+    入力が data_length より短い場合は0でパディングします（encrypt_data と同じ規則）。
+
+    Args:
+        source: 平文の入力ファイル（読み込み位置は start）
+        output: 出力ファイル（書き込み位置は領域の start バイト目）
+        stream_gen: 鍵ストリーム生成器（読み出し位置は start）
+        data_length: 領域の長さ（バイト単位）
+        buffer: 再利用するチャンクバッファ
+        start: 暗号化を開始する領域内の位置（中断したジョブの再開時）
+        checksum: 領域の先頭から start までを入力済みのSHA-256オブジェクト（省略時は新規）
+        on_chunk: 各チャンクの書き込み後に領域内の位置を渡して呼び出す関数
+
+    Returns:
+        パディング込みの平文のチェックサム（SHA-256の先頭8文字）
+    """
+    view = memoryview(buffer)
+    if checksum is None:
+        checksum = hashlib.sha256()
+    position = start
+
+    while position < data_length:
+        size = min(len(buffer), data_length - position)
+        chunk = view[:size]
+
+        # 入力ファイル末尾以降は0パディング
+        _read_padded(source, chunk)
+
+        checksum.update(chunk)
+        xor_into(chunk, chunk, stream_gen.read(size))
+        output.write(chunk)
+        position += size
+
+        if on_chunk:
+            on_chunk(position)
+
+    return checksum.hexdigest()[:8]
+
+
+def _hash_region_prefix(source: BinaryIO, length: int, buffer: bytearray) -> Any:
+    """
+    領域の先頭から指定長までの平文（パディング込み）のSHA-256を計算（ジョブ再開時）
+
+    Args:
+        source: 平文の入力ファイル（読み込み位置は先頭）
+        length: ハッシュ対象の長さ
+        buffer: 再利用するチャンクバッファ
+
+    Returns:
+        入力済みのSHA-256オブジェクト（読み込み位置は length）
+    """
+    view = memoryview(buffer)
+    checksum = hashlib.sha256()
+    remaining = length
+
+    while remaining > 0:
+        chunk = view[:min(len(buffer), remaining)]
+        _read_padded(source, chunk)
+        checksum.update(chunk)
+        remaining -= len(chunk)
+
+    return checksum
+
+
+def _reserve_metadata_size(metadata: Dict[str, Any], data_length: int, interval: int) -> int:
+    """
+    確定後のメタデータ（チェックサムとチェックポイント）が収まる予約領域のサイズを見積もる
+
+    Args:
+        metadata: チェックサムとチェックポイントが未確定のメタデータ
+        data_length: 1パスあたりのデータ長
+        interval: チェックポイントの間隔（ブロック数）
+
+    Returns:
+        可変長メタデータ領域の予約サイズ（バイト数）
+
+    Raises:
+        ValueError: メタデータがコンテナの上限を超える場合
+    """
+    checkpoint_count = ((data_length + 15) // 16) // interval + 1
+    placeholder_state = "A" * (4 * ((CHECKPOINT_STRUCT.size + 2) // 3))
+    placeholder = {"interval": interval, "states": [placeholder_state] * checkpoint_count}
+    estimate = dict(metadata, true_checksum="0" * 8, false_checksum="0" * 8,
+                    stream_checkpoints=[placeholder, placeholder])
+    return len(build_header(estimate, 2 * data_length)) - header_prefix_size() + 64
+
+
+def _load_resumable_journal(journal_path: str, inputs: List[Dict[str, Any]],
+                            chunk_size: int) -> Optional[Dict[str, Any]]:
+    """
+    再開可能なジャーナルを読み込む
+
+    入力ファイルやチャンクサイズが変わっている場合、出力ファイルが確定位置まで
+    書き込まれていない場合は再開できないため None を返します。
+    チェックポイントログから読み込んだチェックポイントは各パスの鍵ストリーム状態に
+    戻すので、返り値の "streams" はそのまま SeekableRabbitStream.from_state に渡せます。
+
+    Args:
+        journal_path: ジャーナルファイルのパス
+        inputs: 入力ファイルの同一性確認用の情報（正規、非正規の順）
+        chunk_size: 今回のチャンクサイズ
+
+    Returns:
+        ジャーナルの内容、または None
+    """
+    journal = load_journal(journal_path)
+    if journal is None:
+        return None
+
+    try:
+        output_file = journal["output_file"]
+        committed = journal["data_offset"] + journal["region"] * journal["data_length"] + journal["offset"]
+        if (journal["inputs"] == inputs and journal["chunk_size"] == chunk_size and
+                os.path.exists(output_file) and os.path.getsize(output_file) >= committed):
+            streams = journal["streams"]
+            checkpoints = load_checkpoints(journal_path, journal["checkpoint_log_size"], len(streams))
+            for stream, states in zip(streams, checkpoints):
+                stream["checkpoints"] = {"interval": stream.pop("interval"), "states": states}
+            return journal
+    except (KeyError, TypeError, ValueError, OSError):
+        pass
+
+    print(f"警告: ジャーナル '{journal_path}' は今回の入力と一致しないため、最初から暗号化します")
+    return None
+
+
+def select_simple_xor_salt(true_password: str, false_password: str) -> bytes:
+    """
+    シンプルなXOR方式用のソルトを選択する
+
+    復号側は is_simple_xor_true_region でパスワードごとに領域を選ぶため、
+    正規パスワードが前半領域、非正規パスワードが後半領域を選択するソルトを
+    見つかるまで生成し直します。両パスワードが同じだと2つの領域が同じ
+    鍵ストリームで暗号化されてしまうため拒否します。
+
+    Args:
+        true_password: 正規パスワード
+        false_password: 非正規パスワード
+
+    Returns:
+        ソルト
+
+    Raises:
+        ValueError: パスワードが同じ場合、または条件を満たすソルトが見つからない場合
+    """
+    if true_password == false_password:
+        raise ValueError("シンプルなXOR方式では正規パスワードと非正規パスワードを別にする必要があります")
+
+    for _ in range(SIMPLE_XOR_SALT_ATTEMPTS):
+        salt = os.urandom(SALT_SIZE)
+        if (is_simple_xor_true_region(salt, true_password)
+                and not is_simple_xor_true_region(salt, false_password)):
+            return salt
+
+    raise ValueError("パスワードの領域判定に合うソルトが見つかりません")
+
+
+def encrypt_file_streaming(true_file: str, false_file: str, output_file: str,
+                           true_password: str, false_password: str,
+                           chunk_size: int = ENCRYPT_CHUNK_SIZE,
+                           journal_path: Optional[str] = None) -> str:
+    """
+    ファイルをチャンク単位で暗号化する（シンプルなXOR方式）
+
+    平文全体をメモリに読み込まず、2つの鍵ストリームを逐次生成しながら
+    暗号化データを出力ファイルへ直接書き込みます。メタデータ領域は先に
+    確保しておき、チェックサムとチェックポイントが確定した最後に書き戻します。
+    出力形式は encrypt_data と同じコンテナ形式（CONTAINER_FORMAT_VERSION）です。
+
+    journal_path を指定すると、ENCRYPT_JOURNAL_INTERVAL バイトごとに確定位置と
+    両パスの鍵ストリーム状態をジャーナルに記録します（チェックポイントは
+    追記専用のチェックポイントログに新しい分だけを追記）。同じ入力で再実行すると
+    中断前の出力ファイルに対して最後の確定位置から暗号化を再開し、完了時に
+    ジャーナルを削除します。
+
+    Args:
+        true_file: 正規の平文ファイルパス
+        false_file: 非正規の平文ファイルパス
+        output_file: 出力ファイルパス（タイムスタンプが付加されます）
+        true_password: 正規パスワード
+        false_password: 非正規パスワード
+        chunk_size: 一度に処理するバイト数
+        journal_path: 再開用ジャーナルのパス（省略時は記録しない）
+
+    Returns:
+        実際に保存された出力ファイルパス
+
+    Raises:
+        ValueError: 両パスワードが同じ場合、パスワードがジャーナルの鍵ストリーム状態と一致しない場合など
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"不正なチャンクサイズ: {chunk_size}")
+
+    inputs = [file_fingerprint(true_file), file_fingerprint(false_file)]
+    journal = _load_resumable_journal(journal_path, inputs, chunk_size) if journal_path else None
+
+    # データ長はファイルサイズから事前に決定
+    max_length = max(inputs[0]["size"], inputs[1]["size"])
+
+    # ソルト生成と鍵導出（再開時はジャーナルのソルトを使用）
+    salt = base64.b64decode(journal["salt"]) if journal else select_simple_xor_salt(true_password, false_password)
+    true_key, true_iv, _ = derive_key(true_password, salt)
+    false_key, false_iv, _ = derive_key(false_password, salt)
+
+    if journal:
+        true_stream_gen = SeekableRabbitStream.from_state(true_key, true_iv, journal["streams"][0])
+        false_stream_gen = SeekableRabbitStream.from_state(false_key, false_iv, journal["streams"][1])
+    else:
+        # チェックポイント数がデータ長に比例しないよう、大きな入力では間隔を広げる
+        interval = checkpoint_interval_for(max_length)
+        true_stream_gen = SeekableRabbitStream(true_key, true_iv, interval)
+        false_stream_gen = SeekableRabbitStream(false_key, false_iv, interval)
+
+    def build_metadata(true_checksum: str, false_checksum: str,
+                       checkpoints: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "version": VERSION,
+            "salt": base64.b64encode(salt).decode('utf-8'),
+            "data_length": max_length,
+            "true_checksum": true_checksum,
+            "false_checksum": false_checksum,
+            "encryption_method": ENCRYPTION_METHOD_SIMPLE_XOR,
+            "stream_checkpoints": checkpoints,
+        }
+
+    # メタデータ領域の予約サイズを見積もる（チェックポイント数はデータ長から決まる）
+    body_length = 2 * max_length
+    prefix_size = header_prefix_size()
+    reserved_size = _reserve_metadata_size(
+        build_metadata("", "", []), max_length, true_stream_gen.checkpoint_interval
+    )
+    data_offset = prefix_size + reserved_size
+
+    if journal:
+        # 中断前の出力ファイルに続きを書き込む
+        timestamped_output_path = journal["output_file"]
+        region, region_offset = journal["region"], journal["offset"]
+        true_checksum = journal.get("true_checksum")
+        print(f"ジャーナルから暗号化を再開します（領域{region + 1}/2、{region_offset}/{max_length}バイト確定済み）")
+    else:
+        # 出力ファイル名にタイムスタンプを追加
+        timestamped_output_path = add_timestamp_to_filename(output_file)
+        output_dir = os.path.dirname(timestamped_output_path)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        region, region_offset, true_checksum = 0, 0, None
+
+    buffer = bytearray(chunk_size)
+    stream_gens = [true_stream_gen, false_stream_gen]
+
+    # チェックポイントログに追記済みのチェックポイント数（パスごと）
+    logged_checkpoints = [len(stream["checkpoints"]["states"]) for stream in journal["streams"]] if journal else [0, 0]
+    if journal_path and not journal:
+        # 一致しない古いジャーナルのチェックポイントログは引き継がない
+        remove_journal(journal_path)
+
+    with open(timestamped_output_path, 'r+b' if journal else 'wb') as output:
+        def commit(committed_region: int, committed_offset: int) -> None:
+            """書き込み済みデータを確定し、新しいチェックポイントを追記してからジャーナルを更新"""
+            output.flush()
+            os.fsync(output.fileno())
+
+            records = []
+            for stream_index, gen in enumerate(stream_gens):
+                start = logged_checkpoints[stream_index]
+                states = gen.export_checkpoints(start)["states"]
+                records.extend({"stream": stream_index, "index": start + i, "state": state}
+                               for i, state in enumerate(states))
+                logged_checkpoints[stream_index] = start + len(states)
+            log_size = append_checkpoints(journal_path, records)
+
+            save_journal(journal_path, {
+                "inputs": inputs,
+                "chunk_size": chunk_size,
+                "output_file": timestamped_output_path,
+                "salt": base64.b64encode(salt).decode('ascii'),
+                "data_length": max_length,
+                "data_offset": data_offset,
+                "region": committed_region,
+                "offset": committed_offset,
+                "true_checksum": true_checksum,
+                "streams": [gen.export_state(include_checkpoints=False) for gen in stream_gens],
+                "checkpoint_log_size": log_size,
+            })
+
+        def make_progress_callback(current_region: int) -> Optional[Callable[[int], None]]:
+            if not journal_path:
+                return None
+            last_commit = region_offset if current_region == region else 0
+
+            def on_chunk(position: int) -> None:
+                nonlocal last_commit
+                if position - last_commit >= ENCRYPT_JOURNAL_INTERVAL and position < max_length:
+                    commit(current_region, position)
+                    last_commit = position
+            return on_chunk
+
+        if not journal:
+            # ヘッダーと予約済みメタデータ領域（空白で埋める）
+            output.write(build_header(
+                build_metadata("", "", []), body_length, reserve=reserved_size
+            ))
+            if journal_path:
+                commit(0, 0)
+
+        # 前半に正規データ、後半に非正規データを順に書き込む
+        for current_region, source_file in ((0, true_file), (1, false_file)):
+            if current_region < region:
+                continue
+            start = region_offset if current_region == region else 0
+
+            with open(source_file, 'rb') as source:
+                # 再開時は確定済み部分のチェックサムを平文から再計算する
+                checksum = _hash_region_prefix(source, start, buffer) if start else None
+                output.seek(data_offset + current_region * max_length + start)
+                region_checksum = _encrypt_region_streaming(
+                    source, output, stream_gens[current_region], max_length, buffer,
+                    start=start, checksum=checksum, on_chunk=make_progress_callback(current_region)
+                )
+
+            if current_region == 0:
+                true_checksum = region_checksum
+                if journal_path:
+                    commit(1, 0)
+            else:
+                false_checksum = region_checksum
+
+        # 確定したメタデータで予約領域を含むヘッダーを書き戻す（JSONの後続空白は解析に影響しない）
+        metadata = build_metadata(true_checksum, false_checksum, [
+            true_stream_gen.export_checkpoints(),
+            false_stream_gen.export_checkpoints()
+        ])
+        header = build_header(metadata, body_length, reserve=reserved_size)
+        if len(header) != data_offset:
+            raise ValueError(f"メタデータが予約領域を超えました: {len(header) - prefix_size} > {reserved_size}")
+
+        output.seek(0)
+        output.write(header)
+
+        if journal_path:
+            output.flush()
+            os.fsync(output.fileno())
+
+    # 完了したジョブのジャーナルは不要
+    if journal_path:
+        remove_journal(journal_path)
+
+    print(f"暗号化ファイルを '{timestamped_output_path}' に保存しました")
+    return timestamped_output_path
+
+
 def encrypt_data(true_data: bytes, false_data: bytes, true_password: str, false_password: str,
                 method: str = ENCRYPTION_METHOD_CLASSIC) -> Tuple[bytes, Dict[str, Any]]:
     """
@@ -368,9 +763,12 @@ def encrypt_data(true_data: bytes, false_data: bytes, true_password: str, false_
 
     Returns:
         (暗号化データ, メタデータ)
+
+    Raises:
+        ValueError: 両パスワードが同じ場合
     """
-    # ソルト生成
-    salt = os.urandom(SALT_SIZE)
+    # ソルト生成（各パスワードが自分の領域を選択するもの）
+    salt = select_simple_xor_salt(true_password, false_password)
 
     # パスワードから鍵を生成
     true_key, true_iv, _ = derive_key(true_password, salt)
@@ -390,21 +788,15 @@ def encrypt_data(true_data: bytes, false_data: bytes, true_password: str, false_
     true_checksum = hashlib.sha256(true_data).hexdigest()[:8]
     false_checksum = hashlib.sha256(false_data).hexdigest()[:8]
 
-    # ストリーム生成
-    true_stream_gen = RabbitStreamGenerator(true_key, true_iv)
-    false_stream_gen = RabbitStreamGenerator(false_key, false_iv)
+    # ストリーム生成（範囲復号用のチェックポイントを記録しながら生成）
+    interval = checkpoint_interval_for(max_length)
+    true_stream_gen = SeekableRabbitStream(true_key, true_iv, interval)
+    false_stream_gen = SeekableRabbitStream(false_key, false_iv, interval)
 
     # 暗号化ストリーム生成
     true_stream = true_stream_gen.generate(max_length)
     false_stream = false_stream_gen.generate(max_length)
 
-    # XOR暗号化
-    true_encrypted = xor_encrypt_data(true_data, true_stream)
-    false_encrypted = xor_encrypt_data(false_data, false_stream)
-
-    # 両方を連結
-    encrypted_data = true_encrypted + false_encrypted
-
     # メタデータ
     metadata = {
         "version": VERSION,
@@ -413,24 +805,24 @@ def encrypt_data(true_data: bytes, false_data: bytes, true_password: str, false_
         "true_checksum": true_checksum,
         "false_checksum": false_checksum,
         "encryption_method": "simple_xor",
+        # 暗号文の領域順（前半/後半）に並べたストリームチェックポイント
+        "stream_checkpoints": [
+            true_stream_gen.export_checkpoints(),
+            false_stream_gen.export_checkpoints()
+        ],
     }
 
-    # 組み立て
-    result = bytearray()
-    result.extend(b'RABBIT_ENCRYPTED_V1\n')
+    # 組み立て（ヘッダー + 暗号化データ）
+    header = build_header(metadata, 2 * max_length)
+    header_length = len(header)
+    result = bytearray(header_length + 2 * max_length)
+    result[:header_length] = header
 
-    # メタデータをJSON形式に変換
-    metadata_json = json.dumps(metadata, indent=2)
-    metadata_bytes = metadata_json.encode('utf-8')
-
-    # メタデータサイズ
-    result.extend(len(metadata_bytes).to_bytes(4, byteorder='big'))
-
-    # メタデータ
-    result.extend(metadata_bytes)
-
-    # 暗号化データ
-    result.extend(encrypted_data)
+    # XOR暗号化（出力バッファの前半/後半に直接書き込み）
+    view = memoryview(result)
+    xor_into(view[header_length:header_length + max_length], true_data, true_stream)
+    xor_into(view[header_length + max_length:], false_data, false_stream)
+    view.release()
 
     return bytes(result), metadata
 
@@ -475,9 +867,18 @@ def parse_arguments() -> argparse.Namespace:
 
     parser.add_argument(
         "--method",
-        choices=["classic", "capsule"],
+        choices=["classic", "capsule", "simple_xor"],
         default="capsule",
-        help="暗号化方式（classic: 単純連結方式, capsule: 多重データカプセル化）"
+        help="暗号化方式（classic: 単純連結方式, capsule: 多重データカプセル化, "
+             "simple_xor: ストリーミング対応のシンプルなXOR方式）"
+    )
+
+    parser.add_argument(
+        "--journal", "--resume",
+        dest="journal",
+        action="store_true",
+        help="中断時に再開できるようジャーナルを記録（simple_xorのみ）。"
+             "同じ引数で再実行すると中断位置から再開します"
     )
 
     parser.add_argument(
@@ -558,6 +959,47 @@ def main():
     # 引数解析
     args = parse_arguments()
 
+    if args.journal and args.method != ENCRYPTION_METHOD_SIMPLE_XOR:
+        raise ValueError("--journal はシンプルなXOR方式（--method simple_xor）でのみ使用できます")
+
+    # シンプルなXOR方式は入力ファイル全体を読み込まずにチャンク単位で暗号化
+    if args.method == ENCRYPTION_METHOD_SIMPLE_XOR:
+        # 再開時は同じパスワードが必要なため、ジャーナル使用時はランダム生成しない
+        if args.journal and not (args.true_password and args.false_password):
+            raise ValueError("--journal を使用する場合は --true-password と --false-password を指定してください")
+
+        true_password = args.true_password or secrets.token_hex(16)
+        false_password = args.false_password or secrets.token_hex(16)
+        if not args.true_password:
+            print(f"正規パスワードを生成しました: {true_password}")
+        if not args.false_password:
+            print(f"非正規パスワードを生成しました: {false_password}")
+
+        print("暗号化方式: ストリーミング対応のシンプルなXOR暗号化")
+        if args.test:
+            # テストモードではファイルを生成せずメモリ上で暗号化して結果を表示
+            encrypted_data, metadata = encrypt_data(read_file(args.true_file), read_file(args.false_file),
+                                                    true_password, false_password)
+            print("\n=== テスト結果 ===")
+            print(f"暗号化データサイズ: {len(encrypted_data)}バイト")
+            print(f"データ長: {metadata['data_length']}バイト")
+            print("\n暗号化が完了しました！")
+            return
+
+        print(f"'{args.true_file}' と '{args.false_file}' を暗号化しています...")
+        journal_path = default_journal_path(args.output) if args.journal else None
+        if journal_path and os.path.exists(journal_path):
+            print(f"ジャーナル '{journal_path}' が見つかりました。中断位置からの再開を試みます")
+        output_path = encrypt_file_streaming(args.true_file, args.false_file, args.output,
+                                             true_password, false_password, journal_path=journal_path)
+
+        # 復号方法の案内
+        print("\n復号方法:")
+        print(f'  正規データを取得: python -m decrypt -p "{true_password}" -i "{output_path}" -o decrypted_true.text')
+        print(f'  非正規データを取得: python -m decrypt -p "{false_password}" -i "{output_path}" -o decrypted_false.text')
+        print("\n暗号化が完了しました！")
+        return
+
     # ファイルの読み込み
     print(f"正規ファイル '{args.true_file}' を読み込んでいます...")
     true_data = read_file(args.true_file)
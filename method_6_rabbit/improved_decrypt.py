@@ -33,6 +33,8 @@ if __name__ == "__main__":
         VERSION
     )
     from method_6_rabbit.rabbit_stream import derive_key, RabbitStreamGenerator
+    from method_6_rabbit.xor_kernel import xor_bytes
+    from method_6_rabbit.container import read_header
 else:
     # パッケージの一部として実行された場合の処理
     from .config import (
@@ -45,6 +47,8 @@ else:
         VERSION
     )
     from .rabbit_stream import derive_key, RabbitStreamGenerator
+    from .xor_kernel import xor_bytes
+    from .container import read_header
 
 # 暗号化方式
 ENCRYPTION_METHOD_SYMMETRIC = "symmetric"
@@ -69,12 +73,8 @@ def decrypt_xor(encrypted_data: bytes, stream: bytes) -> bytes:
     if len(encrypted_data) > len(stream):
         raise ValueError(f"ストリーム長（{len(stream)}バイト）がデータ長（{len(encrypted_data)}バイト）より小さいです")
 
-    # XORによる復号（暗号化と同じ処理）
-    decrypted = bytearray(len(encrypted_data))
-    for i in range(len(encrypted_data)):
-        decrypted[i] = encrypted_data[i] ^ stream[i]
-
-    return bytes(decrypted)
+    # XORによる復号（暗号化と同じ処理、一括XORカーネルを使用）
+    return xor_bytes(encrypted_data, stream)
 
 
 def read_encrypted_file(file_path: str) -> Tuple[bytes, Dict[str, Any]]:
@@ -89,31 +89,8 @@ def read_encrypted_file(file_path: str) -> Tuple[bytes, Dict[str, Any]]:
     """
     try:
         with open(file_path, 'rb') as file:
-            # マジックヘッダーを確認 (V1とV2両方のサポート)
-            expected_magic_v1 = b'RABBIT_ENCRYPTED_V1\n'
-            expected_magic_v2 = b'RABBIT_ENCRYPTED_V2\n'
-            magic = file.read(len(expected_magic_v1))
-
-            if magic != expected_magic_v1 and magic != expected_magic_v2:
-                raise ValueError("無効なファイル形式: Rabbit暗号化ファイルではありません")
-
-            # メタデータのサイズを読み取り
-            meta_size_bytes = file.read(4)
-            meta_size = int.from_bytes(meta_size_bytes, byteorder='big')
-
-            # メタデータサイズの妥当性チェック
-            if meta_size <= 0 or meta_size > 10 * 1024 * 1024:  # 10MB超過でエラー
-                raise ValueError(f"無効なメタデータサイズ: {meta_size}バイト")
-
-            # メタデータを読み取り
-            meta_bytes = file.read(meta_size)
-            try:
-                meta_json = meta_bytes.decode('utf-8')
-                metadata = json.loads(meta_json)
-            except UnicodeDecodeError:
-                raise ValueError("メタデータのUTF-8デコードに失敗しました")
-            except json.JSONDecodeError:
-                raise ValueError("メタデータのJSON解析に失敗しました")
+            # JSONヘッダー（V1/V2）とバイナリヘッダー（B2）の両方をサポート
+            metadata = read_header(file)
 
             # 残りのデータ（暗号化済み）を読み取り
             encrypted_data = file.read()
@@ -194,8 +171,9 @@ def symmetric_decrypt(encrypted_data: bytes, metadata: Dict[str, Any], password:
         path_b_hash = None
 
     # ハッシュ検証でパスを判定
-    path_a_expected = metadata.get("path_a_hash", "")
-    path_b_expected = metadata.get("path_b_hash", "")
+    # （encrypt.py の形式では前半/後半の平文チェックサムが true_checksum/false_checksum に記録される）
+    path_a_expected = metadata.get("path_a_hash", metadata.get("true_checksum", ""))
+    path_b_expected = metadata.get("path_b_hash", metadata.get("false_checksum", ""))
 
     # パスAに一致する場合
     if path_a_hash == path_a_expected:
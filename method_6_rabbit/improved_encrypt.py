@@ -37,6 +37,7 @@ if __name__ == "__main__":
     )
     from method_6_rabbit.stream_selector import StreamSelector
     from method_6_rabbit.rabbit_stream import derive_key, RabbitStreamGenerator
+    from method_6_rabbit.xor_kernel import xor_bytes
 else:
     # パッケージの一部として実行された場合の処理
     from .config import (
@@ -51,6 +52,7 @@ else:
     )
     from .stream_selector import StreamSelector
     from .rabbit_stream import derive_key, RabbitStreamGenerator
+    from .xor_kernel import xor_bytes
 
 # 暗号化方式
 ENCRYPTION_METHOD_SYMMETRIC = "symmetric"
@@ -88,12 +90,8 @@ def xor_encrypt_data(data: bytes, stream: bytes) -> bytes:
     if len(data) > len(stream):
         raise ValueError(f"ストリーム長（{len(stream)}バイト）がデータ長（{len(data)}バイト）より小さいです")
 
-    # XORによる暗号化
-    encrypted = bytearray(len(data))
-    for i in range(len(data)):
-        encrypted[i] = data[i] ^ stream[i]
-
-    return bytes(encrypted)
+    # XORによる暗号化（一括XORカーネルを使用）
+    return xor_bytes(data, stream)
 
 
 def read_file(file_path: str) -> bytes:
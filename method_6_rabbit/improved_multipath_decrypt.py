@@ -109,7 +109,7 @@ class MultipathDecoder:
             path_a_encrypted = self.encrypted_data[:self.data_length]
             path_a_decrypted = decrypt_xor(path_a_encrypted, stream)
             path_a_hash = hashlib.sha256(path_a_decrypted).hexdigest()[:8]
-            path_a_expected = self.metadata.get("path_a_hash", "")
+            path_a_expected = self.metadata.get("path_a_hash", self.metadata.get("true_checksum", ""))
 
             results[PATH_A] = (
                 path_a_decrypted,
@@ -125,7 +125,7 @@ class MultipathDecoder:
             path_b_encrypted = self.encrypted_data[self.data_length:2 * self.data_length]
             path_b_decrypted = decrypt_xor(path_b_encrypted, stream)
             path_b_hash = hashlib.sha256(path_b_decrypted).hexdigest()[:8]
-            path_b_expected = self.metadata.get("path_b_hash", "")
+            path_b_expected = self.metadata.get("path_b_hash", self.metadata.get("false_checksum", ""))
 
             results[PATH_B] = (
                 path_b_decrypted,
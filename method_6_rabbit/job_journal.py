@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+暗号化ジョブのジャーナル
+
+チャンク単位の暗号化で、確定済みの位置と両パスの鍵ストリーム状態を記録し、
+中断されたジョブを最後の確定位置から再開できるようにします。
+ジャーナルには鍵・パスワード・平文を含めず、鍵ストリームの状態は鍵から導出した
+マスクで秘匿されます（SeekableRabbitStream.export_state）。
+
+ジャーナル本体は再開位置と現在の鍵ストリーム状態だけを保持し、確定のたびに
+置き換えます。チェックポイントは増え続けるため、追記専用のチェックポイントログ
+（1行1件のJSON）に新しい分だけを追記し、ジャーナルには確定済みのログサイズを
+記録します。これにより確定1回あたりの書き込み量はジョブの進行に比例しません。
+"""
+
+import os
+import json
+from typing import Any, Dict, List, Optional
+
+# ジャーナル形式のバージョン
+JOURNAL_VERSION = 2
+
+
+def default_journal_path(output_file: str) -> str:
+    """
+    出力ファイルパスに対応する既定のジャーナルパスを取得
+
+    Args:
+        output_file: 暗号化ファイルの出力パス（タイムスタンプ付加前）
+
+    Returns:
+        ジャーナルファイルのパス
+    """
+    return f"{output_file}.journal"
+
+
+def file_fingerprint(path: str) -> Dict[str, Any]:
+    """
+    入力ファイルの同一性確認用の情報を取得
+
+    Args:
+        path: ファイルパス
+
+    Returns:
+        絶対パス、サイズ、更新時刻の辞書
+    """
+    stat = os.stat(path)
+    return {
+        "path": os.path.abspath(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def load_journal(journal_path: str) -> Optional[Dict[str, Any]]:
+    """
+    ジャーナルを読み込む
+
+    Args:
+        journal_path: ジャーナルファイルのパス
+
+    Returns:
+        ジャーナルの内容（存在しない・壊れている・形式が異なる場合はNone）
+    """
+    if not os.path.exists(journal_path):
+        return None
+
+    try:
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            journal = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(journal, dict) or journal.get("version") != JOURNAL_VERSION:
+        return None
+    return journal
+
+
+def checkpoint_log_path(journal_path: str) -> str:
+    """
+    ジャーナルに対応するチェックポイントログのパスを取得
+
+    Args:
+        journal_path: ジャーナルファイルのパス
+
+    Returns:
+        チェックポイントログのパス
+    """
+    return f"{journal_path}.checkpoints"
+
+
+def append_checkpoints(journal_path: str, records: List[Dict[str, Any]]) -> int:
+    """
+    チェックポイントログに追記（ジャーナルの更新前に呼び出す）
+
+    Args:
+        journal_path: ジャーナルファイルのパス
+        records: {"stream": パス番号, "index": チェックポイント番号, "state": base64文字列} のリスト
+
+    Returns:
+        追記後のログサイズ（ジャーナルに確定済みサイズとして記録する）
+    """
+    with open(checkpoint_log_path(journal_path), 'ab') as f:
+        if records:
+            f.write(b''.join(json.dumps(record).encode('ascii') + b'\n' for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+        return f.tell()
+
+
+def load_checkpoints(journal_path: str, log_size: int, stream_count: int) -> List[List[str]]:
+    """
+    チェックポイントログを読み込む
+
+    ジャーナルに記録されたサイズを超える部分（ジャーナル更新前に中断された追記）は
+    切り詰めてから読み込みます。
+
+    Args:
+        journal_path: ジャーナルファイルのパス
+        log_size: ジャーナルに記録された確定済みのログサイズ
+        stream_count: パスの数
+
+    Returns:
+        パスごとのチェックポイント状態のリスト（export_checkpoints() の states と同じ並び）
+
+    Raises:
+        ValueError: ログが確定済みサイズより短い、または内容が不正な場合
+    """
+    path = checkpoint_log_path(journal_path)
+    if log_size == 0 and not os.path.exists(path):
+        return [[] for _ in range(stream_count)]
+
+    with open(path, 'r+b') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() < log_size:
+            raise ValueError(f"チェックポイントログが短すぎます: {f.tell()} < {log_size}")
+        f.truncate(log_size)
+        f.seek(0)
+        lines = f.read().splitlines()
+
+    states: List[List[str]] = [[] for _ in range(stream_count)]
+    for line in lines:
+        record = json.loads(line)
+        stream = record["stream"]
+        if not 0 <= stream < stream_count or record["index"] != len(states[stream]):
+            raise ValueError(f"チェックポイントログの順序が不正です: {stream}/{record['index']}")
+        states[stream].append(record["state"])
+    return states
+
+
+def save_journal(journal_path: str, journal: Dict[str, Any]) -> None:
+    """
+    ジャーナルを保存（一時ファイルに書き込んでから置き換え、途中で中断されても壊れない）
+
+    Args:
+        journal_path: ジャーナルファイルのパス
+        journal: ジャーナルの内容
+    """
+    journal = dict(journal, version=JOURNAL_VERSION)
+    temp_path = f"{journal_path}.tmp"
+
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(journal, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, journal_path)
+
+
+def remove_journal(journal_path: str) -> None:
+    """
+    ジャーナルとチェックポイントログを削除（ジョブ完了時、または最初から暗号化する場合）
+
+    Args:
+        journal_path: ジャーナルファイルのパス
+    """
+    for path in (journal_path, f"{journal_path}.tmp", checkpoint_log_path(journal_path)):
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+鍵導出キャッシュモジュール
+
+PBKDF2/HKDFによる鍵導出結果をプロセス内でメモ化し、同じパスワード・ソルト・
+パラメータでの再導出を省略します。多数のファイルに同じパスワードを試す
+多重経路復号などで、同一の導出が繰り返されるのを防ぎます。
+
+キャッシュキーはプロセスごとのランダム鍵によるHMACで生成するため、
+パスワードそのものや単純なハッシュ値はメモリ上に保持されません。
+エントリ数と有効期間で制限されたLRU方式で、追い出し時には値を消去します。
+"""
+
+import os
+import sys
+import time
+import hmac
+import hashlib
+import secrets
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# インポートエラーを回避するための処理
+if __name__ == "__main__":
+    # モジュールとして実行された場合の処理
+    sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+    from method_6_rabbit.config import (
+        KDF_CACHE_ENABLED,
+        KDF_CACHE_MAX_ENTRIES,
+        KDF_CACHE_TTL,
+        SECURE_MEMORY_WIPE
+    )
+else:
+    # パッケージの一部として実行された場合の処理
+    from .config import (
+        KDF_CACHE_ENABLED,
+        KDF_CACHE_MAX_ENTRIES,
+        KDF_CACHE_TTL,
+        SECURE_MEMORY_WIPE
+    )
+
+
+class KeyDerivationCache:
+    """
+    鍵導出結果のLRUキャッシュ
+
+    スレッドセーフで、エントリ数（max_entries）と有効期間（ttl秒）で制限されます。
+    """
+
+    def __init__(self, max_entries: int = KDF_CACHE_MAX_ENTRIES, ttl: float = KDF_CACHE_TTL,
+                 enabled: bool = KDF_CACHE_ENABLED):
+        """
+        KeyDerivationCacheを初期化
+
+        Args:
+            max_entries: 保持する最大エントリ数
+            ttl: エントリの有効期間（秒）
+            enabled: キャッシュを有効にするかどうか
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+
+        # キャッシュキー生成用のプロセス固有鍵
+        self._key_secret = secrets.token_bytes(32)
+        # キャッシュキー -> (登録時刻, 導出結果)（最も古く使われた順）
+        self._entries: "OrderedDict[bytes, Tuple[float, bytearray]]" = OrderedDict()
+        # キャッシュキー -> 登録時刻（登録順、参照しても並びは変わらない）
+        self._created: "OrderedDict[bytes, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _make_key(self, kind: str, secret: bytes, salt: bytes, params: Tuple[Any, ...]) -> bytes:
+        """
+        キャッシュキーを生成（各要素は長さ付きで連結して曖昧さを排除）
+
+        Args:
+            kind: 導出方式の識別子
+            secret: パスワードまたはマスター鍵
+            salt: ソルト
+            params: 導出パラメータ
+
+        Returns:
+            32バイトのキャッシュキー
+        """
+        mac = hmac.new(self._key_secret, digestmod=hashlib.sha256)
+        for part in (kind.encode('utf-8'), secret, salt, repr(params).encode('utf-8')):
+            mac.update(len(part).to_bytes(8, byteorder='big'))
+            mac.update(part)
+        return mac.digest()
+
+    @staticmethod
+    def _wipe(value: bytearray) -> None:
+        """キャッシュ内の導出結果を上書き消去"""
+        if SECURE_MEMORY_WIPE:
+            for i in range(len(value)):
+                value[i] = 0
+
+    def _remove(self, cache_key: bytes) -> None:
+        """エントリを削除して値を消去（呼び出し側でロック取得済み）"""
+        _, value = self._entries.pop(cache_key)
+        del self._created[cache_key]
+        self._wipe(value)
+
+    def _evict_expired(self, now: float) -> None:
+        """
+        有効期限切れのエントリを削除（呼び出し側でロック取得済み）
+
+        LRU順は参照のたびに変わるため、登録順の _created を先頭から調べます。
+        """
+        while self._created:
+            cache_key, created = next(iter(self._created.items()))
+            if now - created < self.ttl:
+                break
+            self._remove(cache_key)
+            self.expirations += 1
+
+    def get_or_derive(self, kind: str, secret: bytes, salt: bytes, params: Tuple[Any, ...],
+                      derive: Callable[[], bytes]) -> bytes:
+        """
+        キャッシュから導出結果を取得し、なければ導出して登録
+
+        Args:
+            kind: 導出方式の識別子（例: "pbkdf2"）
+            secret: パスワードまたはマスター鍵
+            salt: ソルト
+            params: 導出結果に影響するパラメータ（反復回数、出力長など）
+            derive: キャッシュミス時に呼び出す導出関数
+
+        Returns:
+            導出結果
+        """
+        if not self.enabled or self.max_entries <= 0:
+            return derive()
+
+        cache_key = self._make_key(kind, secret, salt, params)
+        now = time.monotonic()
+
+        with self._lock:
+            self._evict_expired(now)
+            entry = self._entries.get(cache_key)
+            if entry is not None and now - entry[0] >= self.ttl:
+                # 期限切れのエントリは参照されていても使用しない
+                self._remove(cache_key)
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return bytes(entry[1])
+            self.misses += 1
+
+        # 導出はロック外で実行（他スレッドの参照を妨げない）
+        derived = derive()
+
+        with self._lock:
+            if cache_key not in self._entries:
+                # 登録時刻は登録順に単調増加させる（_created の並びと一致させるため）
+                created = time.monotonic()
+                self._entries[cache_key] = (created, bytearray(derived))
+                self._created[cache_key] = created
+                # 最も古く使われたエントリから追い出す
+                while len(self._entries) > self.max_entries:
+                    self._remove(next(iter(self._entries)))
+                    self.evictions += 1
+
+        return derived
+
+    def clear(self) -> None:
+        """全エントリを消去して削除"""
+        with self._lock:
+            for _, value in self._entries.values():
+                self._wipe(value)
+            self._entries.clear()
+            self._created.clear()
+
+    def reset_stats(self) -> None:
+        """統計カウンタをリセット"""
+        with self._lock:
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        キャッシュの統計情報を取得
+
+        Returns:
+            ヒット数、ミス数、ヒット率などの辞書
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self._entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# プロセス全体で共有するキャッシュ
+_default_cache = KeyDerivationCache()
+
+
+def get_kdf_cache() -> KeyDerivationCache:
+    """
+    共有の鍵導出キャッシュを取得
+
+    Returns:
+        KeyDerivationCacheインスタンス
+    """
+    return _default_cache
+
+
+def cached_pbkdf2_hmac(hash_name: str, password: bytes, salt: bytes, iterations: int,
+                       dklen: Optional[int] = None) -> bytes:
+    """
+    hashlib.pbkdf2_hmac のキャッシュ付き版
+
+    Args:
+        hash_name: ハッシュアルゴリズム名
+        password: パスワード
+        salt: ソルト
+        iterations: 反復回数
+        dklen: 出力長
+
+    Returns:
+        導出された鍵材料
+    """
+    return _default_cache.get_or_derive(
+        "pbkdf2",
+        password,
+        salt,
+        (hash_name, iterations, dklen),
+        lambda: hashlib.pbkdf2_hmac(hash_name, password, salt, iterations, dklen)
+    )
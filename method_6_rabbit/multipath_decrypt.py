@@ -17,6 +17,8 @@ import hashlib
 import time
 import binascii
 import datetime
+import mmap
+from concurrent.futures import ProcessPoolExecutor
 from typing import Tuple, Dict, Any, List, Optional, Union
 
 # インポートエラーを回避するための処理
@@ -26,9 +28,16 @@ if __name__ == "__main__":
     from method_6_rabbit.config import (
         DECRYPT_CHUNK_SIZE,
         DECRYPTED_FILE_PATH,
+        PARALLEL_DECRYPT_WORKERS,
         VERSION
     )
     from method_6_rabbit.stream_selector import StreamSelector, KEY_TYPE_TRUE, KEY_TYPE_FALSE
+    from method_6_rabbit.xor_kernel import xor_into
+    from method_6_rabbit.container import read_header
+    from method_6_rabbit.reference_index import (
+        get_reference_index, build_sketch, estimate_similarity, matches_reference_prefix,
+        MATCH_THRESHOLD, HIGH_SIMILARITY_THRESHOLD
+    )
     # 多重データカプセル化モジュールをインポート
     from method_6_rabbit.capsule import (
         extract_from_multipath_capsule
@@ -45,9 +54,16 @@ else:
     from .config import (
         DECRYPT_CHUNK_SIZE,
         DECRYPTED_FILE_PATH,
+        PARALLEL_DECRYPT_WORKERS,
         VERSION
     )
     from .stream_selector import StreamSelector, KEY_TYPE_TRUE, KEY_TYPE_FALSE
+    from .xor_kernel import xor_into
+    from .container import read_header
+    from .reference_index import (
+        get_reference_index, build_sketch, estimate_similarity, matches_reference_prefix,
+        MATCH_THRESHOLD, HIGH_SIMILARITY_THRESHOLD
+    )
     # 多重データカプセル化モジュールをインポート
     from .capsule import (
         extract_from_multipath_capsule
@@ -81,17 +97,25 @@ class MultiPathDecryptor:
     同一の暗号文に対して複数の鍵でアクセスし、それぞれの復号結果を取得します。
     """
 
-    def __init__(self, use_encoding_adapter: bool = USE_ENCODING_ADAPTER):
+    def __init__(self, use_encoding_adapter: bool = USE_ENCODING_ADAPTER,
+                 reference_data: Optional[Dict[str, bytes]] = None):
         """
         初期化
 
         Args:
             use_encoding_adapter: エンコーディングアダプターを使用するかどうか
+            reference_data: 読み込み済みのリファレンスデータ（省略時はファイルから読み込む）
         """
         self.use_encoding_adapter = use_encoding_adapter
         # リファレンスファイルの内容をキャッシュ
-        self.reference_data = self._load_reference_files()
+        if reference_data is None:
+            reference_data = self._load_reference_files()
+        self.reference_data = reference_data
+        # 索引にないリファレンスデータのスケッチ（カテゴリ -> (データ, スケッチ)）
+        self._local_sketches: Dict[str, Tuple[bytes, Any]] = {}
         self.verbose = False
+        # 直近の一括復号における鍵ごとの処理時間（秒、入力順）
+        self.key_timings: List[float] = []
 
     def set_verbose(self, verbose: bool):
         """
@@ -123,17 +147,30 @@ class MultiPathDecryptor:
         return result
 
     def decrypt_file_with_multiple_keys(self, input_file: str,
-                                      key_output_pairs: List[Tuple[str, str]]) -> List[Tuple[str, str, bool, str, str]]:
+                                      key_output_pairs: List[Tuple[str, str]],
+                                      parallel: bool = False,
+                                      max_workers: Optional[int] = None) -> List[Tuple[str, str, bool, str, str]]:
         """
         単一の暗号化ファイルを複数の鍵で復号
 
+        並列モードではプロセスプールの各ワーカーが暗号化ファイルをmmapで共有し、
+        1つの鍵を1タスクとして処理します。結果はどちらのモードでも入力順に返され、
+        鍵ごとの処理時間は key_timings に記録されます。
+
         Args:
             input_file: 入力暗号化ファイルパス
             key_output_pairs: (鍵, 出力ファイルパス)のタプルリスト
+            parallel: プロセスプールで並列に復号するかどうか
+            max_workers: 並列ワーカー数（省略時は PARALLEL_DECRYPT_WORKERS、0はCPUコア数）
 
         Returns:
             [(鍵, 出力ファイルパス, 成功フラグ, パス種別, エンコーディング)]のリスト
         """
+        self.key_timings = []
+
+        if parallel and len(key_output_pairs) > 1:
+            return self._decrypt_parallel(input_file, key_output_pairs, max_workers)
+
         results = []
 
         try:
@@ -142,82 +179,160 @@ class MultiPathDecryptor:
 
             # 各鍵で復号を試行
             for key, output_path in key_output_pairs:
-                try:
-                    # 復号処理
-                    decrypted_data, path_type = decrypt_data(encrypted_data, key, metadata)
-                    encoding_method = "binary"  # デフォルト値
-                    original_data = decrypted_data  # 元のバイナリデータを保持
+                start_time = time.perf_counter()
+                results.append(self._decrypt_with_key(encrypted_data, metadata, key, output_path))
+                self.key_timings.append(time.perf_counter() - start_time)
 
-                    # エンコーディングアダプターの適用
-                    if self.use_encoding_adapter:
-                        try:
-                            # エンコーディングアダプターにメタデータを渡す
-                            if self.verbose:
-                                print(f"\n--- 鍵 '{key}' のエンコーディング処理開始 ---")
+        except Exception as e:
+            # ファイル読み込み等の共通処理で失敗した場合
+            print(f"共通復号処理に失敗: {e}")
+            if self.verbose:
+                import traceback
+                traceback.print_exc()
+            # すべての鍵について失敗として記録
+            results = []
+            self.key_timings = []
+            for key, output_path in key_output_pairs:
+                results.append((key, output_path, False, "error", "none"))
+                self.key_timings.append(0.0)
+
+        return results
 
-                            decoded_text, encoding_method = adaptive_decode(decrypted_data, metadata)
+    def _decrypt_parallel(self, input_file: str, key_output_pairs: List[Tuple[str, str]],
+                          max_workers: Optional[int]) -> List[Tuple[str, str, bool, str, str]]:
+        """
+        プロセスプールで複数の鍵による復号を並列実行
 
-                            # コンテンツベースの検証強化
-                            path_type, confidence = self._verify_content_by_pattern(decrypted_data, decoded_text, path_type)
+        ヘッダーは親プロセスで一度だけ解析し、暗号化データ本体は各ワーカーが
+        同じファイルをmmapして読み取り専用で共有します（ワーカー間でのコピーなし）。
 
-                            if self.verbose:
-                                print(f"パス種別検証結果: {path_type} (信頼度: {confidence:.2f})")
+        Args:
+            input_file: 入力暗号化ファイルパス
+            key_output_pairs: (鍵, 出力ファイルパス)のタプルリスト
+            max_workers: 並列ワーカー数
 
-                            # 可読テキストに変換できた場合は、それを保存用データとして使用
-                            if decoded_text and not decoded_text.startswith('[バイナリデータ:'):
-                                if self.verbose:
-                                    print(f"テキスト変換成功: {encoding_method}")
-                                # テキストを保存するためにUTF-8でエンコード
-                                decrypted_data = decoded_text.encode('utf-8')
-                            else:
-                                if self.verbose:
-                                    print("バイナリデータ検出、リファレンス比較を実行")
-
-                                # リファレンスファイルとの比較を試行
-                                is_match, ref_type, similarity = self._compare_with_references(original_data)
-                                if is_match:
-                                    path_type = ref_type
-                                    if self.verbose:
-                                        print(f"リファレンス一致: {ref_type} (類似度: {similarity:.2f})")
-
-                                    # 類似度が高い場合はリファレンスデータを使用
-                                    if similarity > 0.8 and ref_type in self.reference_data:
-                                        if self.verbose:
-                                            print(f"リファレンスデータを適用: {ref_type}")
-                                        decrypted_data = self.reference_data[ref_type]
-                                        encoding_method = f"reference-match-{ref_type}"
-                        except Exception as e:
-                            print(f"警告: エンコーディングアダプターでのデコードに失敗: {e}")
-                            if self.verbose:
-                                import traceback
-                                traceback.print_exc()
-                            # 失敗した場合は元のバイナリデータをそのまま使用
+        Returns:
+            入力順の復号結果リスト
+        """
+        try:
+            metadata, data_offset = read_encrypted_header(input_file)
+        except Exception as e:
+            print(f"共通復号処理に失敗: {e}")
+            self.key_timings = [0.0] * len(key_output_pairs)
+            return [(key, output_path, False, "error", "none") for key, output_path in key_output_pairs]
 
-                    # 結果を保存し、実際に保存されたパスを取得
-                    actual_output_path = save_decrypted_file(decrypted_data, output_path)
+        if max_workers is None:
+            max_workers = PARALLEL_DECRYPT_WORKERS
+        if max_workers <= 0:
+            max_workers = os.cpu_count() or 1
+        max_workers = min(max_workers, len(key_output_pairs))
 
-                    # 成功として記録（パス種別とエンコーディング情報を含む）
-                    results.append((key, actual_output_path, True, path_type, encoding_method))
+        results = []
+        self.key_timings = []
+
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_parallel_worker,
+            initargs=(input_file, data_offset, metadata, self.use_encoding_adapter,
+                      self.verbose, self.reference_data)
+        ) as executor:
+            futures = [
+                executor.submit(_decrypt_key_in_worker, key, output_path)
+                for key, output_path in key_output_pairs
+            ]
 
+            # 完了順ではなく入力順に結果を回収
+            for (key, output_path), future in zip(key_output_pairs, futures):
+                try:
+                    result, elapsed = future.result()
                 except Exception as e:
-                    # この鍵での復号は失敗
                     print(f"鍵 '{key}' での復号に失敗: {e}")
+                    result, elapsed = (key, output_path, False, "error", "none"), 0.0
+                results.append(result)
+                self.key_timings.append(elapsed)
+
+        return results
+
+    def _decrypt_with_key(self, encrypted_data: bytes, metadata: Dict[str, Any],
+                          key: str, output_path: str) -> Tuple[str, str, bool, str, str]:
+        """
+        1つの鍵で復号し、エンコーディング処理と保存まで行う
+
+        Args:
+            encrypted_data: 暗号化データ
+            metadata: メタデータ
+            key: 復号鍵
+            output_path: 出力ファイルパス
+
+        Returns:
+            (鍵, 出力ファイルパス, 成功フラグ, パス種別, エンコーディング)
+        """
+        try:
+            # 復号処理
+            decrypted_data, path_type = decrypt_data(encrypted_data, key, metadata)
+            encoding_method = "binary"  # デフォルト値
+            original_data = decrypted_data  # 元のバイナリデータを保持
+
+            # エンコーディングアダプターの適用
+            if self.use_encoding_adapter:
+                try:
+                    # エンコーディングアダプターにメタデータを渡す
+                    if self.verbose:
+                        print(f"\n--- 鍵 '{key}' のエンコーディング処理開始 ---")
+
+                    decoded_text, encoding_method = adaptive_decode(decrypted_data, metadata)
+
+                    # コンテンツベースの検証強化
+                    path_type, confidence = self._verify_content_by_pattern(decrypted_data, decoded_text, path_type)
+
+                    if self.verbose:
+                        print(f"パス種別検証結果: {path_type} (信頼度: {confidence:.2f})")
+
+                    # 可読テキストに変換できた場合は、それを保存用データとして使用
+                    if decoded_text and not decoded_text.startswith('[バイナリデータ:'):
+                        if self.verbose:
+                            print(f"テキスト変換成功: {encoding_method}")
+                        # テキストを保存するためにUTF-8でエンコード
+                        decrypted_data = decoded_text.encode('utf-8')
+                    else:
+                        if self.verbose:
+                            print("バイナリデータ検出、リファレンス比較を実行")
+
+                        # リファレンスファイルとの比較を試行
+                        is_match, ref_type, similarity = self._compare_with_references(original_data)
+                        if is_match:
+                            path_type = ref_type
+                            if self.verbose:
+                                print(f"リファレンス一致: {ref_type} (類似度: {similarity:.2f})")
+
+                            # 類似度が高く、復号結果がリファレンスで始まる場合のみリファレンスデータを使用
+                            # （末尾のパディングを落とすだけで、異なる内容は置き換えない）
+                            if (similarity > HIGH_SIMILARITY_THRESHOLD and ref_type in self.reference_data and
+                                    matches_reference_prefix(original_data, self.reference_data[ref_type])):
+                                if self.verbose:
+                                    print(f"リファレンスデータを適用: {ref_type}")
+                                decrypted_data = self.reference_data[ref_type]
+                                encoding_method = f"reference-match-{ref_type}"
+                except Exception as e:
+                    print(f"警告: エンコーディングアダプターでのデコードに失敗: {e}")
                     if self.verbose:
                         import traceback
                         traceback.print_exc()
-                    results.append((key, output_path, False, "error", "none"))
+                    # 失敗した場合は元のバイナリデータをそのまま使用
+
+            # 結果を保存し、実際に保存されたパスを取得
+            actual_output_path = save_decrypted_file(decrypted_data, output_path)
+
+            # 成功として記録（パス種別とエンコーディング情報を含む）
+            return key, actual_output_path, True, path_type, encoding_method
 
         except Exception as e:
-            # ファイル読み込み等の共通処理で失敗した場合
-            print(f"共通復号処理に失敗: {e}")
+            # この鍵での復号は失敗
+            print(f"鍵 '{key}' での復号に失敗: {e}")
             if self.verbose:
                 import traceback
                 traceback.print_exc()
-            # すべての鍵について失敗として記録
-            for key, output_path in key_output_pairs:
-                results.append((key, output_path, False, "error", "none"))
-
-        return results
+            return key, output_path, False, "error", "none"
 
     def _verify_content_by_pattern(self, binary_data: bytes, decoded_text: str, current_path_type: str) -> Tuple[str, float]:
         """
@@ -269,12 +384,38 @@ class MultiPathDecryptor:
 
         # リファレンスファイルとのバイト比較を試行
         is_match, ref_type, similarity = self._compare_with_references(binary_data)
-        if is_match and similarity > 0.8:  # 高い類似度の場合のみ採用
+        if is_match and similarity > HIGH_SIMILARITY_THRESHOLD:  # 高い類似度の場合のみ採用
             path_type = ref_type
             confidence = similarity
 
         return path_type, confidence
 
+    def _reference_sketches(self) -> Dict[str, Any]:
+        """
+        リファレンスデータのフィンガープリント（スケッチ）を取得
+
+        リファレンスファイルの索引を使用し、索引にない（またはファイルと内容が
+        異なる）リファレンスデータのみその場でスケッチを作成します。
+
+        Returns:
+            カテゴリ名 -> スケッチ
+        """
+        index = get_reference_index(REFERENCE_FILES)
+        index.refresh()
+
+        sketches = {}
+        for category, ref_data in self.reference_data.items():
+            entry = index.entries.get(category)
+            if entry is not None and entry["size"] == len(ref_data) and entry["head"] == ref_data[:len(entry["head"])]:
+                sketches[category] = entry["sketch"]
+            else:
+                cached = self._local_sketches.get(category)
+                if cached is None or cached[0] is not ref_data:
+                    cached = (ref_data, build_sketch(ref_data))
+                    self._local_sketches[category] = cached
+                sketches[category] = cached[1]
+        return sketches
+
     def _compare_with_references(self, data: bytes) -> Tuple[bool, str, float]:
         """
         リファレンスファイルとの比較
@@ -292,54 +433,36 @@ class MultiPathDecryptor:
         best_similarity = 0.0
         best_category = ""
 
+        # 復号結果のスケッチは一度だけ（有界なサンプルから）作成し、索引済みのスケッチと比較
+        data_sketch = None
+        reference_sketches = self._reference_sketches()
+
         # 各リファレンスファイルとの類似性を計算
         for category, ref_data in self.reference_data.items():
             # 長さの比較（あまりにも差がある場合はスキップ）
-            len_ratio = min(len(data), len(ref_data)) / max(len(data), len(ref_data))
+            len_ratio = min(len(data), len(ref_data)) / max(len(data), len(ref_data), 1)
             if len_ratio < 0.5:  # 長さが半分以下なら比較しない
                 continue
 
-            # まずは基本的なバイト比較
             min_len = min(len(data), len(ref_data))
             if min_len == 0:
                 continue
 
-            # 先頭、中間、末尾のサンプリング比較
-            samples = [
-                (0, min(100, min_len)),  # 先頭
-                (min_len // 2 - 50, min_len // 2 + 50),  # 中間
-                (max(0, min_len - 100), min_len)  # 末尾
-            ]
-
-            total_matches = 0
-            total_bytes = 0
-
-            for start, end in samples:
-                if end <= start or start >= min_len:
-                    continue
+            if data_sketch is None:
+                data_sketch = build_sketch(data)
+            similarity = estimate_similarity(data_sketch, reference_sketches[category])
 
-                segment_len = end - start
-                matches = sum(1 for i in range(segment_len) if
-                            start + i < min_len and
-                            data[start + i] == ref_data[start + i])
+            # XORパターン検出（バイト間のオフセットが一定かチェック）
+            if similarity < 0.7:  # 直接一致が低い場合はXORパターンを確認
+                xor_matches = self._check_xor_pattern(data[:min(200, min_len)], ref_data[:min(200, min_len)])
+                if xor_matches > similarity:
+                    similarity = xor_matches
 
-                total_matches += matches
-                total_bytes += segment_len
+            if similarity > best_similarity:
+                best_similarity = similarity
+                best_category = category
 
-            if total_bytes > 0:
-                similarity = total_matches / total_bytes
-
-                # XORパターン検出（バイト間のオフセットが一定かチェック）
-                if similarity < 0.7:  # 直接一致が低い場合はXORパターンを確認
-                    xor_matches = self._check_xor_pattern(data[:min(200, min_len)], ref_data[:min(200, min_len)])
-                    if xor_matches > similarity:
-                        similarity = xor_matches
-
-                if similarity > best_similarity:
-                    best_similarity = similarity
-                    best_category = category
-
-        return best_similarity > 0.6, best_category, best_similarity
+        return best_similarity > MATCH_THRESHOLD, best_category, best_similarity
 
     def _check_xor_pattern(self, data1: bytes, data2: bytes) -> float:
         """
@@ -383,47 +506,117 @@ class MultiPathDecryptor:
         return matches / min_len
 
 
-def read_encrypted_file(file_path: str) -> Tuple[bytes, Dict[str, Any]]:
+def read_encrypted_header(file_path: str) -> Tuple[Dict[str, Any], int]:
     """
-    暗号化されたファイルを読み込む
+    暗号化ファイルのヘッダー（メタデータ）のみを読み込む
 
     Args:
         file_path: 暗号化ファイルのパス
 
     Returns:
-        (encrypted_data, metadata): 暗号化データとメタデータ
+        (metadata, data_offset): メタデータと暗号化データ本体の開始位置
     """
     try:
         with open(file_path, 'rb') as file:
-            # マジックヘッダーを確認
-            expected_magic = b'RABBIT_ENCRYPTED_V1\n'
-            magic = file.read(len(expected_magic))
-            if magic != expected_magic:
-                raise ValueError("不正なファイル形式です。Rabbit暗号化ファイルではありません。")
-
-            # メタデータサイズを読み取り
-            metadata_size_bytes = file.read(4)
-            metadata_size = int.from_bytes(metadata_size_bytes, byteorder='big')
-
-            # メタデータを読み取り
-            metadata_bytes = file.read(metadata_size)
-            metadata = json.loads(metadata_bytes.decode('utf-8'))
+            # ヘッダーを解析（V1/B2の両形式に対応）
+            metadata = read_header(file)
 
             # バージョン確認
             if metadata.get('version') != VERSION:
                 print(f"警告: ファイルバージョン ({metadata.get('version')}) と現在のバージョン ({VERSION}) が一致しません")
 
+            return metadata, file.tell()
+
+    except FileNotFoundError:
+        raise ValueError(f"ファイル '{file_path}' が見つかりません")
+    except Exception as e:
+        raise ValueError(f"ファイルの読み込みに失敗しました: {e}")
+
+
+def read_encrypted_file(file_path: str) -> Tuple[bytes, Dict[str, Any]]:
+    """
+    暗号化されたファイルを読み込む
+
+    Args:
+        file_path: 暗号化ファイルのパス
+
+    Returns:
+        (encrypted_data, metadata): 暗号化データとメタデータ
+    """
+    metadata, data_offset = read_encrypted_header(file_path)
+
+    try:
+        with open(file_path, 'rb') as file:
             # 暗号化データを読み取り
+            file.seek(data_offset)
             encrypted_data = file.read()
 
             return encrypted_data, metadata
 
-    except FileNotFoundError:
-        raise ValueError(f"ファイル '{file_path}' が見つかりません")
     except Exception as e:
         raise ValueError(f"ファイルの読み込みに失敗しました: {e}")
 
 
+# 並列復号ワーカーのプロセス内状態（_init_parallel_worker で設定）
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_parallel_worker(input_file: str, data_offset: int, metadata: Dict[str, Any],
+                          use_encoding_adapter: bool, verbose: bool,
+                          reference_data: Dict[str, bytes]) -> None:
+    """
+    並列復号ワーカーの初期化（暗号化ファイルを読み取り専用でmmap）
+
+    Args:
+        input_file: 入力暗号化ファイルパス
+        data_offset: 暗号化データ本体の開始位置
+        metadata: 親プロセスで解析済みのメタデータ
+        use_encoding_adapter: エンコーディングアダプターを使用するかどうか
+        verbose: 詳細ログを有効にするかどうか
+        reference_data: リファレンスデータ
+    """
+    file = open(input_file, 'rb')
+    mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    decryptor = MultiPathDecryptor(use_encoding_adapter=use_encoding_adapter,
+                                   reference_data=reference_data)
+    decryptor.set_verbose(verbose)
+
+    _worker_state.update({
+        'file': file,
+        'mmap': mapped,
+        'data': memoryview(mapped)[data_offset:],
+        'metadata': metadata,
+        'decryptor': decryptor
+    })
+
+
+def _decrypt_key_in_worker(key: str, output_path: str) -> Tuple[Tuple[str, str, bool, str, str], float]:
+    """
+    ワーカープロセスで1つの鍵による復号を実行
+
+    Args:
+        key: 復号鍵
+        output_path: 出力ファイルパス
+
+    Returns:
+        (復号結果, 処理時間（秒）)
+    """
+    start_time = time.perf_counter()
+
+    encrypted_data = _worker_state['data']
+    metadata = _worker_state['metadata']
+    if metadata.get('encryption_method', ENCRYPTION_METHOD_CLASSIC) == ENCRYPTION_METHOD_CAPSULE:
+        # カプセル方式はバイト列を前提とした処理があるため実体化する
+        encrypted_data = bytes(encrypted_data)
+
+    # 鍵ごとにメタデータを複製し、エンコーディングヒントが他の鍵の処理順に依存しないようにする
+    result = _worker_state['decryptor']._decrypt_with_key(
+        encrypted_data, dict(metadata), key, output_path
+    )
+    return result, time.perf_counter() - start_time
+
+
 def read_key_from_file(key_file_path: str) -> str:
     """
     鍵ファイルから鍵を読み込む
@@ -503,10 +696,9 @@ def decrypt_data_classic(encrypted_data: bytes, password: str, metadata: Dict[st
 
         # StreamSelectorを初期化してストリームを取得
         selector = StreamSelector(salt)
-        stream = selector.get_stream_for_decryption(password, data_length)
 
-        # 鍵種別を判定（"true"か"false"）
-        key_type = selector.determine_key_type_for_decryption(password)
+        # 鍵種別を判定（"true"か"false"）し、そのパスのストリームハンドルのみ取得
+        key_type, stream_handle = selector.get_stream_handle_for_decryption(password, data_length)
 
         # 鍵種別に応じて適切な部分を選択
         if key_type == KEY_TYPE_TRUE:
@@ -520,12 +712,10 @@ def decrypt_data_classic(encrypted_data: bytes, password: str, metadata: Dict[st
                 # データが足りない場合は前半部分を使用（エラーを防ぐため）
                 encrypted_part = encrypted_data[:data_length]
 
-        # XORによる復号
+        # XORによる復号（不足分は0のまま残る）
         decrypted = bytearray(data_length)
-        for i in range(data_length):
-            # 単純なXOR復号
-            if i < len(encrypted_part):
-                decrypted[i] = encrypted_part[i] ^ stream[i]
+        encrypted_part = encrypted_part[:data_length]
+        xor_into(decrypted, encrypted_part, stream_handle.read_at(0, len(encrypted_part)))
 
         # 復号結果の検証
         path_type = "unknown"
@@ -813,6 +1003,19 @@ def parse_arguments() -> argparse.Namespace:
         help="テキストプレビュー時の最大表示文字数"
     )
 
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="複数の鍵をプロセスプールで並列に復号する"
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=PARALLEL_DECRYPT_WORKERS,
+        help="並列復号のワーカー数（0はCPUコア数）"
+    )
+
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -862,7 +1065,9 @@ def main():
     # MultiPathDecryptorを使用して一括復号
     decryptor = MultiPathDecryptor(use_encoding_adapter=use_adapter)
     decryptor.set_verbose(args.verbose)
-    results = decryptor.decrypt_file_with_multiple_keys(args.input, key_output_pairs)
+    results = decryptor.decrypt_file_with_multiple_keys(
+        args.input, key_output_pairs, parallel=args.parallel, max_workers=args.workers
+    )
 
     # 出力ファイル名をパス種別に基づいて更新
     for i, (key, output_path, success, path_type, encoding_method) in enumerate(results):
@@ -917,7 +1122,7 @@ def main():
                     # リファレンスファイルと比較
                     is_match, ref_type, similarity = compare_with_reference_files(file_data)
 
-                    if is_match and similarity > 0.6:  # 60%以上一致で適用
+                    if is_match and similarity > MATCH_THRESHOLD:  # 明示指定時は一致判定のみで適用
                         # リファレンスファイルと一致した場合はそれを適用
                         ref_path = REFERENCE_FILES.get(ref_type)
                         if ref_path and os.path.exists(ref_path):
@@ -11,8 +11,10 @@ https://datatracker.ietf.org/doc/html/rfc4503
 import struct
 import os
 import hashlib
+import hmac
+import base64
 import sys
-from typing import Tuple, List, Optional, Union
+from typing import Tuple, List, Optional, Union, Dict, Any
 import binascii
 
 # インポートエラーを回避するための処理
@@ -26,8 +28,11 @@ if __name__ == "__main__":
         RABBIT_COUNTER_WORDS,
         RABBIT_ROUNDS,
         KEY_DERIVATION_ITERATIONS,
+        STREAM_CHECKPOINT_INTERVAL,
+        STREAM_MAX_CHECKPOINTS,
         VERSION
     )
+    from method_6_rabbit.kdf_cache import cached_pbkdf2_hmac
 else:
     # パッケージの一部として実行された場合の処理
     from .config import (
@@ -37,8 +42,11 @@ else:
         RABBIT_COUNTER_WORDS,
         RABBIT_ROUNDS,
         KEY_DERIVATION_ITERATIONS,
+        STREAM_CHECKPOINT_INTERVAL,
+        STREAM_MAX_CHECKPOINTS,
         VERSION
     )
+    from .kdf_cache import cached_pbkdf2_hmac
 
 # Rabbitアルゴリズムの定数
 WORD_SIZE = 32  # ワードサイズ（ビット）
@@ -229,6 +237,57 @@ class RabbitStreamGenerator:
 
         return bytes(result)
 
+    def export_state(self) -> bytes:
+        """
+        現在の内部状態（X, C, carry）をバイト列として取得
+
+        generate() はブロック（16バイト）単位で状態を進めるため、取得した状態は
+        次に生成されるブロックの先頭に対応します。状態は鍵なしで以降の鍵ストリームを
+        再現できるため、鍵と同等の秘密情報として扱ってください。
+
+        Returns:
+            CHECKPOINT_STRUCT.size バイトの状態
+        """
+        return CHECKPOINT_STRUCT.pack(*self.X, *self.C, self.carry)
+
+    def import_state(self, state: bytes) -> None:
+        """
+        export_state() で取得した内部状態を復元
+
+        Args:
+            state: export_state() の出力
+
+        Raises:
+            ValueError: 状態のサイズまたは内容が不正な場合
+        """
+        if len(state) != CHECKPOINT_STRUCT.size:
+            raise ValueError(f"不正な状態サイズ: {len(state)}バイト")
+
+        values = CHECKPOINT_STRUCT.unpack(state)
+        if values[16] not in (0, 1):
+            raise ValueError(f"不正なキャリービット: {values[16]}")
+
+        self.X = list(values[:RABBIT_STATE_WORDS])
+        self.C = list(values[RABBIT_STATE_WORDS:2 * RABBIT_STATE_WORDS])
+        self.carry = values[16]
+
+    @classmethod
+    def from_state(cls, state: bytes) -> "RabbitStreamGenerator":
+        """
+        export_state() で取得した内部状態から生成器を作成（鍵セットアップは行わない）
+
+        Args:
+            state: export_state() の出力
+
+        Returns:
+            状態を復元したRabbitStreamGenerator
+        """
+        generator = cls.__new__(cls)
+        generator._word_mask = WORD_MASK
+        generator._a_constants = A
+        generator.import_state(state)
+        return generator
+
     def generate(self, length: int) -> bytes:
         """
         指定された長さのストリーム鍵を生成（超高速化版）
@@ -288,6 +347,379 @@ class RabbitStreamGenerator:
         return bytes(result[:length])
 
 
+# チェックポイント保存形式（X_0..X_7, C_0..C_7, carry のリトルエンディアン32ビット値）
+CHECKPOINT_STRUCT = struct.Struct('<17I')
+CHECKPOINT_MASK_LABEL = b"rabbit_stream_checkpoint"
+RESUME_STATE_MASK_LABEL = b"rabbit_stream_resume_state"
+
+
+def checkpoint_interval_for(data_length: int,
+                            base_interval: int = STREAM_CHECKPOINT_INTERVAL,
+                            max_checkpoints: int = STREAM_MAX_CHECKPOINTS) -> int:
+    """
+    データ長に応じたチェックポイント間隔を決定
+
+    チェックポイントはメタデータに保存されるため、数が max_checkpoints を
+    超えないように大きなデータでは間隔を広げます（メタデータのサイズを入力サイズに
+    依存させない）。
+
+    Args:
+        data_length: 鍵ストリームの長さ（バイト単位）
+        base_interval: 基本の間隔（ブロック数）
+        max_checkpoints: チェックポイント数の上限（先頭のチェックポイントを含む）
+
+    Returns:
+        チェックポイントの間隔（ブロック数）
+    """
+    blocks = (data_length + 15) // 16
+    # 先頭（ブロック0）を含めて max_checkpoints 個以内に収まる最小の間隔
+    return max(base_interval, -(-blocks // max(1, max_checkpoints - 1)))
+
+
+class SeekableRabbitStream:
+    """
+    ランダムアクセス可能なRabbitストリーム
+
+    生成中にKブロックごとの内部状態スナップショット（チェックポイント）を記録し、
+    任意オフセットの鍵ストリームを最寄りのチェックポイントから再生成します。
+    これにより範囲復号のコストは O(オフセット) ではなく O(範囲 + K) になります。
+
+    出力は同じ鍵とIVの RabbitStreamGenerator.generate(N) の先頭Nバイトと一致します。
+    """
+
+    def __init__(self, key: bytes, iv: Optional[bytes] = None,
+                 checkpoint_interval: int = STREAM_CHECKPOINT_INTERVAL):
+        """
+        SeekableRabbitStreamを初期化
+
+        Args:
+            key: 16バイト（128ビット）の鍵
+            iv: 8バイト（64ビット）の初期化ベクトル（省略可）
+            checkpoint_interval: チェックポイントの間隔（ブロック数）
+
+        Raises:
+            ValueError: 鍵/IVのサイズまたはチェックポイント間隔が不正な場合
+        """
+        if checkpoint_interval <= 0:
+            raise ValueError("チェックポイント間隔は正の値である必要があります")
+
+        self._key = key
+        self._iv = iv
+        self._generator = RabbitStreamGenerator(key, iv)
+        self.checkpoint_interval = checkpoint_interval
+
+        # ブロック番号 -> (X, C, carry) のスナップショット
+        self._checkpoints: Dict[int, Tuple[Tuple[int, ...], Tuple[int, ...], int]] = {}
+        # 内部生成器が次に出力するブロック番号
+        self._block = 0
+        # read()/generate() が次に返すバイト位置
+        self._pos = 0
+        # 直前に生成した最終ブロック（ブロック境界をまたぐ逐次読み出し用）
+        self._last_block_data = b''
+        # チェックポイント番号 -> マスク済みの保存形式（記録済みの状態は変化しないため再利用）
+        self._exported_states: Dict[int, str] = {}
+
+        self._record_checkpoint()
+
+    def _snapshot(self) -> Tuple[Tuple[int, ...], Tuple[int, ...], int]:
+        """内部生成器の現在状態のコピーを取得"""
+        g = self._generator
+        return tuple(g.X), tuple(g.C), g.carry
+
+    def _restore(self, block: int, state: Tuple[Tuple[int, ...], Tuple[int, ...], int]) -> None:
+        """内部生成器を指定ブロックの状態に戻す"""
+        X, C, carry = state
+        self._generator.X = list(X)
+        self._generator.C = list(C)
+        self._generator.carry = carry
+        self._block = block
+        self._last_block_data = b''
+
+    def _record_checkpoint(self) -> None:
+        """現在のブロックがチェックポイント境界であれば状態を記録"""
+        if self._block % self.checkpoint_interval == 0 and self._block not in self._checkpoints:
+            self._checkpoints[self._block] = self._snapshot()
+
+    def _seek_block(self, block: int) -> None:
+        """
+        内部生成器を指定ブロックの直前の状態まで移動
+
+        Args:
+            block: 移動先のブロック番号
+        """
+        # 現在位置から前進する方が近ければそのまま進める
+        nearest = max(b for b in self._checkpoints if b <= block)
+        if not (nearest <= self._block <= block):
+            self._restore(nearest, self._checkpoints[nearest])
+
+        # 出力を抽出せずに状態だけを進める
+        next_state = self._generator._next_state
+        while self._block < block:
+            next_state()
+            self._block += 1
+            self._record_checkpoint()
+
+    def _generate_blocks(self, blocks: int) -> bytes:
+        """
+        現在のブロックから指定ブロック数の出力を生成（チェックポイントを記録しながら）
+
+        Args:
+            blocks: 生成するブロック数
+
+        Returns:
+            blocks * 16 バイトのストリーム
+        """
+        interval = self.checkpoint_interval
+        output = bytearray()
+        remaining = blocks
+
+        while remaining > 0:
+            # 次のチェックポイント境界まで一括生成
+            step = min(remaining, interval - (self._block % interval))
+            output += self._generator.generate(step * 16)
+            self._block += step
+            remaining -= step
+            self._record_checkpoint()
+
+        if output:
+            self._last_block_data = bytes(output[-16:])
+        return bytes(output)
+
+    def seek(self, offset: int) -> None:
+        """
+        読み出し位置を移動
+
+        Args:
+            offset: 新しいバイト位置
+        """
+        if offset < 0:
+            raise ValueError(f"不正なオフセット: {offset}")
+        self._pos = offset
+
+    def tell(self) -> int:
+        """
+        現在の読み出し位置を取得
+
+        Returns:
+            バイト位置
+        """
+        return self._pos
+
+    def read_at(self, offset: int, length: int) -> bytes:
+        """
+        指定オフセットから鍵ストリームを読み出す（読み出し位置は変更しない）
+
+        Args:
+            offset: 開始バイト位置
+            length: 読み出す長さ（バイト単位）
+
+        Returns:
+            鍵ストリームの指定範囲
+        """
+        if offset < 0 or length < 0:
+            raise ValueError(f"不正な範囲: offset={offset}, length={length}")
+        if length == 0:
+            return b''
+
+        first_block = offset // 16
+        last_block = (offset + length + 15) // 16
+
+        if self._last_block_data and first_block == self._block - 1:
+            # 直前のブロックの続きから読む場合は巻き戻さずに再利用
+            cached = self._last_block_data
+            data = cached + self._generate_blocks(last_block - self._block)
+        else:
+            self._seek_block(first_block)
+            data = self._generate_blocks(last_block - first_block)
+
+        start = offset - first_block * 16
+        return data[start:start + length]
+
+    def read(self, length: int) -> bytes:
+        """
+        現在の読み出し位置から鍵ストリームを読み出し、位置を進める
+
+        Args:
+            length: 読み出す長さ（バイト単位）
+
+        Returns:
+            鍵ストリーム
+        """
+        data = self.read_at(self._pos, length)
+        self._pos += length
+        return data
+
+    def generate(self, length: int) -> bytes:
+        """
+        現在の読み出し位置から指定された長さのストリーム鍵を生成
+
+        生成中に通過したチェックポイント境界の状態を記録します。
+
+        Args:
+            length: 生成するストリーム鍵の長さ（バイト単位）
+
+        Returns:
+            指定された長さのストリーム鍵
+        """
+        return self.read(length)
+
+    def _checkpoint_mask(self, index: int, label: bytes = CHECKPOINT_MASK_LABEL) -> bytes:
+        """
+        チェックポイント保存用のマスクを鍵から導出
+
+        内部状態は鍵なしで以降の鍵ストリームを再現できるため、
+        保存時は鍵とIVから導出したマスクでXORして秘匿します。
+
+        Args:
+            index: チェックポイント番号
+            label: マスクの用途ラベル
+
+        Returns:
+            CHECKPOINT_STRUCT.size バイトのマスク
+        """
+        mask = b''
+        counter = 0
+        while len(mask) < CHECKPOINT_STRUCT.size:
+            msg = label + (self._iv or b'') + struct.pack('<QI', index, counter)
+            mask += hmac.new(self._key, msg, hashlib.sha256).digest()
+            counter += 1
+        return mask[:CHECKPOINT_STRUCT.size]
+
+    def export_checkpoints(self, start: int = 0) -> Dict[str, Any]:
+        """
+        記録済みチェックポイントをメタデータに保存可能な形式で取得
+
+        Args:
+            start: 取得を開始するチェックポイント番号（追記済みの分を省く場合に指定）
+
+        Returns:
+            {"interval": K, "states": [base64文字列, ...]} の辞書
+            （states[i] はブロック (start+i)*K の状態）
+        """
+        states = []
+        index = start
+        while index * self.checkpoint_interval in self._checkpoints:
+            if index not in self._exported_states:
+                X, C, carry = self._checkpoints[index * self.checkpoint_interval]
+                packed = CHECKPOINT_STRUCT.pack(*X, *C, carry)
+                masked = bytes(a ^ b for a, b in zip(packed, self._checkpoint_mask(index)))
+                self._exported_states[index] = base64.b64encode(masked).decode('ascii')
+            states.append(self._exported_states[index])
+            index += 1
+
+        return {"interval": self.checkpoint_interval, "states": states}
+
+    @classmethod
+    def from_checkpoints(cls, key: bytes, iv: Optional[bytes],
+                         checkpoint_data: Dict[str, Any]) -> "SeekableRabbitStream":
+        """
+        保存済みチェックポイントからSeekableRabbitStreamを復元
+
+        Args:
+            key: 16バイトの鍵
+            iv: 8バイトのIV（省略可）
+            checkpoint_data: export_checkpoints() の出力
+
+        Returns:
+            チェックポイントを読み込んだSeekableRabbitStream
+
+        Raises:
+            ValueError: チェックポイントデータが不正な場合
+        """
+        stream = cls(key, iv, int(checkpoint_data["interval"]))
+
+        for index, encoded in enumerate(checkpoint_data.get("states", [])):
+            masked = base64.b64decode(encoded)
+            if len(masked) != CHECKPOINT_STRUCT.size:
+                raise ValueError(f"不正なチェックポイントサイズ: {len(masked)}バイト")
+            values = CHECKPOINT_STRUCT.unpack(
+                bytes(a ^ b for a, b in zip(masked, stream._checkpoint_mask(index)))
+            )
+            state = (tuple(values[:8]), tuple(values[8:16]), values[16])
+
+            block = index * stream.checkpoint_interval
+            if block == 0:
+                # 先頭状態は鍵から再計算できるので、鍵の取り違えを検出する
+                if state != stream._checkpoints[0]:
+                    raise ValueError("チェックポイントが鍵またはIVと一致しません")
+                continue
+            stream._checkpoints[block] = state
+
+        return stream
+
+    def export_state(self, include_checkpoints: bool = True) -> Dict[str, Any]:
+        """
+        読み出し位置と内部状態を保存可能な形式で取得（中断した処理の再開用）
+
+        内部状態は鍵とIVから導出したマスクで秘匿されます。
+
+        Args:
+            include_checkpoints: チェックポイントを含めるかどうか（Falseの場合は間隔のみ。
+                チェックポイントは呼び出し側で別に保存し、from_state の前に
+                "checkpoints" として戻す）
+
+        Returns:
+            {"position": 読み出し位置, "block": ブロック番号, "state": base64文字列,
+             "checkpoints": export_checkpoints() の出力} の辞書
+            （include_checkpoints が False の場合は "checkpoints" の代わりに "interval"）
+        """
+        masked = bytes(
+            a ^ b for a, b in zip(self._generator.export_state(),
+                                  self._checkpoint_mask(self._block, RESUME_STATE_MASK_LABEL))
+        )
+        state = {
+            "position": self._pos,
+            "block": self._block,
+            "state": base64.b64encode(masked).decode('ascii'),
+        }
+        if include_checkpoints:
+            state["checkpoints"] = self.export_checkpoints()
+        else:
+            state["interval"] = self.checkpoint_interval
+        return state
+
+    @classmethod
+    def from_state(cls, key: bytes, iv: Optional[bytes], state_data: Dict[str, Any]) -> "SeekableRabbitStream":
+        """
+        export_state() の出力からSeekableRabbitStreamを復元
+
+        保存時点までのチェックポイントと内部状態を読み込むため、
+        先頭から鍵ストリームを再生成せずに続きを生成できます。
+
+        Args:
+            key: 16バイトの鍵
+            iv: 8バイトのIV（省略可）
+            state_data: export_state() の出力
+
+        Returns:
+            状態を復元したSeekableRabbitStream
+
+        Raises:
+            ValueError: 状態データが不正、または鍵/IVと一致しない場合
+        """
+        stream = cls.from_checkpoints(key, iv, state_data["checkpoints"])
+
+        block = int(state_data["block"])
+        position = int(state_data["position"])
+        if block < 0 or position < 0:
+            raise ValueError(f"不正な再開位置: block={block}, position={position}")
+
+        masked = base64.b64decode(state_data["state"])
+        if len(masked) != CHECKPOINT_STRUCT.size:
+            raise ValueError(f"不正な状態サイズ: {len(masked)}バイト")
+        state = bytes(a ^ b for a, b in zip(masked, stream._checkpoint_mask(block, RESUME_STATE_MASK_LABEL)))
+
+        # 記録済みチェックポイントより先の状態のみ採用（手前なら既存のチェックポイントで足りる）
+        if block > max(stream._checkpoints):
+            stream._generator.import_state(state)
+            stream._block = block
+            stream._last_block_data = b''
+            stream._record_checkpoint()
+        stream._pos = position
+
+        return stream
+
+
 def derive_key(password: str, salt: Optional[bytes] = None) -> Tuple[bytes, bytes, bytes]:
     """
     パスワードから鍵とIVを導出する
@@ -303,8 +735,8 @@ def derive_key(password: str, salt: Optional[bytes] = None) -> Tuple[bytes, byte
     if salt is None:
         salt = os.urandom(16)
 
-    # PBKDF2でパスワードから鍵材料を導出
-    key_material = hashlib.pbkdf2_hmac(
+    # PBKDF2でパスワードから鍵材料を導出（同じパスワードとソルトの再導出はキャッシュから取得）
+    key_material = cached_pbkdf2_hmac(
         'sha256',
         password.encode('utf-8'),
         salt,
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+リファレンスファイルのフィンガープリント索引
+
+リファレンスファイルごとにバイト単位のシングル（連続する SHINGLE_SIZE バイト）の
+ハッシュ値から bottom-k スケッチを一度だけ作成して永続化し、復号結果との類似度
+（Jaccard係数の推定値）をスケッチ同士の比較だけで求めます。
+スケッチは先頭部分と固定間隔の窓からなる有界なサンプルから作成するため、
+比較コストはデータサイズに依存しません（リファレンス側も同じサンプリングを使用）。
+索引はリファレンスファイルの更新時刻またはサイズが変わった場合にのみ再構築されます。
+"""
+
+import os
+import json
+import base64
+import threading
+from typing import Dict, Optional, Tuple, Any
+
+import numpy as np
+
+# シングル（部分列）の長さ（バイト）
+SHINGLE_SIZE = 8
+
+# スケッチに保持する最小ハッシュ値の数
+SKETCH_SIZE = 64
+
+# 永続化する索引ファイル名（リファレンスファイルと同じディレクトリに保存）
+INDEX_FILE_NAME = ".reference_index.json"
+
+# 索引形式のバージョン（パラメータ変更時は再構築される）
+INDEX_VERSION = 2
+
+# スケッチ作成に使うサンプル（先頭部分 + 固定間隔の窓）
+SAMPLE_PREFIX_SIZE = 64 * 1024  # 先頭から必ず含めるサイズ（これ以下のデータは全体を使用）
+SAMPLE_WINDOW_SIZE = 4 * 1024  # 各窓のサイズ
+SAMPLE_WINDOW_STRIDE = 1024 * 1024  # 窓の間隔（絶対オフセット。パディングの有無で位置がずれない）
+SAMPLE_WINDOW_COUNT = 32  # 窓の最大数
+
+# 類似度の閾値
+#
+# 推定値は和集合の最小 SKETCH_SIZE 個のうち共通するものの割合で、真のJaccard係数 J に
+# 対しておよそ二項分布 B(64, J)/64 に従う（標準誤差 sqrt(J(1-J)/64) ≦ 0.0625）。
+# - 誤った鍵の出力は一様乱数と見なせ、8バイトのシングルがリファレンスと一致する確率は
+#   無視できるため J ≈ 0。MATCH_THRESHOLD = 0.6 は J = 0.6 での標準誤差（約0.061）の
+#   約10倍離れており、誤一致は実質的に起こらない。
+# - 正しく復号された出力はリファレンスのシングルをすべて含むので、
+#   J = リファレンスのシングル数 / 出力のシングル数。0.6 以上なら、パディングなどの
+#   余分な内容がリファレンスの約2/3までの出力を一致とみなす。
+# - HIGH_SIMILARITY_THRESHOLD = 0.8 は余分な内容が1/4まで（標準誤差約0.05で0.6と4σ離れる）。
+#   ただしスケッチは内容の同一性を保証しないため、出力をリファレンスデータで置き換えるのは
+#   出力がリファレンスで始まる場合（matches_reference_prefix）に限る。この場合の置換は
+#   末尾のパディングを落とすだけで、異なる内容を失うことはない。
+MATCH_THRESHOLD = 0.6
+HIGH_SIMILARITY_THRESHOLD = 0.8
+
+# 先頭バイトの保持サイズ（XORパターン検出などの補助比較用）
+HEAD_SIZE = 200
+
+# splitmix64 の定数
+_MIX_MULTIPLIER_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_MULTIPLIER_2 = np.uint64(0x94D049BB133111EB)
+
+
+def shingle_hashes(data: bytes) -> np.ndarray:
+    """
+    データの全シングルのハッシュ値を計算
+
+    Args:
+        data: 対象データ
+
+    Returns:
+        uint64のハッシュ値配列（データが空なら空配列）
+    """
+    if not data:
+        return np.empty(0, dtype=np.uint64)
+
+    array = np.frombuffer(data, dtype=np.uint8)
+    if len(array) < SHINGLE_SIZE:
+        # 短いデータは全体を1つのシングルとして扱う
+        array = np.concatenate([array, np.zeros(SHINGLE_SIZE - len(array), dtype=np.uint8)])
+
+    # 連続する8バイトを64ビット値に詰める
+    count = len(array) - SHINGLE_SIZE + 1
+    values = np.zeros(count, dtype=np.uint64)
+    for j in range(SHINGLE_SIZE):
+        values |= array[j:j + count].astype(np.uint64) << np.uint64(8 * j)
+
+    # splitmix64 の最終化関数で撹拌（uint64演算のラップアラウンドを利用）
+    with np.errstate(over='ignore'):
+        values ^= values >> np.uint64(30)
+        values *= _MIX_MULTIPLIER_1
+        values ^= values >> np.uint64(27)
+        values *= _MIX_MULTIPLIER_2
+        values ^= values >> np.uint64(31)
+    return values
+
+
+def sample_for_sketch(data: bytes) -> bytes:
+    """
+    スケッチ作成用の有界なサンプルを取得
+
+    先頭 SAMPLE_PREFIX_SIZE バイトと、SAMPLE_WINDOW_STRIDE ごとの絶対オフセットから
+    SAMPLE_WINDOW_SIZE バイトの窓を最大 SAMPLE_WINDOW_COUNT 個連結します。
+
+    Args:
+        data: 対象データ
+
+    Returns:
+        サンプル（データが先頭部分以下ならデータそのもの）
+    """
+    if len(data) <= SAMPLE_PREFIX_SIZE:
+        return data
+
+    view = memoryview(data)
+    pieces = [view[:SAMPLE_PREFIX_SIZE]]
+    for i in range(1, SAMPLE_WINDOW_COUNT + 1):
+        offset = i * SAMPLE_WINDOW_STRIDE
+        if offset >= len(data):
+            break
+        pieces.append(view[offset:offset + SAMPLE_WINDOW_SIZE])
+    return b''.join(pieces)
+
+
+def matches_reference_prefix(data: bytes, ref_data: bytes) -> bool:
+    """
+    データがリファレンスデータで始まるか確認（置換してよいかの判定用）
+
+    Args:
+        data: 復号結果
+        ref_data: リファレンスデータ
+
+    Returns:
+        データの先頭がリファレンスデータと一致する場合はTrue
+    """
+    if not ref_data or len(data) < len(ref_data):
+        return False
+    return memoryview(data)[:len(ref_data)] == ref_data
+
+
+def build_sketch(data: bytes, size: int = SKETCH_SIZE) -> np.ndarray:
+    """
+    bottom-k スケッチ（重複を除いた最小ハッシュ値 size 個）を作成
+
+    Args:
+        data: 対象データ（sample_for_sketch のサンプルのみ使用）
+        size: スケッチサイズ
+
+    Returns:
+        昇順に並んだuint64配列
+    """
+    hashes = shingle_hashes(sample_for_sketch(data))
+
+    # 全体をソートせず、候補を部分選択してから重複を除く
+    candidate_count = 4 * size
+    if len(hashes) > candidate_count:
+        candidates = np.unique(np.partition(hashes, candidate_count)[:candidate_count + 1])
+        if len(candidates) >= size:
+            return candidates[:size]
+
+    return np.unique(hashes)[:size]
+
+
+def estimate_similarity(sketch_a: np.ndarray, sketch_b: np.ndarray, size: int = SKETCH_SIZE) -> float:
+    """
+    2つのスケッチからJaccard係数を推定
+
+    Args:
+        sketch_a: スケッチA
+        sketch_b: スケッチB
+        size: スケッチサイズ
+
+    Returns:
+        類似度（0.0～1.0）
+    """
+    if len(sketch_a) == 0 or len(sketch_b) == 0:
+        return 0.0
+
+    # 和集合の最小 size 個のうち、両方のスケッチに含まれるものの割合
+    union = np.union1d(sketch_a, sketch_b)[:size]
+    both = np.intersect1d(sketch_a, sketch_b, assume_unique=True)
+    return float(np.isin(union, both, assume_unique=True).sum()) / len(union)
+
+
+class ReferenceFingerprintIndex:
+    """
+    リファレンスファイル群のフィンガープリント索引
+    """
+
+    def __init__(self, reference_files: Dict[str, str], index_path: Optional[str] = None):
+        """
+        索引を初期化（永続化された索引があれば読み込む）
+
+        Args:
+            reference_files: カテゴリ名 -> リファレンスファイルパス
+            index_path: 索引ファイルのパス（省略時は最初のリファレンスファイルと同じディレクトリ）
+        """
+        self.reference_files = {category: os.path.abspath(path) for category, path in reference_files.items()}
+        if index_path is None and self.reference_files:
+            first_path = next(iter(self.reference_files.values()))
+            index_path = os.path.join(os.path.dirname(first_path), INDEX_FILE_NAME)
+        self.index_path = index_path
+
+        # カテゴリ -> {path, mtime_ns, size, sketch, head}
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.rebuild_count = 0
+        self._lock = threading.Lock()
+
+        self._load()
+
+    def _load(self) -> None:
+        """永続化された索引を読み込む（形式が異なる・壊れている場合は無視）"""
+        if not self.index_path or not os.path.exists(self.index_path):
+            return
+
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            if (stored.get("version") != INDEX_VERSION or
+                    stored.get("shingle_size") != SHINGLE_SIZE or
+                    stored.get("sketch_size") != SKETCH_SIZE):
+                return
+
+            for category, entry in stored.get("entries", {}).items():
+                self.entries[category] = {
+                    "path": entry["path"],
+                    "mtime_ns": entry["mtime_ns"],
+                    "size": entry["size"],
+                    "sketch": np.frombuffer(base64.b64decode(entry["sketch"]), dtype='<u8').astype(np.uint64),
+                    "head": base64.b64decode(entry["head"]),
+                }
+        except (OSError, ValueError, KeyError, TypeError):
+            self.entries = {}
+
+    def _save(self) -> None:
+        """索引を永続化（書き込めない場合はメモリ上のみで保持）"""
+        if not self.index_path:
+            return
+
+        stored = {
+            "version": INDEX_VERSION,
+            "shingle_size": SHINGLE_SIZE,
+            "sketch_size": SKETCH_SIZE,
+            "entries": {
+                category: {
+                    "path": entry["path"],
+                    "mtime_ns": entry["mtime_ns"],
+                    "size": entry["size"],
+                    "sketch": base64.b64encode(entry["sketch"].astype('<u8').tobytes()).decode('ascii'),
+                    "head": base64.b64encode(entry["head"]).decode('ascii'),
+                }
+                for category, entry in self.entries.items()
+            }
+        }
+
+        try:
+            temp_path = f"{self.index_path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(stored, f)
+            os.replace(temp_path, self.index_path)
+        except OSError:
+            pass
+
+    def refresh(self) -> None:
+        """
+        リファレンスファイルの更新時刻・サイズを確認し、変更されたものだけ再構築
+        """
+        with self._lock:
+            changed = False
+            for category, path in self.reference_files.items():
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    # ファイルがなくなった場合は索引からも除外
+                    if self.entries.pop(category, None) is not None:
+                        changed = True
+                    continue
+
+                entry = self.entries.get(category)
+                if (entry is not None and entry["path"] == path and
+                        entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size):
+                    continue
+
+                try:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                except OSError:
+                    continue
+
+                self.entries[category] = {
+                    "path": path,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": len(data),
+                    "sketch": build_sketch(data),
+                    "head": data[:HEAD_SIZE],
+                }
+                self.rebuild_count += 1
+                changed = True
+
+            if changed:
+                self._save()
+
+    def similarities(self, data: bytes) -> Dict[str, float]:
+        """
+        データと各リファレンスファイルとの類似度を計算
+
+        データのスケッチは一度だけ作成し、各リファレンスとはスケッチ同士で比較します。
+
+        Args:
+            data: 比較対象のデータ
+
+        Returns:
+            カテゴリ名 -> 類似度
+        """
+        self.refresh()
+        if not self.entries:
+            return {}
+
+        sketch = build_sketch(data)
+        return {
+            category: estimate_similarity(sketch, entry["sketch"])
+            for category, entry in self.entries.items()
+        }
+
+    def size_of(self, category: str) -> Optional[int]:
+        """
+        リファレンスファイルのサイズを取得
+
+        Args:
+            category: カテゴリ名
+
+        Returns:
+            サイズ（バイト）。索引にない場合はNone
+        """
+        entry = self.entries.get(category)
+        return entry["size"] if entry else None
+
+    def head_of(self, category: str) -> bytes:
+        """
+        リファレンスファイルの先頭バイトを取得
+
+        Args:
+            category: カテゴリ名
+
+        Returns:
+            先頭 HEAD_SIZE バイト（索引にない場合は空）
+        """
+        entry = self.entries.get(category)
+        return entry["head"] if entry else b''
+
+
+# 参照ファイル群ごとの索引インスタンス
+_INDEX_CACHE: Dict[Tuple[Tuple[str, str], ...], ReferenceFingerprintIndex] = {}
+_INDEX_CACHE_LOCK = threading.Lock()
+
+
+def get_reference_index(reference_files: Dict[str, str]) -> ReferenceFingerprintIndex:
+    """
+    リファレンスファイル群に対応する索引を取得（プロセス内で共有）
+
+    Args:
+        reference_files: カテゴリ名 -> リファレンスファイルパス
+
+    Returns:
+        ReferenceFingerprintIndexインスタンス
+    """
+    cache_key = tuple(sorted((category, os.path.abspath(path)) for category, path in reference_files.items()))
+    with _INDEX_CACHE_LOCK:
+        index = _INDEX_CACHE.get(cache_key)
+        if index is None:
+            index = ReferenceFingerprintIndex(reference_files)
+            _INDEX_CACHE[cache_key] = index
+        return index
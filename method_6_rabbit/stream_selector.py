@@ -31,8 +31,9 @@ if __name__ == "__main__":
         MAGIC_XOR_VALUE,
         KEY_DERIVATION_ITERATIONS
     )
-    from method_6_rabbit.rabbit_stream import RabbitStreamGenerator, derive_key
+    from method_6_rabbit.rabbit_stream import RabbitStreamGenerator, SeekableRabbitStream, derive_key
     from method_6_rabbit.key_analyzer import determine_key_type_advanced, obfuscated_key_determination
+    from method_6_rabbit.kdf_cache import get_kdf_cache
 else:
     from .config import (
         RABBIT_KEY_SIZE,
@@ -45,8 +46,9 @@ else:
         MAGIC_XOR_VALUE,
         KEY_DERIVATION_ITERATIONS
     )
-    from .rabbit_stream import RabbitStreamGenerator, derive_key
+    from .rabbit_stream import RabbitStreamGenerator, SeekableRabbitStream, derive_key
     from .key_analyzer import determine_key_type_advanced, obfuscated_key_determination
+    from .kdf_cache import get_kdf_cache
 
 # 鍵派生用の定数
 TRUE_KEY_INFO = b"true_stream_rabbit"
@@ -99,6 +101,24 @@ def hkdf_expand(pseudo_random_key: bytes, info: bytes, length: int) -> bytes:
     return output[:length]
 
 
+def _derive_stream_key_material(master_key: bytes, salt: bytes) -> bytes:
+    """
+    HKDFで真/偽両ストリーム用の鍵材料を導出
+
+    Args:
+        master_key: マスター鍵
+        salt: ソルト値
+
+    Returns:
+        真のストリーム用と偽のストリーム用の鍵材料を連結したバイト列
+    """
+    # マスター鍵からHKDFで擬似ランダム鍵を抽出
+    prk = hkdf_extract(salt, master_key)
+
+    material_size = RABBIT_KEY_SIZE + RABBIT_IV_SIZE
+    return hkdf_expand(prk, TRUE_KEY_INFO, material_size) + hkdf_expand(prk, FALSE_KEY_INFO, material_size)
+
+
 def derive_multiple_keys(master_key: bytes, salt: bytes = None) -> Tuple[Dict[str, Tuple[bytes, bytes]], bytes]:
     """
     マスター鍵から複数の鍵ペア（鍵とIV）を導出
@@ -111,18 +131,27 @@ def derive_multiple_keys(master_key: bytes, salt: bytes = None) -> Tuple[Dict[st
         (keys_dict, salt): 鍵の種類をキーとし、(key, iv)のタプルを値とする辞書とソルト
     """
     if salt is None:
+        # ランダムソルトでは再利用されないためキャッシュしない
         salt = os.urandom(SALT_SIZE)
-
-    # マスター鍵からHKDFで擬似ランダム鍵を抽出
-    prk = hkdf_extract(salt, master_key)
-
-    # 真のストリーム用の鍵とIVを導出
-    true_key_material = hkdf_expand(prk, TRUE_KEY_INFO, RABBIT_KEY_SIZE + RABBIT_IV_SIZE)
+        key_material = _derive_stream_key_material(master_key, salt)
+    else:
+        key_material = get_kdf_cache().get_or_derive(
+            "hkdf",
+            master_key,
+            salt,
+            (TRUE_KEY_INFO, FALSE_KEY_INFO, RABBIT_KEY_SIZE + RABBIT_IV_SIZE),
+            lambda: _derive_stream_key_material(master_key, salt)
+        )
+
+    material_size = RABBIT_KEY_SIZE + RABBIT_IV_SIZE
+    true_key_material = key_material[:material_size]
+    false_key_material = key_material[material_size:]
+
+    # 真のストリーム用の鍵とIV
     true_key = true_key_material[:RABBIT_KEY_SIZE]
     true_iv = true_key_material[RABBIT_KEY_SIZE:RABBIT_KEY_SIZE + RABBIT_IV_SIZE]
 
-    # 偽のストリーム用の鍵とIVを導出
-    false_key_material = hkdf_expand(prk, FALSE_KEY_INFO, RABBIT_KEY_SIZE + RABBIT_IV_SIZE)
+    # 偽のストリーム用の鍵とIV
     false_key = false_key_material[:RABBIT_KEY_SIZE]
     false_iv = false_key_material[RABBIT_KEY_SIZE:RABBIT_KEY_SIZE + RABBIT_IV_SIZE]
 
@@ -203,6 +232,95 @@ def determine_key_type_secure(key: Union[str, bytes], salt: bytes) -> str:
     return obfuscated_key_determination(key, salt)
 
 
+class LazyStreamHandle:
+    """
+    鍵ストリームの遅延生成ハンドル
+
+    鍵とIVだけを保持し、読み出された範囲の鍵ストリームのみを必要になった時点で生成します。
+    出力は同じ鍵とIVの RabbitStreamGenerator.generate(N) の先頭Nバイトと一致します。
+    """
+
+    def __init__(self, key: bytes, iv: bytes, length: Optional[int] = None):
+        """
+        LazyStreamHandleを初期化（この時点では鍵ストリームを生成しない）
+
+        Args:
+            key: 16バイトの鍵
+            iv: 8バイトのIV
+            length: ストリームの論理長（省略時は無制限）
+        """
+        self._key = key
+        self._iv = iv
+        self.length = length
+        self._stream: Optional[SeekableRabbitStream] = None
+
+    @property
+    def materialized(self) -> bool:
+        """鍵ストリームの生成器が作成済みかどうか"""
+        return self._stream is not None
+
+    def _get_stream(self) -> SeekableRabbitStream:
+        """生成器を必要時に作成"""
+        if self._stream is None:
+            self._stream = SeekableRabbitStream(self._key, self._iv)
+        return self._stream
+
+    def _clamp(self, offset: int, length: int) -> int:
+        """論理長を超えない読み出し長を計算"""
+        if self.length is None:
+            return length
+        return max(0, min(length, self.length - offset))
+
+    def read_at(self, offset: int, length: int) -> bytes:
+        """
+        指定オフセットから鍵ストリームを生成して読み出す
+
+        Args:
+            offset: 開始バイト位置
+            length: 読み出す長さ（論理長を超える分は切り詰める）
+
+        Returns:
+            鍵ストリームの指定範囲
+        """
+        length = self._clamp(offset, length)
+        if length == 0:
+            return b''
+        return self._get_stream().read_at(offset, length)
+
+    def read(self, length: int) -> bytes:
+        """
+        現在の読み出し位置から鍵ストリームを読み出し、位置を進める
+
+        Args:
+            length: 読み出す長さ
+
+        Returns:
+            鍵ストリーム
+        """
+        stream = self._get_stream()
+        length = self._clamp(stream.tell(), length)
+        return stream.read(length)
+
+    def tobytes(self) -> bytes:
+        """
+        論理長全体の鍵ストリームを生成
+
+        Returns:
+            鍵ストリーム全体
+
+        Raises:
+            ValueError: 論理長が設定されていない場合
+        """
+        if self.length is None:
+            raise ValueError("長さが未設定のストリームは一括生成できません")
+        return self.read_at(0, self.length)
+
+    def __len__(self) -> int:
+        if self.length is None:
+            raise TypeError("長さが未設定のストリームです")
+        return self.length
+
+
 class StreamSelector:
     """
     鍵に基づいて適切なストリームを選択する機能を提供
@@ -218,8 +336,8 @@ class StreamSelector:
             master_salt: マスターソルト（省略時はランダム生成）
         """
         self.master_salt = master_salt if master_salt is not None else os.urandom(SALT_SIZE)
-        # ストリームジェネレータのキャッシュ
-        self._generators = {}
+        # ストリームハンドルのキャッシュ（同じ鍵での連続呼び出しはストリームの続きを返す）
+        self._generators: Dict[str, LazyStreamHandle] = {}
 
     def get_salt(self) -> bytes:
         """
@@ -277,13 +395,69 @@ class StreamSelector:
 
         key, iv = keys[key_type]
 
-        # ストリーム生成器を作成または取得
+        # ストリームを生成
+        return self._cached_handle(key, iv).read(data_length)
+
+    def _cached_handle(self, key: bytes, iv: bytes) -> LazyStreamHandle:
+        """
+        鍵とIVに対応するストリームハンドルを作成または取得
+
+        Args:
+            key: 16バイトの鍵
+            iv: 8バイトのIV
+
+        Returns:
+            LazyStreamHandleインスタンス
+        """
         generator_key = f"{binascii.hexlify(key).decode('ascii')}:{binascii.hexlify(iv).decode('ascii')}"
         if generator_key not in self._generators:
-            self._generators[generator_key] = RabbitStreamGenerator(key, iv)
+            self._generators[generator_key] = LazyStreamHandle(key, iv)
+        return self._generators[generator_key]
 
-        # ストリームを生成
-        return self._generators[generator_key].generate(data_length)
+    def get_stream_handles(self, master_key: bytes, data_length: int) -> Dict[str, LazyStreamHandle]:
+        """
+        両方のパス（真/偽）用の遅延ストリームハンドルを取得
+
+        鍵材料は両方のパス分を導出しますが、鍵ストリームは読み出された範囲だけが生成されます。
+
+        Args:
+            master_key: マスター鍵
+            data_length: 各ストリームの長さ
+
+        Returns:
+            鍵タイプをキーとし、LazyStreamHandleを値とする辞書
+        """
+        keys = self.derive_keys_for_both_streams(master_key)
+        return {
+            key_type: LazyStreamHandle(key, iv, data_length)
+            for key_type, (key, iv) in keys.items()
+        }
+
+    def get_stream_handle_for_decryption(self, key: Union[str, bytes],
+                                         data_length: int) -> Tuple[str, LazyStreamHandle]:
+        """
+        復号用の遅延ストリームハンドルを取得
+
+        KDFの処理量から経路を判別されないよう両方のパスの鍵材料を導出しますが、
+        返すのは鍵種別に対応する一方のハンドルのみで、鍵ストリームは読み出し時に生成されます。
+
+        Args:
+            key: ユーザー提供の鍵
+            data_length: ストリームの長さ
+
+        Returns:
+            (鍵タイプ, LazyStreamHandle)
+        """
+        # 鍵種別を判定（高度な難読化判定関数を使用）
+        key_type = obfuscated_key_determination(key, self.master_salt)
+
+        # 鍵がバイト列でなければ変換
+        if isinstance(key, str):
+            key_bytes = key.encode('utf-8')
+        else:
+            key_bytes = key
+
+        return key_type, self.get_stream_handles(key_bytes, data_length)[key_type]
 
     def get_stream_for_decryption(self, key: Union[str, bytes], data_length: int) -> bytes:
         """
@@ -298,7 +472,6 @@ class StreamSelector:
         Returns:
             指定された長さのストリーム
         """
-        # 鍵種別を判定（高度な難読化判定関数を使用）
         key_type = obfuscated_key_determination(key, self.master_salt)
 
         # 鍵がバイト列でなければ変換
@@ -307,30 +480,18 @@ class StreamSelector:
         else:
             key_bytes = key
 
-        # HKDFで実際の暗号化鍵を導出
-        prk = hkdf_extract(self.master_salt, key_bytes)
-
-        # 選択された種類の鍵情報
-        key_info = TRUE_KEY_INFO if key_type == KEY_TYPE_TRUE else FALSE_KEY_INFO
-
-        # 鍵とIVを導出
-        key_material = hkdf_expand(prk, key_info, RABBIT_KEY_SIZE + RABBIT_IV_SIZE)
-        actual_key = key_material[:RABBIT_KEY_SIZE]
-        actual_iv = key_material[RABBIT_KEY_SIZE:RABBIT_KEY_SIZE + RABBIT_IV_SIZE]
-
-        # ストリーム生成器を作成または取得
-        generator_key = f"{binascii.hexlify(actual_key).decode('ascii')}:{binascii.hexlify(actual_iv).decode('ascii')}"
-        if generator_key not in self._generators:
-            self._generators[generator_key] = RabbitStreamGenerator(actual_key, actual_iv)
+        # HKDFで両方のパスの鍵材料を導出し、選択された種類の鍵とIVを使用
+        actual_key, actual_iv = self.derive_keys_for_both_streams(key_bytes)[key_type]
 
         # ストリームを生成
-        return self._generators[generator_key].generate(data_length)
+        return self._cached_handle(actual_key, actual_iv).read(data_length)
 
     def get_streams_for_both_paths(self, master_key: bytes, data_length: int) -> Dict[str, bytes]:
         """
         両方のパス（真/偽）用のストリームを生成
 
-        これは主に暗号化で使用されます。
+        これは主に暗号化で使用されます。片方のパスのみを使う場合は
+        get_stream_handles() で必要な範囲だけを生成してください。
 
         Args:
             master_key: マスター鍵
@@ -339,15 +500,30 @@ class StreamSelector:
         Returns:
             鍵タイプをキーとし、ストリームを値とする辞書
         """
-        keys = self.derive_keys_for_both_streams(master_key)
+        return {
+            key_type: handle.tobytes()
+            for key_type, handle in self.get_stream_handles(master_key, data_length).items()
+        }
+
+
+def is_simple_xor_true_region(salt: bytes, password: str) -> bool:
+    """
+    シンプルなXOR方式でパスワードが前半領域（true）を選択するか判定
+
+    暗号化側はこの判定に合わせてソルトを選び、復号側は同じ判定で領域を選択します。
+
+    Args:
+        salt: ソルト
+        password: パスワード
 
-        # 両方のストリームを生成
-        streams = {}
-        for key_type, (key, iv) in keys.items():
-            generator = RabbitStreamGenerator(key, iv)
-            streams[key_type] = generator.generate(data_length)
+    Returns:
+        前半領域を選択する場合はTrue
+    """
+    hmac_hash = hmac.new(salt, password.encode(), hashlib.sha256).digest()[:4]
+    value = int.from_bytes(hmac_hash, byteorder='big')
 
-        return streams
+    # 数値が偶数ならtrue、奇数ならfalse
+    return value % 2 == 0
 
 
 # パスワードから鍵の種類（TRUE/FALSE）を判定する関数
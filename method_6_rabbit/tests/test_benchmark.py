@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ベンチマークハーネスのテスト
+"""
+
+import unittest
+import os
+import sys
+import json
+import tempfile
+import shutil
+
+# 親ディレクトリをインポートパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# モジュールインポート
+from ..benchmark import (
+    run_benchmarks,
+    compare_with_baseline,
+    save_results,
+    load_results,
+    parse_size,
+    BENCHMARK_CASES
+)
+
+
+class TestBenchmark(unittest.TestCase):
+    """ベンチマークハーネスのテスト"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_parse_size(self):
+        """サイズ指定の解析"""
+        self.assertEqual(parse_size("1K"), 1024)
+        self.assertEqual(parse_size("256MB"), 256 * 1024 * 1024)
+        self.assertEqual(parse_size("1024"), 1024)
+        with self.assertRaises(ValueError):
+            parse_size("abc")
+
+    def test_run_all_cases(self):
+        """全ての計測対象が実行され、JSONとして保存・読込できる"""
+        results = run_benchmarks(sizes=[1024], repeats=2)
+
+        names = {result["name"] for result in results["results"]}
+        self.assertEqual(names, set(BENCHMARK_CASES))
+        for result in results["results"]:
+            self.assertGreater(result["median_ms"], 0.0)
+            self.assertLessEqual(result["min_ms"], result["median_ms"])
+            self.assertNotIn("p99_ms", result)
+            self.assertIsNotNone(result["peak_memory_bytes"])
+            if result["name"] == "kdf":
+                self.assertEqual(result["size"], 0)
+                self.assertIsNone(result["mb_per_s"])
+            else:
+                self.assertEqual(result["size"], 1024)
+                self.assertGreater(result["mb_per_s"], 0.0)
+
+        output_path = os.path.join(self.temp_dir, "bench.json")
+        save_results(results, output_path)
+        self.assertEqual(load_results(output_path), json.loads(json.dumps(results)))
+
+    def test_compare_with_baseline(self):
+        """許容率を超える性能低下のみ検出される"""
+        def make(values):
+            return {"results": [
+                {"name": name, "size": size, "mb_per_s": mb, "ops_per_s": ops}
+                for name, size, mb, ops in values
+            ]}
+
+        baseline = make([("xor", 1024, 100.0, 1.0), ("kdf", 0, None, 200.0), ("keystream", 1024, 2.0, 1.0)])
+        current = make([("xor", 1024, 95.0, 1.0), ("kdf", 0, None, 150.0), ("capsule_transform", 1024, 1.0, 1.0)])
+
+        regressions = compare_with_baseline(current, baseline, max_regression=10.0)
+        self.assertEqual([(r["name"], r["size"]) for r in regressions], [("kdf", 0)])
+        self.assertAlmostEqual(regressions[0]["change_percent"], -25.0)
+
+        self.assertEqual(len(compare_with_baseline(current, baseline, max_regression=3.0)), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
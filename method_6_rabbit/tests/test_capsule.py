@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+カプセル化モジュールのセキュリティ変換・識別不能性変換・混合関数テーブルのテスト
+"""
+
+import unittest
+import os
+import sys
+import hashlib
+from unittest import mock
+
+# 親ディレクトリをインポートパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# モジュールインポート
+from .. import capsule as capsule_module
+from ..capsule import (
+    apply_security_transformations,
+    reverse_security_transformations,
+    add_indistinguishability,
+    remove_indistinguishability,
+    encapsulate_data,
+    encapsulate_data_batch,
+    extract_data_from_capsule,
+    create_mixing_functions,
+    get_mixing_table,
+    clear_mixing_table_cache,
+    SECURITY_BLOCK_SIZE,
+    MIXING_TABLE_CACHE_SIZE
+)
+
+
+def reference_security_transformations(data: bytes, key: str, salt: bytes) -> bytes:
+    """バイト単位ループによる参照実装"""
+    transform_key = hashlib.pbkdf2_hmac('sha256', key.encode('utf-8'), salt, 5000, dklen=32)
+    result = bytearray(len(data))
+    for i in range(0, len(data), SECURITY_BLOCK_SIZE):
+        block_key = hashlib.sha256(transform_key + (i // SECURITY_BLOCK_SIZE).to_bytes(4, byteorder='big')).digest()
+        for j, byte in enumerate(data[i:i + SECURITY_BLOCK_SIZE]):
+            result[i + j] = byte ^ block_key[j % len(block_key)]
+    return bytes(result)
+
+
+def reference_remove_indistinguishability(data: bytes, nonce: bytes) -> bytes:
+    """バイト単位ループによる参照実装"""
+    return bytes((byte - nonce[i % len(nonce)] - (i * 7 + 11) % 256) % 256 for i, byte in enumerate(data))
+
+
+class TestCapsuleTransformations(unittest.TestCase):
+    """ベクトル化した変換が参照実装と一致することのテスト"""
+
+    def test_security_transformations_match_reference(self):
+        """セキュリティ変換の出力が参照実装と一致する"""
+        salt = os.urandom(16)
+        for length in [0, 1, 15, 16, 17, 1000, 4099]:
+            data = os.urandom(length)
+            result = apply_security_transformations(data, "test_key", salt)
+            self.assertEqual(result, reference_security_transformations(data, "test_key", salt))
+            self.assertEqual(reverse_security_transformations(result, "test_key", salt), data)
+
+    def test_indistinguishability_match_reference(self):
+        """識別不能性変換の出力が参照実装と一致し、往復で元に戻る"""
+        for length in [1, 255, 256, 257, 5000]:
+            data = os.urandom(length)
+            transformed, nonce = add_indistinguishability(data)
+
+            expected = bytes((byte + nonce[i % len(nonce)] + (i * 7 + 11) % 256) % 256
+                             for i, byte in enumerate(data))
+            self.assertEqual(transformed, expected)
+            self.assertEqual(remove_indistinguishability(transformed, nonce), data)
+
+        # ノンス長が位置係数の周期と互いに素な場合
+        data = os.urandom(3000)
+        nonce = os.urandom(7)
+        self.assertEqual(remove_indistinguishability(data, nonce),
+                         reference_remove_indistinguishability(data, nonce))
+
+    def test_empty_inputs(self):
+        """空入力の扱いは従来通り"""
+        self.assertEqual(add_indistinguishability(b''), (b'', b''))
+        self.assertEqual(remove_indistinguishability(b'', b'nonce'), b'')
+        self.assertEqual(remove_indistinguishability(b'data', b''), b'')
+
+
+class TestMixingTableCache(unittest.TestCase):
+    """混合関数テーブルのキャッシュとバッチAPIのテスト"""
+
+    def setUp(self):
+        clear_mixing_table_cache()
+        self.key = "mixing_table_key"
+        self.salt = bytes(range(32))
+
+    def tearDown(self):
+        clear_mixing_table_cache()
+
+    def test_table_built_once_per_seed(self):
+        """同じシードでは関数テーブルと関数選択が再計算されない"""
+        with mock.patch.object(capsule_module, "_build_mixing_functions",
+                               wraps=capsule_module._build_mixing_functions) as build, \
+                mock.patch.object(capsule_module, "select_mixing_function",
+                                  wraps=capsule_module.select_mixing_function) as select:
+            for _ in range(5):
+                capsule, metadata = encapsulate_data(b"true data", b"false", self.key, self.salt)
+        self.assertEqual(build.call_count, 1)
+        self.assertEqual(select.call_count, 1)
+
+        self.assertEqual(extract_data_from_capsule(capsule, self.key, "true", metadata), b"true data")
+        self.assertEqual(extract_data_from_capsule(capsule, self.key, "false", metadata), b"false\x00\x00\x00\x00")
+
+        seed = b"s" * 32
+        self.assertIs(get_mixing_table(seed), get_mixing_table(seed))
+        self.assertEqual(len(create_mixing_functions(seed)), len(create_mixing_functions(seed, 16)))
+
+    def test_cache_is_bounded(self):
+        """キャッシュは上限を超えると古いテーブルから追い出される"""
+        first = get_mixing_table(b"\x00" * 32)
+        for i in range(1, MIXING_TABLE_CACHE_SIZE + 1):
+            get_mixing_table(i.to_bytes(32, byteorder='big'))
+        self.assertEqual(len(capsule_module._MIXING_TABLE_CACHE), MIXING_TABLE_CACHE_SIZE)
+        self.assertIsNot(get_mixing_table(b"\x00" * 32), first)
+
+    def test_batch_matches_individual(self):
+        """バッチAPIの結果が個別のカプセル化と一致する"""
+        pairs = [(os.urandom(n), os.urandom(m)) for n, m in [(10, 20), (0, 5), (33, 33), (100, 1)]]
+        results = encapsulate_data_batch(pairs, self.key, self.salt)
+
+        self.assertEqual(len(results), len(pairs))
+        for (true_data, false_data), result in zip(pairs, results):
+            self.assertEqual(result, encapsulate_data(true_data, false_data, self.key, self.salt))
+            capsule, metadata = result
+            self.assertEqual(extract_data_from_capsule(capsule, self.key, "true", metadata)[:len(true_data)],
+                             true_data)
+
+        # ソルト省略時はバッチ全体で1つのソルトを共有する
+        salts = {metadata["salt"] for _, metadata in encapsulate_data_batch(pairs, self.key)}
+        self.assertEqual(len(salts), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+暗号化コンテナ形式（V1/B2）とmmapリーダーのテスト
+"""
+
+import unittest
+import os
+import sys
+import json
+import tempfile
+import shutil
+
+# 親ディレクトリをインポートパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# モジュールインポート
+from ..container import (
+    build_header,
+    parse_header,
+    read_header,
+    open_container,
+    detect_format,
+    FORMAT_V1,
+    FORMAT_B2,
+    MAGIC_B2,
+    REGION_TRUE,
+    REGION_FALSE
+)
+from ..encrypt import encrypt_data, encrypt_file_streaming
+from ..improved_decrypt import read_encrypted_file as improved_read_encrypted_file
+from ..improved_decrypt import symmetric_decrypt, PATH_A, PATH_B
+from ..decrypt import decrypt_data, decrypt_container, parse_encrypted_data
+
+
+class TestContainerFormat(unittest.TestCase):
+    """コンテナヘッダーの組み立てと解析のテスト"""
+
+    def setUp(self):
+        """テスト用のメタデータ"""
+        self.metadata = {
+            "version": "1.0.0",
+            "salt": "AAECAwQFBgcICQoLDA0ODw==",
+            "data_length": 100,
+            "true_checksum": "01234567",
+            "false_checksum": "89abcdef",
+            "encryption_method": "simple_xor",
+            "stream_checkpoints": [{"interval": 4096, "states": ["x"]}, {"interval": 4096, "states": ["y"]}],
+        }
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """一時ファイルを削除"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_round_trip_both_formats(self):
+        """V1/B2のどちらでもメタデータと本体位置が復元される"""
+        body = os.urandom(200)
+        for format_version in (FORMAT_V1, FORMAT_B2):
+            header = build_header(self.metadata, len(body), format_version=format_version)
+            metadata, offset = parse_header(header + body)
+            self.assertEqual(metadata, self.metadata)
+            self.assertEqual(offset, len(header))
+            self.assertEqual(detect_format(header), format_version)
+
+    def test_b2_header_is_compact(self):
+        """B2のヘッダーはV1のインデント付きJSONより小さい"""
+        v1 = build_header(self.metadata, 200, format_version=FORMAT_V1)
+        b2 = build_header(self.metadata, 200, format_version=FORMAT_B2)
+        self.assertTrue(b2.startswith(MAGIC_B2))
+        self.assertLess(len(b2), len(v1))
+
+    def test_reserve_padding(self):
+        """予約サイズ分の空白パディングは解析に影響しない"""
+        for format_version in (FORMAT_V1, FORMAT_B2):
+            small = build_header(self.metadata, 200, format_version=format_version)
+            padded = build_header(self.metadata, 200, format_version=format_version, reserve=4096)
+            self.assertGreater(len(padded), len(small))
+            metadata, offset = parse_header(padded)
+            self.assertEqual(metadata, self.metadata)
+            self.assertEqual(offset, len(padded))
+
+    def test_unknown_method_and_long_salt(self):
+        """固定欄に収まらない値は拡張領域経由で復元される"""
+        metadata = dict(self.metadata, encryption_method="custom", salt="A" * 64)
+        header = build_header(metadata, 10, format_version=FORMAT_B2)
+        self.assertEqual(parse_header(header)[0], metadata)
+
+    def test_invalid_data(self):
+        """不正なデータはValueError"""
+        with self.assertRaises(ValueError):
+            parse_header(b"NOT_A_RABBIT_FILE___" + b"\x00" * 100)
+        header = build_header(self.metadata, 10, format_version=FORMAT_B2)
+        with self.assertRaises(ValueError):
+            parse_header(header[:30])
+
+    def test_mapped_container_regions(self):
+        """mmapリーダーは各領域をコピーなしのmemoryviewで返す"""
+        body = bytes(range(200))
+        for format_version in (FORMAT_V1, FORMAT_B2):
+            path = os.path.join(self.temp_dir, f"container_{format_version}.bin")
+            with open(path, 'wb') as f:
+                f.write(build_header(self.metadata, len(body), format_version=format_version))
+                f.write(body)
+
+            # ファイルから読むヘッダーも同じ
+            with open(path, 'rb') as f:
+                self.assertEqual(read_header(f), self.metadata)
+
+            with open_container(path) as container:
+                self.assertEqual(container.format_version, format_version)
+                self.assertEqual(container.metadata, self.metadata)
+                true_region = container.region(REGION_TRUE)
+                false_region = container.region(REGION_FALSE)
+                self.assertIsInstance(true_region, memoryview)
+                self.assertEqual(true_region.tobytes(), body[:100])
+                self.assertEqual(false_region.tobytes(), body[100:])
+                true_region.release()
+                false_region.release()
+
+    def test_missing_file(self):
+        """存在しないファイルはValueError"""
+        with self.assertRaises(ValueError):
+            open_container(os.path.join(self.temp_dir, "missing.bin"))
+
+
+class TestContainerCompatibility(unittest.TestCase):
+    """既存のV1ファイルとの互換性のテスト"""
+
+    def test_v1_container_still_decrypts(self):
+        """V1形式で組み立てたコンテナも復号できる"""
+        true_data = b"true data " * 30
+        false_data = b"false data " * 20
+        container_data, metadata = encrypt_data(true_data, false_data, "pw_a", "pw_b")
+        encrypted_body, _ = parse_encrypted_data(container_data)
+
+        v1_data = build_header(metadata, len(encrypted_body), format_version=FORMAT_V1) + encrypted_body
+        self.assertTrue(v1_data.startswith(b'RABBIT_ENCRYPTED_V1\n'))
+        self.assertEqual(json.loads(v1_data[24:24 + int.from_bytes(v1_data[20:24], 'big')]), metadata)
+
+        for password in ("pw_a", "pw_b"):
+            self.assertEqual(decrypt_data(v1_data, password), decrypt_data(container_data, password))
+            self.assertEqual(decrypt_data(v1_data, password), decrypt_container(encrypted_body, metadata, password))
+
+
+class TestImprovedDecryptCompatibility(unittest.TestCase):
+    """encrypt.py の出力を improved_decrypt で読み込めることのテスト"""
+
+    def setUp(self):
+        """テスト用の平文ファイルを作成"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.true_data = os.urandom(5003)
+        self.false_data = os.urandom(3001)
+        self.true_file = os.path.join(self.temp_dir, "true.dat")
+        self.false_file = os.path.join(self.temp_dir, "false.dat")
+        with open(self.true_file, "wb") as f:
+            f.write(self.true_data)
+        with open(self.false_file, "wb") as f:
+            f.write(self.false_data)
+
+    def tearDown(self):
+        """一時ファイルを削除"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_roundtrip_from_encrypt(self):
+        """B2形式で保存された暗号化ファイルを improved_decrypt で復号できる"""
+        encrypted_path = encrypt_file_streaming(
+            self.true_file, self.false_file, os.path.join(self.temp_dir, "encrypted.bin"),
+            "true_password", "false_password"
+        )
+        with open(encrypted_path, "rb") as f:
+            self.assertEqual(detect_format(f.read(64)), FORMAT_B2)
+
+        encrypted_data, metadata = improved_read_encrypted_file(encrypted_path)
+        length = metadata["data_length"]
+        self.assertEqual(len(encrypted_data), 2 * length)
+
+        for password, plain, path_type in [("true_password", self.true_data, PATH_A),
+                                           ("false_password", self.false_data, PATH_B)]:
+            decrypted, actual_type = symmetric_decrypt(encrypted_data, metadata, password)
+            self.assertEqual(actual_type, path_type)
+            self.assertEqual(decrypted, plain + b"\x00" * (length - len(plain)))
+
+    def test_reads_json_header(self):
+        """従来のJSONヘッダー（V1）も引き続き読み込める"""
+        data, _ = encrypt_data(self.true_data, self.false_data, "true_password", "false_password")
+        metadata, offset = parse_header(data)
+        path = os.path.join(self.temp_dir, "encrypted_v1.bin")
+        with open(path, "wb") as f:
+            f.write(build_header(metadata, len(data) - offset, format_version=FORMAT_V1) + data[offset:])
+
+        encrypted_data, read_metadata = improved_read_encrypted_file(path)
+        self.assertEqual(encrypted_data, data[offset:])
+        self.assertEqual(read_metadata["salt"], metadata["salt"])
+
+
+if __name__ == "__main__":
+    unittest.main()
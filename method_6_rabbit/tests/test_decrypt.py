@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ラビット復号のテスト（ストリーミング/範囲復号）
+"""
+
+import unittest
+import os
+import sys
+import base64
+import shutil
+import tempfile
+from unittest import mock
+
+# 親ディレクトリをインポートパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# モジュールインポート
+from ..rabbit_stream import RabbitStreamGenerator, derive_key, checkpoint_interval_for
+from ..config import STREAM_CHECKPOINT_INTERVAL, STREAM_MAX_CHECKPOINTS
+from ..container import MAX_METADATA_SIZE
+from .. import encrypt as encrypt_module
+from .. import decrypt as decrypt_module
+from ..encrypt import encrypt_data, encrypt_file_streaming
+from ..decrypt import (
+    decrypt_data,
+    decrypt_range,
+    decrypt_file_streaming,
+    read_encrypted_file,
+    decrypt_container
+)
+
+
+class TestStreamingContainer(unittest.TestCase):
+    """チャンク単位の暗号化/復号のテスト"""
+
+    def setUp(self):
+        """テスト用の平文ファイルを作成"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.true_data = os.urandom(50001)
+        self.false_data = os.urandom(20011)
+        self.true_file = os.path.join(self.temp_dir, "true.dat")
+        self.false_file = os.path.join(self.temp_dir, "false.dat")
+        with open(self.true_file, "wb") as f:
+            f.write(self.true_data)
+        with open(self.false_file, "wb") as f:
+            f.write(self.false_data)
+
+    def tearDown(self):
+        """一時ファイルを削除"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_streaming_roundtrip(self):
+        """ストリーミング暗号化の出力がメモリ上の復号と一致すること"""
+        encrypted_path = encrypt_file_streaming(
+            self.true_file, self.false_file,
+            os.path.join(self.temp_dir, "encrypted.bin"),
+            "true_password", "false_password",
+            chunk_size=4099  # ブロック境界にそろわないチャンク
+        )
+        encrypted_data, metadata = read_encrypted_file(encrypted_path)
+        self.assertEqual(len(encrypted_data), 2 * len(self.true_data))
+
+        for password in ["true_password", "false_password", "other_password"]:
+            output_path = decrypt_file_streaming(
+                encrypted_path, os.path.join(self.temp_dir, "decrypted.dat"),
+                password, chunk_size=1000
+            )
+            with open(output_path, "rb") as f:
+                streamed = f.read()
+            os.remove(output_path)
+
+            self.assertEqual(streamed, decrypt_container(encrypted_data, metadata, password))
+
+        # 各領域がそれぞれのパスワードの鍵ストリームで暗号化されていること（0パディング込み）
+        salt = base64.b64decode(metadata["salt"])
+        length = metadata["data_length"]
+        for index, (password, plain) in enumerate([("true_password", self.true_data),
+                                                   ("false_password", self.false_data)]):
+            key, iv, _ = derive_key(password, salt)
+            stream = RabbitStreamGenerator(key, iv).generate(length)
+            region = encrypted_data[index * length:(index + 1) * length]
+            expected = plain + b'\x00' * (length - len(plain))
+            self.assertEqual(bytes(a ^ b for a, b in zip(region, stream)), expected)
+
+    def test_decrypt_file_streams_simple_xor(self):
+        """decrypt_file はシンプルなXOR方式を暗号文全体を読み込まずにチャンク単位で復号すること"""
+        encrypt_module.encrypt_file(self.true_file, self.false_file,
+                                    os.path.join(self.temp_dir, "encrypted.bin"),
+                                    "true_password", encrypt_module.ENCRYPTION_METHOD_SIMPLE_XOR,
+                                    false_key="false_password")
+        encrypted_path = [path for path in os.listdir(self.temp_dir) if path.startswith("encrypted")][0]
+
+        # メモリ上の復号経路は使わない
+        with mock.patch.object(decrypt_module, "decrypt_container", side_effect=AssertionError), \
+                mock.patch.object(decrypt_module, "decrypt_file_streaming",
+                                  wraps=decrypt_module.decrypt_file_streaming) as streaming:
+            output_path = decrypt_module.decrypt_file(os.path.join(self.temp_dir, encrypted_path),
+                                                      os.path.join(self.temp_dir, "decrypted.dat"),
+                                                      "true_password")
+        streaming.assert_called_once()
+        with open(output_path, "rb") as f:
+            self.assertEqual(f.read(), self.true_data)
+
+        # CLIからもシンプルなXOR方式を選択できる
+        with mock.patch.object(sys, "argv", ["encrypt.py", "--method", "simple_xor"]):
+            self.assertEqual(encrypt_module.parse_arguments().method, encrypt_module.ENCRYPTION_METHOD_SIMPLE_XOR)
+
+    def test_regions_do_not_share_keystream(self):
+        """両領域が別の鍵ストリームで暗号化され、各パスワードで自分の平文が復号されること"""
+        encrypted_path = encrypt_file_streaming(
+            self.true_file, self.false_file,
+            os.path.join(self.temp_dir, "encrypted.bin"),
+            "true_password", "false_password"
+        )
+        encrypted_data, metadata = read_encrypted_file(encrypted_path)
+        length = metadata["data_length"]
+        true_plain = self.true_data
+        false_plain = self.false_data + b'\x00' * (length - len(self.false_data))
+
+        # 同じ鍵ストリームなら C_true XOR C_false が P_true XOR P_false に一致してしまう
+        cipher_xor = bytes(a ^ b for a, b in zip(encrypted_data[:length], encrypted_data[length:2 * length]))
+        plain_xor = bytes(a ^ b for a, b in zip(true_plain, false_plain))
+        self.assertNotEqual(cipher_xor, plain_xor)
+
+        # 各パスワードがそれぞれの領域を選択する
+        self.assertEqual(decrypt_container(encrypted_data, metadata, "true_password"), true_plain)
+        self.assertEqual(decrypt_container(encrypted_data, metadata, "false_password"), false_plain)
+
+        # 同じパスワードでの暗号化は拒否する
+        with self.assertRaises(ValueError):
+            encrypt_file_streaming(self.true_file, self.false_file,
+                                   os.path.join(self.temp_dir, "same.bin"),
+                                   "same_password", "same_password")
+        with self.assertRaises(ValueError):
+            encrypt_data(self.true_data, self.false_data, "same_password", "same_password")
+        with self.assertRaises(ValueError):
+            encrypt_module.encrypt_file(self.true_file, self.false_file,
+                                        os.path.join(self.temp_dir, "single.bin"),
+                                        "true_password", encrypt_module.ENCRYPTION_METHOD_SIMPLE_XOR)
+
+    def test_header_reserve_for_large_input(self):
+        """4GBを超える入力でもメタデータ領域がコンテナの上限に収まること"""
+        data_length = 5 * 1024 ** 3 + 7
+        metadata = {
+            "version": "1.0.0",
+            "salt": base64.b64encode(os.urandom(16)).decode('ascii'),
+            "data_length": data_length,
+            "encryption_method": "simple_xor",
+        }
+
+        interval = checkpoint_interval_for(data_length)
+        self.assertLessEqual(((data_length + 15) // 16) // interval + 1, STREAM_MAX_CHECKPOINTS)
+        reserved = encrypt_module._reserve_metadata_size(metadata, data_length, interval)
+        self.assertLess(reserved, MAX_METADATA_SIZE)
+
+        # 小さな入力では基本の間隔のまま
+        self.assertEqual(checkpoint_interval_for(len(self.true_data)), STREAM_CHECKPOINT_INTERVAL)
+
+        # 固定の間隔ではチェックポイントが入力サイズに比例して上限を超える
+        with self.assertRaises(ValueError):
+            encrypt_module._reserve_metadata_size(metadata, data_length, STREAM_CHECKPOINT_INTERVAL)
+
+    def test_range_decrypt(self):
+        """範囲復号の結果が全体復号の該当部分と一致すること"""
+        data, _ = encrypt_data(self.true_data, self.false_data, "true_password", "false_password")
+
+        for password in ["true_password", "false_password"]:
+            full = decrypt_data(data, password)
+            for offset, length in [(0, 10), (17, 1), (30000, 5000), (len(full) - 5, 100)]:
+                self.assertEqual(decrypt_range(data, password, offset, length),
+                                 full[offset:offset + length])
+
+
+# テスト実行
+if __name__ == "__main__":
+    unittest.main()
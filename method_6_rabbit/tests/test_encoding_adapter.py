@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+エンコーディング検出（サンプリング・キャッシュ）のテスト
+"""
+
+import unittest
+import os
+import sys
+from unittest import mock
+
+import chardet
+
+# 親ディレクトリをインポートパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# モジュールインポート
+from .. import encoding_adapter
+from ..encoding_adapter import (
+    detect_encoding,
+    detect_with_sampling,
+    sample_for_detection,
+    adaptive_decode,
+    clear_encoding_cache,
+    DETECTION_PREFIX_SIZE,
+    DETECTION_SAMPLE_COUNT,
+    DETECTION_SAMPLE_SIZE
+)
+
+
+class TestSamplingDetection(unittest.TestCase):
+    """サンプリング検出のテスト"""
+
+    def setUp(self):
+        clear_encoding_cache()
+
+    def test_small_data_uses_whole_buffer(self):
+        """小さいデータは全体が1つのサンプルになる"""
+        data = "テスト".encode('utf-8') * 100
+        self.assertEqual(sample_for_detection(data), [data])
+
+    def test_large_data_is_bounded(self):
+        """大きいデータのサンプル総量は上限で抑えられる"""
+        data = ("日本語のテキスト。" * 200000).encode('utf-8')
+        samples = sample_for_detection(data)
+        total = sum(len(sample) for sample in samples)
+        self.assertLessEqual(total, (DETECTION_PREFIX_SIZE + 3) + DETECTION_SAMPLE_COUNT * (DETECTION_SAMPLE_SIZE + 3))
+
+        # サンプルはUTF-8の文字境界で切り出される
+        for sample in samples:
+            sample.decode('utf-8')
+
+    def test_low_confidence_prefix_feeds_samples(self):
+        """先頭の信頼度が低い場合のみサンプルを追加で投入する"""
+        data = b"ascii prefix " * 10000 + ("後半だけ日本語です。" * 5000).encode('utf-8')
+        low = {'encoding': 'ascii', 'confidence': 0.5, 'language': ''}
+        with mock.patch.object(encoding_adapter.chardet, 'detect', return_value=low):
+            result = detect_with_sampling(data)
+        self.assertEqual(result['encoding'].lower(), 'utf-8')
+
+    def test_sampling_matches_full_detection(self):
+        """サンプリング検出の結果は全体検出と一致する"""
+        text = "これは日本語の文章です。エンコーディング検出のテストを行います。\n" * 5000
+        for encoding in ('shift_jis', 'euc-jp', 'utf-8'):
+            data = text.encode(encoding)
+            full = chardet.detect(data)['encoding']
+            sampled = detect_with_sampling(data)['encoding']
+            self.assertEqual(sampled.lower(), full.lower())
+
+
+class TestEncodingCache(unittest.TestCase):
+    """検出結果キャッシュとメタデータによる省略のテスト"""
+
+    def setUp(self):
+        clear_encoding_cache()
+
+    def test_cache_hit_skips_detection(self):
+        """同じ内容の2回目の検出は再計算しない"""
+        data = bytes(range(256)) * 4
+        with mock.patch.object(encoding_adapter, '_detect_encoding_uncached',
+                               wraps=encoding_adapter._detect_encoding_uncached) as uncached:
+            first = detect_encoding(data)
+            second = detect_encoding(bytes(data))
+        self.assertEqual(first, second)
+        self.assertEqual(uncached.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
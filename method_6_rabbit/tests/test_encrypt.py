@@ -9,13 +9,22 @@ import unittest
 import os
 import sys
 import binascii
+import json
+import base64
+import shutil
+import tempfile
+from unittest import mock
 
 # 親ディレクトリをインポートパスに追加
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # モジュールインポート
-from ..rabbit_stream import RabbitStreamGenerator, derive_key
+from ..rabbit_stream import RabbitStreamGenerator, SeekableRabbitStream, derive_key
 from ..config import RABBIT_KEY_SIZE, RABBIT_IV_SIZE
+from .. import encrypt as encrypt_module
+from ..encrypt import encrypt_file_streaming
+from ..decrypt import read_encrypted_file
+from ..job_journal import save_journal, checkpoint_log_path, default_journal_path
 
 
 class TestRabbitStream(unittest.TestCase):
@@ -89,6 +98,230 @@ class TestRabbitStream(unittest.TestCase):
         self.assertNotEqual(iv1, iv3)
 
 
+class TestSeekableRabbitStream(unittest.TestCase):
+    """シーク可能なラビットストリームのテスト"""
+
+    def setUp(self):
+        """テスト用の鍵ストリームを準備"""
+        self.key = os.urandom(RABBIT_KEY_SIZE)
+        self.iv = os.urandom(RABBIT_IV_SIZE)
+        self.length = 5000
+        self.expected = RabbitStreamGenerator(self.key, self.iv).generate(self.length)
+
+    def test_sequential_generation(self):
+        """逐次生成の出力が通常の生成器と一致すること"""
+        stream = SeekableRabbitStream(self.key, self.iv, checkpoint_interval=8)
+        output = stream.generate(1000) + stream.generate(7) + stream.generate(self.length - 1007)
+        self.assertEqual(output, self.expected)
+        self.assertEqual(stream.tell(), self.length)
+
+    def test_read_at_with_persisted_checkpoints(self):
+        """保存したチェックポイントから任意範囲を再生成できること"""
+        stream = SeekableRabbitStream(self.key, self.iv, checkpoint_interval=8)
+        stream.generate(self.length)
+        checkpoints = stream.export_checkpoints()
+        self.assertEqual(len(checkpoints["states"]), self.length // (16 * 8) + 1)
+
+        restored = SeekableRabbitStream.from_checkpoints(self.key, self.iv, checkpoints)
+        for offset, length in [(0, 16), (3000, 100), (17, 1), (1023, 900), (128, 128)]:
+            self.assertEqual(restored.read_at(offset, length), self.expected[offset:offset + length])
+
+        restored.seek(4000)
+        self.assertEqual(restored.read(10), self.expected[4000:4010])
+        self.assertEqual(restored.tell(), 4010)
+
+    def test_checkpoints_bound_to_key(self):
+        """異なる鍵ではチェックポイントを読み込めないこと"""
+        stream = SeekableRabbitStream(self.key, self.iv, checkpoint_interval=8)
+        stream.generate(self.length)
+        checkpoints = stream.export_checkpoints()
+
+        with self.assertRaises(ValueError):
+            SeekableRabbitStream.from_checkpoints(os.urandom(RABBIT_KEY_SIZE), self.iv, checkpoints)
+
+    def test_generator_state_export_import(self):
+        """生成器の内部状態を保存・復元して続きを生成できること"""
+        generator = RabbitStreamGenerator(self.key, self.iv)
+        generator.generate(160)
+        state = generator.export_state()
+
+        self.assertEqual(RabbitStreamGenerator.from_state(state).generate(320), self.expected[160:480])
+
+        other = RabbitStreamGenerator(os.urandom(RABBIT_KEY_SIZE))
+        other.import_state(state)
+        self.assertEqual(other.generate(16), self.expected[160:176])
+
+        with self.assertRaises(ValueError):
+            RabbitStreamGenerator.from_state(state[:-1])
+
+    def test_resume_from_exported_state(self):
+        """保存した状態から読み出し位置とチェックポイントを含めて再開できること"""
+        for cut in [0, 1024, 1500, 4096]:
+            stream = SeekableRabbitStream(self.key, self.iv, checkpoint_interval=8)
+            stream.read(cut)
+            state = stream.export_state()
+
+            resumed = SeekableRabbitStream.from_state(self.key, self.iv, state)
+            self.assertEqual(resumed.tell(), cut)
+            self.assertEqual(resumed.read(self.length - cut), self.expected[cut:])
+            self.assertEqual(resumed.read_at(100, 50), self.expected[100:150])
+
+            # 再開後に記録したチェックポイントも中断なしの場合と一致する
+            uninterrupted = SeekableRabbitStream(self.key, self.iv, checkpoint_interval=8)
+            uninterrupted.generate(self.length)
+            self.assertEqual(resumed.export_checkpoints(), uninterrupted.export_checkpoints())
+
+        with self.assertRaises(ValueError):
+            SeekableRabbitStream.from_state(os.urandom(RABBIT_KEY_SIZE), self.iv, state)
+
+
+class TestEncryptJournal(unittest.TestCase):
+    """暗号化ジョブのジャーナルによる再開のテスト"""
+
+    def setUp(self):
+        """テスト用の平文ファイルを作成"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.true_data = os.urandom(50001)
+        self.false_data = os.urandom(20011)
+        self.true_file = os.path.join(self.temp_dir, "true.dat")
+        self.false_file = os.path.join(self.temp_dir, "false.dat")
+        with open(self.true_file, "wb") as f:
+            f.write(self.true_data)
+        with open(self.false_file, "wb") as f:
+            f.write(self.false_data)
+
+    def tearDown(self):
+        """一時ファイルを削除"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_resume_interrupted_encryption(self):
+        """中断した暗号化ジョブがジャーナルから再開され、中断なしと同じ結果になること"""
+        output_file = os.path.join(self.temp_dir, "resumed.bin")
+        journal_path = os.path.join(self.temp_dir, "resumed.journal")
+        saved = []
+
+        def interrupting_save(path, journal):
+            save_journal(path, journal)
+            saved.append(journal["region"])
+            # 後半領域の途中で中断
+            if journal["region"] == 1 and journal["offset"] > 0:
+                raise KeyboardInterrupt()
+
+        with mock.patch.object(encrypt_module, "ENCRYPT_JOURNAL_INTERVAL", 8192), \
+                mock.patch.object(encrypt_module, "save_journal", side_effect=interrupting_save):
+            with self.assertRaises(KeyboardInterrupt):
+                encrypt_file_streaming(self.true_file, self.false_file, output_file,
+                                       "true_password", "false_password",
+                                       chunk_size=4099, journal_path=journal_path)
+        self.assertIn(0, saved)
+        self.assertTrue(os.path.exists(journal_path))
+
+        # 異なるパスワードでは再開できない
+        with self.assertRaises(ValueError):
+            encrypt_file_streaming(self.true_file, self.false_file, output_file,
+                                   "wrong_password", "false_password",
+                                   chunk_size=4099, journal_path=journal_path)
+
+        with mock.patch.object(encrypt_module, "_encrypt_region_streaming",
+                               wraps=encrypt_module._encrypt_region_streaming) as region_call:
+            encrypted_path = encrypt_file_streaming(self.true_file, self.false_file, output_file,
+                                                    "true_password", "false_password",
+                                                    chunk_size=4099, journal_path=journal_path)
+        # 前半領域は再暗号化されず、後半領域は途中から再開される
+        self.assertEqual(region_call.call_count, 1)
+        self.assertGreater(region_call.call_args.kwargs["start"], 0)
+        self.assertFalse(os.path.exists(journal_path))
+
+        # 暗号文・チェックサム・チェックポイントが中断なしの暗号化と一致する
+        _, metadata = read_encrypted_file(encrypted_path)
+        with mock.patch.object(encrypt_module.os, "urandom", return_value=base64.b64decode(metadata["salt"])):
+            reference_path = encrypt_file_streaming(self.true_file, self.false_file,
+                                                    os.path.join(self.temp_dir, "reference.bin"),
+                                                    "true_password", "false_password", chunk_size=4099)
+        with open(reference_path, "rb") as f, open(encrypted_path, "rb") as g:
+            self.assertEqual(f.read(), g.read())
+
+    def test_journal_appends_checkpoints(self):
+        """ジャーナルはチェックポイントを書き直さず、ログに新しい分だけを追記すること"""
+        output_file = os.path.join(self.temp_dir, "logged.bin")
+        journal_path = os.path.join(self.temp_dir, "logged.journal")
+        log_path = checkpoint_log_path(journal_path)
+        saved = []
+
+        def interrupting_save(path, journal):
+            # ログへの追記後、ジャーナル更新前に中断（未確定の追記がログに残る）
+            if journal["region"] == 1 and journal["offset"] > 0:
+                raise KeyboardInterrupt()
+            save_journal(path, journal)
+            saved.append(journal)
+
+        with mock.patch.object(encrypt_module, "checkpoint_interval_for", return_value=16), \
+                mock.patch.object(encrypt_module, "ENCRYPT_JOURNAL_INTERVAL", 8192):
+            with mock.patch.object(encrypt_module, "save_journal", side_effect=interrupting_save):
+                with self.assertRaises(KeyboardInterrupt):
+                    encrypt_file_streaming(self.true_file, self.false_file, output_file,
+                                           "true_password", "false_password",
+                                           chunk_size=4099, journal_path=journal_path)
+
+            # ジャーナル本体にはチェックポイントを含めない
+            for journal in saved:
+                for stream in journal["streams"]:
+                    self.assertNotIn("checkpoints", stream)
+                    self.assertEqual(stream["interval"], 16)
+
+            # 各チェックポイントはログに一度だけ書かれる
+            with open(log_path, "rb") as f:
+                records = [json.loads(line) for line in f.read().splitlines()]
+            keys = [(record["stream"], record["index"]) for record in records]
+            self.assertEqual(len(keys), len(set(keys)))
+            self.assertGreater(os.path.getsize(log_path), saved[-1]["checkpoint_log_size"])
+
+            encrypted_path = encrypt_file_streaming(self.true_file, self.false_file, output_file,
+                                                    "true_password", "false_password",
+                                                    chunk_size=4099, journal_path=journal_path)
+            self.assertFalse(os.path.exists(log_path))
+
+            _, metadata = read_encrypted_file(encrypted_path)
+            with mock.patch.object(encrypt_module.os, "urandom", return_value=base64.b64decode(metadata["salt"])):
+                reference_path = encrypt_file_streaming(self.true_file, self.false_file,
+                                                        os.path.join(self.temp_dir, "reference.bin"),
+                                                        "true_password", "false_password", chunk_size=4099)
+        with open(reference_path, "rb") as f, open(encrypted_path, "rb") as g:
+            self.assertEqual(f.read(), g.read())
+
+    def test_cli_journal_resume(self):
+        """CLIの --journal で既定のジャーナルパスに記録し、再実行で再開できること"""
+        output_file = os.path.join(self.temp_dir, "cli.bin")
+        journal_path = default_journal_path(output_file)
+        argv = ["encrypt.py", "-t", self.true_file, "-f", self.false_file, "-o", output_file,
+                "--method", "simple_xor", "--true-password", "true_password",
+                "--false-password", "false_password", "--journal"]
+
+        def interrupting_save(path, journal):
+            save_journal(path, journal)
+            # 既定のチャンクサイズでは前半領域の完了時に中断
+            if journal["region"] == 1:
+                raise KeyboardInterrupt()
+
+        with mock.patch.object(sys, "argv", argv), \
+                mock.patch.object(encrypt_module, "ENCRYPT_JOURNAL_INTERVAL", 8192):
+            with mock.patch.object(encrypt_module, "save_journal", side_effect=interrupting_save):
+                with self.assertRaises(KeyboardInterrupt):
+                    encrypt_module.main()
+            self.assertTrue(os.path.exists(journal_path))
+
+            with mock.patch.object(encrypt_module, "_encrypt_region_streaming",
+                                   wraps=encrypt_module._encrypt_region_streaming) as region_call:
+                encrypt_module.main()
+            self.assertEqual(region_call.call_count, 1)
+            self.assertFalse(os.path.exists(journal_path))
+
+        # パスワードを指定しない場合は再開できないため拒否する
+        with mock.patch.object(sys, "argv", argv[:9] + ["--journal"]):
+            with self.assertRaises(ValueError):
+                encrypt_module.main()
+
+
 # テスト実行
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+鍵導出キャッシュのテスト
+"""
+
+import unittest
+import os
+import sys
+import time
+import hashlib
+from unittest import mock
+
+# 親ディレクトリをインポートパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# モジュールインポート
+from .. import kdf_cache
+from ..kdf_cache import KeyDerivationCache, get_kdf_cache
+from ..rabbit_stream import derive_key
+from ..stream_selector import derive_multiple_keys
+from ..config import KEY_DERIVATION_ITERATIONS
+
+
+class TestKeyDerivationCache(unittest.TestCase):
+    """KeyDerivationCacheのテスト"""
+
+    def _counting_derive(self, value: bytes):
+        """呼び出し回数を数える導出関数を生成"""
+        calls = []
+
+        def derive():
+            calls.append(1)
+            return value
+
+        return derive, calls
+
+    def test_hit_and_miss(self):
+        """同じ入力は再導出されずキャッシュから返される"""
+        cache = KeyDerivationCache(max_entries=4, ttl=60)
+        derive, calls = self._counting_derive(b"derived")
+
+        self.assertEqual(cache.get_or_derive("pbkdf2", b"pw", b"salt", (1,), derive), b"derived")
+        self.assertEqual(cache.get_or_derive("pbkdf2", b"pw", b"salt", (1,), derive), b"derived")
+        self.assertEqual(len(calls), 1)
+
+        # パラメータ・ソルト・方式が異なれば別エントリ
+        cache.get_or_derive("pbkdf2", b"pw", b"salt", (2,), derive)
+        cache.get_or_derive("pbkdf2", b"pw", b"salt2", (1,), derive)
+        cache.get_or_derive("hkdf", b"pw", b"salt", (1,), derive)
+        self.assertEqual(len(calls), 4)
+
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 4)
+        self.assertAlmostEqual(stats["hit_rate"], 0.2)
+
+    def test_lru_eviction_wipes_value(self):
+        """上限を超えると最も古く使われたエントリが消去される"""
+        cache = KeyDerivationCache(max_entries=2, ttl=60)
+        cache.get_or_derive("pbkdf2", b"a", b"s", (), lambda: b"AAAA")
+        cache.get_or_derive("pbkdf2", b"b", b"s", (), lambda: b"BBBB")
+        first_value = next(iter(cache._entries.values()))[1]
+
+        # a を参照して最近使用にしてから c を追加すると b が追い出される
+        cache.get_or_derive("pbkdf2", b"a", b"s", (), lambda: b"XXXX")
+        second_value = list(cache._entries.values())[0][1]
+        cache.get_or_derive("pbkdf2", b"c", b"s", (), lambda: b"CCCC")
+
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.stats()["size"], 2)
+        self.assertEqual(bytes(second_value), b"\x00" * 4)
+        self.assertEqual(bytes(first_value), b"AAAA")
+        self.assertEqual(cache.get_or_derive("pbkdf2", b"a", b"s", (), lambda: b"XXXX"), b"AAAA")
+
+    def test_ttl_expiration(self):
+        """有効期間を過ぎたエントリは再導出される"""
+        cache = KeyDerivationCache(max_entries=4, ttl=0.05)
+        derive, calls = self._counting_derive(b"derived")
+        cache.get_or_derive("pbkdf2", b"pw", b"salt", (), derive)
+        time.sleep(0.1)
+        cache.get_or_derive("pbkdf2", b"pw", b"salt", (), derive)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_ttl_expiration_after_hit(self):
+        """参照されたエントリも登録から有効期間を過ぎれば再導出される"""
+        clock = [100.0]
+        cache = KeyDerivationCache(max_entries=4, ttl=10)
+        derive, calls = self._counting_derive(b"derived")
+
+        with mock.patch.object(kdf_cache.time, "monotonic", side_effect=lambda: clock[0]):
+            cache.get_or_derive("pbkdf2", b"pw", b"salt", (), derive)
+            stale_value = cache._entries[next(iter(cache._entries))][1]
+
+            # 有効期間内の参照で LRU の末尾に移動し、後から登録したエントリより後ろに並ぶ
+            clock[0] = 106.0
+            cache.get_or_derive("pbkdf2", b"other", b"salt", (), lambda: b"other")
+            cache.get_or_derive("pbkdf2", b"pw", b"salt", (), derive)
+            self.assertEqual(len(calls), 1)
+
+            clock[0] = 111.0
+            cache.get_or_derive("pbkdf2", b"pw", b"salt", (), derive)
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(cache.stats()["expirations"], 1)
+        self.assertEqual(bytes(stale_value), b"\x00" * 7)
+
+    def test_disabled(self):
+        """無効時は常に導出関数を呼び出す"""
+        cache = KeyDerivationCache(enabled=False)
+        derive, calls = self._counting_derive(b"derived")
+        cache.get_or_derive("pbkdf2", b"pw", b"salt", (), derive)
+        cache.get_or_derive("pbkdf2", b"pw", b"salt", (), derive)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_clear(self):
+        """clear で全エントリが消去される"""
+        cache = KeyDerivationCache(max_entries=4, ttl=60)
+        cache.get_or_derive("pbkdf2", b"pw", b"salt", (), lambda: b"secret")
+        value = next(iter(cache._entries.values()))[1]
+        cache.clear()
+        self.assertEqual(cache.stats()["size"], 0)
+        self.assertEqual(bytes(value), b"\x00" * 6)
+
+
+class TestCachedDerivations(unittest.TestCase):
+    """キャッシュを経由する鍵導出関数のテスト"""
+
+    def test_derive_key_matches_pbkdf2(self):
+        """derive_key の結果はキャッシュの有無によらず同一"""
+        salt = os.urandom(16)
+        expected = hashlib.pbkdf2_hmac('sha256', b"password", salt, KEY_DERIVATION_ITERATIONS, dklen=32)
+
+        cache = get_kdf_cache()
+        before = cache.stats()["hits"]
+        first = derive_key("password", salt)
+        second = derive_key("password", salt)
+
+        self.assertEqual(first, second)
+        self.assertEqual(first[0] + first[1], expected[:24])
+        self.assertGreater(cache.stats()["hits"], before)
+
+    def test_derive_multiple_keys_cached(self):
+        """ソルト指定時の derive_multiple_keys はキャッシュされ結果も一致"""
+        master_key = os.urandom(32)
+        salt = os.urandom(16)
+
+        cache = get_kdf_cache()
+        first, _ = derive_multiple_keys(master_key, salt)
+        before = cache.stats()["hits"]
+        second, _ = derive_multiple_keys(master_key, salt)
+
+        self.assertEqual(first, second)
+        self.assertEqual(cache.stats()["hits"], before + 1)
+        self.assertNotEqual(first["true"], first["false"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+多重経路復号（並列モード）のテスト
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+from unittest import mock
+
+# 親ディレクトリをインポートパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# モジュールインポート
+from .. import encrypt as encrypt_module
+from ..encrypt import create_encrypted_container_classic
+from ..container import build_header
+from ..stream_selector import StreamSelector, KEY_TYPE_TRUE, KEY_TYPE_FALSE
+from ..multipath_decrypt import MultiPathDecryptor, read_encrypted_file, read_encrypted_header
+
+
+class TestParallelMultiPathDecrypt(unittest.TestCase):
+    """並列多重経路復号のテスト"""
+
+    def setUp(self):
+        """テスト用の暗号化ファイルを作成"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.true_data = b"true content " * 200
+        self.false_data = b"false content " * 150
+
+        # 多重経路復号はパスワードの鍵種別で領域を選ぶため、ソルトを固定して
+        # 種別が正規/非正規になるパスワードで従来方式のコンテナを作成する
+        salt = os.urandom(16)
+        selector = StreamSelector(salt)
+        candidates = [f"password_{i}" for i in range(64)]
+        true_password = next(p for p in candidates
+                             if selector.determine_key_type_for_decryption(p) == KEY_TYPE_TRUE)
+        false_password = next(p for p in candidates
+                              if selector.determine_key_type_for_decryption(p) == KEY_TYPE_FALSE)
+
+        with mock.patch.object(encrypt_module, "StreamSelector",
+                               side_effect=lambda master_salt=None: StreamSelector(master_salt or salt)):
+            encrypted_data, metadata = create_encrypted_container_classic(
+                self.true_data, self.false_data, os.urandom(16), true_password, false_password
+            )
+
+        self.encrypted_file = os.path.join(self.temp_dir, "encrypted.bin")
+        with open(self.encrypted_file, 'wb') as f:
+            f.write(build_header(metadata, len(encrypted_data)) + encrypted_data)
+        self.keys = [true_password, false_password, "other_key", "another_key"]
+
+    def tearDown(self):
+        """一時ファイルを削除"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _run(self, prefix: str, **kwargs):
+        """指定モードで全鍵を復号し、結果と出力内容を返す"""
+        pairs = [(key, os.path.join(self.temp_dir, f"{prefix}_{i}.text")) for i, key in enumerate(self.keys)]
+        decryptor = MultiPathDecryptor(use_encoding_adapter=False, reference_data={})
+        results = decryptor.decrypt_file_with_multiple_keys(self.encrypted_file, pairs, **kwargs)
+
+        contents = []
+        for _, output_path, success, _, _ in results:
+            self.assertTrue(success)
+            with open(output_path, 'rb') as f:
+                contents.append(f.read())
+        return decryptor, results, contents
+
+    def test_header_offset(self):
+        """ヘッダーのみの読み込みで本体の開始位置が得られる"""
+        encrypted_data, metadata = read_encrypted_file(self.encrypted_file)
+        header_metadata, offset = read_encrypted_header(self.encrypted_file)
+        self.assertEqual(metadata, header_metadata)
+        self.assertEqual(os.path.getsize(self.encrypted_file) - offset, len(encrypted_data))
+
+    def test_parallel_matches_serial(self):
+        """並列モードの結果は入力順で直列モードと一致する"""
+        serial, serial_results, serial_contents = self._run("serial")
+        parallel, parallel_results, parallel_contents = self._run("parallel", parallel=True, max_workers=2)
+
+        # 正規・非正規のパスワードでそれぞれの平文が復元される（非正規側は乱数パディング付き）
+        for contents, results in ((serial_contents, serial_results), (parallel_contents, parallel_results)):
+            self.assertEqual(contents[0], self.true_data)
+            self.assertEqual(contents[1][:len(self.false_data)], self.false_data)
+            self.assertEqual([r[3] for r in results[:2]], ["true", "false"])
+
+        self.assertEqual([r[0] for r in parallel_results], self.keys)
+        self.assertEqual([r[3] for r in parallel_results], [r[3] for r in serial_results])
+        self.assertEqual(parallel_contents, serial_contents)
+
+        # 鍵ごとの処理時間が入力順に記録される
+        self.assertEqual(len(serial.key_timings), len(self.keys))
+        self.assertEqual(len(parallel.key_timings), len(self.keys))
+        self.assertTrue(all(t > 0 for t in parallel.key_timings))
+
+    def test_parallel_missing_file(self):
+        """入力ファイルがない場合は全鍵が失敗として返される"""
+        pairs = [(key, os.path.join(self.temp_dir, f"missing_{i}.text")) for i, key in enumerate(self.keys)]
+        decryptor = MultiPathDecryptor(use_encoding_adapter=False, reference_data={})
+        results = decryptor.decrypt_file_with_multiple_keys(
+            os.path.join(self.temp_dir, "missing.bin"), pairs, parallel=True
+        )
+        self.assertEqual([r[2] for r in results], [False] * len(self.keys))
+        self.assertEqual(decryptor.key_timings, [0.0] * len(self.keys))
+
+
+if __name__ == "__main__":
+    unittest.main()
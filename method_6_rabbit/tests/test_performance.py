@@ -304,7 +304,7 @@ class TestPerformance(unittest.TestCase):
             true_data=true_data,
             false_data=false_data,
             true_password=self.test_key,
-            false_password=self.test_key
+            false_password=f"{self.test_key}_false"
         )
 
         # 復号
@@ -364,7 +364,7 @@ class TestPerformance(unittest.TestCase):
                 true_data=true_data,
                 false_data=false_data,
                 true_password=f"{self.test_key}_{i}",
-                false_password=f"{self.test_key}_{i}"
+                false_password=f"{self.test_key}_{i}_false"
             )
 
             # 計測終了
@@ -385,7 +385,7 @@ class TestPerformance(unittest.TestCase):
             true_data=true_data,
             false_data=false_data,
             true_password=self.test_key,
-            false_password=self.test_key
+            false_password=f"{self.test_key}_false"
         )
 
         for i in range(iterations):
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+マルチレーンストリーム生成エンジンのテスト
+"""
+
+import unittest
+import os
+import sys
+
+# 親ディレクトリをインポートパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# モジュールインポート
+from ..rabbit_stream import RabbitStreamGenerator
+from ..rabbit_vector import RabbitLaneGenerator, generate_keystreams
+from ..config import RABBIT_KEY_SIZE, RABBIT_IV_SIZE
+
+
+class TestRabbitVector(unittest.TestCase):
+    """マルチレーン生成器とスカラー生成器の一致テスト"""
+
+    def setUp(self):
+        """テスト用の(鍵, IV)ペアを準備"""
+        self.pairs = [(os.urandom(RABBIT_KEY_SIZE), os.urandom(RABBIT_IV_SIZE)) for _ in range(4)]
+        # IVなしのレーンも含める
+        self.pairs.append((os.urandom(RABBIT_KEY_SIZE), None))
+
+    def test_matches_scalar_generator(self):
+        """各レーンの出力がスカラー実装とバイト単位で一致すること"""
+        for length in [0, 1, 15, 16, 17, 1000, 4096 * 16 + 5]:
+            streams = generate_keystreams(self.pairs, length)
+            self.assertEqual(len(streams), len(self.pairs))
+            for (key, iv), stream in zip(self.pairs, streams):
+                self.assertEqual(stream, RabbitStreamGenerator(key, iv).generate(length))
+
+    def test_zero_key_known_answer(self):
+        """
+        ゼロ鍵・ゼロIVの出力が記録済みの既知の値と一致すること
+
+        スカラー実装の出力はRFC 4503のテストベクトルと一致せず、既存の暗号化ファイルは
+        その出力で暗号化されているため、スカラー実装の出力を固定値として記録し、
+        両実装がその値から変化しないことを確認します。
+        """
+        key = bytes(RABBIT_KEY_SIZE)
+        iv = bytes(RABBIT_IV_SIZE)
+        expected = bytes.fromhex(
+            "bda80930112325bd5f4b9ad398845a06"
+            "fef9281a75277d871dcb0334a1fef872"
+            "b006397cf0e080d32a1347afeb3697a3"
+        )
+        self.assertEqual(generate_keystreams([(key, iv)], 48)[0], expected)
+        self.assertEqual(RabbitStreamGenerator(key, iv).generate(48), expected)
+
+    def test_continue_from_generators(self):
+        """既存生成器の途中状態から出力を継続できること"""
+        generators = [RabbitStreamGenerator(key, iv) for key, iv in self.pairs]
+        for generator in generators:
+            generator.generate(48)
+
+        lanes = RabbitLaneGenerator.from_generators(generators)
+        streams = lanes.generate(100)
+
+        for generator, stream in zip(generators, streams):
+            self.assertEqual(stream, generator.generate(100))
+
+    def test_empty_input(self):
+        """空の入力の扱い"""
+        self.assertEqual(generate_keystreams([], 16), [])
+        with self.assertRaises(ValueError):
+            RabbitLaneGenerator([])
+
+
+# テスト実行
+if __name__ == "__main__":
+    unittest.main()
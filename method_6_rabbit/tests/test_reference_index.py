@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+リファレンスファイル索引のテスト
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+from unittest import mock
+
+# 親ディレクトリをインポートパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# モジュールインポート
+from .. import reference_index
+from ..reference_index import (
+    ReferenceFingerprintIndex,
+    build_sketch,
+    estimate_similarity,
+    matches_reference_prefix,
+    INDEX_FILE_NAME,
+    SAMPLE_PREFIX_SIZE,
+    SAMPLE_WINDOW_SIZE,
+    SAMPLE_WINDOW_COUNT,
+    HIGH_SIMILARITY_THRESHOLD
+)
+from ..multipath_decrypt import MultiPathDecryptor
+
+
+class TestReferenceIndex(unittest.TestCase):
+    """ReferenceFingerprintIndexのテスト"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.true_text = ("これは正規のファイルです。重要な情報が含まれています。" * 8).encode('utf-8')
+        self.false_text = ("This is a decoy file with entirely different contents. " * 8).encode('utf-8')
+        self.reference_files = {
+            'true': os.path.join(self.temp_dir, 'true.text'),
+            'false': os.path.join(self.temp_dir, 'false.text')
+        }
+        for category, text in (('true', self.true_text), ('false', self.false_text)):
+            with open(self.reference_files[category], 'wb') as f:
+                f.write(text)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_similarity_estimates(self):
+        """同一・部分一致・無関係データの類似度"""
+        sketch = build_sketch(self.true_text)
+        self.assertEqual(estimate_similarity(sketch, build_sketch(self.true_text)), 1.0)
+        self.assertGreater(estimate_similarity(sketch, build_sketch(self.true_text[:-20] + b'X' * 20)), 0.6)
+        self.assertLess(estimate_similarity(sketch, build_sketch(self.false_text)), 0.1)
+        self.assertEqual(estimate_similarity(sketch, build_sketch(b'')), 0.0)
+
+    def test_index_persisted_and_reused(self):
+        """索引が永続化され、再読み込み時には再構築されない"""
+        index = ReferenceFingerprintIndex(self.reference_files)
+        similarities = index.similarities(self.true_text)
+        self.assertEqual(index.rebuild_count, 2)
+        self.assertEqual(similarities['true'], 1.0)
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, INDEX_FILE_NAME)))
+
+        reloaded = ReferenceFingerprintIndex(self.reference_files)
+        self.assertEqual(reloaded.similarities(self.false_text)['false'], 1.0)
+        self.assertEqual(reloaded.rebuild_count, 0)
+        self.assertEqual(reloaded.size_of('true'), len(self.true_text))
+        self.assertEqual(reloaded.head_of('true'), self.true_text[:200])
+
+    def test_rebuild_on_change(self):
+        """リファレンスファイルの変更時のみ該当エントリを再構築"""
+        index = ReferenceFingerprintIndex(self.reference_files)
+        index.refresh()
+        index.refresh()
+        self.assertEqual(index.rebuild_count, 2)
+
+        with open(self.reference_files['true'], 'wb') as f:
+            f.write(self.false_text + b'!')
+        index.refresh()
+        self.assertEqual(index.rebuild_count, 3)
+        self.assertGreater(index.similarities(self.false_text)['true'], 0.9)
+
+    def test_unwritable_index_path(self):
+        """索引を保存できない場合もメモリ上で動作する"""
+        index_path = os.path.join(self.temp_dir, 'missing', INDEX_FILE_NAME)
+        index = ReferenceFingerprintIndex(self.reference_files, index_path=index_path)
+        self.assertEqual(index.similarities(self.true_text)['true'], 1.0)
+        self.assertFalse(os.path.exists(index_path))
+
+    def test_decryptor_compare_with_references(self):
+        """MultiPathDecryptorでのリファレンス比較"""
+        decryptor = MultiPathDecryptor(reference_data={'true': self.true_text, 'false': self.false_text})
+
+        is_match, category, similarity = decryptor._compare_with_references(self.true_text)
+        self.assertTrue(is_match)
+        self.assertEqual(category, 'true')
+        self.assertEqual(similarity, 1.0)
+
+        is_match, category, _ = decryptor._compare_with_references(self.false_text)
+        self.assertTrue(is_match)
+        self.assertEqual(category, 'false')
+
+        is_match, _, _ = decryptor._compare_with_references(os.urandom(len(self.true_text)))
+        self.assertFalse(is_match)
+
+
+    def test_comparison_cost_independent_of_size(self):
+        """リファレンス比較でハッシュするバイト数がデータサイズに依存しない"""
+        bound = SAMPLE_PREFIX_SIZE + SAMPLE_WINDOW_COUNT * SAMPLE_WINDOW_SIZE
+        hashed_sizes = []
+        for size in (40 * 1024 * 1024, 160 * 1024 * 1024):
+            reference = self.true_text + bytes(size - len(self.true_text))
+            decryptor = MultiPathDecryptor(reference_data={'true': reference})
+            with mock.patch.object(reference_index, 'shingle_hashes',
+                                   wraps=reference_index.shingle_hashes) as hashes:
+                is_match, _, _ = decryptor._compare_with_references(reference + bytes(1024))
+            self.assertTrue(is_match)
+            hashed_sizes.append(sum(len(call.args[0]) for call in hashes.call_args_list))
+        self.assertEqual(hashed_sizes[0], hashed_sizes[1])
+        self.assertLessEqual(hashed_sizes[0], 2 * bound)
+
+    def test_sampled_sketch_tolerates_padding(self):
+        """大きなデータでも末尾のパディングだけが異なれば一致し、置換は先頭一致時のみ"""
+        data = os.urandom(3 * 1024 * 1024)
+        padded = data + os.urandom(1024)
+        self.assertGreater(estimate_similarity(build_sketch(data), build_sketch(padded)), HIGH_SIMILARITY_THRESHOLD)
+        self.assertTrue(matches_reference_prefix(padded, data))
+
+        altered = bytearray(padded)
+        altered[10] ^= 0xFF
+        self.assertFalse(matches_reference_prefix(bytes(altered), data))
+        self.assertFalse(matches_reference_prefix(data[:-1], data))
+        self.assertFalse(matches_reference_prefix(data, b''))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ストリーム選択機構（遅延ストリームハンドル）のテスト
+"""
+
+import unittest
+import os
+import sys
+
+# 親ディレクトリをインポートパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# モジュールインポート
+from ..stream_selector import (
+    StreamSelector,
+    LazyStreamHandle,
+    derive_multiple_keys,
+    KEY_TYPE_TRUE,
+    KEY_TYPE_FALSE
+)
+from ..rabbit_stream import RabbitStreamGenerator
+
+
+class TestLazyStreamHandle(unittest.TestCase):
+    """LazyStreamHandleとStreamSelectorのハンドルAPIのテスト"""
+
+    def setUp(self):
+        self.salt = bytes(range(16))
+        self.master_key = b"lazy_stream_master_key"
+        self.length = 5000
+
+    def test_handle_matches_generator(self):
+        """ハンドルの出力が一括生成と一致する"""
+        keys, _ = derive_multiple_keys(self.master_key, self.salt)
+        key, iv = keys[KEY_TYPE_TRUE]
+        expected = RabbitStreamGenerator(key, iv).generate(self.length)
+
+        handle = LazyStreamHandle(key, iv, self.length)
+        self.assertFalse(handle.materialized)
+        self.assertEqual(handle.read_at(1234, 100), expected[1234:1334])
+        self.assertTrue(handle.materialized)
+        self.assertEqual(handle.tobytes(), expected)
+        self.assertEqual(len(handle), self.length)
+
+        # 論理長を超える読み出しは切り詰められる
+        self.assertEqual(handle.read_at(self.length - 10, 100), expected[-10:])
+        self.assertEqual(handle.read(self.length + 10), expected)
+        self.assertEqual(handle.read(10), b'')
+
+    def test_only_consumed_path_is_generated(self):
+        """両方のハンドルを取得しても、読み出したパスのみ生成される"""
+        selector = StreamSelector(self.salt)
+        handles = selector.get_stream_handles(self.master_key, self.length)
+
+        self.assertEqual(set(handles), {KEY_TYPE_TRUE, KEY_TYPE_FALSE})
+        handles[KEY_TYPE_FALSE].read_at(0, 32)
+        self.assertTrue(handles[KEY_TYPE_FALSE].materialized)
+        self.assertFalse(handles[KEY_TYPE_TRUE].materialized)
+
+        streams = StreamSelector(self.salt).get_streams_for_both_paths(self.master_key, self.length)
+        for key_type, handle in handles.items():
+            self.assertEqual(handle.tobytes(), streams[key_type])
+
+    def test_decryption_handle_matches_eager_stream(self):
+        """復号用ハンドルが従来の復号ストリームと一致する"""
+        for password in ("password_one", "password_two", b"password_three"):
+            key_type, handle = StreamSelector(self.salt).get_stream_handle_for_decryption(password, self.length)
+            selector = StreamSelector(self.salt)
+            self.assertEqual(key_type, selector.determine_key_type_for_decryption(password))
+            self.assertEqual(handle.tobytes(), selector.get_stream_for_decryption(password, self.length))
+
+
+if __name__ == '__main__':
+    unittest.main()
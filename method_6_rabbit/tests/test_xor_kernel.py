@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+一括XORカーネルのテスト
+"""
+
+import unittest
+import os
+import sys
+
+# 親ディレクトリをインポートパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# モジュールインポート
+from ..xor_kernel import xor_into, xor_bytes
+
+
+class TestXorKernel(unittest.TestCase):
+    """XORカーネルのテスト"""
+
+    def _reference_xor(self, data: bytes, stream: bytes) -> bytes:
+        """バイト単位の参照実装"""
+        return bytes(d ^ s for d, s in zip(data, stream))
+
+    def test_xor_bytes(self):
+        """新しいバイト列への一括XOR"""
+        for length in [0, 1, 7, 4096, 10007]:
+            data = os.urandom(length)
+            stream = os.urandom(length + 5)  # ストリームは長くてもよい
+            result = xor_bytes(data, stream)
+            self.assertIsInstance(result, bytes)
+            self.assertEqual(result, self._reference_xor(data, stream))
+
+    def test_xor_into_buffer_slices(self):
+        """呼び出し側バッファのスライスへの書き込み"""
+        data = os.urandom(1000)
+        stream = os.urandom(1000)
+        out = bytearray(b'\xff' * 1010)
+
+        written = xor_into(memoryview(out)[5:], memoryview(data), stream)
+
+        self.assertEqual(written, 1000)
+        self.assertEqual(bytes(out[5:1005]), self._reference_xor(data, stream))
+        # 範囲外のバイトは変更されない
+        self.assertEqual(bytes(out[:5]), b'\xff' * 5)
+        self.assertEqual(bytes(out[1005:]), b'\xff' * 5)
+
+    def test_xor_in_place(self):
+        """入力バッファ自身へのインプレースXOR"""
+        data = os.urandom(2048)
+        stream = os.urandom(2048)
+        buffer = bytearray(data)
+        xor_into(buffer, buffer, stream)
+        self.assertEqual(bytes(buffer), self._reference_xor(data, stream))
+
+    def test_length_errors(self):
+        """ストリーム/出力バッファが短い場合のエラー"""
+        with self.assertRaises(ValueError):
+            xor_bytes(b'abcd', b'ab')
+        with self.assertRaises(ValueError):
+            xor_into(bytearray(2), b'abcd', b'abcd')
+
+
+# テスト実行
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+一括XORカーネル
+
+データと鍵ストリームのXORをバイト単位のPythonループではなく、
+バッファを直接参照するNumPyの bitwise_xor で一括処理します。
+出力は呼び出し側が用意した書き込み可能なバッファに直接書き込むため、
+中間コピーが発生しません。
+"""
+
+from typing import Union
+
+import numpy as np
+
+# バッファプロトコルを持つ型（bytes, bytearray, memoryview, mmap など）
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def xor_into(out: Buffer, data: Buffer, stream: Buffer) -> int:
+    """
+    data と stream のXORを out に直接書き込む
+
+    out は data と同じバッファでもよく、その場合はインプレースで変換されます。
+
+    Args:
+        out: 書き込み先の書き込み可能なバッファ（data以上の長さ）
+        data: 入力データ
+        stream: 鍵ストリーム（data以上の長さ）
+
+    Returns:
+        書き込んだバイト数
+
+    Raises:
+        ValueError: ストリームまたは出力バッファが短い場合
+    """
+    length = len(data)
+    if length > len(stream):
+        raise ValueError(f"ストリーム長（{len(stream)}バイト）がデータ長（{length}バイト）より小さいです")
+    if length > len(out):
+        raise ValueError(f"出力バッファ長（{len(out)}バイト）がデータ長（{length}バイト）より小さいです")
+    if length == 0:
+        return 0
+
+    # frombuffer はコピーせずに元のバッファを参照する
+    data_array = np.frombuffer(data, dtype=np.uint8, count=length)
+    stream_array = np.frombuffer(stream, dtype=np.uint8, count=length)
+    out_array = np.frombuffer(out, dtype=np.uint8, count=length)
+
+    np.bitwise_xor(data_array, stream_array, out=out_array)
+    return length
+
+
+def xor_bytes(data: Buffer, stream: Buffer) -> bytes:
+    """
+    data と stream のXORを新しいバイト列として返す
+
+    Args:
+        data: 入力データ
+        stream: 鍵ストリーム（data以上の長さ）
+
+    Returns:
+        XOR結果のバイト列
+    """
+    length = len(data)
+    if length > len(stream):
+        raise ValueError(f"ストリーム長（{len(stream)}バイト）がデータ長（{length}バイト）より小さいです")
+
+    out = np.empty(length, dtype=np.uint8)
+    if length:
+        np.bitwise_xor(
+            np.frombuffer(data, dtype=np.uint8, count=length),
+            np.frombuffer(stream, dtype=np.uint8, count=length),
+            out=out
+        )
+    return out.tobytes()
@@ -0,0 +1,338 @@
+"""
+分割ハニーポットコンテナ
+
+大きなファイルの分割暗号化結果を1つのファイルに格納する形式を提供します。
+各チャンクのハニーポットカプセルを順に格納し、ファイル末尾のチャンクテーブルから
+任意のチャンクに直接アクセスできます。
+
+ファイル構造:
+| ヘッダー | チャンク0のカプセル | チャンク1のカプセル | ... | チャンクテーブル | メタデータ(JSON) | フッター |
+
+チャンクテーブルはヘッダーと合わせて各経路の鍵で認証され（メタデータの
+<鍵タイプ>_table_tag）、各チャンクの認証タグがチャンク番号とデータサイズに
+結び付けられます。チャンクの入れ替えやサイズの書き換えはテーブルの認証で検出されます。
+"""
+
+import os
+import json
+import mmap
+import hmac
+import base64
+import struct
+import hashlib
+from typing import Dict, List, Any, BinaryIO
+
+from .honeypot_capsule import HoneypotCapsule
+
+# コンテナ形式のバージョンとマジックナンバー
+CONTAINER_MAGIC = b"HPOTCHK1"
+CONTAINER_VERSION = 2
+
+# チャンクテーブル認証タグの導出ラベル
+TABLE_TAG_LABEL = b"honeypot_chunk_table"
+
+# 認証タグ・IVのサイズ
+CHUNK_TAG_SIZE = 16
+CHUNK_IV_SIZE = 16
+
+# コンテナヘッダーの構造
+# | マジック(8) | バージョン(2) | チャンクサイズ(4) | 正規データサイズ(8) | 非正規データサイズ(8) |
+CONTAINER_HEADER_FORMAT = "!8sHIQQ"
+CONTAINER_HEADER_SIZE = struct.calcsize(CONTAINER_HEADER_FORMAT)
+
+# チャンクテーブルのエントリ構造
+# | オフセット(8) | 長さ(8) | 正規IV(16) | 非正規IV(16) | 正規タグ(16) | 非正規タグ(16) |
+CHUNK_ENTRY_FORMAT = "!QQ16s16s16s16s"
+CHUNK_ENTRY_SIZE = struct.calcsize(CHUNK_ENTRY_FORMAT)
+
+# フッターの構造
+# | チャンクテーブルのオフセット(8) | チャンク数(4) | メタデータサイズ(8) | マジック(8) |
+CONTAINER_FOOTER_FORMAT = "!QIQ8s"
+CONTAINER_FOOTER_SIZE = struct.calcsize(CONTAINER_FOOTER_FORMAT)
+
+
+def compute_table_tag(key: bytes, table_data: bytes) -> bytes:
+    """
+    ヘッダーとチャンクテーブルの認証タグを計算
+
+    Args:
+        key: 経路の鍵
+        table_data: ヘッダーとチャンクテーブルを連結したバイト列
+
+    Returns:
+        認証タグ
+    """
+    return hmac.new(key, TABLE_TAG_LABEL + table_data, hashlib.sha256).digest()
+
+
+def is_chunked_container(file_path: str) -> bool:
+    """
+    ファイルが分割ハニーポットコンテナかどうかを判定
+
+    Args:
+        file_path: ファイルのパス
+
+    Returns:
+        分割ハニーポットコンテナの場合はTrue
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            if f.read(len(CONTAINER_MAGIC)) != CONTAINER_MAGIC:
+                return False
+            f.seek(0, os.SEEK_END)
+            if f.tell() < CONTAINER_HEADER_SIZE + CONTAINER_FOOTER_SIZE:
+                return False
+            f.seek(-len(CONTAINER_MAGIC), os.SEEK_END)
+            return f.read(len(CONTAINER_MAGIC)) == CONTAINER_MAGIC
+    except OSError:
+        return False
+
+
+class ChunkedContainerWriter:
+    """
+    分割ハニーポットコンテナを書き込むクラス
+
+    チャンクは番号順に追加する必要があります。
+    """
+
+    def __init__(self, fileobj: BinaryIO, chunk_size: int, true_size: int, false_size: int):
+        """
+        初期化（ヘッダーを書き込む）
+
+        Args:
+            fileobj: 書き込み先のファイルオブジェクト
+            chunk_size: 平文のチャンクサイズ
+            true_size: 正規データの全体サイズ
+            false_size: 非正規データの全体サイズ
+        """
+        self._fileobj = fileobj
+        self._entries: List[bytes] = []
+        self._position = 0
+
+        self._header = struct.pack(
+            CONTAINER_HEADER_FORMAT,
+            CONTAINER_MAGIC,
+            CONTAINER_VERSION,
+            chunk_size,
+            true_size,
+            false_size
+        )
+        self._write(self._header)
+
+    def _write(self, data: bytes) -> None:
+        self._fileobj.write(data)
+        self._position += len(data)
+
+    def add_chunk(self, capsule: HoneypotCapsule, chunk_info: Dict[str, bytes]) -> int:
+        """
+        チャンクのカプセルを追加
+
+        Args:
+            capsule: チャンクのハニーポットカプセル
+            chunk_info: チャンクのIVと認証タグ（true_iv, false_iv, true_tag, false_tag）
+
+        Returns:
+            書き込んだバイト数
+        """
+        offset = self._position
+        length = capsule.serialize_to(self._fileobj)
+        self._position += length
+
+        self._entries.append(struct.pack(
+            CHUNK_ENTRY_FORMAT,
+            offset,
+            length,
+            chunk_info['true_iv'],
+            chunk_info['false_iv'],
+            chunk_info['true_tag'],
+            chunk_info['false_tag']
+        ))
+        return length
+
+    def table_tags(self, keys: Dict[str, bytes]) -> Dict[str, str]:
+        """
+        追加済みのチャンクテーブルに対する各経路の認証タグを作成
+
+        全チャンクの追加後、finish の前に呼び出し、結果をメタデータに追加します。
+
+        Args:
+            keys: 鍵タイプをキー、鍵を値とする辞書
+
+        Returns:
+            メタデータに追加する認証タグのフィールド
+        """
+        table_data = self._header + b"".join(self._entries)
+        return {
+            f"{key_type}_table_tag": base64.b64encode(compute_table_tag(key, table_data)).decode('ascii')
+            for key_type, key in keys.items()
+        }
+
+    def finish(self, metadata: Dict[str, Any]) -> int:
+        """
+        チャンクテーブル・メタデータ・フッターを書き込む
+
+        Args:
+            metadata: コンテナ全体のメタデータ
+
+        Returns:
+            コンテナ全体のサイズ
+        """
+        table_offset = self._position
+        self._write(b"".join(self._entries))
+
+        metadata_json = json.dumps(metadata).encode('utf-8')
+        self._write(metadata_json)
+
+        self._write(struct.pack(
+            CONTAINER_FOOTER_FORMAT,
+            table_offset,
+            len(self._entries),
+            len(metadata_json),
+            CONTAINER_MAGIC
+        ))
+        return self._position
+
+
+class ChunkedContainerReader:
+    """
+    分割ハニーポットコンテナをメモリマップして読み込むクラス
+    """
+
+    def __init__(self, file_path: str):
+        """
+        初期化（ヘッダー・フッター・チャンクテーブルを検証）
+
+        Args:
+            file_path: コンテナファイルのパス
+
+        Raises:
+            ValueError: コンテナ形式が不正な場合
+        """
+        with open(file_path, 'rb') as f:
+            file_size = os.fstat(f.fileno()).st_size
+            if file_size < CONTAINER_HEADER_SIZE + CONTAINER_FOOTER_SIZE:
+                raise ValueError("コンテナ形式が不正です: ファイルサイズが小さすぎます")
+            self._mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._load(file_size)
+        except Exception:
+            self.close()
+            raise
+
+    def _load(self, file_size: int) -> None:
+        """ヘッダー・フッター・チャンクテーブルを読み込む"""
+        magic, version, chunk_size, true_size, false_size = struct.unpack_from(
+            CONTAINER_HEADER_FORMAT, self._mapping, 0
+        )
+        if magic != CONTAINER_MAGIC:
+            raise ValueError(f"コンテナ形式が不正です: 不明なマジックナンバー {magic}")
+        if version != CONTAINER_VERSION:
+            raise ValueError(f"対応していないコンテナバージョンです: {version}")
+        if chunk_size == 0:
+            raise ValueError("コンテナ形式が不正です: チャンクサイズが不正です")
+
+        footer_offset = file_size - CONTAINER_FOOTER_SIZE
+        table_offset, num_chunks, metadata_size, footer_magic = struct.unpack_from(
+            CONTAINER_FOOTER_FORMAT, self._mapping, footer_offset
+        )
+        if footer_magic != CONTAINER_MAGIC:
+            raise ValueError("コンテナ形式が不正です: フッターが見つかりません")
+
+        metadata_offset = table_offset + num_chunks * CHUNK_ENTRY_SIZE
+        if table_offset < CONTAINER_HEADER_SIZE or metadata_offset + metadata_size != footer_offset:
+            raise ValueError("コンテナ形式が不正です: チャンクテーブルの位置が不正です")
+
+        # 全チャンクを収めるのに必要なチャンク数と一致する必要がある
+        if num_chunks != (max(true_size, false_size) + chunk_size - 1) // chunk_size:
+            raise ValueError("コンテナ形式が不正です: チャンク数が一致しません")
+
+        self.chunk_size = chunk_size
+        self.sizes = {'true': true_size, 'false': false_size}
+        self._table_data = (bytes(self._mapping[:CONTAINER_HEADER_SIZE]) +
+                            bytes(self._mapping[table_offset:metadata_offset]))
+        self.chunks: List[Dict[str, Any]] = []
+
+        for i in range(num_chunks):
+            offset, length, true_iv, false_iv, true_tag, false_tag = struct.unpack_from(
+                CHUNK_ENTRY_FORMAT, self._mapping, table_offset + i * CHUNK_ENTRY_SIZE
+            )
+            if offset < CONTAINER_HEADER_SIZE or offset + length > table_offset:
+                raise ValueError(f"コンテナ形式が不正です: チャンク {i} の位置が不正です")
+
+            self.chunks.append({
+                'offset': offset,
+                'length': length,
+                'true_iv': true_iv,
+                'false_iv': false_iv,
+                'true_tag': true_tag,
+                'false_tag': false_tag
+            })
+
+        try:
+            self.metadata = json.loads(self._mapping[metadata_offset:footer_offset].decode('utf-8'))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise ValueError("コンテナ形式が不正です: メタデータの解析に失敗しました")
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def verify_table(self, key: bytes, key_type: str) -> bool:
+        """
+        ヘッダーとチャンクテーブルの認証タグを検証
+
+        Args:
+            key: 経路の鍵
+            key_type: 鍵タイプ（"true" または "false"）
+
+        Returns:
+            認証に成功した場合はTrue
+        """
+        try:
+            expected = base64.b64decode(self.metadata.get(f"{key_type}_table_tag", ""))
+        except (ValueError, TypeError):
+            return False
+        return hmac.compare_digest(compute_table_tag(key, self._table_data), expected)
+
+    def chunk_range(self, index: int, key_type: str) -> range:
+        """
+        チャンクが保持する平文の範囲を取得
+
+        Args:
+            index: チャンク番号
+            key_type: 鍵タイプ（"true" または "false"）
+
+        Returns:
+            平文上の範囲
+        """
+        start = index * self.chunk_size
+        return range(min(start, self.sizes[key_type]), min(start + self.chunk_size, self.sizes[key_type]))
+
+    def read_capsule(self, index: int) -> HoneypotCapsule:
+        """
+        チャンクのカプセルを読み込む
+
+        Args:
+            index: チャンク番号
+
+        Returns:
+            チャンクのハニーポットカプセル
+
+        Raises:
+            ValueError: カプセル形式が不正な場合
+        """
+        chunk = self.chunks[index]
+        with memoryview(self._mapping)[chunk['offset']:chunk['offset'] + chunk['length']] as data:
+            return HoneypotCapsule.deserialize(data)
+
+    def close(self) -> None:
+        """メモリマップを閉じる"""
+        if self._mapping is not None:
+            self._mapping.close()
+            self._mapping = None
+
+    def __enter__(self) -> 'ChunkedContainerReader':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
@@ -5,6 +5,8 @@
 秘密経路の識別を数学的に不可能にするための様々な設定値を含みます。
 """
 
+import os
+
 # ファイルパス設定
 TRUE_TEXT_PATH = "common/true-false-text/true.text"
 FALSE_TEXT_PATH = "common/true-false-text/false.text"
@@ -22,6 +24,17 @@ SALT_SIZE = 16  # ソルトサイズ
 TOKEN_SIZE = 32  # ハニートークンサイズ
 CAPSULE_VERSION = 1  # カプセル形式バージョン
 
+# 素数プール設定（トラップドアパラメータ生成の高速化）
+PRIME_POOL_ENABLED = True  # 素数プールの使用
+PRIME_POOL_DEPTH = 8  # プールに予備として保持する素数の数
+PRIME_POOL_BACKGROUND = True  # バックグラウンドスレッドでの補充
+PRIME_POOL_DIR = os.path.join(os.path.expanduser("~"), ".cache", "method_7_honeypot")  # 暗号化された予備の保存先
+PRIME_POOL_SECRET_ENV = "HONEYPOT_PRIME_POOL_SECRET"  # 予備の暗号化鍵を導出する秘密値の環境変数（未設定なら予備を保存しない）
+
+# 起動時間ベンチマーク設定（python -m method_7_honeypot.startup_benchmark）
+STARTUP_BENCHMARK_REPEATS = 5  # 各モジュールのインポート計測回数（中央値を使用）
+STARTUP_BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")  # 起動時間の予算ファイル
+
 # 出力ファイル形式
 OUTPUT_FORMAT = "honeypot"
 OUTPUT_EXTENSION = ".hpot"
@@ -45,7 +58,7 @@ HONEYTRAP_DETECTION_ENABLED = True  # ハニートラップ検出機能
 TAMPER_RESPONSE_MODE = "silent"  # 改ざん検出時の応答モード
 
 # スクリプト改変耐性設定 - 新規追加
-INTEGRITY_CHECK_INTERVAL_MS = 500  # 整合性チェック間隔（ミリ秒）
+INTEGRITY_CACHE_PATH = os.path.join(PRIME_POOL_DIR, "integrity_cache.json")  # 整合性検証キャッシュの保存先
 CODE_VERIFICATION_ROUNDS = 5  # コード検証の冗長ラウンド数
 RUNTIME_VERIFICATION_ENABLED = True  # 実行時検証の有効化
 POLYGLOT_VERIFICATION = True  # 多角的検証方法の有効化
@@ -54,6 +67,8 @@ DECEPTION_LAYERS = 3  # 欺瞞層の数
 SECURE_MEMORY_WIPE = True  # 安全なメモリ消去
 RANDOMIZED_FUNCTION_NAMES = True  # 関数名のランダム化
 DEFAULT_CHUNK_SIZE = 10 * 1024 * 1024  # 10MB: デフォルトのチャンクサイズ
+CHUNK_PIPELINE_WORKERS = 0  # 分割暗号化・復号の並列ワーカー数（0はCPUコア数）
+CHUNK_PIPELINE_DEPTH = 0  # 復号パイプラインのキュー深さ・再利用バッファ数（0はワーカー数の2倍）
 USE_DYNAMIC_THRESHOLD = True  # 動的閾値の使用
 
 # 真の判定ロジックは別の場所に分散して配置されており、
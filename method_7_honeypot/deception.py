@@ -24,7 +24,6 @@ import pickle
 import marshal
 import gc
 import threading
-import queue
 from typing import Dict, List, Tuple, Any, Optional, Union, Callable, Set
 from functools import partial, wraps
 
@@ -37,9 +36,10 @@ from .config import (
     SYMMETRIC_KEY_SIZE, TOKEN_SIZE, DECISION_THRESHOLD,
     RANDOMIZATION_FACTOR, DECOY_VERIFICATION_ROUNDS,
     CODE_VERIFICATION_ROUNDS, DYNAMIC_ROUTE_COUNT,
-    DECEPTION_LAYERS, INTEGRITY_CHECK_INTERVAL_MS,
+    DECEPTION_LAYERS, INTEGRITY_CACHE_PATH,
     RUNTIME_VERIFICATION_ENABLED, POLYGLOT_VERIFICATION
 )
+from .integrity_cache import IntegrityCache, stat_signature, compute_source_hash
 
 # 検証用ハッシュ（初期値はNoneで、実行時に生成・検証される）
 MODULE_HASHES = {
@@ -63,7 +63,7 @@ BYTECODE_HASHES = {
 
 # コア関数シグネチャ（関数名と引数の数のマッピング）
 FUNCTION_SIGNATURES = {
-    'evaluate_key_type': 3,
+    'evaluate_key_type': 4,
     'create_trapdoor_parameters': 1,
     'derive_keys_from_trapdoor': 1,
     'verify_with_tamper_resistance': 3
@@ -78,14 +78,17 @@ _current_decision_threshold = DECISION_THRESHOLD_DEFAULT
 # 閾値調整のエントロピー源
 _threshold_entropy = []
 
-# 検証キャッシュ（整合性検証の結果をキャッシュして計算量を削減）
-_integrity_cache = {}
-_last_verification_time = time.time()
+# 検証キャッシュ（モジュールファイルの状態をキーとしたソースのハッシュ、実行間で保存される）
+_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+_integrity_cache = IntegrityCache(INTEGRITY_CACHE_PATH)
 
-# モジュール検証スレッド用キュー
-_verification_queue = queue.Queue()
-_verification_results = {}
-_verification_lock = threading.Lock()
+# 検証時点のモジュールファイルの状態とソースの検証結果（状態が変化した場合のみ再検証）
+_module_states: Dict[str, Tuple[Optional[Tuple[int, int]], bool]] = {}
+
+# 改変耐性機能の初期化状態（インポート時ではなく初回使用時に初期化する）
+_initialized = False
+_initializing = False
+_initialize_lock = threading.RLock()
 
 # オブジェクトIDと期待されるハッシュ値のマッピング
 _protected_objects = {}
@@ -209,6 +212,48 @@ def _verify_protected_object(obj: Any) -> bool:
     return hmac.compare_digest(expected_hash, current_hash)
 
 
+def _module_file_path(module_name: str) -> str:
+    """
+    モジュール名からモジュールファイルのパスを取得
+
+    Args:
+        module_name: モジュール名（例: 'trapdoor'）
+
+    Returns:
+        モジュールファイルのパス
+    """
+    return os.path.join(_MODULE_DIR, f"{module_name}.py")
+
+
+def _module_source_hash(module_name: str) -> Optional[bytes]:
+    """
+    モジュールのソースのハッシュを取得
+
+    ファイルの状態が検証キャッシュの記録と一致する場合は再計算しません。
+    バイトコードのハッシュは実行中の関数から計算する必要があるため、
+    キャッシュせずに _compute_bytecode_hash で毎回計算します。
+
+    Args:
+        module_name: モジュール名（例: 'trapdoor'）
+
+    Returns:
+        ソースのハッシュ（取得できない場合はNone）
+    """
+    path = _module_file_path(module_name)
+    signature = stat_signature(path)
+    if signature is None:
+        return None
+
+    cached = _integrity_cache.lookup(path, signature)
+    if cached is not None:
+        return cached
+
+    source_hash = compute_source_hash(path)
+    if source_hash is not None:
+        _integrity_cache.store(path, signature, source_hash)
+    return source_hash
+
+
 def generate_module_hashes() -> Dict[str, str]:
     """
     各モジュールのハッシュを生成
@@ -218,31 +263,18 @@ def generate_module_hashes() -> Dict[str, str]:
     Returns:
         モジュール名とハッシュ値のマッピング
     """
-    modules = [
-        'method_7_honeypot.trapdoor',
-        'method_7_honeypot.key_verification',
-        'method_7_honeypot.honeypot_capsule',
-        'method_7_honeypot.encrypt',
-        'method_7_honeypot.decrypt',
-        'method_7_honeypot.deception'
-    ]
-
     hashes = {}
-    for module_name in modules:
-        try:
-            module = importlib.import_module(module_name)
-            # モジュールのソースコードを取得
-            source = inspect.getsource(module)
-            # ハッシュを計算
-            hashes[module_name.split('.')[-1]] = hashlib.sha256(source.encode('utf-8')).hexdigest()
-
-            # バイトコードハッシュも計算
-            bytecode_hash = _compute_bytecode_hash(module_name.split('.')[-1])
-            if bytecode_hash:
-                BYTECODE_HASHES[module_name.split('.')[-1]] = bytecode_hash
-        except Exception:
-            hashes[module_name.split('.')[-1]] = None
+    for module_name in MODULE_HASHES.keys():
+        # ソースのハッシュはファイルの状態が変化していなければ検証キャッシュから取得
+        source_hash = _module_source_hash(module_name)
+        hashes[module_name] = source_hash.hex() if source_hash else None
 
+        # バイトコードのハッシュはディスクから読み込まず、プロセスごとに実行中の関数から計算
+        bytecode_hash = _compute_bytecode_hash(module_name)
+        if bytecode_hash:
+            BYTECODE_HASHES[module_name] = bytecode_hash
+
+    _integrity_cache.save()
     return hashes
 
 
@@ -374,7 +406,7 @@ def _distributed_verification(verification_token: bytes, module_list: List[str])
     # 各モジュールの整合性を検証
     integrity_results = [verify_module_integrity(module) for module in module_list]
 
-    # バイトコードの整合性も検証
+    # バイトコードの整合性も検証（実行中の関数の差し替えを検出するため毎回計算）
     bytecode_results = []
     for module in module_list:
         expected_hash = BYTECODE_HASHES.get(module)
@@ -437,59 +469,43 @@ def verify_module_integrity(module_name: str) -> bool:
     Returns:
         検証結果（True: 正常、False: 改変あり）
     """
-    # キャッシュのチェック（頻繁な検証による性能低下を防止）
-    current_time = time.time()
-    cache_key = f"integrity_{module_name}"
-
-    # キャッシュ期限チェック（一定間隔で再検証）
-    if cache_key in _integrity_cache and current_time - _last_verification_time < (INTEGRITY_CHECK_INTERVAL_MS / 1000):
-        return _integrity_cache[cache_key]
-
-    try:
-        # モジュールを動的にインポート
-        full_module_name = f'method_7_honeypot.{module_name}'
-        module = importlib.import_module(full_module_name)
+    _ensure_initialized()
 
-        # モジュールのソースコードを取得
-        source = inspect.getsource(module)
+    # ソースの検証結果は、モジュールファイルの状態が前回の検証時から変化していなければ再利用
+    signature = stat_signature(_module_file_path(module_name))
+    state = _module_states.get(module_name)
+    if state is not None and state[0] == signature:
+        source_ok = state[1]
+    else:
+        try:
+            # 状態が変化した場合のみハッシュを再計算して比較
+            current_hash = _module_source_hash(module_name)
+            expected_hash = MODULE_HASHES.get(module_name)
+
+            # ハッシュが一致しない場合は改変あり
+            source_ok = current_hash is not None
+            if source_ok and expected_hash is not None:
+                # 16進数文字列をバイトに変換
+                if isinstance(expected_hash, str):
+                    expected_hash = bytes.fromhex(expected_hash)
+                source_ok = hmac.compare_digest(current_hash, expected_hash)
+        except Exception:
+            # 例外が発生した場合も改変と見なす
+            source_ok = False
 
-        # ハッシュを計算
-        current_hash = hashlib.sha256(source.encode('utf-8')).digest()
+        # ソースの検証結果をファイルの状態とともに記録
+        _module_states[module_name] = (signature, source_ok)
+        _integrity_cache.save()
 
-        # バイトコードのハッシュも計算
+    # バイトコードの検証（関数の差し替えはファイルの状態に現れないため毎回計算）
+    bytecode_ok = True
+    expected_bytecode = BYTECODE_HASHES.get(module_name)
+    if expected_bytecode is not None:
         bytecode_hash = _compute_bytecode_hash(module_name)
+        bytecode_ok = bytecode_hash is not None and hmac.compare_digest(bytecode_hash, expected_bytecode)
 
-        # 保存されたハッシュと比較
-        expected_hash = MODULE_HASHES.get(module_name)
-        expected_bytecode = BYTECODE_HASHES.get(module_name)
-
-        # ハッシュが一致しない場合は改変あり
-        source_ok = True
-        if expected_hash is not None:
-            # 16進数文字列をバイトに変換
-            if isinstance(expected_hash, str):
-                expected_hash = bytes.fromhex(expected_hash)
-            source_ok = hmac.compare_digest(current_hash, expected_hash)
-
-        # バイトコードの検証
-        bytecode_ok = True
-        if expected_bytecode is not None and bytecode_hash is not None:
-            bytecode_ok = hmac.compare_digest(bytecode_hash, expected_bytecode)
-
-        # 総合判定（両方OKであれば正常）
-        result = source_ok and bytecode_ok
-
-        # キャッシュを更新
-        _integrity_cache[cache_key] = result
-        globals()['_last_verification_time'] = current_time
-
-        return result
-
-    except Exception:
-        # 例外が発生した場合も改変と見なす
-        _integrity_cache[cache_key] = False
-        globals()['_last_verification_time'] = current_time
-        return False
+    # 総合判定（両方OKであれば正常）
+    return source_ok and bytecode_ok
 
 
 # 判定に使用する関数タイプ
@@ -897,12 +913,8 @@ class ObfuscatedVerifier:
         # 内部状態を分散化
         self._distribute_state(master_seed)
 
-        # モジュールハッシュの生成（初回実行時に設定）
-        if all(h is None for h in MODULE_HASHES.values()):
-            hashes = generate_module_hashes()
-            for k, v in hashes.items():
-                if v is not None:
-                    MODULE_HASHES[k] = bytes.fromhex(v) if isinstance(v, str) else v
+        # モジュールハッシュの生成（初回使用時に設定）
+        _ensure_initialized()
 
         # 自己保護のためにオブジェクトを登録
         _register_protected_object(self)
@@ -1143,55 +1155,18 @@ def create_redundant_verification_pattern(key: bytes, token: bytes, trapdoor_par
         return KEY_TYPE_FALSE
 
 
-# バックグラウンド検証用のスレッド関数
-def _background_verification_thread():
-    """
-    バックグラウンドでモジュール整合性を検証するスレッド
-    """
-    while True:
-        try:
-            # キューからタスクを取得
-            module_name = _verification_queue.get(timeout=1)
-
-            # 整合性検証を実行
-            result = verify_module_integrity(module_name)
-
-            # 結果を保存
-            with _verification_lock:
-                _verification_results[module_name] = result
-
-            # タスク完了を通知
-            _verification_queue.task_done()
-
-            # 短時間スリープ（CPU負荷軽減）
-            time.sleep(0.1)
-        except queue.Empty:
-            # キューが空の場合は短時間スリープ
-            time.sleep(0.5)
-        except Exception:
-            # エラーが発生しても継続
-            pass
-
-
 # 実行時検証を有効化
 def enable_runtime_verification():
     """
     実行時検証を有効化する
 
-    この関数は、バックグラウンドスレッドを起動してモジュールの
-    整合性を定期的に検証します。
+    各モジュールファイルの現在の状態（更新時刻とサイズ）を記録します。
+    以降の検証は状態の比較のみで行い、状態が変化したモジュールだけを再検証します。
     """
     if RUNTIME_VERIFICATION_ENABLED:
-        # バックグラウンドスレッドを起動
-        verification_thread = threading.Thread(
-            target=_background_verification_thread,
-            daemon=True  # メインスレッド終了時に自動終了
-        )
-        verification_thread.start()
-
-        # すべてのモジュールの初期検証をキューに登録
+        # すべてのモジュールの初期検証（状態の記録）
         for module_name in MODULE_HASHES.keys():
-            _verification_queue.put(module_name)
+            verify_module_integrity(module_name)
 
 
 def verify_with_tamper_resistance(key: bytes, token: bytes, trapdoor_params: Dict[str, Any]) -> str:
@@ -1357,7 +1332,7 @@ def initialize_tamper_resistance():
     """
     改変耐性機能を初期化
 
-    この関数は、モジュールがロードされた際に自動的に呼び出され、
+    この関数は、整合性検証を初めて使用する際に自動的に呼び出され、
     改変耐性機能を初期化します。
     """
     # モジュールハッシュの生成
@@ -1368,17 +1343,34 @@ def initialize_tamper_resistance():
             # 文字列からバイト列に変換
             MODULE_HASHES[k] = bytes.fromhex(v) if isinstance(v, str) else v
 
-    # バイトコードハッシュの生成
-    for module_name in BYTECODE_HASHES.keys():
-        bytecode_hash = _compute_bytecode_hash(module_name)
-        if bytecode_hash:
-            BYTECODE_HASHES[module_name] = bytecode_hash
-
     # 実行時検証を有効化（設定で有効になっている場合）
     if RUNTIME_VERIFICATION_ENABLED:
         enable_runtime_verification()
 
 
+def _ensure_initialized() -> None:
+    """
+    改変耐性機能が未初期化であれば初期化する
+
+    モジュールのインポート時にはハッシュの計算や他モジュールのインポートを行わず、
+    整合性検証を初めて使用する時点で一度だけ初期化します。
+    """
+    global _initialized, _initializing
+    if _initialized:
+        return
+
+    with _initialize_lock:
+        # 初期化処理の内部から呼び出された場合は何もしない
+        if _initialized or _initializing:
+            return
+        _initializing = True
+        try:
+            initialize_tamper_resistance()
+            _initialized = True
+        finally:
+            _initializing = False
+
+
 def test_tamper_resistance():
     """
     改変耐性のテスト
@@ -1451,9 +1443,6 @@ def test_tamper_resistance():
     print("\nテスト完了")
 
 
-# モジュールロード時に改変耐性機能を初期化
-initialize_tamper_resistance()
-
 # メイン関数
 if __name__ == "__main__":
     test_tamper_resistance()
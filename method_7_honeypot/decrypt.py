@@ -18,12 +18,10 @@ import secrets
 import binascii
 import random
 from typing import Dict, Tuple, Any, Optional, List, Union, BinaryIO
-from pathlib import Path
 from datetime import datetime
 import io
 import hmac
-import tempfile
-import logging
+from collections import deque
 
 # 内部モジュールからのインポート
 from .trapdoor import (
@@ -31,30 +29,35 @@ from .trapdoor import (
     derive_keys_from_trapdoor, evaluate_key_type,
     derive_user_key_material, KEY_TYPE_TRUE, KEY_TYPE_FALSE
 )
-from .key_verification import verify_key_and_select_path, verify_key_type, get_signature_key
+from .key_verification import (
+    verify_key_and_select_path, verify_key_type, get_signature_key,
+    has_key_check, classify_key_with_check
+)
 from .honeypot_capsule import (
-    HoneypotCapsule, extract_data_from_capsule,
+    HoneypotCapsule, extract_data_from_capsule, iter_data_from_capsule, get_data_size_from_capsule,
     read_data_from_honeypot_file, extract_data_from_honeypot, validate_honeypot_signature
 )
 from .config import (
     OUTPUT_EXTENSION, SYMMETRIC_KEY_SIZE, SALT_SIZE,
     KDF_ITERATIONS, DECISION_THRESHOLD, RANDOMIZATION_FACTOR,
     TOKEN_SIZE, OUTPUT_FORMAT, DEFAULT_OUTPUT_DIR, DEFAULT_PREFIX, DEFAULT_CHUNK_SIZE,
-    USE_DYNAMIC_THRESHOLD
+    USE_DYNAMIC_THRESHOLD, CHUNK_PIPELINE_WORKERS
+)
+from .chunked_container import (
+    ChunkedContainerReader, is_chunked_container, CHUNK_TAG_SIZE
 )
-from .deception import (
-    verify_with_tamper_resistance,
-    create_redundant_verification_pattern,
-    DynamicPathSelector
+from .stream_cipher import (
+    decrypt_stream, iter_blocks, apply_timing_delay, AUTH_TAG_SIZE
 )
+from .decrypt_pipeline import decrypt_chunks_pipelined, authenticate_payloads
 
 # 暗号化モジュールからのインポート
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.primitives import padding
 from cryptography.hazmat.backends import default_backend
 
 
-def symmetric_decrypt(encrypted_data: bytes, key: bytes, iv: bytes, is_chunk: bool = False) -> bytes:
+def symmetric_decrypt(encrypted_data: bytes, key: bytes, iv: bytes, is_chunk: bool = False,
+                      equalize_timing: bool = True) -> bytes:
     """
     対称鍵暗号を使用してデータを復号
 
@@ -62,7 +65,9 @@ def symmetric_decrypt(encrypted_data: bytes, key: bytes, iv: bytes, is_chunk: bo
         encrypted_data: 復号するデータ（暗号文 + 認証タグ）
         key: 復号キー
         iv: 初期化ベクトル
-        is_chunk: データがチャンクであるかどうか（大きなファイルの処理時）
+        is_chunk: 認証タグを含まない暗号文のみのチャンクかどうか（認証は行わない）
+        equalize_timing: 処理時間にランダムな遅延を加えるかどうか
+                         （複数回呼び出す処理では呼び出し元で1回だけ加える）
 
     Returns:
         復号されたデータ
@@ -72,39 +77,27 @@ def symmetric_decrypt(encrypted_data: bytes, key: bytes, iv: bytes, is_chunk: bo
         RuntimeError: 復号に失敗した場合
     """
     try:
-        # cryptographyライブラリを使用した実装
-        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-        from cryptography.hazmat.backends import default_backend
-
         # データが小さすぎる場合はエラー
-        if len(encrypted_data) < 16 and not is_chunk:  # 認証タグサイズ
+        if len(encrypted_data) < AUTH_TAG_SIZE and not is_chunk:
             raise ValueError("データサイズが小さすぎます")
 
-        # 大きなファイルを処理する場合、チャンクごとの認証は行わない
         if is_chunk:
-            ciphertext = encrypted_data
+            # 認証タグを含まないチャンクはAES-CTRで復号するのみ
+            decryptor = Cipher(
+                algorithms.AES(key),
+                modes.CTR(iv),
+                backend=default_backend()
+            ).decryptor()
+            plaintext = decryptor.update(encrypted_data) + decryptor.finalize()
         else:
-            # 暗号文と認証タグを分離
-            ciphertext_len = len(encrypted_data) - 16  # 認証タグは16バイト
-            ciphertext = encrypted_data[:ciphertext_len]
-            auth_tag = encrypted_data[ciphertext_len:]
-
-            # 認証タグを検証
-            expected_tag = hashlib.sha256(key + iv + ciphertext).digest()[:16]
-            if not secrets.compare_digest(auth_tag, expected_tag):
-                raise ValueError("認証に失敗しました。データが改ざんされている可能性があります。")
-
-        # AES-CTRモードで復号
-        cipher = Cipher(
-            algorithms.AES(key),
-            modes.CTR(iv),
-            backend=default_backend()
-        )
-        decryptor = cipher.decryptor()
-        plaintext = decryptor.update(ciphertext) + decryptor.finalize()
+            # 暗号文を一度だけ走査し、認証タグの計算と復号を同時に行う
+            plaintext_parts = []
+            decrypt_stream(iter_blocks(encrypted_data), key, iv, plaintext_parts.append)
+            plaintext = b"".join(plaintext_parts)
 
         # ランダムなスリープを追加（タイミング攻撃対策）
-        time.sleep(random.uniform(0.001, 0.005))
+        if equalize_timing:
+            apply_timing_delay()
 
         return plaintext
 
@@ -235,6 +228,12 @@ def determine_key_type(key: bytes, encrypted_data: bytes, metadata: Dict[str, An
     Returns:
         鍵のタイプ（"true" または "false"）
     """
+    # 鍵チェック構造がある場合は、データサイズに依存しない一定の計算量で判定
+    if has_key_check(metadata):
+        return classify_key_with_check(key, metadata) or KEY_TYPE_TRUE
+
+    # 以下は鍵チェック構造を含まない既存ファイル向けの判定
+
     # 開始時間を記録（タイミング攻撃対策）
     start_time = time.perf_counter()
 
@@ -290,7 +289,7 @@ def determine_key_type(key: bytes, encrypted_data: bytes, metadata: Dict[str, An
                 # IVを取得
                 true_iv = base64.b64decode(metadata.get('true_iv', ''))
                 # 復号を試行
-                _ = symmetric_decrypt(true_data, key, true_iv)
+                _ = symmetric_decrypt(true_data, key, true_iv, equalize_timing=False)
                 return KEY_TYPE_TRUE
             except Exception:
                 pass
@@ -304,7 +303,7 @@ def determine_key_type(key: bytes, encrypted_data: bytes, metadata: Dict[str, An
                 # IVを取得
                 false_iv = base64.b64decode(metadata.get('false_iv', ''))
                 # 復号を試行
-                _ = symmetric_decrypt(false_data, key, false_iv)
+                _ = symmetric_decrypt(false_data, key, false_iv, equalize_timing=False)
                 return KEY_TYPE_FALSE
             except Exception:
                 pass
@@ -341,6 +340,10 @@ def decrypt_file(file_path: str, key: bytes, output_path: Optional[str] = None,
         if verbose:
             print("復号処理を開始します...")
 
+        # 分割ハニーポットコンテナの場合はチャンク単位で復号
+        if is_chunked_container(file_path):
+            return decrypt_container_file(file_path, key, output_path, verbose)
+
         # 暗号化ファイルを読み込み
         encrypted_data, metadata = read_encrypted_file(file_path)
 
@@ -413,22 +416,35 @@ def decrypt_file(file_path: str, key: bytes, output_path: Optional[str] = None,
 
 
 def process_large_file(file_path: str, key: bytes, output_path: str,
-                     max_chunk_size: int = 10 * 1024 * 1024, verbose: bool = False) -> None:
+                     max_chunk_size: int = 10 * 1024 * 1024, verbose: bool = False,
+                     max_workers: Optional[int] = None, queue_depth: Optional[int] = None) -> None:
     """
     大きなファイルを分割して処理
 
+    カプセルファイルをメモリマップし、鍵に対応するデータブロックを先頭から1回だけ
+    順に読み進めます。読み込み（ブロックハッシュ・認証タグの計算）、復号、書き込みは
+    別々のスレッドで同時に行われます（decrypt_pipeline）。
+    復号結果は検証が完了してから出力ファイルに置き換えられます。
+
     Args:
         file_path: 暗号化ファイルのパス
         key: 復号キー
         output_path: 出力ファイルのパス
         max_chunk_size: 最大チャンクサイズ（バイト）
         verbose: 詳細表示モード
+        max_workers: 復号ワーカー数（省略時は CHUNK_PIPELINE_WORKERS、0はCPUコア数）
+        queue_depth: パイプラインのキューの深さ（省略時は CHUNK_PIPELINE_DEPTH）
 
     Raises:
         FileNotFoundError: ファイルが存在しない場合
         ValueError: 復号に失敗した場合
     """
     try:
+        # 分割ハニーポットコンテナの場合はチャンク単位で並列に復号
+        if is_chunked_container(file_path):
+            decrypt_container_file(file_path, key, output_path, verbose, max_workers)
+            return
+
         # ファイルサイズを取得
         file_size = os.path.getsize(file_path)
 
@@ -440,54 +456,350 @@ def process_large_file(file_path: str, key: bytes, output_path: str,
         if verbose:
             print(f"大きなファイル（{file_size} バイト）を分割処理します...")
 
-        # 暗号化ファイルを読み込み
-        encrypted_data, metadata = read_encrypted_file(file_path)
+        try:
+            capsule = HoneypotCapsule.open(file_path)
+        except ValueError:
+            # 単一カプセル以外の形式は通常の復号処理
+            decrypt_file(file_path, key, output_path, verbose)
+            return
 
-        # 鍵のタイプを判定
-        key_type = determine_key_type(key, encrypted_data, metadata)
+        with capsule:
+            _decrypt_capsule_stream(capsule, key, output_path, max_chunk_size, max_workers, queue_depth)
 
-        # Base64エンコードされたIVを取得
-        iv_key = 'true_iv' if key_type == KEY_TYPE_TRUE else 'false_iv'
-        iv_base64 = metadata.get(iv_key, '')
+        # ランダムな遅延は操作ごとに1回だけ加える（タイミング攻撃対策）
+        apply_timing_delay()
 
-        if not iv_base64:
-            raise ValueError(f"メタデータに必要なIV情報がありません。")
+        if verbose:
+            print(f"大きなファイルの処理が完了しました。結果を '{output_path}' に保存しました。")
 
-        iv = base64.b64decode(iv_base64)
+    except Exception as e:
+        print(f"エラー: 大きなファイルの処理に失敗しました: {str(e)}", file=sys.stderr)
+        raise
 
-        # 暗号化データを取得
-        encrypted_content, _ = read_data_from_honeypot_file(encrypted_data, key_type)
 
-        # 出力ファイルを開く
-        with open(output_path, 'wb') as output_file:
-            # データを分割して処理
-            total_chunks = (len(encrypted_content) + max_chunk_size - 1) // max_chunk_size
+def _decrypt_capsule_stream(capsule: HoneypotCapsule, key: bytes, output_path: Optional[str],
+                            chunk_size: int, max_workers: Optional[int] = None,
+                            queue_depth: Optional[int] = None) -> str:
+    """
+    メモリマップしたカプセルを1回の走査で復号・検証して出力
 
-            for i in range(total_chunks):
-                chunk_start = i * max_chunk_size
-                chunk_end = min((i + 1) * max_chunk_size, len(encrypted_content))
+    鍵タイプは鍵チェック構造があればそれで判定します。鍵チェック構造のない既存の
+    カプセルでは、出力の前に両方のデータブロックの認証タグを交互に読みながら同じ
+    計算量で検証し（authenticate_payloads）、認証に成功したブロックだけを復号します。
+    そのため処理時間は正規鍵と非正規鍵で変わりません。
 
-                if verbose:
-                    print(f"チャンク {i+1}/{total_chunks} 処理中... ({chunk_end-chunk_start} バイト)")
+    Args:
+        capsule: HoneypotCapsule.openで開いたカプセル
+        key: 復号キー
+        output_path: 出力ファイルのパス（省略時は標準出力）
+        chunk_size: チャンクサイズ
+        max_workers: 復号ワーカー数
+        queue_depth: パイプラインのキューの深さ
 
-                # チャンクを取得
-                chunk = encrypted_content[chunk_start:chunk_end]
+    Returns:
+        鍵のタイプ（"true" または "false"）
 
-                # チャンクを復号（チャンクとしてマーク）
-                decrypted_chunk = symmetric_decrypt(chunk, key, iv, is_chunk=True)
+    Raises:
+        ValueError: どちらのデータブロックでも認証に失敗した場合
+    """
+    temp_path = f"{output_path}.part" if output_path else None
 
-                # 復号結果を書き込み
-                output_file.write(decrypted_chunk)
+    # 鍵チェック構造がある場合は、対応するデータブロックのみを復号
+    if has_key_check(capsule.metadata):
+        key_types = (classify_key_with_check(key, capsule.metadata) or KEY_TYPE_TRUE,)
+    else:
+        # 両方のブロックを同じ計算量で認証してから、成功したブロックのみを復号
+        payloads = []
+        for key_type in (KEY_TYPE_TRUE, KEY_TYPE_FALSE):
+            iv_base64 = capsule.metadata.get(f"{key_type}_iv", '')
+            payload_size = get_data_size_from_capsule(capsule, key_type)
+            chunks = iter_data_from_capsule(capsule, key_type, chunk_size)
+            if not iv_base64 or chunks is None or payload_size is None:
+                payloads.append(None)
+            else:
+                payloads.append((chunks, payload_size, base64.b64decode(iv_base64)))
+        authenticated = authenticate_payloads(payloads, key)
+        key_types = tuple(
+            key_type for key_type, valid in zip((KEY_TYPE_TRUE, KEY_TYPE_FALSE), authenticated) if valid
+        )[:1]
+
+    for key_type in key_types:
+        iv_base64 = capsule.metadata.get(f"{key_type}_iv", '')
+        payload_size = get_data_size_from_capsule(capsule, key_type)
+        chunks = iter_data_from_capsule(capsule, key_type, chunk_size)
+        if not iv_base64 or chunks is None or payload_size is None:
+            continue
+
+        # 検証が完了するまで平文は一時ファイル（標準出力の場合はメモリ）に保持
+        output = open(temp_path, 'wb') if temp_path else io.BytesIO()
+        try:
+            decrypt_chunks_pipelined(
+                chunks, payload_size, key, base64.b64decode(iv_base64), output.write,
+                chunk_size, max_workers, queue_depth
+            )
+        except ValueError:
+            output.close()
+            continue
+
+        if temp_path:
+            output.close()
+            os.replace(temp_path, output_path)
+        else:
+            sys.stdout.buffer.write(output.getvalue())
+        return key_type
 
-                if verbose:
-                    print(f"チャンク {i+1} を処理しました")
+    if temp_path and os.path.exists(temp_path):
+        os.remove(temp_path)
+    raise ValueError("認証に失敗しました。鍵が正しくないか、データが改ざんされている可能性があります。")
 
+
+def decrypt_container_chunk(reader: ChunkedContainerReader, index: int,
+                            key: bytes, key_type: str) -> bytes:
+    """
+    分割ハニーポットコンテナの1チャンクを復号
+
+    Args:
+        reader: コンテナリーダー
+        index: チャンク番号
+        key: 復号キー
+        key_type: 鍵タイプ（"true" または "false"）
+
+    Returns:
+        復号されたチャンク
+
+    Raises:
+        ValueError: チャンクが不正な場合
+        RuntimeError: 復号に失敗した場合
+    """
+    chunk = reader.chunks[index]
+    encrypted_content = extract_data_from_capsule(reader.read_capsule(index), key_type)
+    if encrypted_content is None:
+        raise ValueError(f"チャンク {index} に必要なデータがありません。")
+
+    # チャンクテーブルの認証タグとカプセル内の認証タグの一致を確認
+    if not hmac.compare_digest(encrypted_content[-CHUNK_TAG_SIZE:], chunk[f"{key_type}_tag"]):
+        raise ValueError(f"チャンク {index} の認証タグがチャンクテーブルと一致しません。")
+
+    return symmetric_decrypt(encrypted_content, key, chunk[f"{key_type}_iv"], equalize_timing=False)
+
+
+def determine_container_key_type(reader: ChunkedContainerReader, key: bytes) -> str:
+    """
+    分割ハニーポットコンテナに対する鍵の種類（正規/非正規）を判定
+
+    Args:
+        reader: コンテナリーダー
+        key: 判定する鍵
+
+    Returns:
+        鍵のタイプ（"true" または "false"）
+    """
+    # 鍵チェック構造がある場合は、データサイズに依存しない一定の計算量で判定
+    if has_key_check(reader.metadata):
+        return classify_key_with_check(key, reader.metadata) or KEY_TYPE_TRUE
+
+    # 両方の鍵タイプで先頭チャンクの認証を試行（タイミング攻撃対策）
+    results = {}
+    for key_type in (KEY_TYPE_TRUE, KEY_TYPE_FALSE):
+        try:
+            decrypt_container_chunk(reader, 0, key, key_type)
+            results[key_type] = True
+        except Exception:
+            results[key_type] = False
+
+    if results[KEY_TYPE_FALSE] and not results[KEY_TYPE_TRUE]:
+        return KEY_TYPE_FALSE
+
+    # どちらも失敗した場合は、デフォルトのキータイプを返す（後続の復号で失敗する）
+    return KEY_TYPE_TRUE
+
+
+def _authenticated_container_key_type(reader: ChunkedContainerReader, key: bytes) -> str:
+    """
+    鍵の種類を判定し、その経路の鍵でヘッダーとチャンクテーブルを認証
+
+    チャンクテーブルの認証により、各チャンクの認証タグがチャンク番号と
+    データサイズに結び付けられます。
+
+    Args:
+        reader: コンテナリーダー
+        key: 復号キー
+
+    Returns:
+        鍵のタイプ（"true" または "false"）
+
+    Raises:
+        ValueError: チャンクテーブルの認証に失敗した場合
+    """
+    key_type = determine_container_key_type(reader, key)
+    if not reader.verify_table(key, key_type):
+        raise ValueError("チャンクテーブルの認証に失敗しました。鍵が正しくないか、データが改ざんされている可能性があります。")
+    return key_type
+
+
+def _iter_decrypted_chunks(reader: ChunkedContainerReader, key: bytes, key_type: str,
+                           indices: range, max_workers: Optional[int] = None):
+    """
+    チャンクを並列に復号し、チャンク番号順に返すジェネレータ
+
+    Args:
+        reader: コンテナリーダー
+        key: 復号キー
+        key_type: 鍵タイプ
+        indices: 復号するチャンク番号の範囲
+        max_workers: 並列ワーカー数（省略時は CHUNK_PIPELINE_WORKERS、0はCPUコア数）
+
+    Yields:
+        (index, chunk): チャンク番号と復号されたチャンク
+    """
+    if max_workers is None:
+        max_workers = CHUNK_PIPELINE_WORKERS
+    if max_workers <= 0:
+        max_workers = os.cpu_count() or 1
+
+    # 単一チャンクの場合は並列化しない
+    if len(indices) <= 1 or max_workers == 1:
+        for index in indices:
+            yield index, decrypt_container_chunk(reader, index, key, key_type)
+        return
+
+    # 並列処理のモジュールは複数チャンクの復号時のみインポートする（起動時間の短縮）
+    from concurrent.futures import ThreadPoolExecutor
+
+    # 先行して復号するチャンク数を制限し、メモリ使用量を抑える
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for index in indices:
+            pending.append((index, executor.submit(decrypt_container_chunk, reader, index, key, key_type)))
+            if len(pending) >= max_workers * 2:
+                done_index, future = pending.popleft()
+                yield done_index, future.result()
+
+        while pending:
+            done_index, future = pending.popleft()
+            yield done_index, future.result()
+
+
+def decrypt_container_range(file_path: str, key: bytes, offset: int = 0,
+                            length: Optional[int] = None,
+                            max_workers: Optional[int] = None) -> bytes:
+    """
+    分割ハニーポットコンテナから指定範囲のみを復号
+
+    範囲を含むチャンクだけを読み込んで復号します。
+
+    Args:
+        file_path: コンテナファイルのパス
+        key: 復号キー
+        offset: 平文上の開始位置
+        length: 読み込むバイト数（省略時は末尾まで）
+        max_workers: 並列ワーカー数
+
+    Returns:
+        復号されたデータ
+
+    Raises:
+        ValueError: 範囲やファイル形式が不正な場合
+        RuntimeError: 復号に失敗した場合
+    """
+    if offset < 0 or (length is not None and length < 0):
+        raise ValueError("読み込み範囲が不正です。")
+
+    with ChunkedContainerReader(file_path) as reader:
+        key_type = _authenticated_container_key_type(reader, key)
+
+        total_size = reader.sizes[key_type]
+        end = total_size if length is None else min(offset + length, total_size)
+        if offset >= end:
+            return b""
+
+        chunk_size = reader.chunk_size
+        indices = range(offset // chunk_size, (end - 1) // chunk_size + 1)
+
+        result = bytearray()
+        for index, chunk in _iter_decrypted_chunks(reader, key, key_type, indices, max_workers):
+            chunk_start = index * chunk_size
+            result += chunk[max(offset - chunk_start, 0):end - chunk_start]
+
+    # ランダムな遅延は操作ごとに1回だけ加える（タイミング攻撃対策）
+    apply_timing_delay()
+
+    return bytes(result)
+
+
+def decrypt_container_file(file_path: str, key: bytes, output_path: Optional[str] = None,
+                           verbose: bool = False, max_workers: Optional[int] = None) -> str:
+    """
+    分割ハニーポットコンテナ全体を並列に復号
+
+    Args:
+        file_path: コンテナファイルのパス
+        key: 復号キー
+        output_path: 出力ファイルのパス（省略時は標準出力）
+        verbose: 詳細表示モード
+        max_workers: 並列ワーカー数
+
+    Returns:
+        出力ファイルのパス（標準出力の場合は空文字列）
+
+    Raises:
+        ValueError: ファイル形式が不正な場合
+        RuntimeError: 復号に失敗した場合
+    """
+    with ChunkedContainerReader(file_path) as reader:
         if verbose:
-            print(f"大きなファイルの処理が完了しました。結果を '{output_path}' に保存しました。")
+            print(f"分割ハニーポットコンテナ '{file_path}' を読み込みました（{len(reader)} チャンク）")
 
-    except Exception as e:
-        print(f"エラー: 大きなファイルの処理に失敗しました: {str(e)}", file=sys.stderr)
-        raise
+        key_type = _authenticated_container_key_type(reader, key)
+        total_size = reader.sizes[key_type]
+
+        # 鍵に対応するデータを含むチャンクのみを復号
+        indices = range((total_size + reader.chunk_size - 1) // reader.chunk_size)
+
+        # 全チャンクの復号が完了するまで一時ファイルに書き込み、途中で失敗した場合は
+        # 不完全な出力を残さない
+        temp_path = f"{output_path}.part" if output_path else None
+        output_file = open(temp_path, 'wb') if temp_path else sys.stdout.buffer
+        try:
+            for index, chunk in _iter_decrypted_chunks(reader, key, key_type, indices, max_workers):
+                output_file.write(chunk)
+                if verbose:
+                    print(f"チャンク {index + 1}/{len(indices)} を復号しました")
+        except BaseException:
+            if temp_path:
+                output_file.close()
+                os.remove(temp_path)
+            raise
+
+        if temp_path:
+            output_file.close()
+            os.replace(temp_path, output_path)
+
+    # ランダムな遅延は操作ごとに1回だけ加える（タイミング攻撃対策）
+    apply_timing_delay()
+
+    if verbose and output_path:
+        print(f"復号データを '{output_path}' に保存しました")
+
+    return output_path or ""
+
+
+def read_file_metadata(file_path: str) -> Dict[str, Any]:
+    """
+    暗号化ファイルのメタデータを取得（分割ハニーポットコンテナにも対応）
+
+    Args:
+        file_path: 暗号化ファイルのパス
+
+    Returns:
+        メタデータ
+    """
+    if is_chunked_container(file_path):
+        with ChunkedContainerReader(file_path) as reader:
+            return reader.metadata
+
+    _, metadata = read_encrypted_file(file_path)
+    return metadata
 
 
 def parse_arguments():
@@ -564,6 +876,32 @@ def parse_arguments():
         default=10 * 1024 * 1024,  # デフォルト: 10MB
         help="大きなファイル処理時のチャンクサイズ（バイト）"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="大きなファイル処理時の復号ワーカー数（0はCPUコア数）"
+    )
+    parser.add_argument(
+        "--queue-depth",
+        type=int,
+        default=None,
+        help="大きなファイル処理時のパイプラインのキューの深さ（0はワーカー数の2倍）"
+    )
+
+    # 範囲指定オプション（分割ハニーポットコンテナのみ）
+    parser.add_argument(
+        "--offset",
+        type=int,
+        default=None,
+        help="復号する範囲の開始位置（バイト、分割ハニーポットコンテナのみ）"
+    )
+    parser.add_argument(
+        "--length",
+        type=int,
+        default=None,
+        help="復号する範囲の長さ（バイト、分割ハニーポットコンテナのみ）"
+    )
 
     # その他のオプション
     parser.add_argument(
@@ -604,7 +942,7 @@ def main():
         elif args.password:
             # メタデータからソルトを取得
             try:
-                _, metadata = read_encrypted_file(args.input_file)
+                metadata = read_file_metadata(args.input_file)
                 salt_base64 = metadata.get('salt')
                 if not salt_base64:
                     print("エラー: メタデータにソルト情報がありません。", file=sys.stderr)
@@ -623,7 +961,7 @@ def main():
     # メタデータのダンプ（オプション）
     if args.dump_metadata:
         try:
-            _, metadata = read_encrypted_file(args.input_file)
+            metadata = read_file_metadata(args.input_file)
             print("\nメタデータ:")
             for key, value in metadata.items():
                 # ソルトとIVはBase64エンコードされた値を表示
@@ -660,12 +998,29 @@ def main():
         # ファイルのサイズを確認
         file_size = os.path.getsize(args.input_file)
 
-        if file_size > args.chunk_size:
+        if args.offset is not None or args.length is not None:
+            # 範囲指定の復号（分割ハニーポットコンテナのみ）
+            if not is_chunked_container(args.input_file):
+                print("エラー: 範囲指定の復号は分割ハニーポットコンテナのみ対応しています。", file=sys.stderr)
+                return 1
+
+            decrypted_data = decrypt_container_range(
+                args.input_file, key, args.offset or 0, args.length
+            )
+            if output_path:
+                with open(output_path, 'wb') as f:
+                    f.write(decrypted_data)
+            else:
+                sys.stdout.buffer.write(decrypted_data)
+        elif file_size > args.chunk_size:
             # 大きなファイルは分割して処理
             if args.verbose:
                 print(f"大きなファイル（{file_size} バイト）を分割して処理します")
 
-            process_large_file(args.input_file, key, output_path, args.chunk_size, args.verbose)
+            process_large_file(
+                args.input_file, key, output_path, args.chunk_size, args.verbose,
+                max_workers=args.workers, queue_depth=args.queue_depth
+            )
         else:
             # 通常サイズのファイルは一括処理
             decrypt_file(args.input_file, key, output_path, args.verbose)
@@ -0,0 +1,295 @@
+"""
+パイプライン復号
+
+大きなハニーポットカプセルのデータを、読み込み・復号・書き込みの3段の
+パイプラインで処理し、ディスクの読み書きと復号を同時に進めます。
+
+- 読み込みスレッド: データを先頭から順に読み進め、認証タグを計算しながら
+  暗号文を再利用バッファにコピーします
+- 復号ワーカー: AES-CTRのカウンタを各チャンクの位置まで進めて並列に復号します
+- 書き込み（呼び出し元のスレッド）: 復号済みのチャンクを元の順番で出力します
+
+バッファはキューの深さと同じ数だけ事前に確保して再利用するため、メモリ使用量は
+ファイルサイズに依存しません。認証タグの検証は全データを出力した後に行われるため、
+呼び出し元は例外なく完了するまで出力を未検証として扱う必要があります。
+"""
+
+import os
+import hmac
+import queue
+import hashlib
+import threading
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.backends import default_backend
+
+from .config import CHUNK_PIPELINE_WORKERS, CHUNK_PIPELINE_DEPTH
+from .stream_cipher import AUTH_TAG_SIZE
+
+# AESのブロックサイズ（CTRカウンタの単位）
+AES_BLOCK_SIZE = 16
+
+# 読み込みの終了を書き込み側に通知する値
+_END_OF_DATA = object()
+
+
+def resolve_pipeline_size(max_workers: Optional[int] = None,
+                          depth: Optional[int] = None) -> Tuple[int, int]:
+    """
+    パイプラインのワーカー数とキューの深さを決定
+
+    Args:
+        max_workers: 復号ワーカー数（省略時は CHUNK_PIPELINE_WORKERS、0はCPUコア数）
+        depth: キューの深さ・再利用バッファ数（省略時は CHUNK_PIPELINE_DEPTH、0はワーカー数の2倍）
+
+    Returns:
+        (max_workers, depth) のタプル
+    """
+    if max_workers is None:
+        max_workers = CHUNK_PIPELINE_WORKERS
+    if max_workers <= 0:
+        max_workers = os.cpu_count() or 1
+
+    if depth is None:
+        depth = CHUNK_PIPELINE_DEPTH
+    if depth <= 0:
+        depth = max_workers * 2
+
+    return max_workers, depth
+
+
+def decrypt_ctr_segment(key: bytes, iv: bytes, offset: int, ciphertext: memoryview,
+                        out: bytearray) -> int:
+    """
+    AES-CTR暗号文の途中から始まる部分を復号
+
+    Args:
+        key: 復号キー
+        iv: 暗号文全体の初期化ベクトル（初期カウンタ）
+        offset: 暗号文全体における開始位置
+        ciphertext: 復号する暗号文
+        out: 出力先のバッファ（暗号文より AES_BLOCK_SIZE - 1 バイト以上大きいこと）
+
+    Returns:
+        出力したバイト数
+    """
+    # カウンタを開始位置のブロックまで進める（128ビットのビッグエンディアン整数として加算）
+    counter = (int.from_bytes(iv, 'big') + offset // AES_BLOCK_SIZE) % (1 << (AES_BLOCK_SIZE * 8))
+    decryptor = Cipher(
+        algorithms.AES(key),
+        modes.CTR(counter.to_bytes(AES_BLOCK_SIZE, 'big')),
+        backend=default_backend()
+    ).decryptor()
+
+    # ブロックの途中から始まる場合は、その分の鍵ストリームを読み飛ばす
+    skip = offset % AES_BLOCK_SIZE
+    if skip:
+        decryptor.update(bytes(skip))
+
+    return decryptor.update_into(ciphertext, out)
+
+
+def authenticate_payloads(payloads: List[Optional[Tuple[Iterable[bytes], int, bytes]]],
+                          key: bytes) -> List[bool]:
+    """
+    複数の「暗号文 + 認証タグ」のチャンク列を交互に読み進め、認証タグだけを検証（復号はしない）
+
+    どのチャンク列の認証に成功するかに関係なく、全てのチャンク列を最後まで読んで
+    同じ計算を行い、タグの比較も途中で打ち切りません。そのため処理時間は鍵の種類に
+    依存せず、鍵チェック構造を持たないカプセルでも復号するデータブロックを出力前に
+    決定できます。
+
+    Args:
+        payloads: (チャンク列, 暗号文と認証タグの合計サイズ, 初期化ベクトル) のリスト
+            （データがない要素はNone）
+        key: 検証に使用する鍵
+
+    Returns:
+        各チャンク列の認証に成功したかどうかのリスト
+    """
+    states = []
+    for payload in payloads:
+        if payload is None:
+            states.append(None)
+            continue
+        chunks, payload_size, iv = payload
+        states.append({
+            'chunks': iter(chunks),
+            'mac': hashlib.sha256(key + iv),
+            'ciphertext_size': payload_size - AUTH_TAG_SIZE,
+            'payload_size': payload_size,
+            'position': 0,
+            'auth_tag': bytearray(),
+            'valid': payload_size >= AUTH_TAG_SIZE,
+        })
+
+    # 全てのチャンク列を1チャンクずつ交互に読み進める
+    active = [state for state in states if state is not None]
+    while active:
+        for state in list(active):
+            try:
+                chunk = next(state['chunks'])
+            except StopIteration:
+                active.remove(state)
+                continue
+            except ValueError:
+                # ブロックハッシュの不一致など
+                state['valid'] = False
+                active.remove(state)
+                continue
+
+            view = memoryview(chunk)
+            mac_length = max(0, min(len(view), state['ciphertext_size'] - state['position']))
+            state['mac'].update(view[:mac_length])
+            state['auth_tag'] += view[mac_length:]
+            state['position'] += len(view)
+
+    results = []
+    for state in states:
+        if state is None:
+            results.append(False)
+            continue
+        tag_matches = hmac.compare_digest(bytes(state['auth_tag']), state['mac'].digest()[:AUTH_TAG_SIZE])
+        results.append(state['valid'] and state['position'] == state['payload_size'] and tag_matches)
+    return results
+
+
+class _Buffer:
+    """パイプラインで再利用する暗号文・平文のバッファの組"""
+
+    __slots__ = ('source', 'target')
+
+    def __init__(self, chunk_size: int):
+        self.source = bytearray(chunk_size)
+        self.target = bytearray(chunk_size + AES_BLOCK_SIZE - 1)
+
+
+def decrypt_chunks_pipelined(chunks: Iterable[bytes], payload_size: int, key: bytes, iv: bytes,
+                             write: Callable[[memoryview], None], chunk_size: int,
+                             max_workers: Optional[int] = None,
+                             depth: Optional[int] = None) -> int:
+    """
+    「暗号文 + 認証タグ」のチャンク列をパイプラインで復号・検証
+
+    stream_cipher.decrypt_stream と同じ結果になりますが、読み込み・復号・書き込みを
+    別々のスレッドで同時に行います。writeに渡すバッファは呼び出しの後に再利用されるため、
+    writeはその内容を呼び出し中に書き出す（またはコピーする）必要があります。
+
+    Args:
+        chunks: 暗号文と認証タグを順に分割したチャンク（読み込みスレッドで反復されます）
+        payload_size: 暗号文と認証タグの合計サイズ
+        key: 復号キー
+        iv: 初期化ベクトル
+        write: 平文のチャンクを受け取る関数
+        chunk_size: 再利用バッファのサイズ
+        max_workers: 復号ワーカー数
+        depth: キューの深さ・再利用バッファ数
+
+    Returns:
+        平文の総バイト数
+
+    Raises:
+        ValueError: データサイズが不正な場合や認証に失敗した場合
+    """
+    ciphertext_size = payload_size - AUTH_TAG_SIZE
+    if ciphertext_size < 0:
+        raise ValueError("データサイズが小さすぎます")
+
+    max_workers, depth = resolve_pipeline_size(max_workers, depth)
+
+    # 並列処理のモジュールはパイプライン使用時のみインポートする（起動時間の短縮）
+    from concurrent.futures import ThreadPoolExecutor
+
+    free_buffers: queue.Queue = queue.Queue()
+    for _ in range(depth):
+        free_buffers.put(_Buffer(chunk_size))
+
+    # 読み込み済み・復号中のチャンク（再利用バッファの数で上限が決まる）
+    pending: queue.Queue = queue.Queue()
+    stopped = threading.Event()
+
+    def read_stage(executor) -> None:
+        """読み込みステージ: 認証タグを計算しながら暗号文を復号ワーカーへ渡す"""
+        mac = hashlib.sha256(key + iv)
+        auth_tag = bytearray()
+        position = 0
+
+        try:
+            for chunk in chunks:
+                view = memoryview(chunk)
+                while len(view) > 0 and not stopped.is_set():
+                    if position >= ciphertext_size:
+                        # 末尾の認証タグ
+                        auth_tag += view
+                        position += len(view)
+                        break
+
+                    length = min(len(view), ciphertext_size - position, chunk_size)
+                    buffer = free_buffers.get()
+                    buffer.source[:length] = view[:length]
+                    mac.update(view[:length])
+
+                    future = executor.submit(
+                        decrypt_ctr_segment, key, iv, position,
+                        memoryview(buffer.source)[:length], buffer.target
+                    )
+                    pending.put((buffer, future))
+                    position += length
+                    view = view[length:]
+
+                if stopped.is_set():
+                    break
+
+            if not stopped.is_set():
+                if position != payload_size:
+                    raise ValueError("データサイズが一致しません")
+                if not hmac.compare_digest(bytes(auth_tag), mac.digest()[:AUTH_TAG_SIZE]):
+                    raise ValueError("認証に失敗しました。データが改ざんされている可能性があります。")
+
+            pending.put(_END_OF_DATA)
+        except BaseException as e:
+            pending.put(e)
+
+    total = 0
+    error: Optional[BaseException] = None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        reader = threading.Thread(
+            target=read_stage,
+            args=(executor,),
+            name="honeypot-decrypt-reader",
+            daemon=True
+        )
+        reader.start()
+
+        # 書き込みステージ: 復号済みのチャンクを順番に出力し、バッファを返却する
+        while True:
+            item = pending.get()
+            if item is _END_OF_DATA:
+                break
+            if isinstance(item, BaseException):
+                error = error or item
+                break
+
+            buffer, future = item
+            try:
+                if error is None:
+                    written = future.result()
+                    write(memoryview(buffer.target)[:written])
+                    total += written
+                else:
+                    # エラー発生後は残りのチャンクの完了を待ってバッファを返却するだけ
+                    future.exception()
+            except BaseException as e:
+                error = e
+                stopped.set()
+            finally:
+                free_buffers.put(buffer)
+
+        reader.join()
+
+    if error is not None:
+        raise error
+
+    return total
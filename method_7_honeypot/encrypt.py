@@ -20,7 +20,8 @@ import time
 import secrets
 import binascii
 import random
-import tempfile
+import queue
+import threading
 from typing import Dict, Tuple, Any, Optional, List, Union
 from pathlib import Path
 from datetime import datetime
@@ -34,9 +35,14 @@ from .trapdoor import (
 from .config import (
     TRUE_TEXT_PATH, FALSE_TEXT_PATH, SYMMETRIC_KEY_SIZE,
     SALT_SIZE, OUTPUT_FORMAT, OUTPUT_EXTENSION,
-    DECISION_THRESHOLD, RANDOMIZATION_FACTOR
+    DECISION_THRESHOLD, RANDOMIZATION_FACTOR, CHUNK_PIPELINE_WORKERS
 )
-from .honeypot_capsule import create_honeypot_file
+from .honeypot_capsule import (
+    create_honeypot_file, HoneypotCapsule, HoneypotCapsuleFactory
+)
+from .chunked_container import ChunkedContainerWriter, CHUNK_TAG_SIZE
+from .stream_cipher import StreamingEncryptor, iter_blocks
+from .key_verification import create_key_check
 
 
 def read_file(file_path: str) -> bytes:
@@ -89,28 +95,14 @@ def symmetric_encrypt(data: bytes, key: bytes) -> Tuple[bytes, bytes]:
         # 複数の暗号方式が存在するかのように錯覚させるためのものです
         encryption_mode = "aes-ctr"  # "chacha20", "camellia", "twofish"から選択
 
-        # cryptographyライブラリを使用した実装
-        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-        from cryptography.hazmat.backends import default_backend
-
-        # 初期化ベクトルを生成
-        iv = os.urandom(16)
-
-        # AES-CTRモードで暗号化
-        cipher = Cipher(
-            algorithms.AES(key),
-            modes.CTR(iv),
-            backend=default_backend()
-        )
-        encryptor = cipher.encryptor()
-        ciphertext = encryptor.update(data) + encryptor.finalize()
-
-        # 認証タグを計算
+        # AES-CTRモードで暗号化し、暗号文の認証タグを同時に計算（IVはランダム生成）
         # 注: 本番環境ではGCMやPoly1305などの認証付き暗号を使用すべきです
-        auth_tag = hashlib.sha256(key + iv + ciphertext).digest()[:16]
+        encryptor = StreamingEncryptor(key)
+        encrypted_parts = [encryptor.update(block) for block in iter_blocks(data)]
 
         # 暗号文と認証タグを結合
-        return ciphertext + auth_tag, iv
+        encrypted_parts.append(encryptor.finalize())
+        return b"".join(encrypted_parts), encryptor.iv
 
     except Exception as e:
         # 暗号化に失敗した場合は例外を送出
@@ -195,7 +187,8 @@ def encrypt_files(true_file_path: str, false_file_path: str, output_path: str,
         "creation_timestamp": timestamp,
         "true_file": os.path.basename(true_file_path),
         "false_file": os.path.basename(false_file_path),
-        "content_hash": hashlib.sha256(true_data + false_data).hexdigest()[:16]
+        "content_hash": hashlib.sha256(true_data + false_data).hexdigest()[:16],
+        **create_key_check(keys)
     }
 
     # 処理時間にランダム性を加える（タイミング攻撃対策）
@@ -357,16 +350,22 @@ def parse_arguments():
 
 
 def process_large_file(true_file_path: str, false_file_path: str, output_path: str,
-                     max_chunk_size: int = 10 * 1024 * 1024, verbose: bool = False) -> Tuple[Dict[str, bytes], Dict[str, Any]]:
+                     max_chunk_size: int = 10 * 1024 * 1024, verbose: bool = False,
+                     max_workers: Optional[int] = None) -> Tuple[Dict[str, bytes], Dict[str, Any]]:
     """
     大きなファイルを分割して処理
 
+    読み込み（呼び出し元スレッド）、暗号化（ワーカープール）、書き込み（専用スレッド）の
+    パイプラインで処理します。チャンクはメモリ上で受け渡され、チャンク番号順に
+    1つの分割ハニーポットコンテナ（chunked_container）として書き込まれます。
+
     Args:
         true_file_path: 正規ファイルのパス
         false_file_path: 非正規ファイルのパス
         output_path: 出力ファイルのパス
         max_chunk_size: 最大チャンクサイズ（バイト）
         verbose: 詳細表示モード
+        max_workers: 暗号化ワーカー数（省略時は CHUNK_PIPELINE_WORKERS、0はCPUコア数）
 
     Returns:
         (keys, metadata): 鍵ペアとメタデータ
@@ -403,61 +402,87 @@ def process_large_file(true_file_path: str, false_file_path: str, output_path: s
     if RANDOMIZATION_FACTOR > 0:
         dynamic_threshold += (random.random() * RANDOMIZATION_FACTOR - RANDOMIZATION_FACTOR/2)
 
-    # ファイルを分割して処理
-    with open(true_file_path, 'rb') as f_true, open(false_file_path, 'rb') as f_false:
-        # 出力ディレクトリの作成
-        output_dir = os.path.dirname(output_path)
-        if output_dir and not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-
-        # チャンク分割が必要な場合は一時ディレクトリを作成
-        temp_dir = os.path.join(output_dir, "temp_chunks")
-        os.makedirs(temp_dir, exist_ok=True)
+    # ワーカー数を決定
+    if max_workers is None:
+        max_workers = CHUNK_PIPELINE_WORKERS
+    if max_workers <= 0:
+        max_workers = os.cpu_count() or 1
 
-        # チャンク情報
-        true_chunks = []
-        false_chunks = []
+    # 出力ディレクトリの作成
+    output_dir = os.path.dirname(output_path)
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir)
 
-        # チャンク番号
-        chunk_number = 0
+    # 並列処理のモジュールは大きなファイルの処理時のみインポートする（起動時間の短縮）
+    from concurrent.futures import ThreadPoolExecutor
 
-        # チャンク処理ループ
-        while True:
-            # チャンクデータの読み込み
-            true_chunk = f_true.read(max_chunk_size)
-            false_chunk = f_false.read(max_chunk_size)
+    factory = HoneypotCapsuleFactory(trapdoor_params)
 
-            # 両方のチャンクが空の場合は終了
-            if not true_chunk and not false_chunk:
-                break
+    # 暗号化中のチャンクを番号順に書き込みスレッドへ渡すキュー
+    # （上限により読み込みが先行しすぎないようにし、メモリ使用量を抑える）
+    pending = queue.Queue(maxsize=max_workers * 2)
+    writer_errors = []
 
-            # チャンクファイルの名前
-            chunk_file = os.path.join(temp_dir, f"chunk_{chunk_number}.hpot")
-
-            # 一時ファイルの作成
-            with tempfile.NamedTemporaryFile(delete=False) as temp_true, tempfile.NamedTemporaryFile(delete=False) as temp_false:
-                temp_true.write(true_chunk)
-                temp_false.write(false_chunk)
-                temp_true_path = temp_true.name
-                temp_false_path = temp_false.name
-
-            # チャンクの暗号化
-            if verbose:
-                print(f"チャンク {chunk_number} を処理中...")
-
-            # チャンクの暗号化（鍵は再利用）
-            chunk_data = encrypt_chunk(temp_true_path, temp_false_path, keys, salt, trapdoor_params, chunk_file, verbose)
-
-            # チャンク情報を保存
-            true_chunks.append({"size": len(true_chunk), "path": chunk_file})
-            false_chunks.append({"size": len(false_chunk), "path": chunk_file})
+    def write_chunks(container: ChunkedContainerWriter) -> None:
+        """書き込みステージ: 暗号化済みチャンクを番号順にコンテナへ書き込む"""
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            if writer_errors:
+                continue
 
-            # 一時ファイルを削除
-            os.unlink(temp_true_path)
-            os.unlink(temp_false_path)
+            chunk_number, future = item
+            try:
+                capsule, chunk_info = future.result()
+                written = container.add_chunk(capsule, chunk_info)
+                if verbose:
+                    print(f"チャンク {chunk_number} を書き込みました（{written} バイト）")
+            except Exception as e:
+                writer_errors.append(e)
+
+    # チャンク番号
+    chunk_number = 0
+
+    with open(output_path, 'wb') as output_file:
+        container = ChunkedContainerWriter(
+            output_file, max_chunk_size, true_file_size, false_file_size
+        )
+        writer = threading.Thread(
+            target=write_chunks, args=(container,), name="honeypot-chunk-writer", daemon=True
+        )
+        writer.start()
 
-            # チャンク番号を増加
-            chunk_number += 1
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+                    open(true_file_path, 'rb') as f_true, open(false_file_path, 'rb') as f_false:
+                # 読み込みステージ
+                while not writer_errors:
+                    # チャンクデータの読み込み
+                    true_chunk = f_true.read(max_chunk_size)
+                    false_chunk = f_false.read(max_chunk_size)
+
+                    # 両方のチャンクが空の場合は終了
+                    if not true_chunk and not false_chunk:
+                        break
+
+                    if verbose:
+                        print(f"チャンク {chunk_number} を処理中...")
+
+                    # チャンクの暗号化（鍵は再利用）
+                    future = executor.submit(
+                        encrypt_chunk_capsule, true_chunk, false_chunk, keys, factory
+                    )
+                    pending.put((chunk_number, future))
+
+                    # チャンク番号を増加
+                    chunk_number += 1
+        finally:
+            pending.put(None)
+            writer.join()
+
+        if writer_errors:
+            raise writer_errors[0]
 
         # チャンク情報メタデータ
         metadata = {
@@ -470,26 +495,65 @@ def process_large_file(true_file_path: str, false_file_path: str, output_path: s
             "true_file": os.path.basename(true_file_path),
             "false_file": os.path.basename(false_file_path),
             "true_size": true_file_size,
-            "false_size": false_file_size
+            "false_size": false_file_size,
+            **create_key_check(keys),
+            # チャンク番号・データサイズを含むチャンクテーブルの認証タグ
+            **container.table_tags(keys)
         }
 
-        # メタデータファイルの作成
-        meta_path = output_path + ".meta"
-        with open(meta_path, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        # チャンクテーブルとメタデータをコンテナ末尾に書き込み
+        container_size = container.finish(metadata)
 
-        if verbose:
-            print(f"分割処理完了: {chunk_number} チャンクを生成しました")
-            print(f"メタデータを '{meta_path}' に保存しました")
+    if verbose:
+        print(f"分割処理完了: {chunk_number} チャンクを '{output_path}' に書き込みました（{container_size} バイト）")
 
-        # 鍵情報を返却
-        key_info = {
-            KEY_TYPE_TRUE: keys[KEY_TYPE_TRUE],
-            KEY_TYPE_FALSE: keys[KEY_TYPE_FALSE],
-            "master_key": master_key
-        }
+    # 鍵情報を返却
+    key_info = {
+        KEY_TYPE_TRUE: keys[KEY_TYPE_TRUE],
+        KEY_TYPE_FALSE: keys[KEY_TYPE_FALSE],
+        "master_key": master_key
+    }
+
+    return key_info, metadata
+
+
+def encrypt_chunk_capsule(true_data: bytes, false_data: bytes, keys: Dict[str, bytes],
+                          factory: HoneypotCapsuleFactory) -> Tuple[HoneypotCapsule, Dict[str, bytes]]:
+    """
+    メモリ上のチャンクを暗号化してカプセルを作成
+
+    Args:
+        true_data: 正規チャンクのデータ
+        false_data: 非正規チャンクのデータ
+        keys: 鍵ペア
+        factory: カプセルファクトリー
+
+    Returns:
+        (capsule, chunk_info): 暗号化されたチャンクのカプセルと、チャンクテーブル用のIV・認証タグ
+    """
+    # データの対称暗号化
+    true_encrypted, true_iv = symmetric_encrypt(true_data, keys[KEY_TYPE_TRUE])
+    false_encrypted, false_iv = symmetric_encrypt(false_data, keys[KEY_TYPE_FALSE])
+
+    # メタデータの作成
+    chunk_metadata = {
+        "true_iv": base64.b64encode(true_iv).decode('ascii'),
+        "false_iv": base64.b64encode(false_iv).decode('ascii'),
+        "true_size": len(true_data),
+        "false_size": len(false_data)
+    }
+
+    # チャンクテーブル用のIVと認証タグ
+    chunk_info = {
+        "true_iv": true_iv,
+        "false_iv": false_iv,
+        "true_tag": true_encrypted[-CHUNK_TAG_SIZE:],
+        "false_tag": false_encrypted[-CHUNK_TAG_SIZE:]
+    }
+
+    # ハニーポットカプセルの作成
+    return factory.create_capsule(true_encrypted, false_encrypted, chunk_metadata), chunk_info
 
-        return key_info, metadata
 
 def encrypt_chunk(true_chunk_path: str, false_chunk_path: str, keys: Dict[str, bytes],
                  salt: bytes, trapdoor_params: Dict[str, Any], output_path: str,
@@ -513,22 +577,11 @@ def encrypt_chunk(true_chunk_path: str, false_chunk_path: str, keys: Dict[str, b
     true_data = read_file(true_chunk_path)
     false_data = read_file(false_chunk_path)
 
-    # データの対称暗号化
-    true_encrypted, true_iv = symmetric_encrypt(true_data, keys[KEY_TYPE_TRUE])
-    false_encrypted, false_iv = symmetric_encrypt(false_data, keys[KEY_TYPE_FALSE])
-
-    # メタデータの作成
-    chunk_metadata = {
-        "true_iv": base64.b64encode(true_iv).decode('ascii'),
-        "false_iv": base64.b64encode(false_iv).decode('ascii'),
-        "true_size": len(true_data),
-        "false_size": len(false_data)
-    }
-
-    # ハニーポットカプセルの作成
-    capsule_data = create_honeypot_file(
-        true_encrypted, false_encrypted, trapdoor_params, chunk_metadata
+    # チャンクの暗号化
+    capsule, _ = encrypt_chunk_capsule(
+        true_data, false_data, keys, HoneypotCapsuleFactory(trapdoor_params)
     )
+    capsule_data = capsule.serialize()
 
     # チャンクデータを保存
     with open(output_path, 'wb') as f:
@@ -12,8 +12,9 @@ import hmac
 import secrets
 import struct
 import json
+import mmap
 import random
-from typing import Dict, List, Tuple, Any, Optional, Union, BinaryIO
+from typing import Dict, List, Tuple, Any, Optional, Union, BinaryIO, Iterable, Iterator
 import io
 
 # 内部モジュールからのインポート
@@ -47,6 +48,96 @@ HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
 BLOCK_HEADER_FORMAT = "!IIQ32s"
 BLOCK_HEADER_SIZE = struct.calcsize(BLOCK_HEADER_FORMAT)
 
+# カプセル末尾のチェックサムサイズ（SHA-256）
+CHECKSUM_SIZE = 32
+
+
+class MappedDataBlock(dict):
+    """
+    メモリマップされたファイル上のデータブロック
+
+    通常のブロック情報辞書と同じキーを持ちますが、'data'は初回アクセス時に
+    ブロックハッシュを検証してからmemoryviewとして返します。
+    """
+
+    def __init__(self, view: memoryview, seed: bytes, block_type: int,
+                 size: int, offset: int, block_hash: bytes):
+        """
+        初期化
+
+        Args:
+            view: ファイル全体のmemoryview
+            seed: カプセルのシード
+            block_type: ブロックタイプ
+            size: ブロックサイズ
+            offset: データオフセット
+            block_hash: ブロックハッシュ
+        """
+        super().__init__(type=block_type, size=size, offset=offset, hash=block_hash, metadata={})
+        self._view = view
+        self._seed = seed
+
+    def __missing__(self, key: str) -> memoryview:
+        if key != 'data':
+            raise KeyError(key)
+
+        data = self._view[self['offset']:self['offset'] + self['size']]
+
+        # ハッシュを検証
+        hasher = hashlib.sha256(self._seed)
+        hasher.update(data)
+        if not hmac.compare_digest(hasher.digest(), self['hash']):
+            data.release()
+            raise ValueError("カプセルの整合性検証に失敗しました: ブロックハッシュが一致しません")
+
+        self['data'] = data
+        return data
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def stream(self, chunk_size: int) -> Iterator[memoryview]:
+        """
+        ブロックデータを先頭からチャンク単位で返しながらハッシュを計算
+
+        ハッシュは最後のチャンクを返した後に検証されるため、呼び出し元は
+        反復が例外なく終了するまでデータを未検証として扱う必要があります。
+
+        Args:
+            chunk_size: チャンクサイズ
+
+        Yields:
+            ブロックデータのチャンク
+
+        Raises:
+            ValueError: ブロックハッシュが一致しない場合
+        """
+        if dict.__contains__(self, 'data'):
+            # 検証済みの場合はそのまま分割して返す
+            data = self['data']
+            for start in range(0, len(data), chunk_size):
+                yield data[start:start + chunk_size]
+            return
+
+        hasher = hashlib.sha256(self._seed)
+        end = self['offset'] + self['size']
+        for start in range(self['offset'], end, chunk_size):
+            chunk = self._view[start:min(start + chunk_size, end)]
+            hasher.update(chunk)
+            yield chunk
+
+        if not hmac.compare_digest(hasher.digest(), self['hash']):
+            raise ValueError("カプセルの整合性検証に失敗しました: ブロックハッシュが一致しません")
+
+    def release(self) -> None:
+        """検証済みデータのmemoryviewを解放"""
+        data = dict.pop(self, 'data', None)
+        if data is not None:
+            data.release()
+
 
 class HoneypotCapsule:
     """
@@ -66,6 +157,10 @@ class HoneypotCapsule:
         self.blocks = []
         self.metadata = {}
 
+        # HoneypotCapsule.openで開いた場合のメモリマップ
+        self._mapping = None
+        self._view = None
+
         # 内部状態 - これは実際の処理には使用されないダミー
         self._counter = int.from_bytes(os.urandom(4), byteorder='big') % 100
 
@@ -158,6 +253,23 @@ class HoneypotCapsule:
         Returns:
             シリアライズされたカプセルのバイト列
         """
+        buffer = io.BytesIO()
+        self.serialize_to(buffer)
+        return buffer.getvalue()
+
+    def serialize_to(self, fileobj: BinaryIO) -> int:
+        """
+        カプセルをバイナリ形式でファイルオブジェクトに直接書き込む
+
+        チェックサムは書き込みと同時に計算するため、カプセル全体を
+        メモリ上に組み立てる必要はありません。
+
+        Args:
+            fileobj: 書き込み先のファイルオブジェクト（シーク不要）
+
+        Returns:
+            書き込んだバイト数
+        """
         # メタデータをJSON形式に変換
         meta_json = json.dumps(self.metadata).encode('utf-8')
 
@@ -165,8 +277,12 @@ class HoneypotCapsule:
         if meta_json:
             self.add_data_block(meta_json, DATA_TYPE_META)
 
-        # バッファを準備
-        buffer = io.BytesIO()
+        # チェックサムを書き込みと同時に計算
+        hasher = hashlib.sha256()
+
+        def write(chunk: bytes) -> None:
+            fileobj.write(chunk)
+            hasher.update(chunk)
 
         # カプセルヘッダーを書き込み
         header = struct.pack(
@@ -177,53 +293,32 @@ class HoneypotCapsule:
             self.seed,
             0  # 予約フィールド
         )
-        buffer.write(header)
-
-        # データオフセットを計算するための現在位置
-        current_pos = HEADER_SIZE + BLOCK_HEADER_SIZE * len(self.blocks)
-
-        # ブロックヘッダーの位置を記録
-        block_headers_pos = buffer.tell()
-
-        # ブロックヘッダー用のダミーデータを書き込み（後で上書き）
-        for _ in self.blocks:
-            buffer.write(b'\x00' * BLOCK_HEADER_SIZE)
-
-        # 各ブロックデータを書き込み
-        for i, block in enumerate(self.blocks):
-            # ブロックデータの位置を記録
-            data_pos = buffer.tell()
-
-            # データを書き込み
-            buffer.write(block['data'])
+        write(header)
 
-            # ブロックヘッダーを作成
-            block_header = struct.pack(
+        # ブロックヘッダー（サイズとハッシュは追加時に確定しているため、
+        # データオフセットは事前に計算できる）
+        data_pos = HEADER_SIZE + BLOCK_HEADER_SIZE * len(self.blocks)
+        block_table = bytearray()
+        for block in self.blocks:
+            block_table += struct.pack(
                 BLOCK_HEADER_FORMAT,
                 block['type'],        # ブロックタイプ
                 block['size'],        # ブロックサイズ
                 data_pos,             # データオフセット
                 block['hash']         # ブロックハッシュ
             )
+            data_pos += block['size']
+        write(bytes(block_table))
 
-            # ファイルポインタをブロックヘッダー位置に移動
-            current_pos = buffer.tell()
-            buffer.seek(block_headers_pos + i * BLOCK_HEADER_SIZE)
-
-            # ブロックヘッダーを書き込み
-            buffer.write(block_header)
-
-            # ファイルポインタを元の位置に戻す
-            buffer.seek(current_pos)
-
-        # チェックサムを計算
-        buffer_value = buffer.getvalue()
-        checksum = hashlib.sha256(buffer_value).digest()
+        # 各ブロックデータを書き込み
+        for block in self.blocks:
+            write(block['data'])
 
         # チェックサムを追加
-        buffer.write(checksum)
+        checksum = hasher.digest()
+        fileobj.write(checksum)
 
-        return buffer.getvalue()
+        return data_pos + len(checksum)
 
     @classmethod
     def deserialize(cls, data: bytes) -> 'HoneypotCapsule':
@@ -317,6 +412,135 @@ class HoneypotCapsule:
         return capsule
 
 
+    @classmethod
+    def open(cls, path: str) -> 'HoneypotCapsule':
+        """
+        カプセルファイルをメモリマップして開く
+
+        ヘッダーとブロックヘッダーのみを検証し、ブロックデータは読み込みません。
+        各ブロックの'data'は初回アクセス時にハッシュを検証してmemoryviewとして返されます。
+        ファイル全体のチェックサムは検証しないため、必要な場合はverify_checksumを使用してください。
+
+        Args:
+            path: カプセルファイルのパス
+
+        Returns:
+            HoneypotCapsuleオブジェクト（使用後はcloseで閉じる）
+
+        Raises:
+            ValueError: データ形式が不正な場合
+        """
+        with open(path, 'rb') as f:
+            file_size = os.fstat(f.fileno()).st_size
+            if file_size < HEADER_SIZE + CHECKSUM_SIZE:
+                raise ValueError("カプセル形式が不正です: ヘッダーの読み込みに失敗しました")
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        capsule = cls()
+        capsule._mapping = mapping
+        capsule._view = memoryview(mapping)
+        try:
+            capsule._load_mapped_blocks(file_size)
+        except Exception:
+            capsule.close()
+            raise
+        return capsule
+
+    def _load_mapped_blocks(self, file_size: int) -> None:
+        """
+        メモリマップ上のヘッダーとブロックヘッダーを検証してブロックを登録
+
+        Args:
+            file_size: ファイルサイズ
+
+        Raises:
+            ValueError: データ形式が不正な場合
+        """
+        magic, version, num_blocks, seed, _ = struct.unpack_from(HEADER_FORMAT, self._mapping, 0)
+
+        # マジックとバージョンを検証
+        if magic != CAPSULE_MAGIC:
+            raise ValueError(f"カプセル形式が不正です: 不明なマジックナンバー {magic}")
+
+        if version != CAPSULE_VERSION:
+            raise ValueError(f"対応していないカプセルバージョンです: {version}")
+
+        # ブロックデータはブロックヘッダーの後、チェックサムの前に収まる必要がある
+        data_start = HEADER_SIZE + BLOCK_HEADER_SIZE * num_blocks
+        data_end = file_size - CHECKSUM_SIZE
+        if data_start > data_end:
+            raise ValueError("カプセル形式が不正です: ブロックヘッダーの読み込みに失敗しました")
+
+        self.version = version
+        self.magic = magic
+        self.seed = seed
+
+        for i in range(num_blocks):
+            block_type, block_size, data_offset, block_hash = struct.unpack_from(
+                BLOCK_HEADER_FORMAT, self._mapping, HEADER_SIZE + i * BLOCK_HEADER_SIZE
+            )
+            if data_offset < data_start or data_offset + block_size > data_end:
+                raise ValueError("カプセル形式が不正です: ブロックデータの読み込みに失敗しました")
+
+            block = MappedDataBlock(self._view, seed, block_type, block_size, data_offset, block_hash)
+
+            # メタデータブロックの場合は、カプセルのメタデータとして設定
+            if block_type == DATA_TYPE_META:
+                try:
+                    self.metadata = json.loads(bytes(block['data']).decode('utf-8'))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    raise ValueError("カプセル形式が不正です: メタデータの解析に失敗しました")
+                finally:
+                    block.release()
+            # ダミーデータは無視
+            elif block_type == DATA_TYPE_DUMMY:
+                pass
+            else:
+                self.blocks.append(block)
+
+    def verify_checksum(self) -> bool:
+        """
+        メモリマップしたカプセルファイル全体のチェックサムを検証
+
+        Returns:
+            チェックサムが一致する場合はTrue（メモリマップしていない場合もTrue）
+        """
+        if self._view is None:
+            return True
+
+        with self._view[:-CHECKSUM_SIZE] as body:
+            actual_checksum = hashlib.sha256(body).digest()
+        return hmac.compare_digest(actual_checksum, bytes(self._view[-CHECKSUM_SIZE:]))
+
+    def close(self) -> None:
+        """
+        メモリマップを閉じる
+
+        ブロックから取得したmemoryviewは無効になります。
+        """
+        for block in self.blocks:
+            if isinstance(block, MappedDataBlock):
+                block.release()
+
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+
+        if self._mapping is not None:
+            try:
+                self._mapping.close()
+            except BufferError:
+                # 呼び出し元がmemoryviewを保持している場合は解放時に閉じられる
+                pass
+            self._mapping = None
+
+    def __enter__(self) -> 'HoneypotCapsule':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
 class HoneypotCapsuleFactory:
     """
     ハニーポットカプセルを生成するためのファクトリークラス
@@ -466,6 +690,99 @@ def extract_data_from_capsule(capsule: HoneypotCapsule, key_type: str) -> Option
     return bytes(data)
 
 
+def iter_data_from_capsule(capsule: HoneypotCapsule, key_type: str,
+                           chunk_size: int = DEFAULT_CHUNK_SIZE) -> Optional[Iterator[bytes]]:
+    """
+    カプセルから指定された鍵タイプに対応するデータをチャンク単位で抽出
+
+    extract_data_from_capsuleと同じデータを返しますが、データ全体をコピーしません。
+    HoneypotCapsule.openで開いたカプセルの場合、ブロックハッシュは読み進めながら
+    計算され、最後のチャンクの後に検証されます。
+
+    Args:
+        capsule: ハニーポットカプセル
+        key_type: 鍵タイプ（"true" または "false"）
+        chunk_size: チャンクサイズ
+
+    Returns:
+        データのチャンクを返すイテレータ（存在しない場合はNone）
+    """
+    # 鍵タイプに基づいてブロックタイプを決定
+    block_type = DATA_TYPE_TRUE if key_type == KEY_TYPE_TRUE else DATA_TYPE_FALSE
+
+    # 対応するブロックを取得
+    block = capsule.get_block_by_type(block_type)
+    if not block:
+        return None
+
+    if isinstance(block, MappedDataBlock):
+        chunks = block.stream(chunk_size)
+    else:
+        data = memoryview(block['data'])
+        chunks = (data[start:start + chunk_size] for start in range(0, len(data), chunk_size))
+
+    return _unbind_token_chunks(chunks, block['size'])
+
+
+def get_data_size_from_capsule(capsule: HoneypotCapsule, key_type: str) -> Optional[int]:
+    """
+    カプセル内の指定された鍵タイプに対応するデータのサイズを取得（データは読み込まない）
+
+    Args:
+        capsule: ハニーポットカプセル
+        key_type: 鍵タイプ（"true" または "false"）
+
+    Returns:
+        トークンを除いたデータサイズ（存在しない場合はNone）
+    """
+    block_type = DATA_TYPE_TRUE if key_type == KEY_TYPE_TRUE else DATA_TYPE_FALSE
+    block = capsule.get_block_by_type(block_type)
+    if not block or block['size'] < TOKEN_SIZE:
+        return None
+    return block['size'] - TOKEN_SIZE
+
+
+def _unbind_token_chunks(chunks: Iterable[bytes], size: int) -> Iterator[bytes]:
+    """
+    トークン付きデータのチャンク列からトークンを除去し、関連付けを解除
+
+    Args:
+        chunks: トークン付きデータのチャンク
+        size: トークン付きデータの全体サイズ
+
+    Yields:
+        データのチャンク
+    """
+    if size < TOKEN_SIZE:
+        raise ValueError("データが不正です: トークンを抽出できません")
+
+    # トークンと、_bind_token_to_dataでXOR処理された先頭部分を集める
+    head_size = TOKEN_SIZE + 32 if size - TOKEN_SIZE >= TOKEN_SIZE else TOKEN_SIZE
+    head = bytearray()
+    chunks = iter(chunks)
+
+    for chunk in chunks:
+        needed = head_size - len(head)
+        head += chunk[:needed]
+        if len(head) < head_size:
+            continue
+
+        # XOR処理を逆適用（XORは再適用で元に戻る）
+        token_hash = hashlib.sha256(bytes(head[:TOKEN_SIZE])).digest()
+        body = head[TOKEN_SIZE:]
+        for i in range(len(body)):
+            body[i] ^= token_hash[i % len(token_hash)]
+
+        if body:
+            yield bytes(body)
+        if len(chunk) > needed:
+            yield chunk[needed:]
+        break
+
+    for chunk in chunks:
+        yield chunk
+
+
 def create_honeypot_file(true_data: bytes, false_data: bytes,
                          trapdoor_params: Dict[str, Any],
                          metadata: Optional[Dict[str, Any]] = None) -> bytes:
@@ -17,7 +17,7 @@ from .trapdoor import (
     derive_keys_from_trapdoor, evaluate_key_type,
     generate_honey_token, KEY_TYPE_TRUE, KEY_TYPE_FALSE
 )
-from .key_verification import verify_key_and_select_path
+from .key_verification import verify_key_and_select_path, create_key_check
 from .honeypot_capsule import (
     create_honeypot_file, read_data_from_honeypot_file
 )
@@ -101,7 +101,8 @@ class HoneypotCrypto:
             "salt": base64.b64encode(self.salt).decode('ascii'),
             "timestamp": int(time.time()),
             "true_file": os.path.basename(true_file_path),
-            "false_file": os.path.basename(false_file_path)
+            "false_file": os.path.basename(false_file_path),
+            **create_key_check(self.keys)
         }
 
         # より詳細な暗号化処理は他のモジュールに委譲
@@ -0,0 +1,173 @@
+"""
+モジュール整合性検証キャッシュ
+
+モジュールファイルのパス・更新時刻・サイズをキーとして、ソースのハッシュを
+保存します。stat() の結果が記録と一致する間はハッシュを再計算せず、
+一致しなくなった場合のみ再計算します。キャッシュは実行間でディスクに保存されます。
+
+バイトコードのハッシュは保存しません。実行中の関数の差し替えはファイルの状態に
+現れないため、期待値と現在値を同じ記録から取り出すと改変を検出できなくなります。
+
+キャッシュはPythonの実装・バージョン（バイトコードの形式）ごとに区別され、
+異なる環境で保存されたキャッシュは使用しません。
+"""
+
+import os
+import sys
+import json
+import hashlib
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+# キャッシュファイルの形式
+CACHE_VERSION = 2
+
+
+def stat_signature(path: str) -> Optional[Tuple[int, int]]:
+    """
+    ファイルの状態（更新時刻とサイズ）を取得
+
+    Args:
+        path: ファイルのパス
+
+    Returns:
+        (更新時刻(ns), サイズ) のタプル（ファイルが存在しない場合はNone）
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def compute_source_hash(path: str) -> Optional[bytes]:
+    """
+    ファイル内容のSHA-256ハッシュを計算
+
+    Args:
+        path: ファイルのパス
+
+    Returns:
+        ハッシュ（読み込めない場合はNone）
+    """
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).digest()
+    except OSError:
+        return None
+
+
+class IntegrityCache:
+    """
+    ファイルの状態をキーとしてハッシュを保持するキャッシュ
+    """
+
+    def __init__(self, cache_path: Optional[str]):
+        """
+        初期化（保存されたキャッシュを読み込む）
+
+        Args:
+            cache_path: キャッシュファイルのパス（Noneの場合はディスクに保存しない）
+        """
+        self.cache_path = cache_path
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+        self._load()
+
+    def lookup(self, path: str, signature: Optional[Tuple[int, int]]) -> Optional[bytes]:
+        """
+        ファイルの状態が記録と一致する場合にソースのハッシュを取得
+
+        Args:
+            path: ファイルのパス
+            signature: 現在のファイルの状態（stat_signatureの戻り値）
+
+        Returns:
+            ソースのハッシュ（記録がないか状態が異なる場合はNone）
+        """
+        if signature is None:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(os.path.abspath(path))
+
+        if entry is None or (entry['mtime_ns'], entry['size']) != signature:
+            return None
+
+        try:
+            return bytes.fromhex(entry['source_hash'])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def store(self, path: str, signature: Tuple[int, int], source_hash: bytes) -> None:
+        """
+        ファイルの状態とソースのハッシュを記録
+
+        Args:
+            path: ファイルのパス
+            signature: ハッシュ計算時のファイルの状態
+            source_hash: ソースのハッシュ
+        """
+        entry = {
+            'mtime_ns': signature[0],
+            'size': signature[1],
+            'source_hash': source_hash.hex()
+        }
+
+        with self._lock:
+            path = os.path.abspath(path)
+            if self._entries.get(path) != entry:
+                self._entries[path] = entry
+                self._dirty = True
+
+    def save(self) -> None:
+        """変更があればキャッシュをディスクに保存（保存できない場合は何もしない）"""
+        if self.cache_path is None:
+            return
+
+        with self._lock:
+            if not self._dirty:
+                return
+            content = {
+                'version': CACHE_VERSION,
+                'python': sys.implementation.cache_tag,
+                'entries': dict(self._entries)
+            }
+            self._dirty = False
+
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), mode=0o700, exist_ok=True)
+
+            # 一時ファイルに書き込んでから置き換え（途中で中断されても壊れない）
+            temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(content, f)
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            pass
+
+    def _load(self) -> None:
+        """保存されたキャッシュを読み込む（存在しない・壊れている場合は空のまま）"""
+        if self.cache_path is None:
+            return
+
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                content = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if (not isinstance(content, dict) or content.get('version') != CACHE_VERSION
+                or content.get('python') != sys.implementation.cache_tag):
+            return
+
+        entries = content.get('entries')
+        if not isinstance(entries, dict):
+            return
+
+        for path, entry in entries.items():
+            if isinstance(entry, dict) and isinstance(entry.get('mtime_ns'), int) \
+                    and isinstance(entry.get('size'), int):
+                self._entries[path] = entry
@@ -6,18 +6,19 @@
 """
 
 import os
+import base64
 import hashlib
 import hmac
 import time
 import secrets
 import binascii
 import random
-from typing import Tuple, Dict, Any, Optional, Union, Callable
+from typing import Tuple, Dict, Any, Optional, Union, Callable, Iterable, List
 
 # 内部モジュールからのインポート
 from .trapdoor import (
     KEY_TYPE_TRUE, KEY_TYPE_FALSE,
-    evaluate_key_type, generate_honey_token
+    evaluate_key_type, generate_honey_token, derive_expected_key_material
 )
 from .config import (
     SYMMETRIC_KEY_SIZE, SALT_SIZE, TOKEN_SIZE,
@@ -28,6 +29,11 @@ from .config import (
 VERIFICATION_DOMAIN = b"honeypot_key_verification_v1"
 TOKEN_VERIFICATION_DOMAIN = b"honeypot_token_verification_v1"
 
+# 鍵チェック構造（鍵タイプの判定用）の定数
+KEY_CHECK_DOMAIN = b"honeypot_key_check_v1"
+KEY_CHECK_SIZE = 16  # 鍵チェック値のサイズ
+KEY_CHECK_NONCE_SIZE = 16  # 鍵チェック用ノンスのサイズ
+
 # タイミング攻撃対策
 MIN_VERIFICATION_TIME_MS = 15  # 最小検証時間（ミリ秒）
 
@@ -84,6 +90,17 @@ class KeyVerifier:
         self.authentic_token = generate_honey_token(KEY_TYPE_TRUE, trapdoor_params)
         self.deception_token = generate_honey_token(KEY_TYPE_FALSE, trapdoor_params)
 
+        # 鍵に依存しない検証用の値を事前に計算（鍵ごとに再計算しない）
+        self._expected_key_material = derive_expected_key_material(trapdoor_params, salt)
+        self._expected_token_hashes = {
+            token: hmac.new(
+                trapdoor_params['seed'],
+                token + TOKEN_VERIFICATION_DOMAIN,
+                hashlib.sha256
+            ).digest()
+            for token in (self.authentic_token, self.deception_token)
+        }
+
         # 内部状態の初期化 - 実際の動作には影響しない
         self._state = os.urandom(16)
         self._counter = int.from_bytes(os.urandom(4), 'big') % 1000
@@ -105,7 +122,7 @@ class KeyVerifier:
         start_time = time.perf_counter()
 
         # トラップドア関数を使用して鍵タイプを評価
-        key_type = evaluate_key_type(key, self.trapdoor_params, self.salt)
+        key_type = evaluate_key_type(key, self.trapdoor_params, self.salt, self._expected_key_material)
 
         # 動的判定閾値の計算 - 解析の検出を困難にする
         dynamic_threshold = DECISION_THRESHOLD
@@ -134,6 +151,30 @@ class KeyVerifier:
 
         return key_type
 
+    def verify_keys(self, keys: Iterable[bytes], max_workers: Optional[int] = None) -> List[str]:
+        """
+        複数の入力鍵を検証し、それぞれの種類を判定
+
+        コンテナ単位の検証用の値は初期化時に一度だけ計算され、すべての鍵で共有されます。
+        各鍵の検証は verify_key と同じ処理（最小検証時間の確保を含む）で行われます。
+
+        Args:
+            keys: 検証する鍵
+            max_workers: 並列ワーカー数（省略時または1以下の場合は順に検証）
+
+        Returns:
+            入力と同じ順序の鍵タイプのリスト
+        """
+        keys = list(keys)
+        if max_workers is None or max_workers <= 1 or len(keys) <= 1:
+            return [self.verify_key(key) for key in keys]
+
+        # 並列処理のモジュールは並列検証時のみインポートする
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(keys))) as executor:
+            return list(executor.map(self.verify_key, keys))
+
     def _verify_token(self, token: bytes, key: bytes, token_type: str) -> str:
         """
         トークンを検証
@@ -153,12 +194,14 @@ class KeyVerifier:
             hashlib.sha256
         ).digest()
 
-        # トークンから期待される検証値を計算
-        expected_hash = hmac.new(
-            self.trapdoor_params['seed'],
-            token + TOKEN_VERIFICATION_DOMAIN,
-            hashlib.sha256
-        ).digest()
+        # トークンから期待される検証値（事前計算済みでなければ計算）
+        expected_hash = self._expected_token_hashes.get(token)
+        if expected_hash is None:
+            expected_hash = hmac.new(
+                self.trapdoor_params['seed'],
+                token + TOKEN_VERIFICATION_DOMAIN,
+                hashlib.sha256
+            ).digest()
 
         # 定数時間で比較（タイミング攻撃対策）
         # 注: secrets.compare_digest は定数時間比較を提供
@@ -234,19 +277,32 @@ class HoneyTokenManager:
         Returns:
             (valid, key_type): 検証結果と鍵タイプのタプル
         """
-        # 正規トークンの検証
+        # 両方のトークンを必ず検証（一致した種類によって処理時間が変わらないようにする）
         true_valid = self._verify_specific_token(token, key, self.true_token)
+        false_valid = self._verify_specific_token(token, key, self.false_token)
+
         if true_valid:
             return True, KEY_TYPE_TRUE
-
-        # 非正規トークンの検証
-        false_valid = self._verify_specific_token(token, key, self.false_token)
         if false_valid:
             return True, KEY_TYPE_FALSE
 
         # どちらでもない場合は無効
         return False, ""
 
+    def verify_tokens(self, token_keys: Iterable[Tuple[bytes, bytes]]) -> List[Tuple[bool, str]]:
+        """
+        複数のトークンを検証し、それぞれの種類を判定
+
+        期待されるトークンは初期化時に一度だけ生成され、すべての検証で共有されます。
+
+        Args:
+            token_keys: (トークン, 鍵) のタプル
+
+        Returns:
+            入力と同じ順序の (valid, key_type) のリスト
+        """
+        return [self.verify_token(token, key) for token, key in token_keys]
+
     def _verify_specific_token(self, token: bytes, key: bytes, expected_token: bytes) -> bool:
         """
         特定のトークンを検証
@@ -280,18 +336,22 @@ class DeceptionManager:
             trapdoor_params: トラップドアパラメータ
         """
         self.trapdoor_params = trapdoor_params
+        self._deception_token: Optional[bytes] = None
 
     def generate_deception_token(self) -> bytes:
         """
         偽装トークンを生成
 
         これは正規トークンと区別がつかないよう設計されています。
+        トークンはパラメータのみに依存するため、一度生成したものを再利用します。
 
         Returns:
             偽装トークン
         """
         # 非正規鍵用のトークンを生成
-        return generate_honey_token(KEY_TYPE_FALSE, self.trapdoor_params)
+        if self._deception_token is None:
+            self._deception_token = generate_honey_token(KEY_TYPE_FALSE, self.trapdoor_params)
+        return self._deception_token
 
     def create_deception_context(self, key: bytes) -> Dict[str, Any]:
         """
@@ -323,6 +383,36 @@ class DeceptionManager:
         return context
 
 
+def _select_path(key: bytes, key_type: str, salt: bytes, token_manager: HoneyTokenManager,
+                 deception: DeceptionManager) -> Dict[str, Any]:
+    """
+    鍵タイプに応じた処理コンテキストを作成
+
+    Args:
+        key: 検証した鍵
+        key_type: 鍵タイプ
+        salt: 鍵導出用ソルト
+        token_manager: ハニートークン管理
+        deception: 偽装管理
+
+    Returns:
+        処理コンテキスト
+    """
+    if key_type == KEY_TYPE_TRUE:
+        # 正規鍵の場合
+        return {
+            'token': token_manager.get_token(KEY_TYPE_TRUE),
+            'salt': salt,
+            'path': 'authentic',
+            'timestamp': int(time.time())
+        }
+
+    # 非正規鍵の場合
+    context = deception.create_deception_context(key)
+    context['path'] = 'deception'
+    return context
+
+
 def verify_key_and_select_path(key: bytes, trapdoor_params: Dict[str, Any], salt: bytes) -> Tuple[str, Dict[str, Any]]:
     """
     入力鍵を検証し、適切な処理パスを選択
@@ -337,31 +427,115 @@ def verify_key_and_select_path(key: bytes, trapdoor_params: Dict[str, Any], salt
     Returns:
         (key_type, context): 鍵タイプと処理コンテキストのタプル
     """
+    return verify_keys_and_select_paths([key], trapdoor_params, salt)[0]
+
+
+def verify_keys_and_select_paths(keys: Iterable[bytes], trapdoor_params: Dict[str, Any], salt: bytes,
+                                 max_workers: Optional[int] = None) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    複数の入力鍵を検証し、それぞれ適切な処理パスを選択
+
+    検証器・トークン管理・偽装管理はすべての鍵で共有され、一度だけ初期化されます。
+
+    Args:
+        keys: 検証する鍵
+        trapdoor_params: トラップドアパラメータ
+        salt: 鍵導出用ソルト
+        max_workers: 鍵検証の並列ワーカー数（省略時は順に検証）
+
+    Returns:
+        入力と同じ順序の (key_type, context) のリスト
+    """
+    keys = list(keys)
+
     # 鍵検証器を初期化
     verifier = KeyVerifier(trapdoor_params, salt)
+    token_manager = HoneyTokenManager(trapdoor_params)
+    deception = DeceptionManager(trapdoor_params)
 
     # 鍵を検証
-    key_type = verifier.verify_key(key)
+    key_types = verifier.verify_keys(keys, max_workers=max_workers)
 
-    # 処理コンテキストを初期化
-    context = {}
+    return [
+        (key_type, _select_path(key, key_type, salt, token_manager, deception))
+        for key, key_type in zip(keys, key_types)
+    ]
+
+
+def _key_check_value(key: bytes, nonce: bytes) -> bytes:
+    """
+    鍵とノンスから固定長の鍵チェック値を導出
+
+    Args:
+        key: 鍵
+        nonce: 鍵チェック用ノンス
+
+    Returns:
+        鍵チェック値
+    """
+    return hmac.new(key, KEY_CHECK_DOMAIN + nonce, hashlib.sha256).digest()[:KEY_CHECK_SIZE]
 
-    if key_type == KEY_TYPE_TRUE:
-        # 正規鍵の場合
-        token_manager = HoneyTokenManager(trapdoor_params)
-        context = {
-            'token': token_manager.get_token(KEY_TYPE_TRUE),
-            'salt': salt,
-            'path': 'authentic',
-            'timestamp': int(time.time())
-        }
-    else:
-        # 非正規鍵の場合
-        deception = DeceptionManager(trapdoor_params)
-        context = deception.create_deception_context(key)
-        context['path'] = 'deception'
 
-    return key_type, context
+def create_key_check(keys: Dict[str, bytes]) -> Dict[str, str]:
+    """
+    暗号化時に各経路の鍵チェック構造を作成
+
+    鍵チェック値は鍵を知らなければ計算できないため、鍵を持たない者には
+    どちらの経路の情報も与えません。
+
+    Args:
+        keys: 鍵タイプをキー、鍵を値とする辞書
+
+    Returns:
+        メタデータに追加する鍵チェックのフィールド
+    """
+    nonce = os.urandom(KEY_CHECK_NONCE_SIZE)
+    return {
+        "key_check_nonce": base64.b64encode(nonce).decode('ascii'),
+        "true_key_check": base64.b64encode(_key_check_value(keys[KEY_TYPE_TRUE], nonce)).decode('ascii'),
+        "false_key_check": base64.b64encode(_key_check_value(keys[KEY_TYPE_FALSE], nonce)).decode('ascii')
+    }
+
+
+def has_key_check(metadata: Dict[str, Any]) -> bool:
+    """
+    メタデータに鍵チェック構造が含まれるかどうか
+
+    Args:
+        metadata: メタデータ
+
+    Returns:
+        鍵チェック構造が含まれる場合はTrue
+    """
+    return all(field in metadata for field in ("key_check_nonce", "true_key_check", "false_key_check"))
+
+
+def classify_key_with_check(key: bytes, metadata: Dict[str, Any]) -> Optional[str]:
+    """
+    鍵チェック構造を使用して鍵タイプを判定
+
+    データサイズに関係なく一定の計算量で、両方の経路を同じ手順で評価します。
+
+    Args:
+        key: 判定する鍵
+        metadata: 鍵チェック構造を含むメタデータ
+
+    Returns:
+        鍵タイプ（"true" または "false"、どちらにも一致しない場合はNone）
+    """
+    candidate = _key_check_value(key, base64.b64decode(metadata["key_check_nonce"]))
+
+    # 両方の経路を必ず評価する（一致した経路によって処理が変わらないようにする）
+    matches = {
+        key_type: hmac.compare_digest(candidate, base64.b64decode(metadata[f"{key_type}_key_check"]))
+        for key_type in (KEY_TYPE_TRUE, KEY_TYPE_FALSE)
+    }
+
+    if matches[KEY_TYPE_TRUE]:
+        return KEY_TYPE_TRUE
+    if matches[KEY_TYPE_FALSE]:
+        return KEY_TYPE_FALSE
+    return None
 
 
 def test_key_verification():
@@ -0,0 +1,355 @@
+"""
+素数プールモジュール
+
+トラップドアパラメータの生成に必要な素数を事前に生成して保持し、
+要求に即座に応えるためのプールを提供します。
+
+- バックグラウンドスレッドが、プールが設定深さを下回ると素数を補充します
+- 未使用の素数はプロセス終了時にAES-GCMで暗号化してディスクに保存され、
+  次回起動時に再利用されます
+- プールが空の場合のみ同期的に素数を生成します
+
+予備の暗号化鍵は予備と同じ場所には保存せず、環境変数 PRIME_POOL_SECRET_ENV の
+秘密値（またはコンストラクタに渡した秘密値）からHKDFで導出します。予備ファイルを
+読める攻撃者でも、この秘密値を得ない限り素数を復元できません。秘密値が設定されて
+いない場合、予備はディスクに保存されず、未使用の素数は終了時に破棄されます。
+
+素数は秘密情報のため、一度払い出した素数は二度と払い出しません。
+ディスク上の予備は読み込み時に原子的に取得（リネーム）してから削除するため、
+複数プロセスが同じ素数を使用することはありません。
+"""
+
+import os
+import json
+import atexit
+import threading
+from typing import Dict, List, Optional
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+from .config import (
+    PRIME_POOL_DEPTH, PRIME_POOL_BACKGROUND, PRIME_POOL_DIR, PRIME_POOL_SECRET_ENV
+)
+
+# 予備ファイルの形式
+RESERVE_VERSION = 2
+RESERVE_KEY_SIZE = 32  # AES-256
+RESERVE_KEY_INFO = b"honeypot_prime_pool_reserve_key"
+RESERVE_NONCE_SIZE = 12
+
+# 素数生成に使用するRSAパラメータ
+RSA_PUBLIC_EXPONENT = 65537
+MIN_RSA_KEY_SIZE = 2048
+
+
+def generate_primes(bits: int) -> List[int]:
+    """
+    指定されたビット長の素数を同期的に生成する
+
+    RSA鍵生成の内部で得られる2つの素数（pとq）を両方とも利用します。
+
+    Args:
+        bits: 素数のビット長
+
+    Returns:
+        生成された素数のリスト（目標ビット長に近い順）
+    """
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    # RSA鍵は2つの素数の積なので、必要なビット長の2倍の鍵サイズを使用
+    private_key = rsa.generate_private_key(
+        public_exponent=RSA_PUBLIC_EXPONENT,
+        key_size=max(bits * 2, MIN_RSA_KEY_SIZE),
+        backend=default_backend()
+    )
+    private_numbers = private_key.private_numbers()
+
+    return sorted(
+        [private_numbers.p, private_numbers.q],
+        key=lambda prime: abs(prime.bit_length() - bits)
+    )
+
+
+def _derive_reserve_key(secret: bytes) -> bytes:
+    """
+    秘密値から予備ファイルの暗号化鍵を導出する
+
+    Args:
+        secret: 予備の保存先とは別に管理される秘密値
+
+    Returns:
+        暗号化鍵
+    """
+    return HKDF(
+        algorithm=hashes.SHA256(),
+        length=RESERVE_KEY_SIZE,
+        salt=None,
+        info=RESERVE_KEY_INFO
+    ).derive(secret)
+
+
+class PrimePool:
+    """
+    事前生成した素数を保持し、即座に払い出すプール
+    """
+
+    def __init__(self, bits: int, depth: int = PRIME_POOL_DEPTH,
+                 reserve_dir: Optional[str] = PRIME_POOL_DIR,
+                 background: bool = PRIME_POOL_BACKGROUND,
+                 reserve_secret: Optional[bytes] = None):
+        """
+        初期化
+
+        Args:
+            bits: 払い出す素数のビット長
+            depth: プールに予備として保持する素数の数
+            reserve_dir: 暗号化された予備の保存先（Noneの場合はディスクに保存しない）
+            background: バックグラウンドスレッドで補充するかどうか
+            reserve_secret: 予備の暗号化鍵を導出する秘密値（省略時は環境変数
+                PRIME_POOL_SECRET_ENV。どちらもない場合はディスクに保存しない）
+        """
+        if reserve_secret is None:
+            env_secret = os.environ.get(PRIME_POOL_SECRET_ENV)
+            reserve_secret = env_secret.encode('utf-8') if env_secret else None
+
+        self.bits = bits
+        self.depth = depth
+        self.reserve_dir = reserve_dir if reserve_secret else None
+        self.background = background
+        self._reserve_key = _derive_reserve_key(reserve_secret) if self.reserve_dir is not None else None
+
+        # 同期生成した回数（プールが空だった回数）
+        self.sync_generation_count = 0
+
+        self._primes: List[int] = []
+        self._lock = threading.Lock()
+        self._refill_needed = threading.Event()
+        self._stopped = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+
+        self._load_reserve()
+        atexit.register(self.close)
+
+    @property
+    def reserve_path(self) -> Optional[str]:
+        """暗号化された予備ファイルのパス"""
+        if self.reserve_dir is None:
+            return None
+        return os.path.join(self.reserve_dir, f"prime_pool_{self.bits}.json")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._primes)
+
+    def take(self) -> int:
+        """
+        素数を1つ払い出す
+
+        プールが空の場合は同期的に生成します。
+
+        Returns:
+            素数
+        """
+        self.start()
+
+        with self._lock:
+            prime = self._primes.pop() if self._primes else None
+
+        if prime is None:
+            primes = generate_primes(self.bits)
+            prime = primes[0]
+            self.sync_generation_count += 1
+            self._add(primes[1:])
+
+        self._refill_needed.set()
+        return prime
+
+    def fill(self, count: Optional[int] = None) -> None:
+        """
+        プールが指定数に達するまで同期的に補充する
+
+        Args:
+            count: 目標数（省略時はプールの深さ）
+        """
+        target = self.depth if count is None else count
+        while len(self) < target:
+            self._add(generate_primes(self.bits))
+
+    def start(self) -> None:
+        """バックグラウンドでの補充を開始（無効化されている場合は何もしない）"""
+        if not self.background or self._closed:
+            return
+
+        with self._lock:
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(
+                target=self._refill_loop,
+                name=f"prime-pool-{self.bits}",
+                daemon=True
+            )
+        self._refill_needed.set()
+        self._worker.start()
+
+    def close(self) -> None:
+        """補充を停止し、未使用の素数を暗号化してディスクに保存"""
+        if self._closed:
+            return
+        self._closed = True
+        self._stopped.set()
+        self._refill_needed.set()
+
+        with self._lock:
+            primes, self._primes = self._primes, []
+        self._save_reserve(primes)
+
+    def _add(self, primes: List[int]) -> None:
+        """素数をプールに追加（深さを超える分は破棄）"""
+        with self._lock:
+            if self._closed:
+                return
+            room = max(self.depth - len(self._primes), 0)
+            self._primes.extend(primes[:room])
+
+    def _refill_loop(self) -> None:
+        """バックグラウンドスレッドの本体"""
+        while not self._stopped.is_set():
+            self._refill_needed.wait()
+            self._refill_needed.clear()
+
+            while not self._stopped.is_set() and len(self) < self.depth:
+                self._add(generate_primes(self.bits))
+
+    def _load_reserve(self) -> None:
+        """ディスク上の予備を取得してプールに読み込む"""
+        reserve_path = self.reserve_path
+        if reserve_path is None:
+            return
+
+        # 他のプロセスと同じ素数を使わないよう、原子的なリネームで予備を取得
+        claim_path = f"{reserve_path}.{os.getpid()}.{threading.get_ident()}.claim"
+        try:
+            os.replace(reserve_path, claim_path)
+        except OSError:
+            return
+
+        try:
+            with open(claim_path, 'r', encoding='utf-8') as f:
+                self._add(self._decrypt_reserve(json.load(f)))
+        except (OSError, ValueError, KeyError, TypeError, InvalidTag):
+            # 壊れた予備は破棄する
+            pass
+        finally:
+            try:
+                os.remove(claim_path)
+            except OSError:
+                pass
+
+    def _save_reserve(self, primes: List[int]) -> None:
+        """
+        未使用の素数を暗号化して保存
+
+        その間に他のプロセスが保存した予備があれば統合します。
+        保存できない場合は素数を破棄します（再利用しないため安全側）。
+        """
+        reserve_path = self.reserve_path
+        if reserve_path is None or not primes:
+            return
+
+        try:
+            os.makedirs(self.reserve_dir, mode=0o700, exist_ok=True)
+
+            existing: List[int] = []
+            claim_path = f"{reserve_path}.{os.getpid()}.{threading.get_ident()}.claim"
+            try:
+                os.replace(reserve_path, claim_path)
+                with open(claim_path, 'r', encoding='utf-8') as f:
+                    existing = self._decrypt_reserve(json.load(f))
+            except (OSError, ValueError, KeyError, TypeError, InvalidTag):
+                pass
+            finally:
+                if os.path.exists(claim_path):
+                    os.remove(claim_path)
+
+            temp_path = f"{reserve_path}.{os.getpid()}.tmp"
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._encrypt_reserve(existing + primes), f)
+            os.replace(temp_path, reserve_path)
+        except (OSError, ValueError):
+            pass
+
+    def _associated_data(self) -> bytes:
+        """予備ファイルの認証付加データ"""
+        return f"honeypot_prime_pool_v{RESERVE_VERSION}:{self.bits}".encode('utf-8')
+
+    def _encrypt_reserve(self, primes: List[int]) -> Dict[str, object]:
+        """素数のリストを暗号化"""
+        nonce = os.urandom(RESERVE_NONCE_SIZE)
+        plaintext = json.dumps([format(prime, 'x') for prime in primes]).encode('utf-8')
+
+        return {
+            'version': RESERVE_VERSION,
+            'bits': self.bits,
+            'nonce': nonce.hex(),
+            'ciphertext': AESGCM(self._reserve_key).encrypt(nonce, plaintext, self._associated_data()).hex()
+        }
+
+    def _decrypt_reserve(self, reserve: Dict[str, object]) -> List[int]:
+        """暗号化された予備から素数のリストを復元"""
+        if reserve.get('version') != RESERVE_VERSION or reserve.get('bits') != self.bits:
+            return []
+
+        plaintext = AESGCM(self._reserve_key).decrypt(
+            bytes.fromhex(reserve['nonce']),
+            bytes.fromhex(reserve['ciphertext']),
+            self._associated_data()
+        )
+        return [int(value, 16) for value in json.loads(plaintext.decode('utf-8'))]
+
+
+# プロセス全体で共有する素数プール（ビット長ごと）
+_PRIME_POOLS: Dict[int, PrimePool] = {}
+_PRIME_POOLS_LOCK = threading.Lock()
+
+
+def get_prime_pool(bits: int) -> PrimePool:
+    """
+    指定されたビット長の共有素数プールを取得
+
+    Args:
+        bits: 素数のビット長
+
+    Returns:
+        素数プール
+    """
+    with _PRIME_POOLS_LOCK:
+        pool = _PRIME_POOLS.get(bits)
+        if pool is None:
+            pool = PrimePool(bits)
+            _PRIME_POOLS[bits] = pool
+        return pool
+
+
+# メイン関数（予備の事前生成）
+if __name__ == "__main__":
+    import argparse
+
+    from .config import KEY_SIZE_BITS
+
+    parser = argparse.ArgumentParser(description="素数プールの予備を事前生成します")
+    parser.add_argument("--bits", type=int, default=KEY_SIZE_BITS // 2, help="素数のビット長")
+    parser.add_argument("--depth", type=int, default=PRIME_POOL_DEPTH, help="保存する素数の数")
+    args = parser.parse_args()
+
+    pool = PrimePool(args.bits, depth=args.depth, background=False)
+    if pool.reserve_path is None:
+        parser.error(f"予備を保存するには環境変数 {PRIME_POOL_SECRET_ENV} に秘密値を設定してください")
+    pool.fill()
+    print(f"{len(pool)}個の{args.bits}ビット素数を保存します: {pool.reserve_path}")
+    pool.close()
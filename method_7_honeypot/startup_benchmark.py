@@ -0,0 +1,242 @@
+"""
+起動時間ベンチマーク
+
+`python -X importtime` で各モジュールのインポート時間を別プロセスで計測し、
+保存された予算（startup_budget.json）と比較します。予算には各モジュールの
+インポート時間の上限と、起動時にインポートしてはならないモジュール
+（初回使用時に遅延初期化されるべきサブシステム）を記録します。
+
+使用例:
+    python -m method_7_honeypot.startup_benchmark
+    python -m method_7_honeypot.startup_benchmark --repeats 10 --output startup.json
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from typing import Any, Dict, List
+
+from .config import STARTUP_BENCHMARK_REPEATS, STARTUP_BUDGET_PATH
+
+# 予算ファイルの形式バージョン
+BUDGET_VERSION = 1
+
+# -X importtime の出力行（自身の時間 | 累積時間 | モジュール名、単位はマイクロ秒）
+IMPORTTIME_PATTERN = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)\s*$")
+
+# パッケージの親ディレクトリ（計測用プロセスのインポートパス）
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(output: str) -> Dict[str, int]:
+    """
+    -X importtime の出力を解析
+
+    Args:
+        output: 標準エラー出力の内容
+
+    Returns:
+        モジュール名と累積インポート時間（マイクロ秒）の辞書
+    """
+    modules = {}
+    for line in output.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2))
+    return modules
+
+
+def measure_import(module_name: str, repeats: int = STARTUP_BENCHMARK_REPEATS) -> Dict[str, Any]:
+    """
+    モジュールのインポート時間を新しいプロセスで計測
+
+    Args:
+        module_name: 計測するモジュール名
+        repeats: 計測回数
+
+    Returns:
+        計測結果（import_ms: 中央値、samples_ms: 各回の値、imported: インポートされたモジュール）
+
+    Raises:
+        RuntimeError: インポートに失敗した場合
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [PACKAGE_ROOT, env.get('PYTHONPATH')]))
+
+    samples = []
+    imported: List[str] = []
+    for _ in range(max(1, repeats)):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"モジュール '{module_name}' のインポートに失敗しました:\n{completed.stderr}")
+
+        modules = parse_importtime(completed.stderr)
+        if module_name not in modules:
+            raise RuntimeError(f"モジュール '{module_name}' のインポート時間を取得できませんでした")
+
+        samples.append(modules[module_name] / 1000)
+        imported = sorted(modules)
+
+    return {
+        'module': module_name,
+        'import_ms': statistics.median(samples),
+        'samples_ms': samples,
+        'imported': imported
+    }
+
+
+def load_budget(path: str = STARTUP_BUDGET_PATH) -> Dict[str, Any]:
+    """
+    起動時間の予算を読み込む
+
+    Args:
+        path: 予算ファイルのパス
+
+    Returns:
+        予算の内容
+
+    Raises:
+        ValueError: 予算ファイルの形式が不正な場合
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        budget = json.load(f)
+
+    if not isinstance(budget, dict) or budget.get('version') != BUDGET_VERSION:
+        raise ValueError(f"予算ファイルの形式が不正です: {path}")
+    return budget
+
+
+def check_budget(results: List[Dict[str, Any]], budget: Dict[str, Any],
+                 check_time: bool = True) -> List[str]:
+    """
+    計測結果を予算と比較
+
+    Args:
+        results: measure_import の計測結果のリスト
+        budget: 予算の内容
+        check_time: インポート時間の上限も確認するかどうか（Falseの場合は
+            実行環境に依存しない禁止モジュールの確認のみ）
+
+    Returns:
+        予算超過の内容（超過がなければ空のリスト）
+    """
+    violations = []
+    for result in results:
+        limits = budget['modules'].get(result['module'])
+        if limits is None:
+            continue
+
+        max_import_ms = limits.get('max_import_ms')
+        if check_time and max_import_ms is not None and result['import_ms'] > max_import_ms:
+            violations.append(
+                f"{result['module']}: インポート時間 {result['import_ms']:.1f}ms が予算 {max_import_ms:.1f}ms を超えています"
+            )
+
+        for forbidden in limits.get('forbidden_imports', []):
+            if forbidden in result['imported']:
+                violations.append(
+                    f"{result['module']}: 起動時に '{forbidden}' がインポートされています（初回使用時に遅延させてください）"
+                )
+
+    return violations
+
+
+def run_benchmark(budget: Dict[str, Any], repeats: int = STARTUP_BENCHMARK_REPEATS,
+                  verbose: bool = False) -> List[Dict[str, Any]]:
+    """
+    予算に記載されたすべてのモジュールを計測
+
+    Args:
+        budget: 予算の内容
+        repeats: 各モジュールの計測回数
+        verbose: 計測結果を表示するかどうか
+
+    Returns:
+        計測結果のリスト
+    """
+    results = []
+    for module_name in budget['modules']:
+        result = measure_import(module_name, repeats)
+        results.append(result)
+
+        if verbose:
+            limit = budget['modules'][module_name].get('max_import_ms')
+            limit_text = f" / 予算 {limit:.1f}ms" if limit is not None else ""
+            print(f"{module_name}: {result['import_ms']:.1f}ms{limit_text}")
+
+    return results
+
+
+def parse_arguments() -> argparse.Namespace:
+    """
+    コマンドライン引数を解析
+
+    Returns:
+        解析された引数オブジェクト
+    """
+    parser = argparse.ArgumentParser(
+        description="暗号学的ハニーポット方式の起動時間ベンチマーク",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+
+    parser.add_argument(
+        "--budget",
+        default=STARTUP_BUDGET_PATH,
+        help="起動時間の予算ファイルのパス"
+    )
+
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=STARTUP_BENCHMARK_REPEATS,
+        help="各モジュールの計測回数"
+    )
+
+    parser.add_argument(
+        "-o", "--output",
+        help="計測結果を保存するJSONファイルのパス"
+    )
+
+    return parser.parse_args()
+
+
+def main() -> int:
+    """
+    メイン関数
+
+    Returns:
+        終了コード（予算を超過した場合は1）
+    """
+    args = parse_arguments()
+
+    budget = load_budget(args.budget)
+    results = run_benchmark(budget, args.repeats, verbose=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"計測結果を '{args.output}' に保存しました")
+
+    violations = check_budget(results, budget)
+    if violations:
+        print("起動時間の予算超過を検出しました:")
+        for violation in violations:
+            print(f"  {violation}")
+        return 1
+
+    print("すべてのモジュールが予算内です")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
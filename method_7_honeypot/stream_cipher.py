@@ -0,0 +1,204 @@
+"""
+ストリーミング対称暗号
+
+AES-CTRによる暗号化・復号と、暗号文に対する認証タグ
+（SHA-256(鍵 + IV + 暗号文) の先頭16バイト）の計算をチャンク単位で同時に行います。
+暗号文を一度走査するだけで暗号化・復号と認証が完了します。
+"""
+
+import os
+import time
+import random
+import hashlib
+import hmac
+from typing import Callable, Iterable, Iterator, Optional
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.backends import default_backend
+
+# 認証タグサイズ
+AUTH_TAG_SIZE = 16
+
+# 初期化ベクトルサイズ
+STREAM_IV_SIZE = 16
+
+# 一括処理時に分割するブロックサイズ
+STREAM_BLOCK_SIZE = 1024 * 1024  # 1MB
+
+
+def apply_timing_delay() -> None:
+    """
+    処理時間にランダムな遅延を加える（タイミング攻撃対策）
+
+    チャンクごとではなく、論理的な操作（ファイル1つの復号など）ごとに1回だけ呼び出します。
+    """
+    time.sleep(random.uniform(0.001, 0.005))
+
+
+def iter_blocks(data: bytes, block_size: int = STREAM_BLOCK_SIZE) -> Iterator[memoryview]:
+    """
+    メモリ上のデータをコピーせずにブロック単位で分割
+
+    Args:
+        data: 分割するデータ
+        block_size: ブロックサイズ
+
+    Yields:
+        データのブロック
+    """
+    view = memoryview(data)
+    for start in range(0, len(view), block_size):
+        yield view[start:start + block_size]
+
+
+class StreamingEncryptor:
+    """
+    AES-CTR暗号化と認証タグ計算を同時に行うクラス
+    """
+
+    def __init__(self, key: bytes, iv: Optional[bytes] = None):
+        """
+        初期化
+
+        Args:
+            key: 暗号化キー
+            iv: 初期化ベクトル（省略時はランダム生成）
+        """
+        self.iv = iv if iv is not None else os.urandom(STREAM_IV_SIZE)
+        self._encryptor = Cipher(
+            algorithms.AES(key),
+            modes.CTR(self.iv),
+            backend=default_backend()
+        ).encryptor()
+        self._mac = hashlib.sha256(key + self.iv)
+
+    def update(self, data: bytes) -> bytes:
+        """
+        データを暗号化
+
+        Args:
+            data: 平文のチャンク
+
+        Returns:
+            暗号文のチャンク
+        """
+        ciphertext = self._encryptor.update(data)
+        self._mac.update(ciphertext)
+        return ciphertext
+
+    def finalize(self) -> bytes:
+        """
+        暗号化を完了して認証タグを取得
+
+        Returns:
+            残りの暗号文と認証タグ（暗号文の末尾に付加する）
+        """
+        ciphertext = self._encryptor.finalize()
+        self._mac.update(ciphertext)
+        return ciphertext + self._mac.digest()[:AUTH_TAG_SIZE]
+
+
+class StreamingDecryptor:
+    """
+    AES-CTR復号と認証タグ検証を同時に行うクラス
+
+    finalizeで認証タグを検証するまで、updateが返す平文は未認証です。
+    """
+
+    def __init__(self, key: bytes, iv: bytes):
+        """
+        初期化
+
+        Args:
+            key: 復号キー
+            iv: 初期化ベクトル
+        """
+        self._decryptor = Cipher(
+            algorithms.AES(key),
+            modes.CTR(iv),
+            backend=default_backend()
+        ).decryptor()
+        self._mac = hashlib.sha256(key + iv)
+
+    def update(self, ciphertext: bytes) -> bytes:
+        """
+        暗号文を復号
+
+        Args:
+            ciphertext: 暗号文のチャンク（認証タグを含まない）
+
+        Returns:
+            平文のチャンク（未認証）
+        """
+        self._mac.update(ciphertext)
+        return self._decryptor.update(ciphertext)
+
+    def finalize(self, auth_tag: bytes) -> bytes:
+        """
+        復号を完了して認証タグを検証
+
+        Args:
+            auth_tag: 暗号文の末尾に付加された認証タグ
+
+        Returns:
+            残りの平文
+
+        Raises:
+            ValueError: 認証に失敗した場合
+        """
+        plaintext = self._decryptor.finalize()
+        expected_tag = self._mac.digest()[:AUTH_TAG_SIZE]
+        if not hmac.compare_digest(bytes(auth_tag), expected_tag):
+            raise ValueError("認証に失敗しました。データが改ざんされている可能性があります。")
+        return plaintext
+
+
+def decrypt_stream(chunks: Iterable[bytes], key: bytes, iv: bytes,
+                   write: Callable[[bytes], None]) -> int:
+    """
+    「暗号文 + 認証タグ」のチャンク列を1回の走査で復号・検証
+
+    末尾の認証タグは最後のチャンクにまたがっていても構いません。
+    認証に失敗した場合、それまでにwriteへ渡した平文は破棄する必要があります。
+
+    Args:
+        chunks: 暗号文と認証タグを順に分割したチャンク
+        key: 復号キー
+        iv: 初期化ベクトル
+        write: 平文のチャンクを受け取る関数
+
+    Returns:
+        平文の総バイト数
+
+    Raises:
+        ValueError: データが短すぎる場合や認証に失敗した場合
+    """
+    decryptor = StreamingDecryptor(key, iv)
+    tail = b""
+    total = 0
+
+    def emit(ciphertext: bytes) -> None:
+        nonlocal total
+        if len(ciphertext) > 0:
+            plaintext = decryptor.update(ciphertext)
+            write(plaintext)
+            total += len(plaintext)
+
+    # 末尾の認証タグ候補（最後のAUTH_TAG_SIZEバイト）を保持しつつ、それ以前を復号
+    for chunk in chunks:
+        chunk = memoryview(chunk)
+        if len(chunk) >= AUTH_TAG_SIZE:
+            emit(tail)
+            emit(chunk[:-AUTH_TAG_SIZE])
+            tail = bytes(chunk[-AUTH_TAG_SIZE:])
+        else:
+            data = tail + bytes(chunk)
+            emit(data[:-AUTH_TAG_SIZE])
+            tail = data[-AUTH_TAG_SIZE:]
+
+    if len(tail) < AUTH_TAG_SIZE:
+        raise ValueError("データサイズが小さすぎます")
+
+    plaintext = decryptor.finalize(tail)
+    write(plaintext)
+    return total + len(plaintext)
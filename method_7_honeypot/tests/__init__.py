@@ -1,3 +1,10 @@
 """
 暗号学的ハニーポット方式のテストパッケージ
 """
+
+import os
+
+from method_7_honeypot.config import PRIME_POOL_SECRET_ENV
+
+# テスト中は共有の素数プールが秘密の素数をホームディレクトリに保存しないようにする
+os.environ.pop(PRIME_POOL_SECRET_ENV, None)
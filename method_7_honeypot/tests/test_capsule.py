@@ -13,6 +13,8 @@ import tempfile
 import shutil
 import binascii
 import random
+import io
+import copy
 import json
 from datetime import datetime
 from pathlib import Path
@@ -26,7 +28,7 @@ from method_7_honeypot.honeypot_capsule import (
     HoneypotCapsule, HoneypotCapsuleFactory,
     create_honeypot_file, read_data_from_honeypot_file,
     extract_data_from_capsule, create_large_honeypot_file,
-    read_data_from_large_honeypot_file
+    read_data_from_large_honeypot_file, HEADER_SIZE
 )
 
 
@@ -247,6 +249,64 @@ class TestHoneypotCapsule(unittest.TestCase):
         print("エラー処理: 成功")
 
 
+    def test_streaming_serialization(self):
+        """ストリーミングシリアライズとメモリマップ読み込みのテスト"""
+        print("\n=== ストリーミングシリアライズのテスト ===")
+
+        capsule = self.factory.create_capsule(self.true_data, self.false_data, self.metadata)
+
+        # serialize_toはserializeと同一のバイト列を書き込む
+        expected = copy.deepcopy(capsule).serialize()
+        buffer = io.BytesIO()
+        written = capsule.serialize_to(buffer)
+        self.assertEqual(buffer.getvalue(), expected)
+        self.assertEqual(written, len(expected))
+
+        capsule_path = os.path.join(self.test_dir, "stream.hpot")
+        with open(capsule_path, 'wb') as f:
+            copy.deepcopy(capsule).serialize_to(f)
+
+        with HoneypotCapsule.open(capsule_path) as mapped:
+            self.assertEqual(mapped.metadata, self.metadata)
+            self.assertTrue(mapped.verify_checksum())
+            self.assertEqual(extract_data_from_capsule(mapped, KEY_TYPE_TRUE), self.true_data)
+            self.assertEqual(extract_data_from_capsule(mapped, KEY_TYPE_FALSE), self.false_data)
+            self.assertIsInstance(mapped.get_block_by_type(1)['data'], memoryview)
+
+        print("ストリーミングシリアライズ: 成功")
+
+    def test_mapped_block_verification(self):
+        """メモリマップしたブロックは初回アクセス時に検証される"""
+        print("\n=== メモリマップ読み込みの検証テスト ===")
+
+        capsule = HoneypotCapsule()
+        capsule.add_data_block(b"T" * 128, 1)
+        capsule.add_data_block(b"F" * 128, 2)
+        serialized = bytearray(capsule.serialize())
+
+        # 正規データブロックのみを破損させる
+        true_offset = serialized.index(b"T" * 128)
+        serialized[true_offset] ^= 0x01
+        capsule_path = os.path.join(self.test_dir, "corrupted.hpot")
+        with open(capsule_path, 'wb') as f:
+            f.write(serialized)
+
+        with HoneypotCapsule.open(capsule_path) as mapped:
+            self.assertFalse(mapped.verify_checksum())
+            self.assertEqual(bytes(mapped.get_block_by_type(2)['data']), b"F" * 128)
+            with self.assertRaises(ValueError):
+                mapped.get_block_by_type(1)['data']
+
+        # ブロックヘッダーのオフセットがファイル範囲外の場合はopen時に検出
+        serialized[HEADER_SIZE + 8:HEADER_SIZE + 16] = (len(serialized) * 2).to_bytes(8, 'big')
+        with open(capsule_path, 'wb') as f:
+            f.write(serialized)
+        with self.assertRaises(ValueError):
+            HoneypotCapsule.open(capsule_path)
+
+        print("メモリマップ読み込みの検証: 成功")
+
+
 # テスト出力ディレクトリの作成
 os.makedirs('test_output', exist_ok=True)
 
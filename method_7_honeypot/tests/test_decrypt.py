@@ -15,9 +15,11 @@ import binascii
 import time
 import random
 import argparse
+import struct
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any
+from unittest import mock
 
 # テスト対象のモジュール
 import sys
@@ -29,12 +31,19 @@ from method_7_honeypot.trapdoor import (
     derive_keys_from_trapdoor, KEY_TYPE_TRUE, KEY_TYPE_FALSE
 )
 from method_7_honeypot.encrypt import encrypt_files
+from method_7_honeypot.encrypt import process_large_file as encrypt_large_file
 from method_7_honeypot.decrypt import (
     decrypt_file, read_key_from_file, read_key_from_hex,
     derive_key_from_password, read_encrypted_file,
-    determine_key_type, process_large_file, parse_arguments
+    determine_key_type, process_large_file, parse_arguments,
+    decrypt_container_range
 )
+from method_7_honeypot import decrypt as decrypt_module
+from method_7_honeypot.decrypt_pipeline import authenticate_payloads
 from method_7_honeypot.config import TRUE_TEXT_PATH, FALSE_TEXT_PATH
+from method_7_honeypot.chunked_container import (
+    CONTAINER_HEADER_FORMAT, CONTAINER_FOOTER_FORMAT, CONTAINER_FOOTER_SIZE, CHUNK_ENTRY_SIZE
+)
 
 
 class TestDecrypt(unittest.TestCase):
@@ -229,7 +238,25 @@ class TestDecrypt(unittest.TestCase):
             self.keys[KEY_TYPE_FALSE], encrypted_data, metadata
         )
 
-        # 出力はせず、内部的な動作のみを確認
+        # 鍵チェック構造により、データを読まずに判定される
+        self.assertIn('key_check_nonce', metadata)
+        self.assertEqual(true_key_type, KEY_TYPE_TRUE)
+        self.assertEqual(false_key_type, KEY_TYPE_FALSE)
+
+        # 鍵チェック構造を含まない既存ファイルでも判定できる
+        legacy_metadata = {
+            name: value for name, value in metadata.items()
+            if name not in ('key_check_nonce', 'true_key_check', 'false_key_check')
+        }
+        self.assertEqual(
+            determine_key_type(self.keys[KEY_TYPE_TRUE], encrypted_data, legacy_metadata),
+            KEY_TYPE_TRUE
+        )
+        self.assertEqual(
+            determine_key_type(self.keys[KEY_TYPE_FALSE], encrypted_data, legacy_metadata),
+            KEY_TYPE_FALSE
+        )
+
         print("鍵タイプ判定: テスト完了")
 
     def test_invalid_key(self):
@@ -345,6 +372,204 @@ class TestDecrypt(unittest.TestCase):
             # テストは失敗させない（分割処理の問題はオプション機能のため）
             print("このテストはスキップします（大きなファイル分割処理はオプション機能）")
 
+    def test_streaming_large_file_decryption(self):
+        """
+        大きなファイルの1パス復号（認証タグの検証と復号を同時に行う）のテスト
+        """
+        large_true_data = os.urandom(200 * 1024 + 5)
+        large_false_data = os.urandom(150 * 1024)
+
+        large_true_file = os.path.join(self.test_dir, 'stream_true.bin')
+        large_false_file = os.path.join(self.test_dir, 'stream_false.bin')
+        with open(large_true_file, 'wb') as f:
+            f.write(large_true_data)
+        with open(large_false_file, 'wb') as f:
+            f.write(large_false_data)
+
+        encrypted_path = os.path.join(self.test_dir, 'stream.hpot')
+        key_info, _ = encrypt_files(large_true_file, large_false_file, encrypted_path)
+
+        chunk_size = 32 * 1024
+        for key_type, original in ((KEY_TYPE_TRUE, large_true_data), (KEY_TYPE_FALSE, large_false_data)):
+            output = os.path.join(self.test_dir, f'stream_{key_type}.bin')
+            process_large_file(encrypted_path, key_info[key_type], output, chunk_size)
+            with open(output, 'rb') as f:
+                self.assertEqual(f.read(), original)
+            self.assertFalse(os.path.exists(output + '.part'))
+
+        # 不正な鍵・改ざんされたデータでは出力ファイルが作成されない
+        output = os.path.join(self.test_dir, 'stream_invalid.bin')
+        with self.assertRaises(ValueError):
+            process_large_file(encrypted_path, os.urandom(32), output, chunk_size)
+        self.assertFalse(os.path.exists(output))
+        self.assertFalse(os.path.exists(output + '.part'))
+
+        with open(encrypted_path, 'r+b') as f:
+            f.seek(100 * 1024)
+            byte = f.read(1)
+            f.seek(100 * 1024)
+            f.write(bytes([byte[0] ^ 0x01]))
+        with self.assertRaises(ValueError):
+            process_large_file(encrypted_path, key_info[KEY_TYPE_TRUE], output, chunk_size)
+        self.assertFalse(os.path.exists(output))
+
+    def test_streaming_legacy_capsule_equal_work(self):
+        """
+        鍵チェック構造のない既存カプセルでも、両方のブロックを認証してから1回だけ復号すること
+        """
+        large_true_data = os.urandom(100 * 1024 + 7)
+        large_false_data = os.urandom(60 * 1024)
+
+        large_true_file = os.path.join(self.test_dir, 'legacy_true.bin')
+        large_false_file = os.path.join(self.test_dir, 'legacy_false.bin')
+        with open(large_true_file, 'wb') as f:
+            f.write(large_true_data)
+        with open(large_false_file, 'wb') as f:
+            f.write(large_false_data)
+
+        encrypted_path = os.path.join(self.test_dir, 'legacy.hpot')
+        key_info, _ = encrypt_files(large_true_file, large_false_file, encrypted_path)
+
+        chunk_size = 16 * 1024
+        output = os.path.join(self.test_dir, 'legacy_output.bin')
+        expected = {KEY_TYPE_TRUE: [True, False], KEY_TYPE_FALSE: [False, True]}
+        with mock.patch.object(decrypt_module, 'has_key_check', return_value=False):
+            for key_type, original in ((KEY_TYPE_TRUE, large_true_data), (KEY_TYPE_FALSE, large_false_data)):
+                authenticated = []
+
+                def authenticate(payloads, key):
+                    authenticated.append(authenticate_payloads(payloads, key))
+                    return authenticated[-1]
+
+                with mock.patch.object(decrypt_module, 'authenticate_payloads', side_effect=authenticate), \
+                        mock.patch.object(decrypt_module, 'decrypt_chunks_pipelined',
+                                          wraps=decrypt_module.decrypt_chunks_pipelined) as decrypt_call:
+                    process_large_file(encrypted_path, key_info[key_type], output, chunk_size)
+
+                # 両方のブロックを認証し、復号は認証に成功したブロックの1回のみ
+                self.assertEqual(authenticated, [expected[key_type]])
+                self.assertEqual(decrypt_call.call_count, 1)
+                with open(output, 'rb') as f:
+                    self.assertEqual(f.read(), original)
+
+            with mock.patch.object(decrypt_module, 'decrypt_chunks_pipelined') as decrypt_call:
+                with self.assertRaises(ValueError):
+                    process_large_file(encrypted_path, os.urandom(32), output + '.invalid', chunk_size)
+            decrypt_call.assert_not_called()
+            self.assertFalse(os.path.exists(output + '.invalid'))
+
+    def test_chunked_container_decryption(self):
+        """
+        分割ハニーポットコンテナの範囲指定・並列復号のテスト
+        """
+        chunk_size = 1000
+        large_true_data = os.urandom(chunk_size * 5 + 123)
+        large_false_data = os.urandom(chunk_size * 3)
+
+        large_true_file = os.path.join(self.test_dir, 'container_true.bin')
+        large_false_file = os.path.join(self.test_dir, 'container_false.bin')
+        with open(large_true_file, 'wb') as f:
+            f.write(large_true_data)
+        with open(large_false_file, 'wb') as f:
+            f.write(large_false_data)
+
+        container_path = os.path.join(self.test_dir, 'container.hpot')
+        key_info, _ = encrypt_large_file(
+            large_true_file, large_false_file, container_path, max_chunk_size=chunk_size
+        )
+
+        # ファイル全体の復号（並列）
+        for key_type, original in ((KEY_TYPE_TRUE, large_true_data), (KEY_TYPE_FALSE, large_false_data)):
+            output = os.path.join(self.test_dir, f'container_{key_type}.bin')
+            decrypt_file(container_path, key_info[key_type], output)
+            with open(output, 'rb') as f:
+                self.assertEqual(f.read(), original)
+
+        # 範囲指定の復号（チャンク境界をまたぐ範囲・末尾を超える範囲）
+        for offset, length in ((0, 10), (990, 2020), (chunk_size * 5, 500), (2500, None), (10 ** 6, 10)):
+            expected = large_true_data[offset:] if length is None else large_true_data[offset:offset + length]
+            self.assertEqual(
+                decrypt_container_range(container_path, key_info[KEY_TYPE_TRUE], offset, length, max_workers=2),
+                expected
+            )
+        self.assertEqual(
+            decrypt_container_range(container_path, key_info[KEY_TYPE_FALSE], 1500, 1000),
+            large_false_data[1500:2500]
+        )
+
+        # 不正な鍵では復号できない
+        with self.assertRaises(Exception):
+            decrypt_container_range(container_path, os.urandom(32), 0, 10)
+
+    def test_chunked_container_tamper_detection(self):
+        """
+        分割ハニーポットコンテナのチャンク入れ替え・サイズ改ざんの検出と、失敗時に出力を残さないことのテスト
+        """
+        chunk_size = 1000
+        large_true_data = os.urandom(chunk_size * 5 + 1)
+        large_false_data = os.urandom(chunk_size * 3)
+
+        large_true_file = os.path.join(self.test_dir, 'tamper_true.bin')
+        large_false_file = os.path.join(self.test_dir, 'tamper_false.bin')
+        with open(large_true_file, 'wb') as f:
+            f.write(large_true_data)
+        with open(large_false_file, 'wb') as f:
+            f.write(large_false_data)
+
+        container_path = os.path.join(self.test_dir, 'tamper.hpot')
+        key_info, _ = encrypt_large_file(
+            large_true_file, large_false_file, container_path, max_chunk_size=chunk_size
+        )
+        with open(container_path, 'rb') as f:
+            original = f.read()
+        table_offset, _, _, _ = struct.unpack_from(CONTAINER_FOOTER_FORMAT, original,
+                                                   len(original) - CONTAINER_FOOTER_SIZE)
+
+        output = os.path.join(self.test_dir, 'tamper_output.bin')
+
+        # チャンクテーブルの先頭2エントリを入れ替え（各チャンクのタグ自体は正しい）
+        swapped = bytearray(original)
+        first = slice(table_offset, table_offset + CHUNK_ENTRY_SIZE)
+        second = slice(table_offset + CHUNK_ENTRY_SIZE, table_offset + 2 * CHUNK_ENTRY_SIZE)
+        swapped[first], swapped[second] = original[second], original[first]
+
+        # ヘッダーの正規データサイズを書き換え（チャンク数は変わらない）
+        resized = bytearray(original)
+        magic, version, header_chunk_size, true_size, false_size = struct.unpack_from(
+            CONTAINER_HEADER_FORMAT, original, 0)
+        struct.pack_into(CONTAINER_HEADER_FORMAT, resized, 0,
+                         magic, version, header_chunk_size, true_size - 500, false_size)
+
+        for tampered in (swapped, resized):
+            with open(container_path, 'wb') as f:
+                f.write(tampered)
+            with self.assertRaises(ValueError):
+                decrypt_file(container_path, key_info[KEY_TYPE_TRUE], output)
+            with self.assertRaises(ValueError):
+                decrypt_container_range(container_path, key_info[KEY_TYPE_TRUE], 0, 10)
+            self.assertFalse(os.path.exists(output))
+
+        # 途中のチャンクで失敗した場合は不完全な出力を残さない
+        with open(container_path, 'wb') as f:
+            f.write(original)
+        decrypt_chunk = decrypt_module.decrypt_container_chunk
+
+        def failing_chunk(reader, index, key, key_type):
+            if index == 3:
+                raise ValueError("チャンクの認証に失敗しました")
+            return decrypt_chunk(reader, index, key, key_type)
+
+        with mock.patch.object(decrypt_module, 'decrypt_container_chunk', side_effect=failing_chunk):
+            with self.assertRaises(ValueError):
+                decrypt_module.decrypt_container_file(container_path, key_info[KEY_TYPE_TRUE], output,
+                                                      max_workers=1)
+        self.assertFalse(os.path.exists(output))
+        self.assertFalse(os.path.exists(output + '.part'))
+
+        decrypt_module.decrypt_container_file(container_path, key_info[KEY_TYPE_TRUE], output)
+        with open(output, 'rb') as f:
+            self.assertEqual(f.read(), large_true_data)
+
     def test_timing_attack_resistance(self):
         """
         タイミング攻撃耐性のテスト
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+パイプライン復号の単体テスト
+
+読み込み・復号・書き込みを分けたパイプラインが、1回の走査による復号
+（decrypt_stream）と同じ結果になること、改ざんや書き込みエラーが
+呼び出し元に伝わることを確認します。
+"""
+
+import io
+import os
+import unittest
+
+# テスト対象のモジュールをインポート
+from method_7_honeypot.stream_cipher import StreamingEncryptor, decrypt_stream
+from method_7_honeypot.decrypt_pipeline import (
+    decrypt_chunks_pipelined, decrypt_ctr_segment, resolve_pipeline_size
+)
+
+
+def _split(data: bytes, sizes):
+    """データを指定サイズの繰り返しで分割"""
+    chunks = []
+    position = 0
+    index = 0
+    while position < len(data):
+        size = sizes[index % len(sizes)]
+        chunks.append(data[position:position + size])
+        position += size
+        index += 1
+    return chunks
+
+
+class TestDecryptPipeline(unittest.TestCase):
+    """パイプライン復号のテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.key = os.urandom(32)
+        self.plaintext = os.urandom(100 * 1024 + 7)
+
+        encryptor = StreamingEncryptor(self.key)
+        self.iv = encryptor.iv
+        self.payload = encryptor.update(self.plaintext) + encryptor.finalize()
+
+    def _decrypt(self, chunks, **kwargs) -> bytes:
+        output = io.BytesIO()
+        total = decrypt_chunks_pipelined(
+            chunks, len(self.payload), self.key, self.iv, output.write, 8 * 1024, **kwargs
+        )
+        self.assertEqual(total, len(output.getvalue()))
+        return output.getvalue()
+
+    def test_ctr_segment(self):
+        """暗号文の途中（ブロック境界以外を含む）から復号できる"""
+        for offset in (0, 16, 17, 4095):
+            segment = memoryview(self.payload)[offset:offset + 1000]
+            out = bytearray(len(segment) + 15)
+            written = decrypt_ctr_segment(self.key, self.iv, offset, segment, out)
+            self.assertEqual(bytes(out[:written]), self.plaintext[offset:offset + 1000])
+
+    def test_matches_stream_decryption(self):
+        """チャンクの分割や並列度に関係なく1パス復号と同じ結果になる"""
+        expected = io.BytesIO()
+        decrypt_stream([self.payload], self.key, self.iv, expected.write)
+
+        for sizes in ([8 * 1024], [32, 8 * 1024], [5, 3000, 20000]):
+            for max_workers, depth in ((1, 1), (3, 2), (4, 8)):
+                chunks = _split(self.payload, sizes)
+                self.assertEqual(
+                    self._decrypt(chunks, max_workers=max_workers, depth=depth),
+                    expected.getvalue()
+                )
+
+    def test_tampered_data_rejected(self):
+        """改ざんされた暗号文・認証タグでは認証に失敗する"""
+        for position in (10, len(self.payload) - 1):
+            tampered = bytearray(self.payload)
+            tampered[position] ^= 0x01
+            with self.assertRaises(ValueError):
+                self._decrypt(_split(bytes(tampered), [4096]), max_workers=2)
+
+        with self.assertRaises(ValueError):
+            self._decrypt([self.payload[:-1]], max_workers=2)
+
+    def test_write_error_propagated(self):
+        """書き込みステージのエラーがパイプラインを停止して伝わる"""
+        def failing_write(data):
+            raise OSError("disk full")
+
+        with self.assertRaises(OSError):
+            decrypt_chunks_pipelined(
+                _split(self.payload, [1024]), len(self.payload), self.key, self.iv,
+                failing_write, 1024, max_workers=2, depth=2
+            )
+
+    def test_resolve_pipeline_size(self):
+        """既定のキューの深さはワーカー数の2倍"""
+        self.assertEqual(resolve_pipeline_size(3, 0), (3, 6))
+        self.assertEqual(resolve_pipeline_size(2, 5), (2, 5))
+        self.assertGreaterEqual(resolve_pipeline_size(0, 0)[0], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
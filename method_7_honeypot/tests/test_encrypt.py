@@ -21,13 +21,15 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 
 # テスト対象のモジュールをインポート
 from method_7_honeypot.encrypt import (
-    read_file, symmetric_encrypt, encrypt_files, save_keys
+    read_file, symmetric_encrypt, encrypt_files, save_keys,
+    process_large_file
 )
 from method_7_honeypot.trapdoor import (
     create_master_key, create_trapdoor_parameters,
     derive_keys_from_trapdoor, KEY_TYPE_TRUE, KEY_TYPE_FALSE
 )
-from method_7_honeypot.honeypot_capsule import read_data_from_honeypot_file
+from method_7_honeypot.honeypot_capsule import read_data_from_honeypot_file, extract_data_from_capsule
+from method_7_honeypot.chunked_container import ChunkedContainerReader
 
 
 class TestEncrypt(unittest.TestCase):
@@ -160,6 +162,41 @@ class TestEncrypt(unittest.TestCase):
                 saved_key = f.read()
             self.assertEqual(saved_key, key_info[key_type])
 
+    def test_process_large_file_pipeline(self):
+        """分割暗号化パイプラインのテスト"""
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+        chunk_size = 1024
+        large_true = os.urandom(chunk_size * 4 + 100)
+        large_false = os.urandom(chunk_size * 2 + 7)
+        with open(self.true_file, "wb") as f:
+            f.write(large_true)
+        with open(self.false_file, "wb") as f:
+            f.write(large_false)
+
+        key_info, metadata = process_large_file(
+            self.true_file, self.false_file, self.output_file,
+            max_chunk_size=chunk_size, max_workers=3
+        )
+        self.assertEqual(metadata["chunks"], 5)
+
+        # 1つのコンテナに全チャンクが番号順に格納され、それぞれの鍵で復号できることを確認
+        with ChunkedContainerReader(self.output_file) as reader:
+            self.assertEqual(len(reader), 5)
+            self.assertEqual(reader.metadata, metadata)
+
+            for key_type, original in ((KEY_TYPE_TRUE, large_true), (KEY_TYPE_FALSE, large_false)):
+                restored = b""
+                for chunk_number in range(len(reader)):
+                    encrypted = extract_data_from_capsule(reader.read_capsule(chunk_number), key_type)
+                    self.assertEqual(encrypted[-16:], reader.chunks[chunk_number][f"{key_type}_tag"])
+
+                    iv = reader.chunks[chunk_number][f"{key_type}_iv"]
+                    decryptor = Cipher(algorithms.AES(key_info[key_type]), modes.CTR(iv)).decryptor()
+                    restored += decryptor.update(encrypted[:-16]) + decryptor.finalize()
+
+                self.assertEqual(restored, original)
+
     def test_end_to_end(self):
         """エンドツーエンドのテスト（暗号化から復号まで）"""
         # ファイルを暗号化
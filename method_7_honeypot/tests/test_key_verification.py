@@ -23,7 +23,8 @@ from method_7_honeypot.trapdoor import (
 )
 from method_7_honeypot.key_verification import (
     KeyVerifier, HoneyTokenManager, DeceptionManager,
-    verify_key_and_select_path
+    verify_key_and_select_path, verify_keys_and_select_paths,
+    create_key_check, has_key_check, classify_key_with_check
 )
 
 
@@ -176,6 +177,50 @@ class TestKeyVerification(unittest.TestCase):
         workflow_time_diff = abs(true_workflow_time - false_workflow_time)
         self.assertLess(workflow_time_diff, 0.2)  # 200ms以内の差を許容
 
+    def test_batch_verification(self):
+        """複数鍵の一括検証のテスト"""
+        verifier = KeyVerifier(self.params, self.salt)
+        keys = [self.keys[KEY_TYPE_TRUE], self.keys[KEY_TYPE_FALSE], self.keys[KEY_TYPE_TRUE]]
+        expected = [KEY_TYPE_TRUE, KEY_TYPE_FALSE, KEY_TYPE_TRUE]
+
+        # 順次・並列のどちらでも入力順の結果が得られる
+        self.assertEqual(verifier.verify_keys(keys), expected)
+        self.assertEqual(verifier.verify_keys(keys, max_workers=3), expected)
+        self.assertEqual(verifier.verify_keys([]), [])
+
+        # 経路選択も鍵ごとに行われる
+        results = verify_keys_and_select_paths(keys, self.params, self.salt, max_workers=2)
+        self.assertEqual([key_type for key_type, _ in results], expected)
+        self.assertEqual([context['path'] for _, context in results],
+                         ['authentic', 'deception', 'authentic'])
+
+        # トークンの一括検証
+        manager = HoneyTokenManager(self.params)
+        token_results = manager.verify_tokens([
+            (self.true_token, self.keys[KEY_TYPE_TRUE]),
+            (self.false_token, self.keys[KEY_TYPE_FALSE]),
+            (os.urandom(len(self.true_token)), self.keys[KEY_TYPE_TRUE])
+        ])
+        self.assertEqual(token_results, [(True, KEY_TYPE_TRUE), (True, KEY_TYPE_FALSE), (False, "")])
+
+    def test_key_check_classification(self):
+        """鍵チェック構造による鍵タイプ判定のテスト"""
+        metadata = create_key_check(self.keys)
+        self.assertTrue(has_key_check(metadata))
+        self.assertFalse(has_key_check({}))
+
+        # 両方の鍵が正しく判定される
+        self.assertEqual(classify_key_with_check(self.keys[KEY_TYPE_TRUE], metadata), KEY_TYPE_TRUE)
+        self.assertEqual(classify_key_with_check(self.keys[KEY_TYPE_FALSE], metadata), KEY_TYPE_FALSE)
+
+        # 無関係な鍵はどちらにも一致しない
+        self.assertIsNone(classify_key_with_check(os.urandom(32), metadata))
+
+        # 鍵チェック値は鍵そのものを含まない
+        for value in metadata.values():
+            for key in self.keys.values():
+                self.assertNotIn(binascii.hexlify(key).decode(), value)
+
 
 def run_tests():
     """テスト実行関数"""
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+素数プールの単体テスト
+
+事前生成した素数の払い出し、暗号化された予備の保存・再利用、
+プールが空の場合の同期生成を確認します。
+"""
+
+import os
+import json
+import time
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+# テスト対象のモジュールをインポート
+from method_7_honeypot.config import PRIME_POOL_SECRET_ENV
+from method_7_honeypot.prime_pool import PrimePool, generate_primes
+
+
+class TestPrimePool(unittest.TestCase):
+    """素数プールのテストケース"""
+
+    BITS = 1024
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.reserve_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.reserve_dir)
+
+    def _create_pool(self, **kwargs) -> PrimePool:
+        kwargs.setdefault('background', False)
+        kwargs.setdefault('reserve_secret', b'test reserve secret')
+        pool = PrimePool(self.BITS, reserve_dir=self.reserve_dir, **kwargs)
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_generate_primes(self):
+        """同期生成で目標ビット長の素数が2つ得られる"""
+        primes = generate_primes(self.BITS)
+        self.assertEqual(len(primes), 2)
+        for prime in primes:
+            self.assertEqual(prime.bit_length(), self.BITS)
+            self.assertEqual(pow(2, prime - 1, prime), 1)
+
+    def test_take_from_filled_pool(self):
+        """補充済みのプールから同期生成なしで払い出される"""
+        pool = self._create_pool(depth=4)
+        pool.fill()
+        self.assertEqual(len(pool), 4)
+
+        taken = {pool.take() for _ in range(4)}
+        self.assertEqual(len(taken), 4)
+        self.assertEqual(pool.sync_generation_count, 0)
+
+        # 空になった後は同期生成にフォールバックする
+        prime = pool.take()
+        self.assertNotIn(prime, taken)
+        self.assertEqual(pool.sync_generation_count, 1)
+
+    def test_reserve_persisted_encrypted(self):
+        """未使用の素数は暗号化して保存され、次回は一度だけ再利用される"""
+        pool = self._create_pool(depth=4)
+        pool.fill()
+        taken = pool.take()
+        remaining = set(pool._primes)
+        pool.close()
+
+        with open(pool.reserve_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        for prime in remaining:
+            self.assertNotIn(format(prime, 'x'), content)
+
+        reloaded = self._create_pool(depth=4)
+        self.assertEqual(set(reloaded._primes), remaining)
+        self.assertNotIn(taken, reloaded._primes)
+        self.assertFalse(os.path.exists(reloaded.reserve_path))
+
+        # 予備は取得済みのため、別のプールには読み込まれない
+        self.assertEqual(len(self._create_pool(depth=4)), 0)
+
+    def test_reserve_key_not_stored(self):
+        """暗号化鍵は予備と同じ場所に保存されず、別の秘密値では復元できない"""
+        pool = self._create_pool(depth=2)
+        pool.fill()
+        pool.close()
+        self.assertEqual(os.listdir(self.reserve_dir), [os.path.basename(pool.reserve_path)])
+
+        self.assertEqual(len(self._create_pool(depth=2, reserve_secret=b'other secret')), 0)
+
+    def test_no_secret_disables_reserve(self):
+        """秘密値が設定されていない場合は予備をディスクに保存しない"""
+        with mock.patch.dict(os.environ):
+            os.environ.pop(PRIME_POOL_SECRET_ENV, None)
+            pool = self._create_pool(depth=2, reserve_secret=None)
+        self.assertIsNone(pool.reserve_path)
+        pool.fill()
+        pool.close()
+        self.assertEqual(os.listdir(self.reserve_dir), [])
+
+    def test_tampered_reserve_discarded(self):
+        """改ざんされた予備は破棄される"""
+        pool = self._create_pool(depth=2)
+        pool.fill()
+        pool.close()
+
+        with open(pool.reserve_path, 'r', encoding='utf-8') as f:
+            reserve = json.load(f)
+        reserve['ciphertext'] = ('0' if reserve['ciphertext'][0] != '0' else '1') + reserve['ciphertext'][1:]
+        with open(pool.reserve_path, 'w', encoding='utf-8') as f:
+            json.dump(reserve, f)
+
+        self.assertEqual(len(self._create_pool(depth=2)), 0)
+
+    def test_background_refill(self):
+        """バックグラウンドスレッドが設定深さまで補充する"""
+        pool = self._create_pool(depth=4, background=True)
+        pool.take()
+
+        deadline = time.time() + 60
+        while len(pool) < 4 and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(len(pool), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+起動時間ベンチマークの単体テスト
+
+-X importtime の出力解析、予算との比較、保存された予算に記録された
+禁止モジュールが起動時にインポートされないことを確認します。
+インポート時間（ミリ秒）の予算は実行環境に依存するため、通常は
+`python -m method_7_honeypot.startup_benchmark` で確認し、単体テストでは
+環境変数 STARTUP_TIMING_ENV を設定した場合のみ確認します。
+"""
+
+import os
+import unittest
+
+# テスト対象のモジュールをインポート
+from method_7_honeypot.startup_benchmark import (
+    parse_importtime, check_budget, load_budget, run_benchmark
+)
+
+
+# インポート時間の予算もテストする場合に設定する環境変数
+STARTUP_TIMING_ENV = "HONEYPOT_STARTUP_TIMING_TESTS"
+
+SAMPLE_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        900 |     method_7_honeypot.deception
+import time:       400 |       1500 |   method_7_honeypot.trapdoor
+import time:       600 |       2500 | method_7_honeypot.decrypt
+"""
+
+
+class TestStartupBenchmark(unittest.TestCase):
+    """起動時間ベンチマークのテストケース"""
+
+    def test_parse_importtime(self):
+        """累積インポート時間がモジュールごとに得られる"""
+        modules = parse_importtime(SAMPLE_OUTPUT)
+        self.assertEqual(modules['method_7_honeypot.decrypt'], 2500)
+        self.assertEqual(modules['method_7_honeypot.deception'], 900)
+        self.assertNotIn('package', modules)
+
+    def test_check_budget(self):
+        """インポート時間の超過と禁止モジュールのインポートが検出される"""
+        budget = {
+            'version': 1,
+            'modules': {
+                'method_7_honeypot.decrypt': {
+                    'max_import_ms': 2.0,
+                    'forbidden_imports': ['method_7_honeypot.deception']
+                }
+            }
+        }
+        modules = parse_importtime(SAMPLE_OUTPUT)
+        result = {
+            'module': 'method_7_honeypot.decrypt',
+            'import_ms': modules['method_7_honeypot.decrypt'] / 1000,
+            'imported': sorted(modules)
+        }
+
+        violations = check_budget([result], budget)
+        self.assertEqual(len(violations), 2)
+
+        result['import_ms'] = 1.0
+        result['imported'] = ['method_7_honeypot.decrypt']
+        self.assertEqual(check_budget([result], budget), [])
+
+        # 時間を確認しない場合は禁止モジュールのみ検出される
+        result['import_ms'] = 5.0
+        self.assertEqual(check_budget([result], budget, check_time=False), [])
+
+    def test_stored_budget_imports(self):
+        """保存された予算の禁止モジュールが起動時にインポートされない"""
+        budget = load_budget()
+        results = run_benchmark(budget, repeats=1)
+        self.assertEqual(len(results), len(budget['modules']))
+        self.assertEqual(check_budget(results, budget, check_time=False), [])
+
+    @unittest.skipUnless(os.environ.get(STARTUP_TIMING_ENV), f"{STARTUP_TIMING_ENV} が設定されていません")
+    def test_stored_budget_timing(self):
+        """保存された予算の時間内で各モジュールをインポートできる（環境依存のため任意）"""
+        budget = load_budget()
+        self.assertEqual(check_budget(run_benchmark(budget), budget), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
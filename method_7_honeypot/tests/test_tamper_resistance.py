@@ -30,6 +30,8 @@ from method_7_honeypot.deception import (
     DynamicPathSelector, ObfuscatedVerifier,
     verify_with_tamper_resistance
 )
+from method_7_honeypot import deception
+from method_7_honeypot.integrity_cache import IntegrityCache, stat_signature
 
 
 class TestTamperResistance(unittest.TestCase):
@@ -99,6 +101,83 @@ class TestTamperResistance(unittest.TestCase):
 
             print(f"モジュール '{module_name}' の整合性検証インターフェイスを確認: 成功")
 
+    def test_integrity_recheck_on_stat_change(self):
+        """
+        モジュールファイルの状態が変化した場合のみ再検証されることのテスト
+        """
+        # 遅延初期化を済ませてから検証対象を差し替える
+        deception._ensure_initialized()
+
+        module_path = os.path.join(self.test_dir, 'trapdoor.py')
+        shutil.copy(deception._module_file_path('trapdoor'), module_path)
+
+        with patch.object(deception, '_module_file_path', return_value=module_path), \
+                patch.object(deception, '_module_states', {}), \
+                patch.object(deception, '_integrity_cache', IntegrityCache(None)), \
+                patch.dict(deception.MODULE_HASHES), patch.dict(deception.BYTECODE_HASHES):
+            generate_module_hashes()
+            self.assertTrue(verify_module_integrity('trapdoor'))
+
+            # 状態が変化していなければハッシュを再計算しない
+            with patch.object(deception, 'compute_source_hash') as compute:
+                self.assertTrue(verify_module_integrity('trapdoor'))
+                compute.assert_not_called()
+
+            # ファイルを改変すると状態の変化により再検証される
+            with open(module_path, 'a', encoding='utf-8') as f:
+                f.write("\n# tampered\n")
+            self.assertFalse(verify_module_integrity('trapdoor'))
+
+    def test_runtime_patch_detected_without_stat_change(self):
+        """
+        ファイルの状態が変わらなくても、実行中の関数の差し替えが検出されることのテスト
+        """
+        deception._ensure_initialized()
+        trapdoor_module = sys.modules['method_7_honeypot.trapdoor']
+
+        with patch.object(deception, '_module_states', {}), \
+                patch.object(deception, '_integrity_cache', IntegrityCache(None)), \
+                patch.dict(deception.MODULE_HASHES), patch.dict(deception.BYTECODE_HASHES):
+            generate_module_hashes()
+            self.assertTrue(verify_module_integrity('trapdoor'))
+
+            # ソースのハッシュはキャッシュから再利用されるが、バイトコードは毎回計算される
+            with patch.object(trapdoor_module, 'derive_keys_from_trapdoor', lambda params: ({}, b'')), \
+                    patch.object(deception, 'compute_source_hash') as compute:
+                self.assertFalse(verify_module_integrity('trapdoor'))
+                self.assertNotEqual(deception._compute_bytecode_hash('trapdoor'),
+                                    deception.BYTECODE_HASHES['trapdoor'])
+                compute.assert_not_called()
+
+            self.assertTrue(verify_module_integrity('trapdoor'))
+
+    def test_integrity_cache_persistence(self):
+        """
+        整合性検証キャッシュが実行間で保存されることのテスト
+        """
+        cache_path = os.path.join(self.test_dir, 'cache', 'integrity_cache.json')
+        target_path = os.path.join(self.test_dir, 'module.py')
+        with open(target_path, 'w', encoding='utf-8') as f:
+            f.write("value = 1\n")
+
+        signature = stat_signature(target_path)
+        cache = IntegrityCache(cache_path)
+        cache.store(target_path, signature, b'\x01' * 32)
+        cache.save()
+
+        # バイトコードのハッシュはディスクに保存しない
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            self.assertNotIn('bytecode_hash', f.read())
+
+        # 状態が一致する間は保存されたハッシュを使用する
+        reloaded = IntegrityCache(cache_path)
+        self.assertEqual(reloaded.lookup(target_path, signature), b'\x01' * 32)
+
+        # 状態が変化した場合は使用しない
+        with open(target_path, 'a', encoding='utf-8') as f:
+            f.write("value = 2\n")
+        self.assertIsNone(reloaded.lookup(target_path, stat_signature(target_path)))
+
     def test_dynamic_path_selection(self):
         """
         動的経路選択のテスト
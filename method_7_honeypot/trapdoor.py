@@ -20,7 +20,7 @@ from typing import Tuple, Dict, Any, Optional, Union, List, Callable
 from .config import (
     KEY_SIZE_BITS, SYMMETRIC_KEY_SIZE, SALT_SIZE,
     KDF_ITERATIONS, TOKEN_SIZE, DECISION_THRESHOLD,
-    RANDOMIZATION_FACTOR, TIME_VARIANCE_MS
+    RANDOMIZATION_FACTOR, TIME_VARIANCE_MS, PRIME_POOL_ENABLED
 )
 
 # 鍵タイプの定数
@@ -139,6 +139,34 @@ def generate_prime(bits: int) -> int:
     return p
 
 
+def _take_prime_pair(bits: int) -> Tuple[int, int]:
+    """
+    互いに異なる2つの素数を取得（素数プールが有効な場合はプールから払い出す）
+
+    Args:
+        bits: 素数のビット長
+
+    Returns:
+        (p, q): 素数のタプル
+    """
+    if not PRIME_POOL_ENABLED:
+        p = generate_prime(bits)
+        q = generate_prime(bits)
+        while q == p:
+            q = generate_prime(bits)
+        return p, q
+
+    # 素数プールは初回使用時にインポートする（起動時間の短縮）
+    from .prime_pool import get_prime_pool
+
+    pool = get_prime_pool(bits)
+    p = pool.take()
+    q = pool.take()
+    while q == p:
+        q = pool.take()
+    return p, q
+
+
 def create_trapdoor_parameters(master_key: bytes) -> Dict[str, Any]:
     """
     マスター鍵からトラップドア関数のパラメータを生成
@@ -153,8 +181,7 @@ def create_trapdoor_parameters(master_key: bytes) -> Dict[str, Any]:
     seed = hashlib.sha512(master_key).digest()
 
     # パラメータ生成（RSAに似た構造）
-    p = generate_prime(KEY_SIZE_BITS // 2)
-    q = generate_prime(KEY_SIZE_BITS // 2)
+    p, q = _take_prime_pair(KEY_SIZE_BITS // 2)
 
     # モジュラス（n = p * q）
     n = p * q
@@ -230,7 +257,33 @@ def derive_keys_from_trapdoor(params: Dict[str, Any]) -> Tuple[Dict[str, bytes],
     return keys, salt
 
 
-def evaluate_key_type(key: bytes, params: Dict[str, Any], salt: bytes) -> str:
+def derive_expected_key_material(params: Dict[str, Any], salt: bytes) -> Dict[str, bytes]:
+    """
+    鍵タイプの判定に使用する各経路の期待鍵材料を導出
+
+    パラメータとソルトのみに依存するため、同じコンテナに対して複数の鍵を
+    判定する場合は一度だけ導出して再利用できます。
+
+    Args:
+        params: トラップドアパラメータ
+        salt: 鍵導出に使用されたソルト
+
+    Returns:
+        鍵タイプをキー、期待鍵材料を値とする辞書
+    """
+    expected = {}
+    for key_type, param_name in ((KEY_TYPE_TRUE, 'true_param'), (KEY_TYPE_FALSE, 'false_param')):
+        base = (params[param_name] * params['d']) % params['n']
+        expected[key_type] = hmac.new(
+            salt,
+            safe_int_to_bytes(base, KEY_SIZE_BITS // 8),
+            hashlib.sha512
+        ).digest()[:SYMMETRIC_KEY_SIZE]
+    return expected
+
+
+def evaluate_key_type(key: bytes, params: Dict[str, Any], salt: bytes,
+                      expected_key_material: Optional[Dict[str, bytes]] = None) -> str:
     """
     入力鍵がどのタイプの鍵かを判定
 
@@ -241,6 +294,8 @@ def evaluate_key_type(key: bytes, params: Dict[str, Any], salt: bytes) -> str:
         key: 評価する鍵
         params: トラップドアパラメータ
         salt: 鍵導出に使用されたソルト
+        expected_key_material: 導出済みの期待鍵材料（derive_expected_key_material の戻り値、
+                               省略時はここで導出）
 
     Returns:
         鍵のタイプ（"true" または "false"）
@@ -251,22 +306,11 @@ def evaluate_key_type(key: bytes, params: Dict[str, Any], salt: bytes) -> str:
     # 鍵を使って正規鍵と非正規鍵のどちらに近いかを計算
     # 完全に一致する場合は別として、数学的な距離を計算して近い方を選択
 
-    # 鍵から正規/非正規に対応する値を導出
-    # 正規鍵の場合の期待値
-    true_base = (params['true_param'] * params['d']) % params['n']
-    true_key_material = hmac.new(
-        salt,
-        safe_int_to_bytes(true_base, KEY_SIZE_BITS // 8),
-        hashlib.sha512
-    ).digest()[:SYMMETRIC_KEY_SIZE]
-
-    # 非正規鍵の場合の期待値
-    false_base = (params['false_param'] * params['d']) % params['n']
-    false_key_material = hmac.new(
-        salt,
-        safe_int_to_bytes(false_base, KEY_SIZE_BITS // 8),
-        hashlib.sha512
-    ).digest()[:SYMMETRIC_KEY_SIZE]
+    # 正規鍵・非正規鍵の場合の期待値
+    if expected_key_material is None:
+        expected_key_material = derive_expected_key_material(params, salt)
+    true_key_material = expected_key_material[KEY_TYPE_TRUE]
+    false_key_material = expected_key_material[KEY_TYPE_FALSE]
 
     # バイト単位で比較する（ビット単位のハミング距離のような指標）
     true_distance = sum(a != b for a, b in zip(key, true_key_material))
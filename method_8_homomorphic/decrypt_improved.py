@@ -253,6 +253,12 @@ def decrypt_data(encrypted_data: bytes, key_params: Dict[str, Any]) -> bytes:
     paillier = PaillierCryptosystem()
     paillier.public_key = {"n": pubkey_n, "g": pubkey_g}
     paillier.private_key = {"lambda": lambda_n, "mu": mu}
+    # CRT decryption values (older key files do not have them and use standard decryption)
+    for name in PaillierCryptosystem.CRT_KEY_FIELDS:
+        if name in private_key:
+            paillier.private_key[name] = int(private_key[name])
+    # Restore p and q from the key file's prime factor and n // prime_factor
+    paillier.set_crt_factor(key_params.get("parameters", {}).get("prime_factors", {}).get("factor"))
 
     # Determine which dataset to decrypt based on mathematical properties
     # This replaces the explicit dataset type identifier
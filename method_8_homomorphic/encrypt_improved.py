@@ -82,6 +82,10 @@ class PaillierCryptosystem:
     Paillier homomorphic encryption system implementation.
     Provides additive homomorphic properties: E(a) * E(b) = E(a + b)
     """
+    # CRT values stored in key files (q_inv is q^(-1) mod p)
+    # p and q themselves are not stored; they are restored with set_crt_factor on load
+    CRT_KEY_FIELDS = ("hp", "hq", "q_inv")
+
     def __init__(self, key_size=PAILLIER_KEY_BITS):
         self.key_size = key_size
         self.public_key = None
@@ -114,6 +118,8 @@ class PaillierCryptosystem:
         # Set the public and private keys
         self.public_key = {"n": n, "g": g}
         self.private_key = {"lambda": lambda_n, "mu": mu}
+        # Precompute the values used for CRT decryption
+        self.private_key.update(self._crt_parameters(self._p, self._q, g))
 
         return self.public_key, self.private_key
 
@@ -129,6 +135,20 @@ class PaillierCryptosystem:
             raise ValueError("Key pair has not been generated yet")
         return self._q
 
+    def set_crt_factor(self, prime_factor) -> bool:
+        """Restore p and q for CRT decryption from the key file's prime factor and n // prime_factor (ordered by q_inv)"""
+        n = self.public_key["n"]
+        q_inv = self.private_key.get("q_inv")
+        if not prime_factor or not q_inv or n % prime_factor != 0:
+            return False
+
+        other = n // prime_factor
+        for p, q in ((prime_factor, other), (other, prime_factor)):
+            if p > 1 and q > 1 and q * q_inv % p == 1:
+                self._p, self._q = p, q
+                return True
+        return False
+
     def encrypt(self, m):
         """
         Encrypt a message using the Paillier cryptosystem
@@ -174,15 +194,20 @@ class PaillierCryptosystem:
             raise ValueError("Private key not set")
 
         n = self.public_key["n"]
-        lambda_n = self.private_key["lambda"]
-        mu = self.private_key["mu"]
-        n_squared = n * n
-
-        # Decrypt: m = L(c^lambda mod n^2) * mu mod n
-        # where L(x) = (x-1)/n
-        c_lambda = pow(c, lambda_n, n_squared)
-        L = (c_lambda - 1) // n
-        m = (L * mu) % n
+        if self._use_crt(n):
+            # Work modulo p^2 and q^2 and recombine (faster than modulo n^2)
+            m = self._decrypt_crt(c)
+        else:
+            # Keys without the CRT values use the standard decryption
+            lambda_n = self.private_key["lambda"]
+            mu = self.private_key["mu"]
+            n_squared = n * n
+
+            # Decrypt: m = L(c^lambda mod n^2) * mu mod n
+            # where L(x) = (x-1)/n
+            c_lambda = pow(c, lambda_n, n_squared)
+            L = (c_lambda - 1) // n
+            m = (L * mu) % n
 
         return m
 
@@ -250,6 +275,33 @@ class PaillierCryptosystem:
         """Calculate the modular inverse of a mod m"""
         return pow(a, -1, m)
 
+    def _crt_parameters(self, p, q, g):
+        """Precompute the CRT private key values (hp = L_p(g^(p-1) mod p^2)^(-1) mod p, likewise hq)"""
+        hp = self._mod_inverse((pow(g, p - 1, p * p) - 1) // p, p)
+        hq = self._mod_inverse((pow(g, q - 1, q * q) - 1) // q, q)
+        return {"hp": hp, "hq": hq, "q_inv": self._mod_inverse(q, p)}
+
+    def _use_crt(self, n):
+        """Check whether p and q are restored and the private key has CRT values matching the public modulus"""
+        key = self.private_key
+        if self._p is None or self._q is None:
+            return False
+        if not all(key.get(name) for name in self.CRT_KEY_FIELDS):
+            return False
+        return self._p * self._q == n
+
+    def _decrypt_crt(self, c):
+        """Decrypt modulo p^2 and q^2 and recombine with the Chinese Remainder Theorem"""
+        p = self._p
+        q = self._q
+
+        # m_p = L_p(c^(p-1) mod p^2) * hp mod p, likewise m_q
+        m_p = ((pow(c, p - 1, p * p) - 1) // p) * self.private_key["hp"] % p
+        m_q = ((pow(c, q - 1, q * q) - 1) // q) * self.private_key["hq"] % q
+
+        # Find m with m = m_p (mod p) and m = m_q (mod q)
+        return m_q + q * ((m_p - m_q) * self.private_key["q_inv"] % p)
+
     def _get_random_coprime(self, n):
         """Generate a random number coprime to n"""
         while True:
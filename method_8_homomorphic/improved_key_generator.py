@@ -43,6 +43,10 @@ class PaillierCryptosystem:
     Paillier homomorphic encryption system implementation.
     Provides additive homomorphic properties: E(a) * E(b) = E(a + b)
     """
+    # CRT values stored in key files (q_inv is q^(-1) mod p)
+    # p and q themselves are not stored; they are restored with set_crt_factor on load
+    CRT_KEY_FIELDS = ("hp", "hq", "q_inv")
+
     def __init__(self, key_size=PAILLIER_KEY_BITS):
         self.key_size = key_size
         self.public_key = None
@@ -75,6 +79,8 @@ class PaillierCryptosystem:
         # Set the public and private keys
         self.public_key = {"n": n, "g": g}
         self.private_key = {"lambda": lambda_n, "mu": mu}
+        # Precompute the values used for CRT decryption
+        self.private_key.update(self._crt_parameters(self._p, self._q, g))
 
         return self.public_key, self.private_key
 
@@ -90,6 +96,20 @@ class PaillierCryptosystem:
             raise ValueError("Key pair has not been generated yet")
         return self._q
 
+    def set_crt_factor(self, prime_factor) -> bool:
+        """Restore p and q for CRT decryption from the key file's prime factor and n // prime_factor (ordered by q_inv)"""
+        n = self.public_key["n"]
+        q_inv = self.private_key.get("q_inv")
+        if not prime_factor or not q_inv or n % prime_factor != 0:
+            return False
+
+        other = n // prime_factor
+        for p, q in ((prime_factor, other), (other, prime_factor)):
+            if p > 1 and q > 1 and q * q_inv % p == 1:
+                self._p, self._q = p, q
+                return True
+        return False
+
     def _lcm(self, a, b):
         """Calculate the least common multiple of a and b"""
         return a * b // math.gcd(a, b)
@@ -98,6 +118,12 @@ class PaillierCryptosystem:
         """Calculate the modular inverse of a mod m"""
         return pow(a, -1, m)
 
+    def _crt_parameters(self, p, q, g):
+        """Precompute the CRT private key values (hp = L_p(g^(p-1) mod p^2)^(-1) mod p, likewise hq)"""
+        hp = self._mod_inverse((pow(g, p - 1, p * p) - 1) // p, p)
+        hq = self._mod_inverse((pow(g, q - 1, q * q) - 1) // q, q)
+        return {"hp": hp, "hq": hq, "q_inv": self._mod_inverse(q, p)}
+
 def generate_fibonacci_sequence(seed_val, length=5):
     """
     Generate a Fibonacci-like sequence starting with seed values derived from seed_val
@@ -175,6 +201,10 @@ def generate_improved_key_parameters(master_seed: bytes = None) -> Tuple[Dict[st
         "lambda": paillier.private_key["lambda"],
         "mu": paillier.private_key["mu"]
     }
+    # Include the CRT decryption values but not p and q, which are restored from the prime factor on load
+    # (older key files without them use standard decryption)
+    for name in PaillierCryptosystem.CRT_KEY_FIELDS:
+        private_key[name] = paillier.private_key[name]
 
     # Create a generator with a fixed seed for reproducible paths
     path_rng = random.Random(int.from_bytes(seed_hash[8:16], byteorder='big'))
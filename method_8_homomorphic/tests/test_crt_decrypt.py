@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Paillier暗号のCRT復号のテスト
+"""
+
+import unittest
+import os
+import sys
+import json
+import random
+from unittest import mock
+
+# 親ディレクトリをインポートパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# モジュールインポート
+import decrypt as decrypt_module
+from encrypt import PaillierCryptosystem, generate_key_parameters, encrypt_data
+
+
+class TestCrtDecrypt(unittest.TestCase):
+    """CRT復号と従来の lambda/mu による復号のテスト"""
+
+    @classmethod
+    def setUpClass(cls):
+        """鍵ファイルと暗号文を一度だけ生成"""
+        params_a, params_b = generate_key_parameters(os.urandom(32))
+
+        # チャンク境界にそろえた平文（復号側はチャンクサイズ単位でバイト列に戻す）
+        chunk_size = (params_a["public_key"]["n"].bit_length() - 64) // 8
+        cls.data_a = (b"dataset A " * chunk_size)[:2 * chunk_size]
+        cls.data_b = (b"dataset B " * chunk_size)[:2 * chunk_size]
+        cls.encrypted, cls.key_info_a, cls.key_info_b = encrypt_data(cls.data_a, cls.data_b, params_a, params_b)
+
+    def _key_files(self):
+        """鍵ファイルに保存して読み込んだ状態の鍵データA/Bを作成"""
+        return [json.loads(json.dumps(key_info)) for key_info in (self.key_info_a, self.key_info_b)]
+
+    def _decrypt_both(self, key_a, key_b):
+        """両方の鍵で復号し、CRT復号の呼び出し回数とともに返す"""
+        with mock.patch.object(decrypt_module.PaillierCryptosystem, "_decrypt_crt", autospec=True,
+                               side_effect=decrypt_module.PaillierCryptosystem._decrypt_crt) as crt:
+            result_a = decrypt_module.decrypt_with_key(self.encrypted, key_a, "keys/dataset_a_key.json")
+            result_b = decrypt_module.decrypt_with_key(self.encrypted, key_b, "keys/dataset_b_key.json")
+        return result_a, result_b, crt.call_count
+
+    def test_crt_matches_standard_decryption(self):
+        """CRT復号の結果が lambda/mu による復号と一致すること"""
+        paillier = PaillierCryptosystem(key_size=512)
+        paillier.generate_keypair()
+        self.assertTrue(paillier._use_crt(paillier.public_key["n"]))
+
+        standard = PaillierCryptosystem(key_size=512)
+        standard.public_key = dict(paillier.public_key)
+        standard.private_key = {"lambda": paillier.private_key["lambda"], "mu": paillier.private_key["mu"]}
+        self.assertFalse(standard._use_crt(standard.public_key["n"]))
+
+        n = paillier.public_key["n"]
+        for m in [0, 1, n - 1] + [random.randrange(n) for _ in range(20)]:
+            c = paillier.encrypt(m)
+            self.assertEqual(paillier.decrypt(c), standard.decrypt(c))
+            self.assertEqual(paillier.decrypt(c), m)
+
+    def test_key_files_decrypt_with_crt(self):
+        """鍵ファイルは素因数を秘密鍵に含めず、prime_factor から復元してCRT復号すること"""
+        key_a, key_b = self._key_files()
+        for key in (key_a, key_b):
+            private_key = key["parameters"]["private_key"]
+            self.assertNotIn("p", private_key)
+            self.assertNotIn("q", private_key)
+            for name in PaillierCryptosystem.CRT_KEY_FIELDS:
+                self.assertIn(name, private_key)
+
+        # データセットAは p、データセットBは q を prime_factor として持つ
+        result_a, result_b, crt_calls = self._decrypt_both(key_a, key_b)
+        self.assertEqual(result_a, self.data_a)
+        self.assertEqual(result_b, self.data_b)
+        self.assertEqual(crt_calls, 4)
+
+        # 素因数が公開鍵と対応しない場合はCRT復号を使用しない
+        paillier = decrypt_module.PaillierCryptosystem()
+        paillier.public_key = dict(key_a["parameters"]["public_key"])
+        paillier.private_key = dict(key_a["parameters"]["private_key"])
+        self.assertFalse(paillier.set_crt_factor(12345))
+        self.assertFalse(paillier._use_crt(paillier.public_key["n"]))
+
+    def test_legacy_key_file_without_crt_fields(self):
+        """CRT用のフィールドを持たない古い鍵ファイルは従来の方法で復号されること"""
+        key_a, key_b = self._key_files()
+        for key in (key_a, key_b):
+            for name in PaillierCryptosystem.CRT_KEY_FIELDS:
+                del key["parameters"]["private_key"][name]
+
+        result_a, result_b, crt_calls = self._decrypt_both(key_a, key_b)
+        self.assertEqual(result_a, self.data_a)
+        self.assertEqual(result_b, self.data_b)
+        self.assertEqual(crt_calls, 0)
+
+
+# テスト実行
+if __name__ == "__main__":
+    unittest.main()